@@ -0,0 +1 @@
+"""Offline bulk generation with SageMaker Batch Transform: sharding and merging."""
@@ -0,0 +1,99 @@
+"""
+Prepare inputs for, and merge outputs of, a Batch Transform run.
+
+Examples:
+    # Shard /invoke request bodies into TGI payloads for the transform
+    python -m batch_transform prepare prompts.jsonl \\
+        s3://<BatchTransformBucket>/input/nightly/
+
+    # Start the transform (see the BatchTransformStateMachineArn output)
+    aws stepfunctions start-execution --state-machine-arn <arn> --input \\
+        '{"job_name": "nightly", "input_prefix": "input/nightly/",
+          "output_prefix": "output/nightly/"}'
+
+    # Put the generations back with their requests, in input order
+    python -m batch_transform merge prompts.jsonl \\
+        s3://<BatchTransformBucket>/output/nightly/ results.jsonl
+"""
+
+import argparse
+import json
+import sys
+
+from batch_transform.records import PayloadFormatter, iter_records
+from batch_transform.shards import MIB, merge_results, write_shards
+from batch_transform.storage import Storage
+from config import CONFIG
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m batch_transform",
+        description="Shard requests for Batch Transform and merge its outputs.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prepare = commands.add_parser("prepare", help="Write TGI payload shards")
+    prepare.add_argument("input", help="JSONL of /invoke request bodies")
+    prepare.add_argument("destination", help="Directory or s3:// prefix for shards")
+    prepare.add_argument(
+        "--chat-template",
+        default=CONFIG.model.chat_template.value,
+        help="Prompt format (default: config.model.chat_template)",
+    )
+    prepare.add_argument(
+        "--system-prompt",
+        default=CONFIG.model.system_prompt,
+        help="System message (default: config.model.system_prompt)",
+    )
+    prepare.add_argument("--max-records", type=int, default=500, help="Per shard")
+    prepare.add_argument("--max-shard-mb", type=int, default=64)
+    prepare.add_argument(
+        "--max-payload-mb",
+        type=int,
+        default=(
+            CONFIG.batch_transform.max_payload_mb if CONFIG.batch_transform else 6
+        ),
+        help="Largest record (default: config.batch_transform.max_payload_mb)",
+    )
+
+    merge = commands.add_parser("merge", help="Merge outputs in input order")
+    merge.add_argument("input", help="The JSONL that was prepared")
+    merge.add_argument("outputs", help="Directory or s3:// prefix of the outputs")
+    merge.add_argument("destination", help="Results file or s3:// URI (JSONL)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    storage = Storage()
+    records = iter_records(storage.read_lines(args.input))
+
+    if args.command == "prepare":
+        formatter = PayloadFormatter(
+            args.chat_template, args.system_prompt, CONFIG.model.generation_defaults
+        )
+        shards = write_shards(
+            records,
+            formatter,
+            storage,
+            args.destination,
+            max_records=args.max_records,
+            max_shard_bytes=args.max_shard_mb * MIB,
+            max_record_bytes=args.max_payload_mb * MIB,
+        )
+        total = sum(shard.records for shard in shards)
+        print(f"Wrote {total} records in {len(shards)} shards to {args.destination}")
+        return 0
+
+    count = 0
+    with storage.open_write(args.destination) as f:
+        for result in merge_results(records, storage, args.outputs):
+            f.write(json.dumps(result) + "\n")
+            count += 1
+    print(f"Merged {count} results into {args.destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
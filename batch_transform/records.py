@@ -0,0 +1,90 @@
+"""Turn /invoke request bodies into TGI payloads and back into results."""
+
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from slm_sagemaker.direct_integration import (
+    CHAT_TEMPLATE_FORMATS,
+    DEFAULT_GENERATION_PARAMETERS,
+)
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """
+    Parse request bodies from JSONL lines, skipping blank lines.
+
+    Each line is an /invoke request body, e.g.
+    ``{"prompt": "...", "parameters": {"max_new_tokens": 64}}``; other fields
+    (such as an id) are carried through to the merged results.
+
+    Raises:
+        ValueError: If a line is not an object with a prompt
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict) or not record.get("prompt"):
+            raise ValueError(f"Line {line_number}: expected an object with a 'prompt'")
+        yield record
+
+
+class PayloadFormatter:
+    """Build the TGI payload the invoke handler would send for a request."""
+
+    def __init__(
+        self,
+        chat_template: str,
+        system_prompt: str,
+        generation_defaults: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Args:
+            chat_template: Prompt format of the model, e.g. "zephyr"
+            system_prompt: System message placed before each prompt
+            generation_defaults: Parameters used when a request omits them
+        """
+        if chat_template not in CHAT_TEMPLATE_FORMATS:
+            raise ValueError(f"Unknown chat template {chat_template!r}")
+        self.message, self.assistant_prefix, self.stop = CHAT_TEMPLATE_FORMATS[
+            chat_template
+        ]
+        self.system_prompt = system_prompt
+        self.generation_defaults = generation_defaults or {}
+
+    def payload(self, record: dict[str, Any]) -> dict[str, Any]:
+        """TGI payload for a request body."""
+        parameters = {**self.generation_defaults, **record.get("parameters", {})}
+        generation_config = {
+            name: parameters.get(name, default)
+            for name, default in DEFAULT_GENERATION_PARAMETERS.items()
+        }
+        generation_config["return_full_text"] = False
+        generation_config["stop"] = list(self.stop)
+        if parameters.get("seed") is not None:
+            generation_config["seed"] = parameters["seed"]
+        inputs = (
+            self.message.format(role="system", content=self.system_prompt)
+            + self.message.format(role="user", content=record["prompt"])
+            + self.assistant_prefix
+        )
+        return {"inputs": inputs, "parameters": generation_config}
+
+
+def merge_result(record: dict[str, Any], output_line: str) -> dict[str, Any]:
+    """
+    Combine a request body with its Batch Transform output line.
+
+    Returns:
+        The request's fields plus generated_text, and usage when TGI
+        reported token details
+    """
+    output = json.loads(output_line)
+    if isinstance(output, list):
+        output = output[0]
+    result = {**record, "generated_text": output["generated_text"]}
+    details = output.get("details") or {}
+    if "generated_tokens" in details:
+        result["usage"] = {"generated_tokens": details["generated_tokens"]}
+    return result
@@ -0,0 +1,135 @@
+"""Split requests into Batch Transform input shards and merge the outputs.
+
+Batch Transform reads every object under the input prefix, splits each into
+records by line and writes ``<object name>.out`` under the output prefix,
+with one line per input record in input order. Shards are contiguous runs of
+the input whose names sort in input order, so merging walks the outputs in
+name order beside the input and puts every result back with its request.
+Both directions stream: one shard is written at a time and one line of each
+file is read at a time.
+"""
+
+import contextlib
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import chain, zip_longest
+from typing import Any
+
+from batch_transform.records import PayloadFormatter, merge_result
+from batch_transform.storage import Storage, join
+
+SHARD_NAME = "shard-{index:05d}.jsonl"
+OUTPUT_SUFFIX = ".out"
+
+MIB = 1024 * 1024
+
+_MISSING = object()
+
+
+@dataclass
+class Shard:
+    """One input object of the transform."""
+
+    name: str
+    records: int = 0
+    size_bytes: int = 0
+
+
+def write_shards(
+    records: Iterable[dict[str, Any]],
+    formatter: PayloadFormatter,
+    storage: Storage,
+    destination: str,
+    max_records: int = 500,
+    max_shard_bytes: int = 64 * MIB,
+    max_record_bytes: int = 6 * MIB,
+) -> list[Shard]:
+    """
+    Write TGI payloads for requests as JSONL shards.
+
+    A shard is closed (and uploaded, for S3) before the next is started.
+    Smaller shards spread better over transform instances; each instance
+    works through whole shards.
+
+    Args:
+        records: Request bodies, in order
+        formatter: Builds the TGI payload of each request
+        storage: Where shards are written
+        destination: Directory or S3 prefix for the shards
+        max_records: Most records per shard
+        max_shard_bytes: Largest shard
+        max_record_bytes: Largest payload, the transform's MaxPayloadInMB
+
+    Returns:
+        The shards written, in input order
+
+    Raises:
+        ValueError: If a payload is larger than max_record_bytes
+    """
+    shards: list[Shard] = []
+    with contextlib.ExitStack() as stack:
+        writer = None
+        for number, record in enumerate(records, start=1):
+            line = json.dumps(formatter.payload(record)) + "\n"
+            size = len(line.encode("utf-8"))
+            if size > max_record_bytes:
+                raise ValueError(
+                    f"Record {number} is {size} bytes, over the transform's "
+                    f"{max_record_bytes} byte payload limit"
+                )
+            if (
+                writer is None
+                or shards[-1].records >= max_records
+                or shards[-1].size_bytes + size > max_shard_bytes
+            ):
+                stack.close()
+                shards.append(Shard(SHARD_NAME.format(index=len(shards))))
+                writer = stack.enter_context(
+                    storage.open_write(join(destination, shards[-1].name))
+                )
+            writer.write(line)
+            shards[-1].records += 1
+            shards[-1].size_bytes += size
+    return shards
+
+
+def merge_results(
+    records: Iterable[dict[str, Any]], storage: Storage, outputs: str
+) -> Iterator[dict[str, Any]]:
+    """
+    Pair requests with the transform's outputs, in input order.
+
+    Args:
+        records: The request bodies that were sharded, in order
+        storage: Where the outputs are read from
+        outputs: Directory or S3 prefix the transform wrote to
+
+    Yields:
+        Each request's fields plus its generated_text
+
+    Raises:
+        ValueError: If shard outputs are missing or the record counts differ
+    """
+    names = [name for name in storage.list(outputs) if name.endswith(OUTPUT_SUFFIX)]
+    if not names:
+        raise ValueError(f"No transform outputs under {outputs}")
+    expected = [SHARD_NAME.format(index=i) + OUTPUT_SUFFIX for i in range(len(names))]
+    if names != expected:
+        missing = sorted(set(expected) - set(names))
+        raise ValueError(
+            f"Outputs under {outputs} are not a complete run of shards; "
+            f"missing {', '.join(missing)}"
+        )
+
+    lines = chain.from_iterable(storage.read_lines(join(outputs, n)) for n in names)
+    output_lines = (line for line in lines if line.strip())
+    for number, (record, line) in enumerate(
+        zip_longest(records, output_lines, fillvalue=_MISSING), start=1
+    ):
+        if record is _MISSING or line is _MISSING:
+            raise ValueError(
+                f"Input and outputs differ in length at record {number}; "
+                "was the input changed since it was sharded?"
+            )
+        yield merge_result(record, line)
@@ -0,0 +1,98 @@
+"""Streaming reads and writes of local files and S3 objects.
+
+Locations are local paths or ``s3://bucket/key`` URIs. Reads stream line by
+line; S3 writes go to a temporary file that is uploaded when it is closed, so
+no whole file is ever held in memory.
+"""
+
+import contextlib
+import os
+import tempfile
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+S3_SCHEME = "s3://"
+
+
+def is_s3_uri(location: str) -> bool:
+    return location.startswith(S3_SCHEME)
+
+
+def split_s3_uri(uri: str) -> tuple[str, str]:
+    """Bucket and key (or key prefix) of an ``s3://`` URI."""
+    bucket, _, key = uri[len(S3_SCHEME) :].partition("/")
+    return bucket, key
+
+
+def join(location: str, name: str) -> str:
+    """Location of a file inside a directory or S3 prefix."""
+    if is_s3_uri(location):
+        return location.rstrip("/") + "/" + name
+    return os.path.join(location, name)
+
+
+class Storage:
+    """Local files and S3 objects behind one interface."""
+
+    def __init__(self, s3_client: Any = None) -> None:
+        """
+        Args:
+            s3_client: S3 client, created on first use if omitted
+        """
+        self._s3_client = s3_client
+
+    @property
+    def s3(self) -> Any:
+        if self._s3_client is None:
+            import boto3
+
+            self._s3_client = boto3.client("s3")
+        return self._s3_client
+
+    def read_lines(self, location: str) -> Iterator[str]:
+        """Lines of a file or object, without line endings."""
+        if is_s3_uri(location):
+            bucket, key = split_s3_uri(location)
+            body = self.s3.get_object(Bucket=bucket, Key=key)["Body"]
+            for line in body.iter_lines():
+                yield line.decode("utf-8")
+        else:
+            with open(location, encoding="utf-8") as f:
+                for line in f:
+                    yield line.rstrip("\n")
+
+    def list(self, location: str) -> list[str]:
+        """Names of the files directly inside a directory or S3 prefix, sorted."""
+        if not is_s3_uri(location):
+            return sorted(
+                name
+                for name in os.listdir(location)
+                if os.path.isfile(os.path.join(location, name))
+            )
+        bucket, prefix = split_s3_uri(location.rstrip("/") + "/")
+        names = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+            keys = (item["Key"] for item in page.get("Contents", []))
+            names.extend(key[len(prefix) :] for key in keys)
+        return sorted(names)
+
+    @contextlib.contextmanager
+    def open_write(self, location: str) -> Iterator[TextIO]:
+        """Open a file or object for writing text; objects upload on close."""
+        if not is_s3_uri(location):
+            directory = os.path.dirname(location)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(location, "w", encoding="utf-8") as f:
+                yield f
+            return
+
+        bucket, key = split_s3_uri(location)
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                yield f
+            self.s3.upload_file(path, bucket, key)
+        finally:
+            os.unlink(path)
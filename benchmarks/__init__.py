@@ -0,0 +1 @@
+"""Microbenchmarks of the invoke handler's per-request overhead."""
@@ -0,0 +1,86 @@
+"""
+Benchmark the invoke handler's per-request overhead.
+
+Examples:
+    # Compare against benchmarks/baseline.json; exits 1 on a regression
+    python -m benchmarks
+
+    # Record a new baseline after an intended change
+    python -m benchmarks --update-baseline
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.gate import (
+    DEFAULT_TOLERANCES,
+    find_regressions,
+    format_results,
+    load_baseline,
+    save_baseline,
+)
+from benchmarks.handler_bench import run
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the invoke handler's per-request overhead.",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store this run as the baseline instead of checking against it",
+    )
+    parser.add_argument("--iterations", type=int, default=300, help="Per repeat")
+    parser.add_argument("--repeats", type=int, default=9, help="Median of N repeats")
+    parser.add_argument("--import-runs", type=int, default=9)
+    parser.add_argument(
+        "--cpu-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCES["relative_cpu"],
+        help="Allowed CPU time growth, as a fraction",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCES["peak_kib"],
+        help="Allowed peak memory growth, as a fraction",
+    )
+    parser.add_argument("--output", help="Also write the results to this file (JSON)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results = run(args.iterations, args.repeats, args.import_runs)
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        save_baseline(results)
+        print("Baseline updated")
+        return 0
+
+    baseline = load_baseline()
+    if baseline is None:
+        print("No baseline recorded; run with --update-baseline")
+        return 1
+    regressions = find_regressions(
+        baseline,
+        results,
+        {"relative_cpu": args.cpu_tolerance, "peak_kib": args.memory_tolerance},
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print("Within baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Compare benchmark results against the stored baseline."""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# Allowed growth over the baseline before a metric counts as a regression.
+# CPU ratios move with machine load and Python version, allocations barely do.
+DEFAULT_TOLERANCES = {"relative_cpu": 0.35, "peak_kib": 0.15, "import": 0.5}
+
+# Growth in calibration units allowed on top of the tolerance. Scenarios of a
+# few tens of microseconds jitter by more than 35% from timer resolution and
+# cache effects alone; this slack is negligible for larger ones.
+CPU_SLACK = 1.0
+
+
+@dataclass
+class Regression:
+    """A metric that grew beyond its tolerance."""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.baseline:.3g} -> {self.current:.3g} "
+            f"({self.change:+.0%})"
+        )
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, Any] | None:
+    """Stored results, or None if no baseline has been recorded."""
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: dict[str, Any], path: Path = BASELINE_PATH) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    tolerances: dict[str, float] | None = None,
+) -> list[Regression]:
+    """
+    List metrics of the current run that exceed the baseline by more than
+    their tolerance.
+
+    CPU time and import time are compared in calibration units, so a faster
+    or slower machine than the one that recorded the baseline does not count.
+    Scenario CPU time may also grow by CPU_SLACK units. Scenarios missing from
+    either side are skipped.
+
+    Args:
+        baseline: Results of an earlier run, from load_baseline()
+        current: Results of this run
+        tolerances: Fractional growth allowed per metric, defaults to
+            DEFAULT_TOLERANCES
+
+    Returns:
+        Regressions, empty if the run is within budget
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    regressions = []
+
+    def check(
+        name: str, metric: str, before: float, after: float, slack: float = 0.0
+    ) -> None:
+        if before > 0 and after > before * (1 + tolerances[metric]) + slack:
+            regressions.append(Regression(name, before, after))
+
+    check(
+        "import (relative)",
+        "import",
+        baseline["import"]["relative"],
+        current["import"]["relative"],
+    )
+    for scenario, before in baseline["scenarios"].items():
+        after = current["scenarios"].get(scenario)
+        if after is None:
+            continue
+        check(
+            f"{scenario} relative_cpu",
+            "relative_cpu",
+            before["relative_cpu"],
+            after["relative_cpu"],
+            CPU_SLACK,
+        )
+        check(f"{scenario} peak_kib", "peak_kib", before["peak_kib"], after["peak_kib"])
+    return regressions
+
+
+def format_results(results: dict[str, Any]) -> str:
+    """Render results as a table, one row per scenario."""
+    lines = [
+        f"Import:           {results['import']['ms']:.1f} ms",
+        f"{'Scenario':<18}{'CPU/request':>12}{'relative':>10}{'peak':>12}",
+    ]
+    for name, scenario in results["scenarios"].items():
+        lines.append(
+            f"{name:<18}{scenario['cpu_us']:>9.0f} us"
+            f"{scenario['relative_cpu']:>10.2f}{scenario['peak_kib']:>8.1f} KiB"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,256 @@
+"""Measure what lambda_handler adds on top of the endpoint call.
+
+The SageMaker runtime is stubbed to return a prebuilt TGI response, so the
+timings cover only the handler: body parsing, templating, payload and
+response serialization, caching and metrics. CPU times are also expressed
+relative to a fixed calibration workload, so a baseline recorded on one
+machine can gate runs on another.
+"""
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+LAMBDA_SOURCE_DIR = (
+    Path(__file__).resolve().parent.parent / "lambda" / "invoke_sagemaker"
+)
+
+# Times the calibration workload (document in argv[1]) and then the import,
+# both in CPU seconds, in the same fresh interpreter
+IMPORT_SCRIPT = """
+import json, sys, time
+document = json.loads(sys.argv[1])
+start = time.process_time()
+for _ in range(200):
+    json.loads(json.dumps(document))
+unit = (time.process_time() - start) / 200
+start = time.process_time()
+import handler
+print(json.dumps({"seconds": time.process_time() - start, "unit": unit}))
+"""
+
+
+@dataclass
+class Scenario:
+    """One request shape sent to the handler."""
+
+    name: str
+    event: dict[str, Any]
+    generated_text: str
+    resource: str = "/invoke"
+
+
+@dataclass
+class ScenarioResult:
+    """Per-request cost of a scenario."""
+
+    cpu_us: float  # CPU time per request
+    relative_cpu: float  # CPU time in calibration units
+    peak_kib: float  # Peak traced memory while handling one request
+
+
+class StubRuntime:
+    """sagemaker-runtime client returning a fixed TGI response instantly."""
+
+    def __init__(self, generated_text: str) -> None:
+        result = [
+            {
+                "generated_text": generated_text,
+                "details": {"generated_tokens": len(generated_text) // 4},
+            }
+        ]
+        self._body = json.dumps(result).encode()
+
+    def invoke_endpoint(self, **kwargs: Any) -> dict[str, Any]:
+        return {"Body": io.BytesIO(self._body)}
+
+
+def _words(count: int) -> str:
+    return " ".join(f"word{i % 97}" for i in range(count))
+
+
+def default_scenarios() -> list[Scenario]:
+    """Small and large prompts and outputs, a cache hit and a batch."""
+    small_prompt = "What is the capital of France?"
+    large_prompt = _words(1200)
+    return [
+        Scenario("small", {"prompt": small_prompt}, "Paris is the capital."),
+        Scenario("large-prompt", {"prompt": large_prompt}, "Paris is the capital."),
+        Scenario("large-output", {"prompt": small_prompt}, _words(800)),
+        Scenario(
+            "large-both",
+            {"prompt": large_prompt, "parameters": {"max_new_tokens": 1024}},
+            _words(800),
+        ),
+        Scenario(
+            "cache-hit",
+            {"prompt": small_prompt, "parameters": {"do_sample": False}},
+            "Paris is the capital.",
+        ),
+        Scenario(
+            "batch-8",
+            {"prompts": [f"{small_prompt} ({i})" for i in range(8)]},
+            "Paris is the capital.",
+            resource="/invoke/batch",
+        ),
+    ]
+
+
+def load_handler() -> Any:
+    """Import the handler with deterministic settings for benchmarking."""
+    os.environ.setdefault("SAGEMAKER_ENDPOINT_NAME", "bench-endpoint")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    if str(LAMBDA_SOURCE_DIR) not in sys.path:
+        sys.path.insert(0, str(LAMBDA_SOURCE_DIR))
+    import handler
+
+    # Token counting depends on whether `make tokenizer` has run; keep it off
+    # so baselines compare like with like
+    handler.tokenizers = {handler.TOKENIZER_PATH: None}
+    handler.PAYLOAD_LOG_SAMPLE_RATE = 0.0
+    return handler
+
+
+CALIBRATION_DOCUMENT = {"items": [{"id": i, "text": _words(8)} for i in range(20)]}
+
+
+def calibrate(iterations: int = 500, repeats: int = 5) -> float:
+    """CPU seconds of a fixed JSON workload, the unit of relative CPU time."""
+    return _median([_calibration_sample(iterations) for _ in range(repeats)])
+
+
+def measure_import(runs: int = 9) -> tuple[float, float]:
+    """
+    CPU time to import the handler in a fresh interpreter.
+
+    Returns:
+        Median CPU seconds, and the median ratio to the calibration workload
+        timed in the same interpreter
+    """
+    env = {**os.environ, "SAGEMAKER_ENDPOINT_NAME": "bench-endpoint"}
+    env.pop("PRIME_ON_INIT", None)
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT, json.dumps(CALIBRATION_DOCUMENT)],
+            cwd=LAMBDA_SOURCE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        timings.append(json.loads(output.strip().splitlines()[-1]))
+    return (
+        _median([timing["seconds"] for timing in timings]),
+        _median([timing["seconds"] / timing["unit"] for timing in timings]),
+    )
+
+
+def measure_scenario(
+    handler: Any,
+    scenario: Scenario,
+    iterations: int = 300,
+    repeats: int = 9,
+) -> ScenarioResult:
+    """
+    Time and trace one scenario.
+
+    Each repeat times the calibration workload right before the scenario, so
+    both see the same machine load, and relative CPU time is the median of
+    their ratios. Peak memory is the traced peak of a single request, as the
+    median over a few requests.
+    """
+    handler.sagemaker_runtime = StubRuntime(scenario.generated_text)
+    event = {"resource": scenario.resource, "body": json.dumps(scenario.event)}
+
+    def call() -> None:
+        response = handler.lambda_handler(event, None)
+        if response["statusCode"] != 200:
+            raise RuntimeError(f"{scenario.name} failed: {response['body']}")
+
+    # Metrics records are part of the cost, but not of the output
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for _ in range(max(iterations // 10, 1)):
+            call()
+        samples = []
+        for _ in range(repeats):
+            unit = _calibration_sample(max(iterations // 2, 1))
+            samples.append((_cpu_per_call(call, iterations), unit))
+        peak = _peak_bytes(call, max(iterations // 10, 1))
+
+    return ScenarioResult(
+        cpu_us=_median([cpu for cpu, _ in samples]) * 1e6,
+        relative_cpu=_median([cpu / unit for cpu, unit in samples]),
+        peak_kib=peak / 1024,
+    )
+
+
+def _median(values: list[float]) -> float:
+    return sorted(values)[len(values) // 2]
+
+
+def _calibration_sample(iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        json.loads(json.dumps(CALIBRATION_DOCUMENT))
+    return (time.process_time() - started) / iterations
+
+
+def _cpu_per_call(call: Callable[[], None], iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        call()
+    return (time.process_time() - started) / iterations
+
+
+def _peak_bytes(call: Callable[[], None], iterations: int) -> int:
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        return sorted(peaks)[len(peaks) // 2]
+    finally:
+        tracemalloc.stop()
+
+
+def run(
+    iterations: int = 300, repeats: int = 9, import_runs: int = 9
+) -> dict[str, Any]:
+    """
+    Run every scenario and the import benchmark.
+
+    Returns:
+        JSON-serializable results, in the format of the stored baseline
+    """
+    handler = load_handler()
+    calibration = calibrate(repeats=repeats)
+    import_seconds, import_relative = measure_import(import_runs)
+    scenarios = {
+        scenario.name: {
+            metric: round(value, 2)
+            for metric, value in vars(
+                measure_scenario(handler, scenario, iterations, repeats)
+            ).items()
+        }
+        for scenario in default_scenarios()
+    }
+    return {
+        "calibration_us": round(calibration * 1e6, 2),
+        "import": {
+            "ms": round(import_seconds * 1000, 2),
+            "relative": round(import_relative, 2),
+        },
+        "scenarios": scenarios,
+    }
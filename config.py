@@ -1,7 +1,8 @@
 """Configuration for SageMaker LLM deployment."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from typing import Any
 
 
 class EndpointType(Enum):
@@ -9,6 +10,83 @@ class EndpointType(Enum):
 
     REAL_TIME = "real-time"
     SERVERLESS = "serverless"
+    ASYNC = "async"
+    INFERENCE_COMPONENTS = "inference-components"
+
+
+@dataclass
+class ModelArchitecture:
+    """Model dimensions used to size TGI's KV cache and batch token budgets."""
+
+    num_parameters_billions: float
+    num_layers: int
+    num_attention_heads: int
+    num_kv_heads: int
+    head_dim: int
+    max_context_length: int
+
+
+@dataclass
+class TgiLimits:
+    """Explicit TGI limits; any value set here overrides the derived one."""
+
+    num_shards: int | None = None
+    max_input_length: int | None = None
+    max_total_tokens: int | None = None
+    max_batch_prefill_tokens: int | None = None
+    max_batch_total_tokens: int | None = None
+
+
+class Quantization(Enum):
+    """TGI weight quantization methods."""
+
+    BITSANDBYTES = "bitsandbytes"  # 8-bit, quantized on load
+    EETQ = "eetq"  # 8-bit, quantized on load
+    AWQ = "awq"  # 4-bit, requires an AWQ checkpoint
+    GPTQ = "gptq"  # 4-bit, requires a GPTQ checkpoint
+
+
+class Dtype(Enum):
+    """TGI weight dtypes for unquantized models."""
+
+    FLOAT16 = "float16"
+    BFLOAT16 = "bfloat16"
+
+
+@dataclass
+class TgiProfile:
+    """TGI performance options passed to the container environment."""
+
+    quantization: Quantization | None = None
+    dtype: Dtype | None = None
+    speculate: int | None = None  # n-gram speculative lookahead tokens
+    cuda_graphs: list[int] | None = None  # batch sizes to capture; [] disables
+
+
+class ChatTemplate(Enum):
+    """Prompt formats the invoke Lambda can render."""
+
+    ZEPHYR = "zephyr"  # TinyLlama-Chat, Zephyr
+    CHATML = "chatml"  # Qwen2, SmolLM
+    PHI3 = "phi3"
+    LLAMA3 = "llama3"
+
+
+@dataclass
+class InferenceComponentResources:
+    """Resources reserved for each copy of a model on a shared endpoint."""
+
+    num_accelerators: int = 1
+    min_memory_mb: int = 4096  # Host memory
+    copy_count: int = 1
+
+
+@dataclass
+class LoraAdapter:
+    """LoRA adapter loaded beside the base model and selected per request."""
+
+    name: str  # Request-facing name, e.g. "support"
+    hf_adapter_id: str  # HuggingFace Hub id of the adapter weights
 
 
 @dataclass
@@ -17,6 +95,65 @@ class ModelConfig:
 
     name: str
     hf_model_id: str
+    architecture: ModelArchitecture | None = None
+    tgi_limits: TgiLimits = field(default_factory=TgiLimits)
+    tgi_profile: TgiProfile = field(default_factory=TgiProfile)
+    chat_template: ChatTemplate = ChatTemplate.ZEPHYR
+    system_prompt: str = "You are a helpful AI assistant."
+    # Generation parameters used when a request omits them
+    generation_defaults: dict[str, Any] = field(default_factory=dict)
+    # Fine-tuned variants served from the same GPU as the base model; needs a
+    # TGI image with multi-LoRA support (2.1 or later)
+    adapters: list[LoraAdapter] = field(default_factory=list)
+    # Only used by inference component endpoints
+    resources: InferenceComponentResources = field(
+        default_factory=InferenceComponentResources
+    )
+
+
+class ScalingMetric(Enum):
+    """Metrics that real-time endpoint autoscaling can track."""
+
+    INVOCATIONS_PER_INSTANCE = "invocations-per-instance"
+    CONCURRENT_REQUESTS_PER_MODEL = "concurrent-requests-per-model"
+
+
+@dataclass
+class ScheduledScalingWindow:
+    """Capacity bounds applied on a schedule, e.g. scaling down overnight."""
+
+    name: str
+    schedule: str  # Application Auto Scaling expression, e.g. "cron(0 22 * * ? *)"
+    min_capacity: int
+    max_capacity: int
+
+
+@dataclass
+class AutoscalingConfig:
+    """Target-tracking autoscaling for the real-time endpoint variant."""
+
+    enabled: bool
+    min_capacity: int
+    max_capacity: int
+    metric: ScalingMetric
+    target_value: float
+    scale_in_cooldown_seconds: int
+    scale_out_cooldown_seconds: int
+    scheduled_windows: list[ScheduledScalingWindow] = field(default_factory=list)
+
+
+@dataclass
+class EndpointVariant:
+    """Production or shadow variant of a real-time endpoint."""
+
+    name: str
+    instance_type: str
+    initial_instance_count: int = 1
+    # Traffic share relative to the other production variants; for a shadow
+    # variant, the share of production requests copied to it
+    weight: float = 1.0
+    # Image override, e.g. a Neuron TGI image for ml.inf2 instances
+    tgi_image_uri: str | None = None
 
 
 @dataclass
@@ -25,6 +162,12 @@ class RealTimeEndpointConfig:
 
     instance_type: str
     initial_instance_count: int
+    autoscaling: AutoscalingConfig | None = None
+    # Weighted variants that replace the single AllTraffic variant, e.g. to
+    # compare instance types under live traffic
+    variants: list[EndpointVariant] = field(default_factory=list)
+    # Receives a copy of production traffic; its responses are discarded
+    shadow_variant: EndpointVariant | None = None
 
 
 @dataclass
@@ -35,13 +178,61 @@ class ServerlessEndpointConfig:
     max_concurrency: int
 
 
+@dataclass
+class AsyncEndpointConfig:
+    """Asynchronous endpoint configuration."""
+
+    instance_type: str
+    max_instance_count: int
+    max_concurrent_invocations_per_instance: int
+    scale_to_zero: bool = True
+
+
+@dataclass
+class InferenceComponentsEndpointConfig:
+    """Shared instances that host every model as an inference component."""
+
+    instance_type: str
+    initial_instance_count: int
+
+
+@dataclass
+class WarmupConfig:
+    """Priming generations sent after each deploy, and serverless keep-warm pings."""
+
+    # Approximate prompt lengths in tokens; cover what clients send, within the
+    # model's input limit
+    prompt_tokens: list[int] = field(default_factory=lambda: [32, 256, 1024])
+    requests_per_length: int = 2
+    max_new_tokens: int = 16
+    # Roll the deployment back if a priming request fails
+    fail_on_error: bool = False
+    # Serverless endpoints only: ping the endpoint this often so its containers
+    # are not reclaimed while idle; 0 disables
+    keep_warm_minutes: int = 0
+    # Pings sent at once, i.e. serverless containers kept warm
+    keep_warm_concurrency: int = 1
+
+
 @dataclass
 class EndpointConfig:
-    """Endpoint configuration supporting both real-time and serverless."""
+    """Endpoint configuration for every supported endpoint type."""
 
     type: EndpointType
     real_time: RealTimeEndpointConfig
     serverless: ServerlessEndpointConfig
+    async_inference: AsyncEndpointConfig | None = None
+    inference_components: InferenceComponentsEndpointConfig | None = None
+    # Warm the endpoint once it is InService (real-time and serverless only)
+    warmup: WarmupConfig | None = None
+
+
+class GenerationBudgetMode(Enum):
+    """What the handler does with max_new_tokens that cannot finish in time."""
+
+    CLAMP = "clamp"  # Lower it to what fits before the deadline
+    REJECT = "reject"  # Answer 400
+    OFF = "off"  # Send it as requested
 
 
 @dataclass
@@ -49,6 +240,71 @@ class ApiConfig:
     """API Gateway configuration."""
 
     name: str
+    enable_streaming: bool = False
+    enable_shared_cache: bool = False
+    snap_start: bool = False
+    provisioned_concurrency: int = 0
+    # Multi-turn sessions with history stored in DynamoDB
+    enable_sessions: bool = False
+    # Pin each session to one instance with SageMaker stateful sessions; the
+    # serving container must support them (real-time endpoints only)
+    sticky_sessions: bool = False
+    # Send a duplicate of a short generation that has not answered after this
+    # many milliseconds, taking whichever finishes first; 0 disables hedging
+    hedge_after_ms: int = 0
+    # Fit max_new_tokens to the request deadline at the observed tokens/s
+    generation_budget_mode: GenerationBudgetMode = GenerationBudgetMode.CLAMP
+    # Serve deterministic requests whose prompt is at least this similar (0-1)
+    # to a cached one from the cache; 0 disables near-duplicate matching
+    near_duplicate_threshold: float = 0.0
+    # Integrate POST /invoke with the SageMaker runtime directly, formatting the
+    # prompt in API Gateway mapping templates; skips the Lambda and its cache,
+    # admission control and retries (single-model endpoints only)
+    direct_integration: bool = False
+    # API Gateway gzips responses of at least this many bytes for clients that
+    # send Accept-Encoding, and decompresses gzip request bodies; None disables
+    min_compression_bytes: int | None = 1024
+    # Fraction of requests (0-1) whose full payload and response are logged
+    payload_log_sample_rate: float = 0.0
+
+
+@dataclass
+class BatchTransformConfig:
+    """Batch Transform jobs for offline bulk generation with the endpoint's model."""
+
+    instance_type: str
+    instance_count: int = 1
+    # Records each instance sends to TGI at once; TGI batches them together
+    max_concurrent_transforms: int = 8
+    max_payload_mb: int = 6  # Largest record
+    timeout_hours: int = 12
+
+
+@dataclass
+class RegionConfig:
+    """A region the deployment runs in, with its own endpoint capacity."""
+
+    region: str
+    # Capacity overrides for the endpoint type in use; None keeps the value in
+    # config.endpoint
+    instance_type: str | None = None  # Real-time, async, inference components
+    initial_instance_count: int | None = None  # Real-time, inference components
+    min_capacity: int | None = None  # Real-time autoscaling
+    max_capacity: int | None = None  # Real-time autoscaling, async
+    max_concurrency: int | None = None  # Serverless
+
+
+@dataclass
+class GlobalRoutingConfig:
+    """One hostname that sends each client to the nearest healthy region."""
+
+    domain_name: str  # e.g. "llm.example.com"
+    # Route 53 public hosted zone that domain_name belongs to
+    hosted_zone_id: str
+    hosted_zone_name: str  # e.g. "example.com"
+    health_check_interval_seconds: int = 30  # 10 or 30
+    # Failed checks in a row before a region stops receiving traffic
+    health_check_failure_threshold: int = 3
 
 
 @dataclass
@@ -59,6 +315,15 @@ class DeploymentConfig:
     endpoint: EndpointConfig
     tgi_image_uri: str
     api: ApiConfig
+    # Further models packed beside `model` on an inference component endpoint
+    additional_models: list[ModelConfig] = field(default_factory=list)
+    # Offline bulk generation; the model is sized for the endpoint's instance
+    # type, so use the same type for the transform
+    batch_transform: BatchTransformConfig | None = None
+    # Deploy one stack per region; empty deploys to the CLI's region only
+    regions: list[RegionConfig] = field(default_factory=list)
+    # Latency-based DNS and health checks across the regional APIs
+    global_routing: GlobalRoutingConfig | None = None
 
 
 # Default configuration
@@ -66,17 +331,43 @@ CONFIG = DeploymentConfig(
     model=ModelConfig(
         name="TinyLlama-1-1B-Chat",
         hf_model_id="TinyLlama/TinyLlama-1.1B-Chat-v1.0",
+        architecture=ModelArchitecture(
+            num_parameters_billions=1.1,
+            num_layers=22,
+            num_attention_heads=32,
+            num_kv_heads=4,
+            head_dim=64,
+            max_context_length=2048,
+        ),
     ),
     endpoint=EndpointConfig(
         type=EndpointType.REAL_TIME,
         real_time=RealTimeEndpointConfig(
             instance_type="ml.g5.xlarge",
             initial_instance_count=1,
+            autoscaling=AutoscalingConfig(
+                enabled=False,
+                min_capacity=1,
+                max_capacity=4,
+                metric=ScalingMetric.INVOCATIONS_PER_INSTANCE,
+                target_value=60,  # invocations per instance per minute
+                scale_in_cooldown_seconds=600,
+                scale_out_cooldown_seconds=60,
+            ),
         ),
         serverless=ServerlessEndpointConfig(
             memory_size_in_mb=3072,
             max_concurrency=10,
         ),
+        async_inference=AsyncEndpointConfig(
+            instance_type="ml.g5.xlarge",
+            max_instance_count=2,
+            max_concurrent_invocations_per_instance=4,
+        ),
+        inference_components=InferenceComponentsEndpointConfig(
+            instance_type="ml.g5.12xlarge",
+            initial_instance_count=1,
+        ),
     ),
     tgi_image_uri="763104351884.dkr.ecr.{region}.amazonaws.com/huggingface-pytorch-tgi-inference:2.1.1-tgi2.0.1-gpu-py310-cu121-ubuntu22.04",
     api=ApiConfig(
@@ -0,0 +1,91 @@
+"""Job submission and result polling for SageMaker async inference endpoints.
+
+Request payloads are written to S3 and queued with ``invoke_endpoint_async``.
+SageMaker writes the TGI response to ``output/<job id>.out``, or an error to
+``failure/<job id>-error.out``, in the same bucket.
+"""
+
+import json
+import re
+import uuid
+from typing import Any, Dict, Optional
+
+# Job ids are generated here, so anything else is rejected before touching S3
+JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9-]{1,64}$")
+
+
+def submit_job(
+    s3: Any,
+    sagemaker_runtime: Any,
+    bucket: str,
+    endpoint_name: str,
+    payload: Dict[str, Any],
+) -> str:
+    """
+    Upload a TGI payload and queue it on the async endpoint.
+
+    Args:
+        s3: S3 client
+        sagemaker_runtime: SageMaker runtime client
+        bucket: Bucket configured as the endpoint's async output location
+        endpoint_name: Async endpoint name
+        payload: TGI request payload
+
+    Returns:
+        Job id to poll for the result
+    """
+    job_id = str(uuid.uuid4())
+    input_key = f"input/{job_id}.json"
+    s3.put_object(
+        Bucket=bucket,
+        Key=input_key,
+        Body=json.dumps(payload).encode(),
+        ContentType="application/json",
+    )
+    response = sagemaker_runtime.invoke_endpoint_async(
+        EndpointName=endpoint_name,
+        InputLocation=f"s3://{bucket}/{input_key}",
+        ContentType="application/json",
+        InferenceId=job_id,
+    )
+    # Derive the id from the output location SageMaker reports, so polling
+    # looks for exactly the object it will write
+    output_name = response["OutputLocation"].rsplit("/", 1)[-1]
+    return output_name.removesuffix(".out")
+
+
+def get_job_result(s3: Any, bucket: str, job_id: str) -> Dict[str, Any]:
+    """
+    Look up the outcome of an async job.
+
+    Args:
+        s3: S3 client
+        bucket: Bucket configured as the endpoint's async output location
+        job_id: Id returned by submit_job
+
+    Returns:
+        {"status": "completed", "result": ...}, {"status": "failed", "error": ...}
+        or {"status": "pending"}
+
+    Raises:
+        ValueError: If the job id is malformed
+    """
+    if not JOB_ID_PATTERN.match(job_id):
+        raise ValueError(f"Invalid job id: {job_id}")
+
+    output = _read_object(s3, bucket, f"output/{job_id}.out")
+    if output is not None:
+        return {"status": "completed", "result": json.loads(output)}
+
+    failure = _read_object(s3, bucket, f"failure/{job_id}-error.out")
+    if failure is not None:
+        return {"status": "failed", "error": failure.decode(errors="replace")}
+
+    return {"status": "pending"}
+
+
+def _read_object(s3: Any, bucket: str, key: str) -> Optional[bytes]:
+    try:
+        return s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except s3.exceptions.NoSuchKey:
+        return None
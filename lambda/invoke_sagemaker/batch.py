@@ -0,0 +1,46 @@
+"""Bounded concurrent fan-out for batch invocations."""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Sequence
+
+
+def run_batch(
+    tasks: Sequence[Callable[[], Any]],
+    max_workers: int,
+    deadline_seconds: float,
+) -> List[Dict[str, Any]]:
+    """
+    Run tasks concurrently and collect their outcomes in input order.
+
+    Tasks that have not finished when the deadline passes are reported as
+    timed out; those not yet started are cancelled.
+
+    Args:
+        tasks: Zero-argument callables, one per batch item
+        max_workers: Maximum number of tasks running at once
+        deadline_seconds: Time budget for the whole batch
+
+    Returns:
+        One dict per task, ``{"result": value}`` or ``{"error": message}``
+    """
+    if not tasks:
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+    try:
+        futures = [executor.submit(task) for task in tasks]
+        wait(futures, timeout=deadline_seconds)
+
+        outcomes = []
+        for future in futures:
+            if not future.done():
+                future.cancel()
+                outcomes.append({"error": "Deadline exceeded"})
+            elif future.exception() is not None:
+                outcomes.append({"error": str(future.exception())})
+            else:
+                outcomes.append({"result": future.result()})
+        return outcomes
+    finally:
+        # Don't block the response on stragglers past the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
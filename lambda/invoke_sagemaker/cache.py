@@ -0,0 +1,187 @@
+"""Two-tier response cache for deterministic generations.
+
+The first tier is an in-process LRU that survives warm invocations of the same
+Lambda container. The optional second tier is a DynamoDB table shared by every
+container, so a generation computed anywhere is reused everywhere.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def cache_key(
+    formatted_prompt: str,
+    generation_config: Dict[str, Any],
+    model: Optional[str] = None,
+) -> str:
+    """
+    Compute a canonical key for a generation request.
+
+    Keys are independent of parameter ordering, so equivalent requests
+    always hash to the same key.
+
+    Args:
+        formatted_prompt: Prompt after chat templating
+        generation_config: Generation parameters sent to TGI
+        model: Inference component serving the request, if the endpoint
+            hosts several models
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    request = {"inputs": formatted_prompt, "parameters": generation_config}
+    if model is not None:
+        request["model"] = model
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_deterministic(generation_config: Dict[str, Any]) -> bool:
+    """Return True if the generation is reproducible (greedy or seeded)."""
+    return not generation_config.get("do_sample") or (
+        generation_config.get("seed") is not None
+    )
+
+
+class LruTtlCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL.
+
+    Safe to share between the threads of a batch.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DynamoDbCache:
+    """Shared cache tier backed by a DynamoDB table with TTL expiry."""
+
+    def __init__(self, table_name: str, ttl_seconds: int, client: Any = None) -> None:
+        """
+        Args:
+            table_name: Table with a ``cache_key`` string partition key
+            ttl_seconds: Lifetime of written items (table TTL attribute ``expires_at``)
+            client: DynamoDB client, created on first use if omitted
+        """
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("dynamodb")
+        return self._client
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self.client.get_item(
+            TableName=self.table_name, Key={"cache_key": {"S": key}}
+        ).get("Item")
+        # DynamoDB deletes expired items lazily, so check the TTL ourselves
+        if item is None or int(item["expires_at"]["N"]) <= time.time():
+            return None
+        return json.loads(item["value"]["S"])
+
+    def put(self, key: str, value: Any) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                "cache_key": {"S": key},
+                "value": {"S": json.dumps(value)},
+                "expires_at": {"N": str(int(time.time()) + self.ttl_seconds)},
+            },
+        )
+
+
+class InMemorySharedCache:
+    """Local stand-in for the shared tier, for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.items: Dict[str, Any] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.items.get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        self.items[key] = value
+
+
+class ResponseCache:
+    """Look up the local tier, then the shared tier, and count hits and misses."""
+
+    def __init__(self, local: LruTtlCache, shared: Any = None) -> None:
+        self.local = local
+        self.shared = shared
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """
+        Look up a key in both tiers.
+
+        Returns:
+            (value, outcome) where outcome is "HIT-LOCAL", "HIT-SHARED" or "MISS"
+        """
+        value = self.local.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value, "HIT-LOCAL"
+
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                # The shared tier is an optimization; never fail the request on it
+                print(f"Shared cache lookup failed: {str(e)}")
+                value = None
+            if value is not None:
+                self.local.put(key, value)
+                self.stats["shared_hits"] += 1
+                return value, "HIT-SHARED"
+
+        self.stats["misses"] += 1
+        return None, "MISS"
+
+    def put(self, key: str, value: Any) -> None:
+        self.local.put(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.put(key, value)
+            except Exception as e:
+                print(f"Shared cache write failed: {str(e)}")
@@ -0,0 +1,67 @@
+"""Decoding of compressed request bodies.
+
+Behind API Gateway, compressed requests are decompressed before they reach
+the Lambda once the API has a minimum compression size, which also makes
+API Gateway gzip large responses for clients that accept it. Bodies that
+reach a function still encoded, such as base64 proxy events and requests to
+the streaming function URL, are decoded here. Decompression is detected from
+the gzip magic number rather than the Content-Encoding header, which API
+Gateway passes on after it has decompressed the body.
+"""
+
+import base64
+import zlib
+from typing import Union
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Largest decompressed body; Lambda payloads cannot exceed 6 MB anyway
+MAX_DECOMPRESSED_BYTES = 6 * 1024 * 1024
+
+
+class RequestEncodingError(ValueError):
+    """A request body could not be decoded."""
+
+
+def decode_body(body: Union[str, bytes], is_base64: bool = False) -> str:
+    """
+    Text of a request body, decompressing it if it is gzip-compressed.
+
+    Args:
+        body: Body as received
+        is_base64: The body is base64-encoded (proxy events with binary bodies)
+
+    Returns:
+        The body as text
+
+    Raises:
+        RequestEncodingError: If the body is not valid base64, gzip or UTF-8,
+            is truncated, or decompresses to more than MAX_DECOMPRESSED_BYTES
+    """
+    if isinstance(body, str):
+        if not is_base64:
+            return body
+        try:
+            body = base64.b64decode(body, validate=True)
+        except ValueError as e:
+            raise RequestEncodingError("Request body is not valid base64") from e
+
+    if body[:2] == GZIP_MAGIC:
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        try:
+            body = decompressor.decompress(body, MAX_DECOMPRESSED_BYTES + 1)
+        except zlib.error as e:
+            raise RequestEncodingError(f"Invalid gzip request body: {e}") from e
+        if len(body) > MAX_DECOMPRESSED_BYTES or decompressor.unconsumed_tail:
+            raise RequestEncodingError(
+                f"Request body decompresses to over {MAX_DECOMPRESSED_BYTES} bytes"
+            )
+        if not decompressor.eof:
+            raise RequestEncodingError("Truncated gzip request body")
+
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise RequestEncodingError(
+            "Request body must be UTF-8 JSON, optionally gzip-compressed"
+        ) from e
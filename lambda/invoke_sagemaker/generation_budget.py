@@ -0,0 +1,140 @@
+"""Fit max_new_tokens to the time left before the request's deadline.
+
+``ThroughputEstimator`` keeps a rolling (exponentially weighted) estimate of
+seconds per generated token for each model, from the endpoint calls this
+container makes. With a shared store, containers publish their estimates and
+a cold container starts from the fleet's instead of from nothing.
+``max_tokens_within`` turns an estimate into the largest generation that can
+finish before the deadline.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Generations shorter than this are dominated by prefill and network time,
+# so they say little about decode speed
+MIN_SAMPLE_TOKENS = 4
+
+SHARED_KEY_PREFIX = "throughput#"
+
+
+class ThroughputEstimator:
+    """Rolling estimate of seconds per generated token, per model."""
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        min_samples: int = 3,
+        shared: Any = None,
+        sync_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            alpha: Weight of each new sample in the moving average
+            min_samples: Samples needed before the local estimate is used
+            shared: Store with get(key) and put(key, value), e.g. the shared
+                response cache tier; None keeps estimates per container
+            sync_interval_seconds: Least time between reads or writes of a
+                model's shared estimate
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.shared = shared
+        self.sync_interval_seconds = sync_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._estimates: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._shared_estimates: Dict[str, float] = {}
+        self._last_published: Dict[str, float] = {}
+        self._last_fetched: Dict[str, float] = {}
+
+    def record(self, key: str, generated_tokens: int, seconds: float) -> None:
+        """
+        Add a completed generation to the estimate.
+
+        Args:
+            key: Model the generation ran on
+            generated_tokens: Tokens generated
+            seconds: Duration of the endpoint call
+        """
+        if generated_tokens < MIN_SAMPLE_TOKENS or seconds <= 0:
+            return
+        sample = seconds / generated_tokens
+        with self._lock:
+            previous = self._estimates.get(key)
+            estimate = (
+                sample
+                if previous is None
+                else self.alpha * sample + (1 - self.alpha) * previous
+            )
+            self._estimates[key] = estimate
+            self._samples[key] = self._samples.get(key, 0) + 1
+            samples = self._samples[key]
+            publish = (
+                self.shared is not None
+                and samples >= self.min_samples
+                and self._due(self._last_published, key)
+            )
+        if publish:
+            try:
+                self.shared.put(
+                    SHARED_KEY_PREFIX + key,
+                    {"seconds_per_token": estimate, "samples": samples},
+                )
+            except Exception as e:
+                # Sharing is an optimization; never fail the request on it
+                print(f"Throughput estimate write failed: {str(e)}")
+
+    def seconds_per_token(self, key: str) -> Optional[float]:
+        """
+        Current estimate for a model.
+
+        Returns:
+            Seconds per generated token, or None until there is enough data
+        """
+        with self._lock:
+            if self._samples.get(key, 0) >= self.min_samples:
+                return self._estimates[key]
+            fetch = self.shared is not None and self._due(self._last_fetched, key)
+        if fetch:
+            try:
+                item = self.shared.get(SHARED_KEY_PREFIX + key)
+            except Exception as e:
+                print(f"Throughput estimate lookup failed: {str(e)}")
+                item = None
+            if item is not None:
+                with self._lock:
+                    self._shared_estimates[key] = float(item["seconds_per_token"])
+        return self._shared_estimates.get(key)
+
+    def _due(self, last: Dict[str, float], key: str) -> bool:
+        now = self._clock()
+        if key in last and now - last[key] < self.sync_interval_seconds:
+            return False
+        last[key] = now
+        return True
+
+
+def max_tokens_within(
+    remaining_seconds: float, seconds_per_token: float, overhead_seconds: float
+) -> int:
+    """
+    Largest number of tokens expected to generate in the time remaining.
+
+    Args:
+        remaining_seconds: Time until the deadline
+        seconds_per_token: Throughput estimate
+        overhead_seconds: Time allowed for prefill, queueing and the network
+
+    Returns:
+        Token count, 0 if not even the overhead fits
+    """
+    available = remaining_seconds - overhead_seconds
+    if available <= 0:
+        return 0
+    return math.floor(available / seconds_per_token)
@@ -1,15 +1,1093 @@
-"""Lambda function to invoke SageMaker Real-Time Endpoint."""
+"""Lambda function to invoke SageMaker Real-Time Endpoint.
+
+Module import is kept lean for cold starts: boto3 is imported and the
+SageMaker runtime client created on first use (or by prime() before a
+SnapStart snapshot), not at import time. The tokenizer is loaded the same
+way.
+"""
 
 import json
 import os
-import boto3
-from typing import Dict, Any
+import random
+import threading
+import time
+from functools import partial
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+from async_jobs import get_job_result, submit_job
+from batch import run_batch
+from cache import (
+    DynamoDbCache,
+    LruTtlCache,
+    ResponseCache,
+    cache_key,
+    is_deterministic,
+)
+from compression import RequestEncodingError, decode_body
+from generation_budget import ThroughputEstimator, max_tokens_within
+from metrics import RequestMetrics
+from models import (
+    CHAT_TEMPLATES,
+    ModelRoute,
+    UnknownModelError,
+    load_model_routes,
+    select_adapter,
+    select_route,
+)
+from near_duplicate import NearDuplicateCache
+from resilience import (
+    CircuitBreaker,
+    Deadline,
+    EndpointUnavailableError,
+    call_with_retries,
+)
+from response_fields import ResponseFieldsError, parse_fields, select_fields
+from sessions import (
+    SESSION_ID_PATTERN,
+    DynamoDbSessionStore,
+    parse_endpoint_session_id,
+    truncate_history,
+)
+from tokenizer import AdmissionError, BpeTokenizer, apply_token_budget, load_tokenizer
 
-# Initialize SageMaker runtime client
-sagemaker_runtime = boto3.client("sagemaker-runtime")
+# AWS clients, created lazily by get_sagemaker_runtime(), get_s3_client() and
+# get_sagemaker_client()
+sagemaker_runtime = None
+s3_client = None
+sagemaker_client = None
+_client_lock = threading.Lock()
 
 ENDPOINT_NAME = os.environ["SAGEMAKER_ENDPOINT_NAME"]
 
+HANDLER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Models hosted as inference components on the endpoint, by name; the first is
+# the default. Empty when the endpoint serves a single model.
+MODEL_ROUTES = (
+    load_model_routes(json.loads(os.environ["MODEL_ROUTES"]), HANDLER_DIR)
+    if os.environ.get("MODEL_ROUTES")
+    else {}
+)
+
+# LoRA adapters of a single-model endpoint: TGI adapter ids by the names
+# requests select them with (inference component routes carry their own)
+ADAPTER_ROUTES = json.loads(os.environ.get("ADAPTER_ROUTES", "{}"))
+
+# Production variants of the endpoint; with several (e.g. instance types being
+# compared), requests may pin one and metrics are recorded per variant
+ENDPOINT_VARIANTS = os.environ.get("ENDPOINT_VARIANTS", "AllTraffic").split(",")
+
+# Set when the endpoint is asynchronous; /invoke then submits jobs
+ASYNC_BUCKET_NAME = os.environ.get("ASYNC_BUCKET_NAME")
+
+# Client tuning: fail fast on connect, keep connections alive between warm
+# invocations, and size the pool for batch fan-out
+SAGEMAKER_CONNECT_TIMEOUT = float(os.environ.get("SAGEMAKER_CONNECT_TIMEOUT", "2"))
+SAGEMAKER_READ_TIMEOUT = float(os.environ.get("SAGEMAKER_READ_TIMEOUT", "55"))
+SAGEMAKER_MAX_ATTEMPTS = int(os.environ.get("SAGEMAKER_MAX_ATTEMPTS", "3"))
+
+# Endpoint calls must finish within API Gateway's 29 second integration
+# timeout (and the Lambda's remaining time), less time to build the response
+INTEGRATION_TIMEOUT_SECONDS = float(os.environ.get("INTEGRATION_TIMEOUT_SECONDS", "29"))
+DEADLINE_MARGIN_SECONDS = float(os.environ.get("DEADLINE_MARGIN_SECONDS", "0.5"))
+
+# Send a duplicate of a short generation that has not answered after
+# HEDGE_AFTER_MS, to cut tail latency; 0 disables hedging
+HEDGE_AFTER_MS = float(os.environ.get("HEDGE_AFTER_MS", "0"))
+HEDGE_MAX_NEW_TOKENS = int(os.environ.get("HEDGE_MAX_NEW_TOKENS", "64"))
+
+# Fail fast with 503 after consecutive throttles or 5xx errors, per container
+circuit_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5")),
+    reset_timeout_seconds=float(os.environ.get("CIRCUIT_RESET_SECONDS", "10")),
+)
+
+# GET /health answers Route 53 health checks, which arrive from many locations
+# every few seconds; the endpoint status is reused for this long
+HEALTH_CACHE_SECONDS = float(os.environ.get("HEALTH_CACHE_SECONDS", "10"))
+# (monotonic time fetched, EndpointStatus)
+_endpoint_status: Optional[Tuple[float, str]] = None
+# Statuses in which the endpoint answers requests; updates and rollbacks keep
+# the previous configuration serving until they finish
+SERVING_STATUSES = frozenset({"InService", "Updating", "SystemUpdating", "RollingBack"})
+
+# Fit max_new_tokens to the deadline using observed decode throughput:
+# "clamp" lowers it, "reject" answers 400, "off" leaves it alone
+GENERATION_BUDGET_MODE = os.environ.get("GENERATION_BUDGET_MODE", "clamp")
+# Time allowed for prefill, queueing and the network on top of decoding
+GENERATION_BUDGET_OVERHEAD_SECONDS = float(
+    os.environ.get("GENERATION_BUDGET_OVERHEAD_SECONDS", "1.5")
+)
+# Requests that would be clamped below this are rejected instead
+GENERATION_BUDGET_MIN_TOKENS = int(os.environ.get("GENERATION_BUDGET_MIN_TOKENS", "16"))
+
+# Response cache; the in-process tier persists across warm invocations
+CACHE_TTL_SECONDS = int(os.environ.get("CACHE_TTL_SECONDS", "3600"))
+response_cache = ResponseCache(
+    local=LruTtlCache(
+        max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", "256")),
+        ttl_seconds=CACHE_TTL_SECONDS,
+    ),
+    shared=(
+        DynamoDbCache(os.environ["CACHE_TABLE_NAME"], CACHE_TTL_SECONDS)
+        if os.environ.get("CACHE_TABLE_NAME")
+        else None
+    ),
+)
+
+# Near-duplicate tier: a deterministic request whose prompt is at least
+# NEAR_DUPLICATE_THRESHOLD similar to a cached one (estimated Jaccard
+# similarity of normalized character shingles) reuses its generation; 0
+# disables it. It is per container, in front of the endpoint call.
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0"))
+near_duplicate_cache = (
+    NearDuplicateCache(
+        threshold=NEAR_DUPLICATE_THRESHOLD,
+        max_entries=int(os.environ.get("NEAR_DUPLICATE_MAX_ENTRIES", "1024")),
+        ttl_seconds=CACHE_TTL_SECONDS,
+    )
+    if NEAR_DUPLICATE_THRESHOLD
+    else None
+)
+
+# Decode throughput per model, shared between containers through the shared
+# cache tier when it is enabled
+throughput = ThroughputEstimator(shared=response_cache.shared)
+
+# Token limits of the TGI container; prompts are counted against them before
+# the endpoint is called. Unset limits disable admission control.
+TOKENIZER_PATH = os.environ.get(
+    "TOKENIZER_PATH", os.path.join(HANDLER_DIR, "tokenizer.json")
+)
+MAX_INPUT_LENGTH = int(os.environ.get("MAX_INPUT_LENGTH", "0")) or None
+MAX_TOTAL_TOKENS = int(os.environ.get("MAX_TOTAL_TOKENS", "0")) or None
+
+# Tokenizers by path, loaded by get_tokenizer() and kept across warm invocations
+tokenizers: Dict[str, Optional[BpeTokenizer]] = {}
+
+# Multi-turn sessions: history is stored server-side and truncated to a token
+# budget. Sticky routing pins a session to one instance with SageMaker
+# stateful sessions, so the model server can reuse the cached prefix.
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", "86400"))
+SESSION_HISTORY_TOKENS = int(os.environ.get("SESSION_HISTORY_TOKENS", "1024"))
+SESSION_STICKY_ROUTING = os.environ.get("SESSION_STICKY_ROUTING", "").lower() == "true"
+session_store = (
+    DynamoDbSessionStore(os.environ["SESSION_TABLE_NAME"], SESSION_TTL_SECONDS)
+    if os.environ.get("SESSION_TABLE_NAME")
+    else None
+)
+
+SYSTEM_PROMPT = "You are a helpful AI assistant."
+
+# Fraction of requests whose full payload and response are logged
+PAYLOAD_LOG_SAMPLE_RATE = float(os.environ.get("PAYLOAD_LOG_SAMPLE_RATE", "0"))
+
+# Batch fan-out limits
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "8"))
+# Stay under API Gateway's 29 second integration timeout
+BATCH_DEADLINE_SECONDS = float(os.environ.get("BATCH_DEADLINE_SECONDS", "25"))
+
+
+def get_sagemaker_runtime() -> Any:
+    """
+    Return the SageMaker runtime client, creating it on first use.
+
+    Returns:
+        boto3 sagemaker-runtime client
+    """
+    global sagemaker_runtime
+    # Batch threads may race here on a cold container, and boto3's default
+    # session is not thread-safe
+    with _client_lock:
+        if sagemaker_runtime is None:
+            import boto3
+            from botocore.config import Config
+
+            sagemaker_runtime = boto3.client(
+                "sagemaker-runtime",
+                config=Config(
+                    connect_timeout=SAGEMAKER_CONNECT_TIMEOUT,
+                    read_timeout=SAGEMAKER_READ_TIMEOUT,
+                    tcp_keepalive=True,
+                    max_pool_connections=max(10, BATCH_MAX_CONCURRENCY * 2),
+                    # Retries are made by call_with_retries(), within the
+                    # request's deadline
+                    retries={"mode": "standard", "total_max_attempts": 1},
+                ),
+            )
+    return sagemaker_runtime
+
+
+def get_s3_client() -> Any:
+    """
+    Return the S3 client used for async jobs, creating it on first use.
+
+    Returns:
+        boto3 S3 client
+    """
+    global s3_client
+    with _client_lock:
+        if s3_client is None:
+            import boto3
+
+            s3_client = boto3.client("s3")
+    return s3_client
+
+
+def get_sagemaker_client() -> Any:
+    """
+    Return the SageMaker client used by health checks, creating it on first use.
+
+    Returns:
+        boto3 SageMaker client
+    """
+    global sagemaker_client
+    with _client_lock:
+        if sagemaker_client is None:
+            import boto3
+
+            sagemaker_client = boto3.client("sagemaker")
+    return sagemaker_client
+
+
+def get_tokenizer(model: Optional[ModelRoute] = None) -> Optional[BpeTokenizer]:
+    """
+    Return a model's bundled tokenizer, loading it on first use.
+
+    Args:
+        model: Model route; the default model when omitted
+
+    Returns:
+        Tokenizer, or None if its tokenizer.json is missing or unsupported
+    """
+    path = (model or resolve_model(None)).tokenizer_path
+    with _client_lock:
+        if path not in tokenizers:
+            tokenizers[path] = load_tokenizer(path)
+    return tokenizers[path]
+
+
+def resolve_model(name: Optional[str], adapter: Optional[str] = None) -> ModelRoute:
+    """
+    Return the route for a requested model and adapter.
+
+    Args:
+        name: Model name from the request, or None for the default model
+        adapter: LoRA adapter name from the request, or None for the base model
+
+    Returns:
+        Model route
+
+    Raises:
+        UnknownModelError: If the endpoint does not serve the model or adapter
+    """
+    if MODEL_ROUTES:
+        return select_adapter(select_route(MODEL_ROUTES, name), adapter)
+    if name is not None:
+        raise UnknownModelError("This endpoint serves a single model; omit 'model'")
+    route = ModelRoute(
+        name="default",
+        template=CHAT_TEMPLATES["zephyr"],
+        system_prompt=SYSTEM_PROMPT,
+        tokenizer_path=TOKENIZER_PATH,
+        max_input_length=MAX_INPUT_LENGTH,
+        max_total_tokens=MAX_TOTAL_TOKENS,
+        adapters=ADAPTER_ROUTES,
+    )
+    return select_adapter(route, adapter)
+
+
+def metric_dimensions(model: ModelRoute) -> Dict[str, str]:
+    """
+    EMF dimensions for a request.
+
+    Metrics are split per model on inference component endpoints and per
+    adapter when the request selected one.
+    """
+    dimensions = {"EndpointName": ENDPOINT_NAME}
+    if model.inference_component:
+        dimensions["Model"] = model.name
+    if model.adapter:
+        dimensions["Adapter"] = model.adapter
+    return dimensions
+
+
+def prime() -> None:
+    """
+    Warm the client and JSON paths so the first request does not pay for them.
+
+    Runs before the SnapStart snapshot is taken, or during init when
+    PRIME_ON_INIT is set. The endpoint itself is not called.
+    """
+    get_sagemaker_runtime()
+    payload, _ = build_payload("warm up", {})
+    json.loads(json.dumps(payload))
+    cache_key(payload["inputs"], payload["parameters"])
+
+
+def build_generation_config(
+    parameters: Dict[str, Any], model: Optional[ModelRoute] = None
+) -> Dict[str, Any]:
+    """
+    Build the TGI generation parameters, applying defaults for missing values.
+
+    Args:
+        parameters: Caller-supplied generation parameters
+        model: Model route whose defaults, stop sequences and adapter apply
+
+    Returns:
+        Generation parameters for the TGI payload
+    """
+    model = model or resolve_model(None)
+    parameters = {**model.parameters, **parameters}
+    generation_config = {
+        "max_new_tokens": parameters.get("max_new_tokens", 512),
+        "temperature": parameters.get("temperature", 0.7),
+        "top_p": parameters.get("top_p", 0.9),
+        "do_sample": parameters.get("do_sample", True),
+        "return_full_text": False,  # Only return generated tokens, not prompt
+        "stop": list(model.template.stop),  # Stop at chat boundaries
+    }
+    if parameters.get("seed") is not None:
+        generation_config["seed"] = parameters["seed"]
+    if model.adapter_id:
+        # TGI applies the adapter per request, batching it with other adapters
+        generation_config["adapter_id"] = model.adapter_id
+    return generation_config
+
+
+def build_payload(
+    prompt: str,
+    parameters: Dict[str, Any],
+    metrics: Optional[RequestMetrics] = None,
+    history: Optional[List[Dict[str, str]]] = None,
+    model: Optional[ModelRoute] = None,
+) -> Tuple[Dict[str, Any], Optional[int]]:
+    """
+    Build the TGI payload and admit it against the container's token limits.
+
+    When the tokenizer is available, the formatted prompt is counted and
+    max_new_tokens is clamped to what is left of MAX_TOTAL_TOKENS, so TGI
+    never rejects the request for length.
+
+    Args:
+        prompt: User prompt
+        parameters: Caller-supplied generation parameters
+        metrics: Request metrics to record stage timings in
+        history: Earlier turns of a session, oldest first
+        model: Model route; the default model when omitted
+
+    Returns:
+        (payload, input_tokens); input_tokens is None without a tokenizer
+
+    Raises:
+        AdmissionError: If the prompt does not fit the token limits
+    """
+    metrics = metrics or RequestMetrics()
+    model = model or resolve_model(None)
+
+    with metrics.stage("Template"):
+        # Default parameters for text generation
+        generation_config = build_generation_config(parameters, model)
+
+        # Prepare payload for TGI endpoint
+        payload = {
+            "inputs": format_chat_prompt(prompt, history, model),
+            "parameters": generation_config,
+        }
+
+    tokenizer = get_tokenizer(model)
+    if tokenizer is None:
+        return payload, None
+
+    with metrics.stage("Tokenize"):
+        input_tokens = tokenizer.count_tokens(payload["inputs"])
+    metrics.set("InputTokens", input_tokens)
+    if model.max_total_tokens:
+        apply_token_budget(
+            input_tokens,
+            generation_config,
+            max_input_length=model.max_input_length or model.max_total_tokens - 1,
+            max_total_tokens=model.max_total_tokens,
+        )
+    return payload, input_tokens
+
+
+def apply_generation_budget(
+    generation_config: Dict[str, Any],
+    model: ModelRoute,
+    deadline: Optional[Deadline],
+    metrics: RequestMetrics,
+) -> bool:
+    """
+    Fit max_new_tokens to the time left before the deadline.
+
+    Uses the model's observed decode throughput; until there is an estimate,
+    requests are left as they are. The applied budget is recorded in metrics
+    ("GenerationBudget") so it can be reported in the response.
+
+    Args:
+        generation_config: TGI generation parameters; updated in place
+        model: Model route the request runs on
+        deadline: Time by which the response is needed; None skips the check
+        metrics: Request metrics to record the budget in
+
+    Returns:
+        True if max_new_tokens was lowered
+
+    Raises:
+        AdmissionError: If max_new_tokens does not fit and GENERATION_BUDGET_MODE
+            is "reject", or fewer than GENERATION_BUDGET_MIN_TOKENS would fit
+    """
+    if GENERATION_BUDGET_MODE == "off" or deadline is None:
+        return False
+    seconds_per_token = throughput.seconds_per_token(model.name)
+    if seconds_per_token is None:
+        return False
+
+    requested = int(generation_config["max_new_tokens"])
+    fits = max_tokens_within(
+        deadline.remaining(), seconds_per_token, GENERATION_BUDGET_OVERHEAD_SECONDS
+    )
+    clamped = requested > fits
+    if clamped and (
+        GENERATION_BUDGET_MODE == "reject" or fits < GENERATION_BUDGET_MIN_TOKENS
+    ):
+        raise AdmissionError(
+            f"max_new_tokens {requested} cannot finish before the request "
+            f"deadline at the endpoint's current {1 / seconds_per_token:.0f} "
+            f"tokens/s; at most {fits} fit"
+        )
+    if clamped:
+        generation_config["max_new_tokens"] = fits
+
+    metrics.set("GenerationBudget", generation_config["max_new_tokens"])
+    metrics.set("BudgetClamped", int(clamped))
+    metrics.set("EstimatedTokensPerSecond", 1 / seconds_per_token, "Count/Second")
+    return clamped
+
+
+def generation_budget(metrics: RequestMetrics) -> Optional[Dict[str, Any]]:
+    """The budget apply_generation_budget() applied, for the response body."""
+    if "GenerationBudget" not in metrics.values:
+        return None
+    return {
+        "max_new_tokens": metrics.values["GenerationBudget"][0],
+        "clamped": bool(metrics.values["BudgetClamped"][0]),
+        "tokens_per_second": round(metrics.values["EstimatedTokensPerSecond"][0], 1),
+    }
+
+
+def format_chat_prompt(
+    prompt: str,
+    history: Optional[List[Dict[str, str]]] = None,
+    model: Optional[ModelRoute] = None,
+) -> str:
+    """
+    Format a prompt with the model's chat template.
+
+    The default model, TinyLlama-1.1B-Chat, expects:
+    <|system|>...<|user|>...<|assistant|>
+
+    Args:
+        prompt: Newest user message
+        history: Earlier user and assistant messages, oldest first
+        model: Model route; the default model when omitted
+    """
+    model = model or resolve_model(None)
+    messages = [
+        {"role": "system", "content": model.system_prompt},
+        *(history or []),
+        {"role": "user", "content": prompt},
+    ]
+    return model.template.format(messages)
+
+
+def parse_tgi_result(result: Any) -> Tuple[str, Optional[int]]:
+    """
+    Extract the generated text and token count from a TGI response.
+
+    Args:
+        result: Decoded TGI response
+
+    Returns:
+        (generated_text, generated_tokens); the count is None without details
+    """
+    # TGI returns format: [{"generated_text": "...", "details": {...}}]
+    if isinstance(result, list) and len(result) > 0:
+        result = result[0]
+    generated_text = result.get("generated_text", str(result))
+    generated_tokens = (result.get("details") or {}).get("generated_tokens")
+    return generated_text, generated_tokens
+
+
+def invoke_endpoint(
+    payload: Dict[str, Any],
+    metrics: Optional[RequestMetrics] = None,
+    session: Optional[Dict[str, Any]] = None,
+    model: Optional[ModelRoute] = None,
+    target_variant: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> Tuple[str, Optional[int]]:
+    """
+    Invoke the SageMaker endpoint and extract the generated text.
+
+    Throttles and transient errors are retried while the deadline allows,
+    and short generations are hedged when HEDGE_AFTER_MS is set. On endpoints
+    with several production variants, the variant that served the request is
+    added to the metric dimensions.
+
+    Args:
+        payload: TGI request payload
+        metrics: Request metrics to record stage timings and token counts in
+        session: Session whose ``endpoint_session_id`` routes the request to
+            its instance; updated with the id SageMaker returns
+        model: Model route naming the inference component to invoke
+        target_variant: Production variant to send the request to, bypassing
+            the variant weights
+        deadline: Time by which the response is needed; API Gateway's
+            integration timeout from now when omitted
+
+    Returns:
+        (generated_text, generated_tokens)
+
+    Raises:
+        EndpointUnavailableError: If the endpoint is saturated or kept failing
+            until the deadline
+    """
+    metrics = metrics or RequestMetrics()
+
+    with metrics.stage("Template"):
+        # "details" makes TGI report the generated token count
+        request_body = json.dumps(
+            {**payload, "parameters": {**payload["parameters"], "details": True}}
+        )
+
+    routing = {}
+    if model is not None and model.inference_component:
+        routing["InferenceComponentName"] = model.inference_component
+    if session is not None and session.get("endpoint_session_id"):
+        routing["SessionId"] = session["endpoint_session_id"]
+    if target_variant is not None:
+        routing["TargetVariant"] = target_variant
+
+    def call() -> Tuple[Dict[str, Any], bytes, float]:
+        started = time.perf_counter()
+        response = get_sagemaker_runtime().invoke_endpoint(
+            EndpointName=ENDPOINT_NAME,
+            ContentType="application/json",
+            Body=request_body,
+            **routing,
+        )
+        body = response["Body"].read()
+        return response, body, (time.perf_counter() - started) * 1000
+
+    hedge_after_seconds = None
+    if (
+        HEDGE_AFTER_MS > 0
+        and "SessionId" not in routing  # A duplicate would open a second session
+        and payload["parameters"].get("max_new_tokens", 0) <= HEDGE_MAX_NEW_TOKENS
+    ):
+        hedge_after_seconds = HEDGE_AFTER_MS / 1000
+
+    with metrics.stage("Endpoint"):
+        response, response_body, attempt_ms = call_with_retries(
+            call,
+            deadline or Deadline(INTEGRATION_TIMEOUT_SECONDS - DEADLINE_MARGIN_SECONDS),
+            circuit_breaker,
+            max_attempts=SAGEMAKER_MAX_ATTEMPTS,
+            hedge_after_seconds=hedge_after_seconds,
+        )
+
+    if len(ENDPOINT_VARIANTS) > 1 and response.get("InvokedProductionVariant"):
+        metrics.dimensions["Variant"] = response["InvokedProductionVariant"]
+
+    if "SessionId" in routing:
+        if response.get("ClosedSessionId"):
+            session["endpoint_session_id"] = None
+        elif response.get("NewSessionId"):
+            session["endpoint_session_id"] = parse_endpoint_session_id(
+                response["NewSessionId"]
+            )
+
+    with metrics.stage("Decode"):
+        result = json.loads(response_body.decode())
+        generated_text, generated_tokens = parse_tgi_result(result)
+
+    if random.random() < PAYLOAD_LOG_SAMPLE_RATE:
+        print(json.dumps({"payload": payload, "response": result}))
+
+    metrics.set("OutputLength", len(generated_text))
+    if generated_tokens and attempt_ms > 0:
+        # Timed over the successful attempt only, excluding retry backoff
+        throughput.record(
+            (model or resolve_model(None)).name, generated_tokens, attempt_ms / 1000
+        )
+        metrics.set("GeneratedTokens", generated_tokens)
+        metrics.set(
+            "TokensPerSecond", generated_tokens / (attempt_ms / 1000), "Count/Second"
+        )
+    return generated_text, generated_tokens
+
+
+def generate(
+    prompt: str,
+    parameters: Dict[str, Any],
+    use_cache: Optional[bool] = None,
+    metrics: Optional[RequestMetrics] = None,
+    model: Optional[ModelRoute] = None,
+    target_variant: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> Tuple[str, Dict[str, Any], str, Dict[str, int]]:
+    """
+    Generate text for a prompt, serving it from the response cache if possible.
+
+    Deterministic requests (do_sample false or a fixed seed) use the cache by
+    default; use_cache overrides that choice. Requests pinned to a variant
+    always reach the endpoint, so they measure it. On a cache miss,
+    max_new_tokens is fitted to the deadline and a clamped generation is
+    cached under its clamped parameters. With the near-duplicate tier
+    enabled, a request missing the exact cache may reuse the generation of a
+    similar prompt with the same parameters. Token counts that are known
+    (input always when the tokenizer is bundled, generated unless served from
+    the cache) are returned as usage.
+
+    Args:
+        prompt: User prompt
+        parameters: Caller-supplied generation parameters
+        use_cache: Whether to use the response cache
+        metrics: Request metrics to record stage timings in
+        model: Model route; the default model when omitted
+        target_variant: Production variant to pin the request to
+        deadline: Time by which the response is needed
+
+    Returns:
+        (generated_text, generation_config, cache_status, usage)
+
+    Raises:
+        AdmissionError: If the prompt does not fit the token limits, or the
+            generation does not fit the deadline
+        EndpointUnavailableError: If the endpoint cannot answer in time
+    """
+    metrics = metrics or RequestMetrics()
+    metrics.set("InputLength", len(prompt))
+
+    model = model or resolve_model(None)
+    payload, input_tokens = build_payload(prompt, parameters, metrics, model=model)
+    generation_config = payload["parameters"]
+
+    generated_tokens = None
+    if target_variant is not None:
+        use_cache = False
+    elif use_cache is None:
+        use_cache = is_deterministic(generation_config)
+    if use_cache:
+        key = cache_key(payload["inputs"], generation_config, model.inference_component)
+        generated_text, cache_status = response_cache.get(key)
+        if generated_text is None and apply_generation_budget(
+            generation_config, model, deadline, metrics
+        ):
+            # An earlier request may have cached the clamped generation
+            key = cache_key(
+                payload["inputs"], generation_config, model.inference_component
+            )
+            generated_text, cache_status = response_cache.get(key)
+        if generated_text is None and near_duplicate_cache is not None:
+            # Prompts are compared within a model and parameter set
+            scope = cache_key("", generation_config, model.inference_component)
+            signature = near_duplicate_cache.signature(prompt)
+            generated_text, similarity = near_duplicate_cache.get(scope, signature)
+            if similarity:
+                metrics.set("NearDuplicateSimilarity", similarity, "None")
+            if generated_text is not None:
+                cache_status = "HIT-NEAR"
+            metrics.set("NearDuplicateHits", int(cache_status == "HIT-NEAR"))
+        metrics.set("CacheHits", int(cache_status != "MISS"))
+        metrics.set("CacheMisses", int(cache_status == "MISS"))
+        if generated_text is None:
+            generated_text, generated_tokens = invoke_endpoint(
+                payload, metrics, model=model, deadline=deadline
+            )
+            response_cache.put(key, generated_text)
+            if near_duplicate_cache is not None:
+                near_duplicate_cache.put(scope, signature, generated_text)
+    else:
+        apply_generation_budget(generation_config, model, deadline, metrics)
+        generated_text, generated_tokens = invoke_endpoint(
+            payload,
+            metrics,
+            model=model,
+            target_variant=target_variant,
+            deadline=deadline,
+        )
+        cache_status = "BYPASS"
+
+    usage = _usage(input_tokens, generated_tokens)
+    return generated_text, generation_config, cache_status, usage
+
+
+def _usage(
+    input_tokens: Optional[int], generated_tokens: Optional[int]
+) -> Dict[str, int]:
+    """Token counts for the response, omitting those that are unknown."""
+    counts = {"input_tokens": input_tokens, "generated_tokens": generated_tokens}
+    return {name: count for name, count in counts.items() if count is not None}
+
+
+def handle_session_turn(
+    session_id: str,
+    prompt: str,
+    parameters: Dict[str, Any],
+    metrics: RequestMetrics,
+    model: ModelRoute,
+    deadline: Optional[Deadline] = None,
+    fields: Optional[FrozenSet[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Continue a conversation stored server-side with a new user message.
+
+    History is truncated to SESSION_HISTORY_TOKENS (and the endpoint's input
+    limit) before templating. With sticky routing, every turn of a session
+    goes to the same endpoint instance.
+
+    Args:
+        session_id: Client-chosen conversation id
+        prompt: New user message
+        parameters: Caller-supplied generation parameters
+        metrics: Request metrics to record stage timings in
+        model: Model route
+        deadline: Time by which the response is needed
+        fields: Response fields to return; see parse_fields()
+
+    Returns:
+        Response with the assistant reply
+    """
+    if session_store is None:
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "Sessions are not enabled for this API"}),
+        }
+    if not isinstance(session_id, str) or not SESSION_ID_PATTERN.match(session_id):
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps(
+                {"error": "'session_id' must be 1-128 letters, digits, '-' or '_'"}
+            ),
+        }
+
+    session = session_store.get(session_id)
+    budget = min(
+        SESSION_HISTORY_TOKENS, model.max_input_length or SESSION_HISTORY_TOKENS
+    )
+    count_tokens = partial(_count_message_tokens, model)
+    user_message = {"role": "user", "content": prompt}
+    history = truncate_history(
+        session["messages"] + [user_message], budget, count_tokens
+    )[:-1]
+
+    payload, input_tokens = build_payload(prompt, parameters, metrics, history, model)
+    apply_generation_budget(payload["parameters"], model, deadline, metrics)
+
+    if SESSION_STICKY_ROUTING:
+        if not session["endpoint_session_id"]:
+            session["endpoint_session_id"] = "NEW_SESSION"
+        try:
+            generated_text, generated_tokens = invoke_endpoint(
+                payload, metrics, session, model, deadline=deadline
+            )
+        except Exception as e:
+            # The instance session expired or its instance was replaced
+            error_code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if (
+                error_code != "ValidationError"
+                or session["endpoint_session_id"] == "NEW_SESSION"
+            ):
+                raise
+            session["endpoint_session_id"] = "NEW_SESSION"
+            generated_text, generated_tokens = invoke_endpoint(
+                payload, metrics, session, model, deadline=deadline
+            )
+    else:
+        generated_text, generated_tokens = invoke_endpoint(
+            payload, metrics, model=model, deadline=deadline
+        )
+
+    session["messages"] = truncate_history(
+        history + [user_message, {"role": "assistant", "content": generated_text}],
+        budget,
+        count_tokens,
+    )
+    session_store.put(session_id, session)
+    metrics.set("SessionMessages", len(session["messages"]))
+    metrics.emit(metric_dimensions(model))
+
+    response_body = {
+        "generated_text": generated_text,
+        "session_id": session_id,
+        "parameters": payload["parameters"],
+        "usage": _usage(input_tokens, generated_tokens),
+    }
+    budget = generation_budget(metrics)
+    if budget is not None:
+        response_body["generation_budget"] = budget
+
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "X-Cache": "BYPASS",
+            "Server-Timing": metrics.server_timing(),
+        },
+        "body": json.dumps(select_fields(response_body, fields)),
+    }
+
+
+def _count_message_tokens(model: ModelRoute, message: Dict[str, str]) -> int:
+    text = model.template.message.format(**message)
+    tokenizer = get_tokenizer(model)
+    if tokenizer is None:
+        # Roughly four characters per token for English text
+        return len(text) // 4 + 1
+    return tokenizer.count_tokens(text)
+
+
+def handle_batch(
+    body: Dict[str, Any], deadline: Optional[Deadline] = None
+) -> Dict[str, Any]:
+    """
+    Generate text for a list of prompts concurrently.
+
+    Expected input format:
+    {
+        "prompts": ["First prompt", {"prompt": "Second", "parameters": {...}}],
+        "parameters": {"max_new_tokens": 128},
+        "model": "optional-model-name",
+        "adapter": "optional-adapter-name",
+        "deadline_seconds": 20
+    }
+
+    Shared parameters, model and adapter apply to every item; per-item values
+    override them. The batch deadline is also capped by the request deadline.
+
+    Args:
+        body: Parsed request body
+        deadline: Time by which the response is needed
+
+    Returns:
+        Response with one result or error per prompt, in input order
+    """
+    items = body.get("prompts")
+    if not isinstance(items, list) or not items:
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "'prompts' must be a non-empty list"}),
+        }
+    if len(items) > BATCH_MAX_ITEMS:
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps(
+                {"error": f"Batch exceeds the limit of {BATCH_MAX_ITEMS} prompts"}
+            ),
+        }
+    requested_deadline = body.get("deadline_seconds", BATCH_DEADLINE_SECONDS)
+    if (
+        isinstance(requested_deadline, bool)
+        or not isinstance(requested_deadline, (int, float))
+        or not requested_deadline > 0
+    ):
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps(
+                {"error": "'deadline_seconds' must be a positive number"}
+            ),
+        }
+
+    batch_deadline_seconds = min(float(requested_deadline), BATCH_DEADLINE_SECONDS)
+    if deadline is not None:
+        batch_deadline_seconds = min(batch_deadline_seconds, deadline.remaining())
+    # Items share the batch deadline, so none retries or waits past it
+    item_deadline = Deadline(batch_deadline_seconds)
+    tasks = [
+        partial(
+            _generate_batch_item,
+            item,
+            body.get("parameters", {}),
+            body.get("cache"),
+            body.get("model"),
+            body.get("adapter"),
+            item_deadline,
+        )
+        for item in items
+    ]
+    outcomes = run_batch(tasks, BATCH_MAX_CONCURRENCY, batch_deadline_seconds)
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if "error" in outcome:
+            results.append({"index": index, "error": outcome["error"]})
+        else:
+            results.append({"index": index, "generated_text": outcome["result"]})
+
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({"results": results}),
+    }
+
+
+def _generate_batch_item(
+    item: Any,
+    shared_parameters: Dict[str, Any],
+    use_cache: Optional[bool],
+    shared_model: Optional[str],
+    shared_adapter: Optional[str],
+    deadline: Optional[Deadline],
+) -> str:
+    if isinstance(item, str):
+        item = {"prompt": item}
+    if not isinstance(item, dict) or not item.get("prompt"):
+        raise ValueError("Missing 'prompt' in batch item")
+    parameters = {**shared_parameters, **item.get("parameters", {})}
+    model = resolve_model(
+        item.get("model", shared_model), item.get("adapter", shared_adapter)
+    )
+    metrics = RequestMetrics()
+    generated_text, _, _, _ = generate(
+        item["prompt"], parameters, use_cache, metrics, model, deadline=deadline
+    )
+    metrics.emit(metric_dimensions(model))
+    return generated_text
+
+
+def handle_async_submit(
+    prompt: str,
+    parameters: Dict[str, Any],
+    model: Optional[ModelRoute] = None,
+    fields: Optional[FrozenSet[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Queue a generation on the async endpoint and return its job id.
+
+    Args:
+        prompt: User prompt
+        parameters: Caller-supplied generation parameters
+        model: Model route; the default model when omitted
+        fields: Response fields to return; see parse_fields()
+
+    Returns:
+        202 response with the job id and the URL path to poll
+    """
+    payload, _ = build_payload(prompt, parameters, model=model)
+    generation_config = payload["parameters"]
+    job_id = submit_job(
+        get_s3_client(),
+        get_sagemaker_runtime(),
+        ASYNC_BUCKET_NAME,
+        ENDPOINT_NAME,
+        payload,
+    )
+    return {
+        "statusCode": 202,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(
+            select_fields(
+                {
+                    "job_id": job_id,
+                    "status": "pending",
+                    "result_path": f"/result/{job_id}",
+                    "parameters": generation_config,
+                },
+                fields,
+            )
+        ),
+    }
+
+
+def handle_async_result(job_id: str) -> Dict[str, Any]:
+    """
+    Return the status, and once finished the output, of an async job.
+
+    Args:
+        job_id: Id returned when the job was submitted
+
+    Returns:
+        200 with the generated text, 202 while pending, or an error response
+    """
+    try:
+        outcome = get_job_result(get_s3_client(), ASYNC_BUCKET_NAME, job_id)
+    except ValueError as e:
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": str(e)}),
+        }
+
+    if outcome["status"] == "completed":
+        generated_text, _ = parse_tgi_result(outcome["result"])
+        body = {
+            "job_id": job_id,
+            "status": "completed",
+            "generated_text": generated_text,
+        }
+        status_code = 200
+    elif outcome["status"] == "failed":
+        body = {"job_id": job_id, "status": "failed", "error": outcome["error"]}
+        status_code = 500
+    else:
+        body = {"job_id": job_id, "status": "pending"}
+        status_code = 202
+
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(body),
+    }
+
+
+def handle_health() -> Dict[str, Any]:
+    """
+    Report whether this region can serve requests.
+
+    The region is healthy while the endpoint is serving (including during
+    updates) and this container's circuit breaker is not open. Latency-based
+    DNS stops sending clients to a region whose health check fails.
+
+    Returns:
+        200 if healthy, otherwise 503, with the endpoint status
+    """
+    global _endpoint_status
+    now = time.monotonic()
+    if _endpoint_status is None or now - _endpoint_status[0] >= HEALTH_CACHE_SECONDS:
+        try:
+            description = get_sagemaker_client().describe_endpoint(
+                EndpointName=ENDPOINT_NAME
+            )
+            _endpoint_status = (now, description["EndpointStatus"])
+        except Exception as e:
+            print(f"Could not describe endpoint {ENDPOINT_NAME}: {e}")
+            _endpoint_status = (now, "Unknown")
+
+    endpoint_status = _endpoint_status[1]
+    circuit = circuit_breaker.state
+    healthy = endpoint_status in SERVING_STATUSES and circuit != "open"
+    return {
+        "statusCode": 200 if healthy else 503,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(
+            {
+                "status": "healthy" if healthy else "unhealthy",
+                "endpoint_status": endpoint_status,
+                "circuit": circuit,
+            }
+        ),
+    }
+
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -22,9 +1100,48 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             "max_new_tokens": 512,
             "temperature": 0.7,
             "top_p": 0.9
-        }
+        },
+        "cache": false,
+        "session_id": "optional-conversation-id",
+        "model": "optional-model-name",
+        "adapter": "optional-adapter-name",
+        "target_variant": "optional-variant-name",
+        "fields": ["generated_text", "usage"]
     }
 
+    Responses leave out the echoed prompt and parameters unless "fields"
+    asks for them; "fields" lists the response fields to return, or is "*"
+    for all of them. Request bodies may be gzip-compressed.
+
+    Deterministic requests (do_sample false or a fixed seed) are served from
+    the response cache. Sampled requests bypass it unless "cache" is true.
+
+    Prompts longer than the endpoint's input token limit are rejected with 400,
+    and max_new_tokens is clamped to the tokens left in the context window.
+
+    With a session_id, the prompt is the next user message of a conversation
+    whose earlier turns are stored server-side.
+
+    On endpoints hosting several models as inference components, "model"
+    selects one; its chat template and defaults apply. "adapter" selects one
+    of the model's LoRA adapters; requests for different adapters share the
+    base model's GPU and are batched together.
+
+    On endpoints with several production variants, "target_variant" sends the
+    request to one variant regardless of the weights, for benchmarking.
+
+    Endpoint calls are retried within the invocation's deadline (the Lambda's
+    remaining time, capped by API Gateway's integration timeout). While the
+    endpoint is saturated, requests fail fast with 503 and Retry-After.
+    max_new_tokens is clamped (or the request rejected) so the generation is
+    expected to finish before the deadline at the observed tokens/s.
+
+    For async endpoints, /invoke returns a job id immediately and
+    GET /result/{id} returns the output once the job has finished.
+
+    GET /health reports whether the endpoint can serve requests, for DNS
+    health checks.
+
     Args:
         event: API Gateway event
         context: Lambda context
@@ -32,12 +1149,37 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Returns:
         Response with generated text or error message
     """
+    metrics = RequestMetrics()
+    deadline = Deadline.for_request(
+        context, INTEGRATION_TIMEOUT_SECONDS, DEADLINE_MARGIN_SECONDS
+    )
     try:
+        if event.get("resource") == "/result/{id}":
+            return handle_async_result(event["pathParameters"]["id"])
+        if event.get("resource") == "/health":
+            return handle_health()
+
         # Parse request body
-        if isinstance(event.get("body"), str):
-            body = json.loads(event["body"])
-        else:
-            body = event.get("body", {})
+        with metrics.stage("Parse"):
+            if isinstance(event.get("body"), str):
+                body = json.loads(
+                    decode_body(event["body"], bool(event.get("isBase64Encoded")))
+                )
+            else:
+                body = event.get("body", {})
+
+        if event.get("resource") == "/invoke/batch":
+            if ASYNC_BUCKET_NAME:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps(
+                        {
+                            "error": "Batch invocation is not supported for async endpoints"
+                        }
+                    ),
+                }
+            return handle_batch(body, deadline)
 
         # Extract prompt and parameters
         prompt = body.get("prompt")
@@ -48,57 +1190,106 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "body": json.dumps({"error": "Missing 'prompt' in request body"}),
             }
 
-        # Default parameters for text generation
-        parameters = body.get("parameters", {})
-        generation_config = {
-            "max_new_tokens": parameters.get("max_new_tokens", 512),
-            "temperature": parameters.get("temperature", 0.7),
-            "top_p": parameters.get("top_p", 0.9),
-            "do_sample": parameters.get("do_sample", True),
-            "return_full_text": False,  # Only return generated tokens, not prompt
-            "stop": ["</s>", "<|user|>", "<|system|>"],  # Stop at chat boundaries
-        }
-
-        # Format prompt with ChatML template for TinyLlama-1.1B-Chat
-        # This model expects: <|system|>...<|user|>...<|assistant|>
-        formatted_prompt = f"<|system|>\nYou are a helpful AI assistant.</s>\n<|user|>\n{prompt}</s>\n<|assistant|>\n"
+        fields = parse_fields(body.get("fields"))
+        model = resolve_model(body.get("model"), body.get("adapter"))
+        target_variant = body.get("target_variant")
+        if target_variant is not None and target_variant not in ENDPOINT_VARIANTS:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps(
+                    {
+                        "error": f"Unknown target_variant {target_variant!r}; "
+                        f"available variants: {', '.join(ENDPOINT_VARIANTS)}"
+                    }
+                ),
+            }
 
-        # Prepare payload for TGI endpoint
-        payload = {
-            "inputs": formatted_prompt,
-            "parameters": generation_config,
-        }
+        if body.get("session_id") is not None:
+            if ASYNC_BUCKET_NAME:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps(
+                        {"error": "Sessions are not supported for async endpoints"}
+                    ),
+                }
+            return handle_session_turn(
+                body["session_id"],
+                prompt,
+                body.get("parameters", {}),
+                metrics,
+                model,
+                deadline,
+                fields,
+            )
 
-        print(payload)
+        if ASYNC_BUCKET_NAME:
+            return handle_async_submit(
+                prompt, body.get("parameters", {}), model, fields
+            )
 
-        # Invoke SageMaker endpoint
-        response = sagemaker_runtime.invoke_endpoint(
-            EndpointName=ENDPOINT_NAME,
-            ContentType="application/json",
-            Body=json.dumps(payload),
+        generated_text, generation_config, cache_status, usage = generate(
+            prompt,
+            body.get("parameters", {}),
+            body.get("cache"),
+            metrics,
+            model,
+            target_variant,
+            deadline,
         )
+        metrics.emit(metric_dimensions(model))
 
-        # Parse response
-        result = json.loads(response["Body"].read().decode())
-
-        # Log the raw response for debugging
-        print(f"SageMaker response: {json.dumps(result)}")
-
-        # TGI returns format: [{"generated_text": "..."}]
-        if isinstance(result, list) and len(result) > 0:
-            generated_text = result[0].get("generated_text", "")
-        else:
-            generated_text = result.get("generated_text", str(result))
+        response_body = {
+            "generated_text": generated_text,
+            "prompt": prompt,
+            "parameters": generation_config,
+            "usage": usage,
+        }
+        if MODEL_ROUTES:
+            response_body["model"] = model.name
+        if model.adapter:
+            response_body["adapter"] = model.adapter
+        if "Variant" in metrics.dimensions:
+            response_body["variant"] = metrics.dimensions["Variant"]
+        budget = generation_budget(metrics)
+        if budget is not None:
+            response_body["generation_budget"] = budget
 
         return {
             "statusCode": 200,
+            "headers": {
+                "Content-Type": "application/json",
+                "X-Cache": cache_status,
+                "Server-Timing": metrics.server_timing(),
+            },
+            "body": json.dumps(select_fields(response_body, fields)),
+        }
+
+    except (
+        AdmissionError,
+        UnknownModelError,
+        RequestEncodingError,
+        ResponseFieldsError,
+    ) as e:
+        return {
+            "statusCode": 400,
             "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": str(e)}),
+        }
+
+    except EndpointUnavailableError as e:
+        print(f"SageMaker endpoint unavailable: {str(e)}")
+        metrics.set("EndpointUnavailable", 1)
+        metrics.emit({"EndpointName": ENDPOINT_NAME})
+        return {
+            "statusCode": 503,
+            "headers": {
+                "Content-Type": "application/json",
+                "Retry-After": e.retry_after_header,
+            },
             "body": json.dumps(
-                {
-                    "generated_text": generated_text,
-                    "prompt": prompt,
-                    "parameters": generation_config,
-                }
+                {"error": "SageMaker endpoint is unavailable", "message": str(e)}
             ),
         }
 
@@ -111,6 +1302,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     except Exception as e:
         print(f"Error invoking SageMaker endpoint: {str(e)}")
+        metrics.set("Errors", 1)
+        metrics.emit({"EndpointName": ENDPOINT_NAME})
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
@@ -121,3 +1314,13 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 }
             ),
         }
+
+
+try:
+    # Available on SnapStart-enabled Python runtimes
+    from snapshot_restore_py import register_before_snapshot
+
+    register_before_snapshot(prime)
+except ImportError:
+    if os.environ.get("PRIME_ON_INIT", "").lower() == "true":
+        prime()
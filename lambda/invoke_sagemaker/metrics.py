@@ -0,0 +1,94 @@
+"""CloudWatch Embedded Metric Format (EMF) helpers for the invoke Lambda."""
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Tuple
+
+METRICS_NAMESPACE = "SlmSagemaker"
+
+
+def emit_metrics(
+    metrics: Dict[str, Tuple[float, str]],
+    dimensions: Dict[str, str],
+    namespace: str = METRICS_NAMESPACE,
+) -> None:
+    """
+    Write a single EMF record to stdout, where CloudWatch Logs extracts it.
+
+    Args:
+        metrics: Mapping of metric name to (value, unit)
+        dimensions: Dimension names and values attached to every metric
+        namespace: CloudWatch metrics namespace
+    """
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": namespace,
+                    "Dimensions": [list(dimensions)],
+                    "Metrics": [
+                        {"Name": name, "Unit": unit}
+                        for name, (_, unit) in metrics.items()
+                    ],
+                }
+            ],
+        },
+        **dimensions,
+        **{name: value for name, (value, _) in metrics.items()},
+    }
+    print(json.dumps(record))
+
+
+class RequestMetrics:
+    """
+    Per-request stage timings and values, published as one EMF record.
+
+    Stage timings are also rendered as a ``Server-Timing`` header, so clients
+    can see where the time went without CloudWatch access. Dimensions only
+    known once the endpoint has answered, such as the variant that served the
+    request, are added to ``dimensions``.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self.stages: Dict[str, float] = {}
+        self.values: Dict[str, Tuple[float, str]] = {}
+        self.dimensions: Dict[str, str] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block of work as a named stage.
+
+        Args:
+            name: Stage name, e.g. "Parse"; published as the metric "ParseTime"
+        """
+        started = self._clock()
+        try:
+            yield
+        finally:
+            elapsed_ms = (self._clock() - started) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def set(self, name: str, value: float, unit: str = "Count") -> None:
+        """Record a value to publish alongside the stage timings."""
+        self.values[name] = (value, unit)
+
+    def server_timing(self) -> str:
+        """Render stage timings as a ``Server-Timing`` header value."""
+        return ", ".join(
+            f"{name.lower()};dur={duration:.1f}"
+            for name, duration in self.stages.items()
+        )
+
+    def emit(self, dimensions: Dict[str, str]) -> None:
+        """Publish all stage timings and values as a single EMF record."""
+        metrics = {
+            f"{name}Time": (duration, "Milliseconds")
+            for name, duration in self.stages.items()
+        }
+        metrics.update(self.values)
+        if metrics:
+            emit_metrics(metrics, {**dimensions, **self.dimensions})
@@ -0,0 +1,150 @@
+"""Per-model chat templates, generation defaults and routing.
+
+An endpoint built from inference components hosts several models; each request
+names the model it wants and is routed to that model's inference component
+with the model's own prompt format and defaults. Within a model, a request may
+also name one of its LoRA adapters.
+"""
+
+import os
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ChatTemplate:
+    """Prompt format of a chat model."""
+
+    message: str  # One turn; formatted with role and content
+    assistant_prefix: str  # Opens the turn the model completes
+    stop: Tuple[str, ...]  # Sequences that end the assistant turn
+
+    def format(self, messages: List[Dict[str, str]]) -> str:
+        """Render {"role", "content"} messages and open the assistant turn."""
+        turns = "".join(
+            self.message.format(role=m["role"], content=m["content"]) for m in messages
+        )
+        return turns + self.assistant_prefix
+
+
+CHAT_TEMPLATES: Dict[str, ChatTemplate] = {
+    # TinyLlama-Chat, Zephyr
+    "zephyr": ChatTemplate(
+        message="<|{role}|>\n{content}</s>\n",
+        assistant_prefix="<|assistant|>\n",
+        stop=("</s>", "<|user|>", "<|system|>"),
+    ),
+    # Qwen2, SmolLM
+    "chatml": ChatTemplate(
+        message="<|im_start|>{role}\n{content}<|im_end|>\n",
+        assistant_prefix="<|im_start|>assistant\n",
+        stop=("<|im_end|>", "<|im_start|>"),
+    ),
+    # Phi-3
+    "phi3": ChatTemplate(
+        message="<|{role}|>\n{content}<|end|>\n",
+        assistant_prefix="<|assistant|>\n",
+        stop=("<|end|>", "<|user|>", "<|endoftext|>"),
+    ),
+    # Llama 3
+    "llama3": ChatTemplate(
+        message="<|start_header_id|>{role}<|end_header_id|>\n\n{content}<|eot_id|>",
+        assistant_prefix="<|start_header_id|>assistant<|end_header_id|>\n\n",
+        stop=("<|eot_id|>",),
+    ),
+}
+
+
+class UnknownModelError(ValueError):
+    """Raised when a request names a model the endpoint does not serve."""
+
+
+class UnknownAdapterError(UnknownModelError):
+    """Raised when a request names an adapter the model does not load."""
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Where and how to send requests for one model."""
+
+    name: str
+    template: ChatTemplate
+    system_prompt: str
+    tokenizer_path: str
+    inference_component: Optional[str] = None
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    max_input_length: Optional[int] = None
+    max_total_tokens: Optional[int] = None
+    # TGI adapter ids by request-facing name
+    adapters: Dict[str, str] = field(default_factory=dict)
+    # Name of the adapter selected for a request, if any
+    adapter: Optional[str] = None
+
+    @property
+    def adapter_id(self) -> Optional[str]:
+        """TGI id of the selected adapter, or None for the base model."""
+        return self.adapters[self.adapter] if self.adapter else None
+
+
+def load_model_routes(spec: Dict[str, Any], base_dir: str) -> Dict[str, ModelRoute]:
+    """
+    Build routes from the MODEL_ROUTES environment variable.
+
+    Args:
+        spec: Mapping of model name to inference_component, chat_template,
+            system_prompt, parameters, max_input_length, max_total_tokens,
+            adapters and tokenizer (file name relative to base_dir)
+        base_dir: Directory of the Lambda asset
+
+    Returns:
+        Routes by model name, in the order given (the first is the default)
+    """
+    return {
+        name: ModelRoute(
+            name=name,
+            template=CHAT_TEMPLATES[entry["chat_template"]],
+            system_prompt=entry["system_prompt"],
+            tokenizer_path=os.path.join(base_dir, entry["tokenizer"]),
+            inference_component=entry.get("inference_component"),
+            parameters=entry.get("parameters", {}),
+            max_input_length=entry.get("max_input_length"),
+            max_total_tokens=entry.get("max_total_tokens"),
+            adapters=entry.get("adapters", {}),
+        )
+        for name, entry in spec.items()
+    }
+
+
+def select_route(routes: Dict[str, ModelRoute], name: Optional[str]) -> ModelRoute:
+    """
+    Return the route for a requested model, or the default when none is named.
+
+    Raises:
+        UnknownModelError: If the model is not served by the endpoint
+    """
+    if name is None:
+        return next(iter(routes.values()))
+    route = routes.get(name)
+    if route is None:
+        raise UnknownModelError(
+            f"Unknown model {name!r}; available models: {', '.join(routes)}"
+        )
+    return route
+
+
+def select_adapter(route: ModelRoute, name: Optional[str]) -> ModelRoute:
+    """
+    Return the route with a requested adapter selected.
+
+    Raises:
+        UnknownAdapterError: If the model does not load the adapter
+    """
+    if name is None:
+        return route
+    if name not in route.adapters:
+        available = ", ".join(route.adapters) or "none"
+        raise UnknownAdapterError(
+            f"Unknown adapter {name!r} for model {route.name}; "
+            f"available adapters: {available}"
+        )
+    return replace(route, adapter=name)
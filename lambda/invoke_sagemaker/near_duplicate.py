@@ -0,0 +1,272 @@
+"""Near-duplicate prompt cache with MinHash signatures and a banded LSH index.
+
+Prompts that differ only by whitespace, casing or a word or two miss the exact
+response cache. ``normalize_prompt`` removes the trivial differences, and
+``MinHasher`` turns the character shingles of what is left into a signature:
+the fraction of positions at which two signatures agree estimates the Jaccard
+similarity of the prompts. ``LshIndex`` splits signatures into bands, so a
+lookup only compares a prompt with cached ones sharing at least one band.
+
+Signatures are computed with NumPy when it is importable (e.g. from a Lambda
+layer) and in pure Python otherwise; both give identical signatures.
+"""
+
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Hash functions are h(x) = (a * x + b) mod p over this prime; products of
+# values below it fit in 64 bits, which keeps the NumPy path exact
+MERSENNE_PRIME = (1 << 31) - 1
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+
+Signature = Tuple[int, ...]
+
+_numpy: Any = None
+
+
+def _import_numpy() -> Any:
+    """NumPy if it is installed, else False; imported on first use."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-fold, collapse whitespace and strip punctuation at either end."""
+    text = _WHITESPACE.sub(" ", prompt.casefold())
+    return _EDGE_PUNCTUATION.sub("", text)
+
+
+def shingle_hashes(text: str, size: int) -> List[int]:
+    """Distinct hashes of the character n-grams of a normalized prompt."""
+    if len(text) <= size:
+        shingles = {text}
+    else:
+        shingles = {text[i : i + size] for i in range(len(text) - size + 1)}
+    return [zlib.crc32(s.encode()) % MERSENNE_PRIME for s in shingles]
+
+
+class MinHasher:
+    """MinHash signatures of prompts."""
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+        seed: int = 1,
+        use_numpy: Optional[bool] = None,
+    ) -> None:
+        """
+        Args:
+            num_perm: Signature length; more is more accurate but slower
+            shingle_size: Characters per shingle
+            seed: Seed of the hash functions; signatures are only comparable
+                between hashers with the same seed and num_perm
+            use_numpy: Force (True) or avoid (False) the NumPy path; by
+                default it is used when NumPy is importable
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.use_numpy = use_numpy
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, MERSENNE_PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, MERSENNE_PRIME) for _ in range(num_perm)]
+        self._arrays: Any = None
+
+    def signature(self, prompt: str) -> Signature:
+        """Signature of a prompt, after normalization."""
+        hashes = shingle_hashes(normalize_prompt(prompt), self.shingle_size)
+        np = _import_numpy() if self.use_numpy is not False else False
+        if np:
+            return self._signature_numpy(np, hashes)
+        return tuple(
+            min((a * x + b) % MERSENNE_PRIME for x in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    def _signature_numpy(self, np: Any, hashes: List[int]) -> Signature:
+        if self._arrays is None:
+            self._arrays = (
+                np.array(self._a, dtype=np.uint64)[:, None],
+                np.array(self._b, dtype=np.uint64)[:, None],
+            )
+        a, b = self._arrays
+        x = np.array(hashes, dtype=np.uint64)[None, :]
+        # One row per hash function, one column per shingle
+        return tuple(((a * x + b) % MERSENNE_PRIME).min(axis=1).tolist())
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Estimated Jaccard similarity of the prompts behind two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class LshIndex:
+    """
+    Bounded index of signatures, queried for the most similar entry.
+
+    Entries are kept in scopes (e.g. one per model and parameter set) that
+    never match each other. A pair of prompts becomes a candidate when all
+    rows of any one band agree, which is likely above a similarity of about
+    (1 / bands) ** (1 / rows); candidates are then compared in full. The
+    least recently used entries are evicted beyond max_entries, and entries
+    expire after ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError(f"{bands} bands do not divide {num_perm} permutations")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # Entry id -> (scope, signature, expires_at, value), least recent first
+        self._entries: "OrderedDict[int, Tuple[str, Signature, float, Any]]" = (
+            OrderedDict()
+        )
+        self._buckets: Dict[Tuple[str, int, Signature], Set[int]] = {}
+
+    def _band_keys(
+        self, scope: str, signature: Signature
+    ) -> Iterator[Tuple[str, int, Signature]]:
+        for band in range(self.bands):
+            rows = signature[band * self.rows : (band + 1) * self.rows]
+            yield (scope, band, rows)
+
+    def query(self, scope: str, signature: Signature) -> Tuple[Optional[Any], float]:
+        """
+        Find the most similar live entry in a scope.
+
+        Returns:
+            (value, similarity) of the best candidate, or (None, 0.0) if no
+            entry shares a band with the signature
+        """
+        with self._lock:
+            candidates: Set[int] = set()
+            for key in self._band_keys(scope, signature):
+                candidates |= self._buckets.get(key, set())
+            best_id, best_similarity = None, 0.0
+            now = self._clock()
+            for entry_id in candidates:
+                _, other, expires_at, _ = self._entries[entry_id]
+                if expires_at <= now:
+                    self._remove(entry_id)
+                    continue
+                score = similarity(signature, other)
+                if score > best_similarity:
+                    best_id, best_similarity = entry_id, score
+            if best_id is None:
+                return None, 0.0
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][3], best_similarity
+
+    def add(self, scope: str, signature: Signature, value: Any) -> None:
+        """Index a value under its prompt's signature, evicting if full."""
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            expires_at = self._clock() + self.ttl_seconds
+            self._entries[entry_id] = (scope, signature, expires_at, value)
+            for key in self._band_keys(scope, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        scope, signature, _, _ = self._entries.pop(entry_id)
+        for key in self._band_keys(scope, signature):
+            bucket = self._buckets[key]
+            bucket.discard(entry_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NearDuplicateCache:
+    """Serve generations of prompts similar enough to a cached one."""
+
+    def __init__(
+        self,
+        threshold: float,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        max_prompt_chars: int = 2000,
+        hasher: Optional[MinHasher] = None,
+        index: Optional[LshIndex] = None,
+    ) -> None:
+        """
+        Args:
+            threshold: Least estimated similarity (0-1) served from the cache
+            max_entries: Entries kept before the least recently used go
+            ttl_seconds: Lifetime of an entry
+            max_prompt_chars: Longer prompts are neither looked up nor
+                indexed, as hashing them costs more than it is likely to save
+            hasher: Signature function, replaceable in tests
+            index: LSH index, replaceable in tests
+        """
+        self.threshold = threshold
+        self.max_prompt_chars = max_prompt_chars
+        self.hasher = hasher or MinHasher()
+        self.index = index or LshIndex(
+            num_perm=self.hasher.num_perm,
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+        )
+        self.stats = {"hits": 0, "misses": 0}
+
+    def signature(self, prompt: str) -> Optional[Signature]:
+        """
+        Signature of a prompt, or None if it is too long to index or nothing
+        is left of it after normalization (e.g. "" and "?" would collide).
+        """
+        if len(prompt) > self.max_prompt_chars or not normalize_prompt(prompt):
+            return None
+        return self.hasher.signature(prompt)
+
+    def get(
+        self, scope: str, signature: Optional[Signature]
+    ) -> Tuple[Optional[Any], float]:
+        """
+        Look up the generation of the most similar cached prompt.
+
+        Returns:
+            (value, similarity); value is None below the threshold, while the
+            similarity of the best candidate is reported either way
+        """
+        if signature is None:
+            return None, 0.0
+        value, score = self.index.query(scope, signature)
+        if value is None or score < self.threshold:
+            self.stats["misses"] += 1
+            return None, score
+        self.stats["hits"] += 1
+        return value, score
+
+    def put(self, scope: str, signature: Optional[Signature], value: Any) -> None:
+        if signature is not None:
+            self.index.add(scope, signature, value)
@@ -0,0 +1,315 @@
+"""Deadline-aware retries, hedging and circuit breaking for endpoint calls.
+
+Every request gets a ``Deadline`` from the Lambda's remaining time, capped by
+API Gateway's integration timeout. ``call_with_retries`` retries throttles,
+``ModelNotReadyException`` and transient 5xx errors with jittered exponential
+backoff, but only while another attempt still fits before the deadline. It
+can also hedge: if the first attempt has not answered after a delay, send a
+duplicate and take whichever finishes first. A per-container
+``CircuitBreaker`` stops calling a saturated endpoint for a while, so
+requests fail fast instead of queueing into timeouts.
+"""
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Error codes of the sagemaker-runtime API worth another attempt
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "ModelNotReadyException",
+    "ServiceUnavailable",
+    "InternalFailure",
+    "InternalDependencyException",
+}
+# Status codes of the serving container (reported through ModelError) that
+# mean it is overloaded or restarting rather than that the request is bad
+RETRYABLE_MODEL_STATUS_CODES = {429, 502, 503, 504}
+# botocore exceptions raised before the request reached the endpoint
+RETRYABLE_EXCEPTION_NAMES = {"EndpointConnectionError", "ConnectTimeoutError"}
+
+
+class EndpointUnavailableError(Exception):
+    """The endpoint could not serve the request in time; the client may retry."""
+
+    def __init__(self, message: str, retry_after_seconds: float) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+    @property
+    def retry_after_header(self) -> str:
+        """Value for the ``Retry-After`` header, in whole seconds."""
+        return str(max(1, math.ceil(self.retry_after_seconds)))
+
+
+class CircuitOpenError(EndpointUnavailableError):
+    """The circuit breaker is open, so the endpoint was not called."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Return True if a failed endpoint call is worth retrying.
+
+    Args:
+        error: Exception raised by the sagemaker-runtime client
+    """
+    if type(error).__name__ in RETRYABLE_EXCEPTION_NAMES:
+        return True
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return False
+    code = response.get("Error", {}).get("Code")
+    if code in RETRYABLE_ERROR_CODES:
+        return True
+    if code == "ModelError":
+        return response.get("OriginalStatusCode") in RETRYABLE_MODEL_STATUS_CODES
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return status == 429 or (status is not None and status >= 500)
+
+
+class Deadline:
+    """Point in time by which a response must be returned."""
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Args:
+            seconds: Time budget from now
+            clock: Monotonic clock, replaceable in tests
+        """
+        self._clock = clock
+        self._expires_at = clock() + seconds
+
+    @classmethod
+    def for_request(
+        cls,
+        context: Any,
+        cap_seconds: float,
+        margin_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> "Deadline":
+        """
+        Deadline of a Lambda invocation.
+
+        Args:
+            context: Lambda context; None (local runs) leaves only the cap
+            cap_seconds: Upper bound, e.g. API Gateway's integration timeout
+            margin_seconds: Time kept back to build and return the response
+
+        Returns:
+            The earlier of the Lambda timeout and the cap, less the margin
+        """
+        seconds = cap_seconds
+        if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+            seconds = min(seconds, context.get_remaining_time_in_millis() / 1000)
+        return cls(seconds - margin_seconds, clock)
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self._expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the endpoint is saturated.
+
+    After ``failure_threshold`` consecutive retryable failures the breaker
+    opens and rejects calls for ``reset_timeout_seconds``. It then lets one
+    trial call through (half-open): success closes it, failure reopens it.
+    State is per Lambda container and shared by its batch threads.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """One of "closed", "open" or "half-open"."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.reset_timeout_seconds:
+            return "open"
+        return "half-open"
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a call through again."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            elapsed = self._clock() - self._opened_at
+            return max(0.0, self.reset_timeout_seconds - elapsed)
+
+    def allow(self) -> bool:
+        """Return True if a call may go ahead, claiming the half-open trial."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+# Threads running hedged attempts, created on first use
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(thread_name_prefix="hedge")
+    return _hedge_executor
+
+
+def hedged_call(call: Callable[[], T], hedge_after_seconds: float) -> T:
+    """
+    Run call, and a duplicate if it has not finished after hedge_after_seconds.
+
+    The first attempt to succeed wins. If one attempt fails, the other is
+    still awaited; the error is raised only if both fail. The losing attempt
+    runs to completion in the background and its result is discarded.
+
+    Args:
+        call: The endpoint call
+        hedge_after_seconds: Delay before sending the duplicate
+
+    Returns:
+        Result of the first successful attempt
+    """
+    executor = _get_hedge_executor()
+    pending = {executor.submit(call)}
+    done, pending = wait(pending, timeout=hedge_after_seconds)
+    if not done:
+        pending.add(executor.submit(call))
+
+    error: Optional[BaseException] = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+def call_with_retries(
+    call: Callable[[], T],
+    deadline: Deadline,
+    breaker: Optional[CircuitBreaker] = None,
+    max_attempts: int = 3,
+    base_delay_seconds: float = 0.1,
+    max_delay_seconds: float = 2.0,
+    min_attempt_seconds: float = 1.0,
+    hedge_after_seconds: Optional[float] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    rand: Callable[[], float] = random.random,
+) -> T:
+    """
+    Call the endpoint, retrying transient failures while the deadline allows.
+
+    Backoff is exponential with full jitter, so containers throttled together
+    do not retry together. A retry is only started if, after the backoff,
+    there is still min_attempt_seconds (or as long as the failed attempt
+    took, if longer) before the deadline.
+
+    Args:
+        call: The endpoint call
+        deadline: Time by which a result is needed
+        breaker: Circuit breaker to consult and update
+        max_attempts: Attempts including the first
+        base_delay_seconds: Backoff cap of the first retry
+        max_delay_seconds: Largest backoff cap
+        min_attempt_seconds: Least time worth starting an attempt with
+        hedge_after_seconds: Send a duplicate of an attempt that has not
+            answered after this long; None disables hedging
+        sleep: Sleep function, replaceable in tests
+        rand: Uniform [0, 1) source for the jitter, replaceable in tests
+
+    Returns:
+        Result of the first successful attempt
+
+    Raises:
+        CircuitOpenError: If the breaker is open
+        EndpointUnavailableError: If retryable failures outlasted the attempts
+            or the deadline
+        Exception: Non-retryable errors from call, unchanged
+    """
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(
+                "Endpoint is saturated; failing fast", breaker.retry_after()
+            )
+        attempt += 1
+        started = time.monotonic()
+        try:
+            if hedge_after_seconds is not None:
+                result = hedged_call(call, hedge_after_seconds)
+            else:
+                result = call()
+        except Exception as e:
+            if not is_retryable(e):
+                # The endpoint answered; the request itself is at fault
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            delay = rand() * min(
+                max_delay_seconds, base_delay_seconds * 2 ** (attempt - 1)
+            )
+            needed = delay + max(min_attempt_seconds, time.monotonic() - started)
+            if attempt >= max_attempts or deadline.remaining() < needed:
+                retry_after = breaker.retry_after() if breaker is not None else 0.0
+                raise EndpointUnavailableError(
+                    f"Endpoint unavailable after {attempt} attempt(s): {e}",
+                    retry_after or max_delay_seconds,
+                ) from e
+            print(f"Retrying endpoint call after {type(e).__name__}: {e}")
+            sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
@@ -0,0 +1,91 @@
+"""Selection of the fields returned in generation responses.
+
+Responses used to echo the prompt and the generation parameters back, which
+for long prompts roughly doubled the bytes serialized and sent. The echoed
+inputs are now left out unless a request asks for them with ``"fields"``,
+a list (or comma-separated string) of the fields to return, e.g.
+``["generated_text", "parameters"]``, or ``"*"`` for all of them.
+"""
+
+from typing import Any, Dict, FrozenSet, Optional
+
+# Fields a generation response may have
+RESPONSE_FIELDS = frozenset(
+    {
+        "generated_text",
+        "prompt",
+        "parameters",
+        "usage",
+        "model",
+        "adapter",
+        "variant",
+        "generation_budget",
+        "session_id",
+        "job_id",
+        "status",
+        "result_path",
+    }
+)
+
+# Request inputs, returned only when asked for
+ECHOED_FIELDS = frozenset({"prompt", "parameters"})
+
+ALL_FIELDS = "*"
+
+
+class ResponseFieldsError(ValueError):
+    """The requested response fields are malformed or unknown."""
+
+
+def parse_fields(value: Any) -> Optional[FrozenSet[str]]:
+    """
+    Validate the "fields" of a request.
+
+    Args:
+        value: List of field names, comma-separated names, "*" or None
+
+    Returns:
+        The fields to return, or None for the default (all but echoed inputs)
+
+    Raises:
+        ResponseFieldsError: If value is malformed or names an unknown field
+    """
+    if value is None:
+        return None
+    if value == ALL_FIELDS:
+        return RESPONSE_FIELDS
+    if isinstance(value, str):
+        value = [name.strip() for name in value.split(",") if name.strip()]
+    if (
+        not isinstance(value, list)
+        or not value
+        or not all(isinstance(name, str) for name in value)
+    ):
+        raise ResponseFieldsError("'fields' must be a non-empty list of field names")
+    unknown = sorted(set(value) - RESPONSE_FIELDS)
+    if unknown:
+        raise ResponseFieldsError(
+            f"Unknown response fields: {', '.join(unknown)}; "
+            f"available fields: {', '.join(sorted(RESPONSE_FIELDS))}"
+        )
+    return frozenset(value)
+
+
+def select_fields(
+    body: Dict[str, Any], fields: Optional[FrozenSet[str]]
+) -> Dict[str, Any]:
+    """
+    Keep the requested fields of a response body.
+
+    Args:
+        body: Complete response body
+        fields: Result of parse_fields()
+
+    Returns:
+        Response body to serialize
+    """
+    if fields is None:
+        return {
+            name: value for name, value in body.items() if name not in ECHOED_FIELDS
+        }
+    return {name: value for name, value in body.items() if name in fields}
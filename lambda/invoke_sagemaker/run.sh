@@ -0,0 +1,3 @@
+#!/bin/sh
+# Entry point for the streaming function under the Lambda Web Adapter
+exec python3 stream_server.py
@@ -0,0 +1,123 @@
+"""Server-side conversation history for multi-turn sessions.
+
+Clients send only the new message with a ``session_id``; earlier turns are
+kept here, truncated to a token budget so the stored item and the prompt
+prefill stay small. Each session also remembers the SageMaker stateful
+session id that pins it to one endpoint instance.
+"""
+
+import json
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Client-chosen session ids: URL-safe and short enough for a DynamoDB key
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+def new_session() -> Dict[str, Any]:
+    """Return the state of a session with no history."""
+    return {"messages": [], "endpoint_session_id": None}
+
+
+def truncate_history(
+    messages: List[Dict[str, str]],
+    budget_tokens: int,
+    count_tokens: Callable[[Dict[str, str]], int],
+) -> List[Dict[str, str]]:
+    """
+    Drop the oldest turns until the conversation fits a token budget.
+
+    The newest message is always kept, even if it alone exceeds the budget;
+    admission control decides whether it can be served. Whole user/assistant
+    turns are dropped together so the history never starts with a reply.
+
+    Args:
+        messages: Conversation in order, each {"role", "content"}
+        budget_tokens: Maximum tokens the history may occupy
+        count_tokens: Token count of one formatted message
+
+    Returns:
+        The most recent messages that fit the budget
+    """
+    counts = [count_tokens(message) for message in messages]
+    start = 0
+    total = sum(counts)
+    while total > budget_tokens and start < len(messages) - 1:
+        total -= counts[start]
+        start += 1
+        # Do not leave an assistant reply without its user message
+        while start < len(messages) - 1 and messages[start]["role"] != "user":
+            total -= counts[start]
+            start += 1
+    return messages[start:]
+
+
+class DynamoDbSessionStore:
+    """Session history in a DynamoDB table with TTL expiry."""
+
+    def __init__(self, table_name: str, ttl_seconds: int, client: Any = None) -> None:
+        """
+        Args:
+            table_name: Table with a ``session_id`` string partition key
+            ttl_seconds: Idle lifetime of a session (table TTL attribute ``expires_at``)
+            client: DynamoDB client, created on first use if omitted
+        """
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("dynamodb")
+        return self._client
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        item = self.client.get_item(
+            TableName=self.table_name, Key={"session_id": {"S": session_id}}
+        ).get("Item")
+        # DynamoDB deletes expired items lazily, so check the TTL ourselves
+        if item is None or int(item["expires_at"]["N"]) <= time.time():
+            return new_session()
+        return {
+            "messages": json.loads(item["messages"]["S"]),
+            "endpoint_session_id": item.get("endpoint_session_id", {}).get("S"),
+        }
+
+    def put(self, session_id: str, session: Dict[str, Any]) -> None:
+        item = {
+            "session_id": {"S": session_id},
+            "messages": {"S": json.dumps(session["messages"])},
+            "expires_at": {"N": str(int(time.time()) + self.ttl_seconds)},
+        }
+        if session.get("endpoint_session_id"):
+            item["endpoint_session_id"] = {"S": session["endpoint_session_id"]}
+        self.client.put_item(TableName=self.table_name, Item=item)
+
+
+class InMemorySessionStore:
+    """Local stand-in for the session table, for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        session = self.sessions.get(session_id)
+        return json.loads(json.dumps(session)) if session else new_session()
+
+    def put(self, session_id: str, session: Dict[str, Any]) -> None:
+        self.sessions[session_id] = json.loads(json.dumps(session))
+
+
+def parse_endpoint_session_id(header: Optional[str]) -> Optional[str]:
+    """
+    Extract the session id from SageMaker's NewSessionId response value.
+
+    The value has the form ``"<id>; Expires=<timestamp>"``.
+    """
+    if not header:
+        return None
+    return header.split(";", 1)[0].strip() or None
@@ -0,0 +1,179 @@
+"""Token streaming server run behind the Lambda Web Adapter.
+
+The managed Python runtime cannot stream Lambda responses, so the streaming
+function runs this HTTP server under the Lambda Web Adapter extension, which
+forwards function URL requests to it and relays the response body as it is
+written.
+
+Request body matches the ``/invoke`` route, and may be gzip-compressed
+(function URLs do not decompress it). The response is a ``text/event-stream``
+with one ``data:`` event per token followed by a final summary event.
+"""
+
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from compression import RequestEncodingError, decode_body
+from handler import (
+    DEADLINE_MARGIN_SECONDS,
+    ENDPOINT_NAME,
+    ENDPOINT_VARIANTS,
+    INTEGRATION_TIMEOUT_SECONDS,
+    SAGEMAKER_MAX_ATTEMPTS,
+    build_payload,
+    circuit_breaker,
+    get_sagemaker_runtime,
+    metric_dimensions,
+    resolve_model,
+)
+from metrics import emit_metrics
+from models import UnknownModelError
+from resilience import Deadline, EndpointUnavailableError, call_with_retries
+from streaming import GenerationStream
+from tokenizer import AdmissionError
+
+# Errors raised while writing to a client that has gone away
+CLIENT_DISCONNECTED = (BrokenPipeError, ConnectionResetError)
+
+
+class StreamRequestHandler(BaseHTTPRequestHandler):
+    """Stream TGI tokens to the client as server-sent events."""
+
+    def do_GET(self) -> None:
+        """Readiness check used by the Lambda Web Adapter."""
+        self._send_json(200, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(decode_body(self.rfile.read(length)) or "{}")
+        except RequestEncodingError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": f"Invalid JSON in request body: {str(e)}"})
+            return
+
+        prompt = body.get("prompt")
+        if not prompt:
+            self._send_json(400, {"error": "Missing 'prompt' in request body"})
+            return
+
+        try:
+            model = resolve_model(body.get("model"), body.get("adapter"))
+            payload, _ = build_payload(prompt, body.get("parameters", {}), model=model)
+        except (AdmissionError, UnknownModelError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        payload["stream"] = True
+
+        target_variant = body.get("target_variant")
+        if target_variant is not None and target_variant not in ENDPOINT_VARIANTS:
+            self._send_json(
+                400, {"error": f"Unknown target_variant {target_variant!r}"}
+            )
+            return
+
+        routing = {}
+        if model.inference_component:
+            routing["InferenceComponentName"] = model.inference_component
+        if target_variant is not None:
+            routing["TargetVariant"] = target_variant
+
+        runtime = get_sagemaker_runtime()
+        try:
+            # Only opening the stream is retried; once tokens have been sent
+            # the generation cannot be restarted transparently
+            response = call_with_retries(
+                lambda: runtime.invoke_endpoint_with_response_stream(
+                    EndpointName=ENDPOINT_NAME,
+                    ContentType="application/json",
+                    Body=json.dumps(payload),
+                    **routing,
+                ),
+                Deadline(INTEGRATION_TIMEOUT_SECONDS - DEADLINE_MARGIN_SECONDS),
+                circuit_breaker,
+                max_attempts=SAGEMAKER_MAX_ATTEMPTS,
+            )
+        except EndpointUnavailableError as e:
+            print(f"SageMaker endpoint unavailable: {str(e)}")
+            self._send_json(
+                503,
+                {"error": "SageMaker endpoint is unavailable", "message": str(e)},
+                {"Retry-After": e.retry_after_header},
+            )
+            return
+        except Exception as e:
+            print(f"Error invoking SageMaker endpoint: {str(e)}")
+            self._send_json(
+                500,
+                {"error": "Failed to invoke SageMaker endpoint", "message": str(e)},
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        stream = GenerationStream(response["Body"])
+        try:
+            for token in stream:
+                self._send_event({"token": token})
+            self._send_event(
+                {
+                    "generated_text": stream.generated_text,
+                    "tokens": stream.token_count,
+                    "time_to_first_token_ms": stream.time_to_first_token_ms,
+                }
+            )
+        except CLIENT_DISCONNECTED:
+            print("Client disconnected, cancelled generation")
+        except Exception as e:
+            print(f"Error streaming from SageMaker endpoint: {str(e)}")
+            try:
+                self._send_event({"error": "Stream interrupted", "message": str(e)})
+            except CLIENT_DISCONNECTED:
+                print("Client disconnected before the error was sent")
+        finally:
+            # Closing the stream drops the SageMaker connection so TGI stops
+            # generating tokens nobody will read
+            stream.close()
+
+        metrics = {
+            "StreamedTokens": (stream.token_count, "Count"),
+            "StreamDuration": (stream.total_time_ms, "Milliseconds"),
+        }
+        if stream.time_to_first_token_ms is not None:
+            metrics["TimeToFirstToken"] = (
+                stream.time_to_first_token_ms,
+                "Milliseconds",
+            )
+        dimensions = metric_dimensions(model)
+        if len(ENDPOINT_VARIANTS) > 1 and response.get("InvokedProductionVariant"):
+            # Time to first token per variant, for comparing instance types
+            dimensions["Variant"] = response["InvokedProductionVariant"]
+        emit_metrics(metrics, dimensions)
+
+    def _send_event(self, data: dict) -> None:
+        self.wfile.write(f"data: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def _send_json(
+        self, status: int, data: dict, headers: Optional[dict] = None
+    ) -> None:
+        encoded = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", "8080"))
+    ThreadingHTTPServer(("0.0.0.0", port), StreamRequestHandler).serve_forever()
@@ -0,0 +1,104 @@
+"""Incremental parsing of TGI token events from SageMaker response streams."""
+
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+
+class SseTokenParser:
+    """
+    Split a byte stream of server-sent events into TGI token events.
+
+    SageMaker delivers ``PayloadPart`` chunks with arbitrary boundaries, so a
+    single ``data:`` line may be spread over several chunks. Incomplete lines
+    are buffered until the rest arrives.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> Iterator[Dict[str, Any]]:
+        """
+        Consume a chunk and yield every complete event it finishes.
+
+        Args:
+            chunk: Raw bytes from a ``PayloadPart``
+
+        Yields:
+            Decoded TGI events, e.g. ``{"token": {...}, "generated_text": None}``
+        """
+        self._buffer += chunk
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                return
+            line = self._buffer[:newline].rstrip(b"\r")
+            self._buffer = self._buffer[newline + 1 :]
+            if not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:") :].strip()
+            if data and data != b"[DONE]":
+                yield json.loads(data)
+
+
+class GenerationStream:
+    """
+    Iterate over the tokens of a streamed TGI generation.
+
+    Iterating yields token text as soon as each token event is parsed. Timing
+    and the final generated text are available once iteration finishes.
+    Closing the stream closes the underlying SageMaker connection, which makes
+    TGI stop generating for the request.
+    """
+
+    def __init__(
+        self,
+        event_stream: Iterable[Dict[str, Any]],
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Args:
+            event_stream: ``Body`` of an ``invoke_endpoint_with_response_stream`` response
+            clock: Monotonic clock in seconds, injectable for tests
+        """
+        self._event_stream = event_stream
+        self._clock = clock
+        self._started = clock()
+        self._parser = SseTokenParser()
+        self.time_to_first_token_ms: Optional[float] = None
+        self.total_time_ms: Optional[float] = None
+        self.token_count = 0
+        self.generated_text = ""
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for event in self._event_stream:
+                if "PayloadPart" not in event:
+                    error = event.get("ModelStreamError") or event.get(
+                        "InternalStreamFailure", {}
+                    )
+                    raise RuntimeError(
+                        f"SageMaker stream failed: {error.get('Message', event)}"
+                    )
+                for token_event in self._parser.feed(event["PayloadPart"]["Bytes"]):
+                    token = token_event.get("token") or {}
+                    if token.get("special"):
+                        continue
+                    if self.time_to_first_token_ms is None:
+                        self.time_to_first_token_ms = self._elapsed_ms()
+                    self.token_count += 1
+                    text = token.get("text", "")
+                    self.generated_text += text
+                    yield text
+        finally:
+            self.total_time_ms = self._elapsed_ms()
+            self.close()
+
+    def close(self) -> None:
+        """Close the SageMaker stream, cancelling any remaining generation."""
+        close = getattr(self._event_stream, "close", None)
+        if close is not None:
+            close()
+
+    def _elapsed_ms(self) -> float:
+        return (self._clock() - self._started) * 1000
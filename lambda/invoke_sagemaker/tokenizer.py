@@ -0,0 +1,220 @@
+"""Pure-Python token counting for SentencePiece-style BPE tokenizers.
+
+Loads a Hugging Face ``tokenizer.json`` of the kind used by Llama, Mistral and
+TinyLlama (BPE model with byte fallback, "▁" word boundaries, no
+pre-tokenizer) and reproduces its segmentation without native dependencies,
+so it can ship in the Lambda asset as-is. The handler uses the counts to
+admit requests against the TGI container's token limits.
+"""
+
+import heapq
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+SPACE = "▁"
+
+
+class UnsupportedTokenizerError(ValueError):
+    """Raised for tokenizer.json files this implementation cannot reproduce."""
+
+
+class AdmissionError(ValueError):
+    """Raised when a request cannot fit the endpoint's token limits."""
+
+
+class BpeTokenizer:
+    """Encode text with a SentencePiece-style BPE vocabulary and merge list."""
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        merges: List[Tuple[str, str]],
+        added_tokens: List[str],
+        add_bos: bool = True,
+    ) -> None:
+        self.vocab = vocab
+        self.ranks = {pair: rank for rank, pair in enumerate(merges)}
+        self.add_bos = add_bos
+        # Longest first, so overlapping special tokens match greedily
+        self._added_pattern = (
+            re.compile(
+                "|".join(
+                    re.escape(token)
+                    for token in sorted(added_tokens, key=len, reverse=True)
+                )
+            )
+            if added_tokens
+            else None
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "BpeTokenizer":
+        """
+        Load a Hugging Face tokenizer.json.
+
+        Raises:
+            UnsupportedTokenizerError: If the tokenizer is not SentencePiece-style BPE
+        """
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+
+        model = spec.get("model") or {}
+        if model.get("type") != "BPE" or spec.get("pre_tokenizer") is not None:
+            raise UnsupportedTokenizerError(
+                "Only SentencePiece-style BPE tokenizers are supported"
+            )
+
+        merges = [
+            tuple(merge.split(" ", 1)) if isinstance(merge, str) else tuple(merge)
+            for merge in model.get("merges", [])
+        ]
+        added_tokens = [token["content"] for token in spec.get("added_tokens", [])]
+        post_processor = json.dumps(spec.get("post_processor") or {})
+        return cls(
+            vocab=model["vocab"],
+            merges=merges,
+            added_tokens=added_tokens,
+            add_bos='"<s>"' in post_processor,
+        )
+
+    def encode(self, text: str) -> List[str]:
+        """
+        Split text into tokens.
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            Token strings, including the BOS token if the tokenizer adds one
+        """
+        tokens = ["<s>"] if self.add_bos else []
+        for segment, is_added in self._split_added_tokens(text):
+            if is_added:
+                tokens.append(segment)
+            elif segment:
+                tokens.extend(self._bpe(SPACE + segment.replace(" ", SPACE)))
+        return tokens
+
+    def count_tokens(self, text: str) -> int:
+        """Return the number of tokens the model will see for text."""
+        return len(self.encode(text))
+
+    def _split_added_tokens(self, text: str) -> List[Tuple[str, bool]]:
+        if self._added_pattern is None:
+            return [(text, False)]
+        segments = []
+        position = 0
+        for match in self._added_pattern.finditer(text):
+            segments.append((text[position : match.start()], False))
+            segments.append((match.group(), True))
+            position = match.end()
+        segments.append((text[position:], False))
+        return segments
+
+    def _bpe(self, word: str) -> List[str]:
+        """
+        Apply merges in rank order using a heap over a linked list of symbols.
+
+        Segments have no pre-tokenizer to break them up, so a naive
+        rescan-per-merge would be quadratic in prompt length.
+        """
+        symbols: List[Optional[str]] = list(word)
+        next_index = list(range(1, len(symbols) + 1))
+        prev_index = list(range(-1, len(symbols) - 1))
+        heap: List[Tuple[int, int, str, str]] = []
+
+        def push(left: int) -> None:
+            right = next_index[left]
+            if right < len(symbols):
+                pair = (symbols[left], symbols[right])
+                rank = self.ranks.get(pair)
+                if rank is not None:
+                    heapq.heappush(heap, (rank, left, pair[0], pair[1]))
+
+        for index in range(len(symbols) - 1):
+            push(index)
+
+        while heap:
+            _, left, left_symbol, right_symbol = heapq.heappop(heap)
+            right = next_index[left]
+            # Skip entries invalidated by an earlier merge
+            if (
+                symbols[left] != left_symbol
+                or right >= len(symbols)
+                or symbols[right] != right_symbol
+            ):
+                continue
+            symbols[left] = left_symbol + right_symbol
+            symbols[right] = None
+            next_index[left] = next_index[right]
+            if next_index[right] < len(symbols):
+                prev_index[next_index[right]] = left
+            if prev_index[left] >= 0:
+                push(prev_index[left])
+            push(left)
+
+        tokens = []
+        for symbol in symbols:
+            if symbol is None:
+                continue
+            if symbol in self.vocab:
+                tokens.append(symbol)
+            else:
+                # Byte fallback: one token per UTF-8 byte
+                tokens.extend(f"<0x{byte:02X}>" for byte in symbol.encode("utf-8"))
+        return tokens
+
+
+def load_tokenizer(path: str) -> Optional[BpeTokenizer]:
+    """
+    Load the bundled tokenizer, or return None if it is missing or unsupported.
+
+    Args:
+        path: Path to tokenizer.json
+
+    Returns:
+        Tokenizer, or None when token counting is unavailable
+    """
+    try:
+        return BpeTokenizer.from_file(path)
+    except (FileNotFoundError, UnsupportedTokenizerError) as e:
+        print(f"Token counting disabled: {str(e)}")
+        return None
+
+
+def apply_token_budget(
+    input_tokens: int,
+    generation_config: Dict,
+    max_input_length: int,
+    max_total_tokens: int,
+) -> int:
+    """
+    Clamp max_new_tokens so the request fits TGI's token limits.
+
+    Args:
+        input_tokens: Token count of the formatted prompt
+        generation_config: TGI generation parameters; updated in place
+        max_input_length: TGI MAX_INPUT_LENGTH
+        max_total_tokens: TGI MAX_TOTAL_TOKENS (prompt plus generated tokens)
+
+    Returns:
+        The max_new_tokens applied
+
+    Raises:
+        AdmissionError: If the prompt alone exceeds the limits
+    """
+    if input_tokens > max_input_length:
+        raise AdmissionError(
+            f"Prompt is {input_tokens} tokens after templating, over the "
+            f"endpoint limit of {max_input_length} tokens"
+        )
+    budget = max_total_tokens - input_tokens
+    if budget < 1:
+        raise AdmissionError(
+            f"Prompt is {input_tokens} tokens after templating, leaving no room "
+            f"to generate within {max_total_tokens} total tokens"
+        )
+    max_new_tokens = min(int(generation_config["max_new_tokens"]), budget)
+    generation_config["max_new_tokens"] = max_new_tokens
+    return max_new_tokens
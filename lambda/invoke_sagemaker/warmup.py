@@ -0,0 +1,380 @@
+"""Lambda function that warms up the SageMaker endpoint.
+
+A fresh container pays for its first requests: weights are paged into GPU
+memory and TGI runs its first prefills at each prompt length, and serverless
+containers also have to start. This function takes that cost instead of
+users. A CloudFormation custom resource invokes it once the endpoint is
+InService, after each deploy that changes the endpoint or the warm-up
+settings, and it sends priming generations at representative prompt lengths
+to every production variant. On serverless endpoints an EventBridge schedule
+can also invoke it, so idle containers are used before they are reclaimed.
+
+Latencies and failures are published as EMF metrics under the ``Trigger``
+dimension, ``Deploy`` or ``KeepWarm``.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from batch import run_batch
+from metrics import emit_metrics
+from resilience import Deadline, call_with_retries
+
+ENDPOINT_NAME = os.environ["SAGEMAKER_ENDPOINT_NAME"]
+ENDPOINT_VARIANTS = os.environ.get("ENDPOINT_VARIANTS", "AllTraffic").split(",")
+
+# Cold containers are slow to answer: invocations wait out the runtime's own
+# 60 second limit, and retries back off for longer than the invoke Lambda's
+SAGEMAKER_READ_TIMEOUT = float(os.environ.get("SAGEMAKER_READ_TIMEOUT", "70"))
+WARMUP_MAX_ATTEMPTS = int(os.environ.get("WARMUP_MAX_ATTEMPTS", "5"))
+WARMUP_BASE_DELAY_SECONDS = 2.0
+WARMUP_MAX_DELAY_SECONDS = 30.0
+# Endpoint states that end on their own; polled until the endpoint is InService
+TRANSITIONAL_STATUSES = {"Creating", "Updating", "SystemUpdating", "RollingBack"}
+STATUS_POLL_SECONDS = 15.0
+# Kept back from the Lambda timeout to report the result to CloudFormation
+DEADLINE_MARGIN_SECONDS = 10.0
+
+# Common words are one token each in the Llama, Mistral and GPT tokenizers,
+# so a prompt of n words is about n tokens long
+FILLER_WORDS = ("The", "quick", "brown", "fox", "jumps", "over", "the", "lazy", "dog.")
+
+# (payload, target variant or None) -> parsed response body
+Invoke = Callable[[Dict[str, Any], Optional[str]], Any]
+
+# Clients, created lazily so that tests can run without boto3
+sagemaker_runtime = None
+sagemaker_client = None
+_client_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class WarmupSettings:
+    """Priming generations to send, from the custom resource's properties."""
+
+    prompt_tokens: Tuple[int, ...]
+    requests_per_length: int
+    max_new_tokens: int
+    fail_on_error: bool = False
+
+    @classmethod
+    def from_properties(cls, properties: Dict[str, Any]) -> "WarmupSettings":
+        """
+        Parse custom resource properties.
+
+        CloudFormation passes every property value as a string.
+
+        Args:
+            properties: ResourceProperties of the CloudFormation event
+
+        Returns:
+            Warm-up settings
+        """
+        return cls(
+            prompt_tokens=tuple(int(tokens) for tokens in properties["PromptTokens"]),
+            requests_per_length=int(properties["RequestsPerLength"]),
+            max_new_tokens=int(properties["MaxNewTokens"]),
+            fail_on_error=str(properties.get("FailOnError", "")).lower() == "true",
+        )
+
+
+def get_sagemaker_runtime() -> Any:
+    """Return the SageMaker runtime client, creating it on first use."""
+    global sagemaker_runtime
+    with _client_lock:
+        if sagemaker_runtime is None:
+            import boto3
+            from botocore.config import Config
+
+            sagemaker_runtime = boto3.client(
+                "sagemaker-runtime",
+                config=Config(
+                    read_timeout=SAGEMAKER_READ_TIMEOUT,
+                    # Retries are made by call_with_retries()
+                    retries={"mode": "standard", "total_max_attempts": 1},
+                ),
+            )
+    return sagemaker_runtime
+
+
+def get_sagemaker_client() -> Any:
+    """Return the SageMaker client used to check the endpoint's status."""
+    global sagemaker_client
+    with _client_lock:
+        if sagemaker_client is None:
+            import boto3
+
+            sagemaker_client = boto3.client("sagemaker")
+    return sagemaker_client
+
+
+def priming_prompt(tokens: int) -> str:
+    """Return a prompt of about ``tokens`` tokens."""
+    return " ".join(FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(tokens))
+
+
+def priming_payload(tokens: int, max_new_tokens: int) -> Dict[str, Any]:
+    """
+    Build a TGI request with a prompt of about ``tokens`` tokens.
+
+    Generation is greedy, so every priming request does the same work and
+    their latencies can be compared across deploys.
+    """
+    return {
+        "inputs": priming_prompt(tokens),
+        "parameters": {"max_new_tokens": max_new_tokens, "do_sample": False},
+    }
+
+
+def invoke_endpoint(payload: Dict[str, Any], variant: Optional[str]) -> Any:
+    """Send a payload to the endpoint, or to one of its variants."""
+    routing = {"TargetVariant": variant} if variant else {}
+    response = get_sagemaker_runtime().invoke_endpoint(
+        EndpointName=ENDPOINT_NAME,
+        ContentType="application/json",
+        Body=json.dumps(payload),
+        **routing,
+    )
+    return json.loads(response["Body"].read())
+
+
+def endpoint_status() -> str:
+    """Return the endpoint's status, e.g. "InService"."""
+    description = get_sagemaker_client().describe_endpoint(EndpointName=ENDPOINT_NAME)
+    return description["EndpointStatus"]
+
+
+def wait_in_service(
+    status: Callable[[], str],
+    deadline: Deadline,
+    sleep: Callable[[float], None] = time.sleep,
+) -> None:
+    """
+    Wait until the endpoint is InService.
+
+    CloudFormation only runs the warm-up after the endpoint resource is
+    complete, so this rarely waits; it guards against updates that are still
+    rolling out.
+
+    Args:
+        status: Returns the endpoint's current status
+        deadline: Time by which the endpoint must be InService
+        sleep: Sleep function, replaceable in tests
+
+    Raises:
+        RuntimeError: If the endpoint failed, or was not InService in time
+    """
+    while True:
+        current = status()
+        if current == "InService":
+            return
+        if current not in TRANSITIONAL_STATUSES:
+            raise RuntimeError(f"Endpoint {ENDPOINT_NAME} is {current}")
+        if deadline.remaining() < STATUS_POLL_SECONDS:
+            raise RuntimeError(
+                f"Endpoint {ENDPOINT_NAME} is still {current}; not warming it up"
+            )
+        sleep(STATUS_POLL_SECONDS)
+
+
+def _timed_call(
+    invoke: Invoke,
+    payload: Dict[str, Any],
+    variant: Optional[str],
+    deadline: Deadline,
+    clock: Callable[[], float],
+    sleep: Callable[[float], None],
+) -> float:
+    """
+    Invoke with retries and return the latency in milliseconds.
+
+    The latency includes retries, since a cold container's failures are part
+    of what the first user request would have waited for.
+    """
+    started = clock()
+    call_with_retries(
+        lambda: invoke(payload, variant),
+        deadline,
+        max_attempts=WARMUP_MAX_ATTEMPTS,
+        base_delay_seconds=WARMUP_BASE_DELAY_SECONDS,
+        max_delay_seconds=WARMUP_MAX_DELAY_SECONDS,
+        sleep=sleep,
+    )
+    return (clock() - started) * 1000
+
+
+def _publish(
+    trigger: str,
+    variant: str,
+    prompt_tokens: int,
+    latencies: List[float],
+    failures: int,
+    first_latency: Optional[float] = None,
+) -> None:
+    metrics = {"WarmupFailures": (float(failures), "Count")}
+    if first_latency is not None:
+        metrics["WarmupFirstLatency"] = (first_latency, "Milliseconds")
+    if latencies:
+        # The slowest request is the one that met the coldest container
+        metrics["WarmupLatency"] = (max(latencies), "Milliseconds")
+    emit_metrics(
+        metrics,
+        {
+            "EndpointName": ENDPOINT_NAME,
+            "Trigger": trigger,
+            "Variant": variant,
+            "PromptTokens": str(prompt_tokens),
+        },
+    )
+
+
+def warm_up(
+    settings: WarmupSettings,
+    variants: Sequence[str],
+    deadline: Deadline,
+    invoke: Invoke = invoke_endpoint,
+    clock: Callable[[], float] = time.perf_counter,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """
+    Send priming generations to every production variant.
+
+    Each prompt length gets ``requests_per_length`` requests in a row. The
+    first one's latency (``WarmupFirstLatency``) is the cold cost users were
+    spared; the later ones (``WarmupLatency``) show what remains once warm.
+
+    Args:
+        settings: Prompt lengths, request counts and generation length
+        variants: Production variant names; only targeted if there are several
+        deadline: Time by which the warm-up must finish
+        invoke: Sends a payload to the endpoint, replaceable in tests
+        clock: Clock for latencies, replaceable in tests
+        sleep: Sleep between retries, replaceable in tests
+
+    Returns:
+        Number of priming requests that failed
+    """
+    total_failures = 0
+    for variant in variants:
+        target = variant if len(variants) > 1 else None
+        for tokens in settings.prompt_tokens:
+            payload = priming_payload(tokens, settings.max_new_tokens)
+            results: List[Optional[float]] = []
+            for _ in range(settings.requests_per_length):
+                if deadline.expired:
+                    print(f"Warm-up of {variant} at {tokens} tokens ran out of time")
+                    results.append(None)
+                    continue
+                try:
+                    results.append(
+                        _timed_call(invoke, payload, target, deadline, clock, sleep)
+                    )
+                except Exception as e:
+                    print(f"Warm-up of {variant} at {tokens} tokens failed: {e}")
+                    results.append(None)
+            failures = results.count(None)
+            _publish(
+                "Deploy",
+                variant,
+                tokens,
+                [latency for latency in results[1:] if latency is not None],
+                failures,
+                first_latency=results[0],
+            )
+            total_failures += failures
+    return total_failures
+
+
+def keep_warm(
+    concurrency: int,
+    prompt_tokens: int,
+    deadline: Deadline,
+    invoke: Invoke = invoke_endpoint,
+    clock: Callable[[], float] = time.perf_counter,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """
+    Ping a serverless endpoint with concurrent one-token generations.
+
+    Serverless endpoints keep a container for each request in flight, so
+    ``concurrency`` pings keep up to that many containers from going idle.
+
+    Args:
+        concurrency: Pings sent at once
+        prompt_tokens: Prompt length of each ping
+        deadline: Time by which the pings must finish
+        invoke: Sends a payload to the endpoint, replaceable in tests
+        clock: Clock for latencies, replaceable in tests
+        sleep: Sleep between retries, replaceable in tests
+
+    Returns:
+        Number of pings that failed
+    """
+    payload = priming_payload(prompt_tokens, 1)
+    outcomes = run_batch(
+        [
+            lambda: _timed_call(invoke, payload, None, deadline, clock, sleep)
+            for _ in range(concurrency)
+        ],
+        max_workers=concurrency,
+        deadline_seconds=deadline.remaining(),
+    )
+    latencies = [outcome["result"] for outcome in outcomes if "result" in outcome]
+    for outcome in outcomes:
+        if "error" in outcome:
+            print(f"Keep-warm ping failed: {outcome['error']}")
+    failures = len(outcomes) - len(latencies)
+    _publish("KeepWarm", ENDPOINT_VARIANTS[0], prompt_tokens, latencies, failures)
+    return failures
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Handle a custom resource event from CloudFormation, or a keep-warm event.
+
+    Custom resource events come through the CDK Provider framework, which
+    reports the returned dict (or a raised error) to CloudFormation.
+    Keep-warm events from EventBridge look like
+    ``{"KeepWarm": {"Concurrency": 2, "PromptTokens": 32}}``.
+
+    Args:
+        event: CloudFormation custom resource or keep-warm event
+        context: Lambda context
+
+    Returns:
+        Custom resource response, with the number of failed requests
+
+    Raises:
+        RuntimeError: If priming requests failed and FailOnError is set, so
+            that CloudFormation rolls the deployment back
+    """
+    deadline = Deadline.for_request(
+        context, cap_seconds=900, margin_seconds=DEADLINE_MARGIN_SECONDS
+    )
+    if "KeepWarm" in event:
+        options = event["KeepWarm"]
+        failures = keep_warm(
+            int(options["Concurrency"]),
+            int(options["PromptTokens"]),
+            deadline,
+            invoke=invoke_endpoint,
+        )
+        return {"Failures": failures}
+
+    physical_id = event.get("PhysicalResourceId", f"{ENDPOINT_NAME}-warmup")
+    if event["RequestType"] == "Delete":
+        return {"PhysicalResourceId": physical_id}
+
+    settings = WarmupSettings.from_properties(event["ResourceProperties"])
+    wait_in_service(endpoint_status, deadline)
+    failures = warm_up(settings, ENDPOINT_VARIANTS, deadline, invoke=invoke_endpoint)
+    if failures and settings.fail_on_error:
+        raise RuntimeError(
+            f"{failures} priming request(s) to {ENDPOINT_NAME} failed; "
+            "see the warm-up function's logs"
+        )
+    return {"PhysicalResourceId": physical_id, "Data": {"Failures": failures}}
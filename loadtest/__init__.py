@@ -0,0 +1 @@
+"""Load testing for the invoke API: workload replay, a local fake endpoint, reports."""
@@ -0,0 +1,141 @@
+"""
+Load test the invoke API.
+
+Examples:
+    # Against the handler and a local fake endpoint (no AWS needed)
+    python -m loadtest --local --concurrency 8
+
+    # Against the deployed API at 5 requests/second (open loop)
+    python -m loadtest --api-key $API_KEY --rate 5 --requests 300 \\
+        --url https://<api-id>.execute-api.<region>.amazonaws.com/prod/invoke
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from loadtest.fake_runtime import FakeTgiRuntime, serve_local
+from loadtest.report import format_summary, summarize
+from loadtest.runner import (
+    HttpTarget,
+    load_workload,
+    run_closed_loop,
+    run_open_loop,
+    sigv4_signer,
+)
+
+DEFAULT_WORKLOAD = Path(__file__).resolve().parent / "workloads" / "sample.jsonl"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest", description="Load test the invoke API."
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Deployed /invoke URL (or streaming URL)")
+    target.add_argument(
+        "--local", action="store_true", help="Run the handler against a fake endpoint"
+    )
+    parser.add_argument("--workload", default=str(DEFAULT_WORKLOAD), help="JSONL file")
+    parser.add_argument(
+        "--api-key", default=os.environ.get("SLM_API_KEY"), help="x-api-key value"
+    )
+    parser.add_argument(
+        "--stream", action="store_true", help="Stream tokens and time the first one"
+    )
+    parser.add_argument(
+        "--iam", action="store_true", help="SigV4-sign requests (streaming URL)"
+    )
+    parser.add_argument(
+        "--region", default=os.environ.get("AWS_REGION", "us-east-1"), help="For --iam"
+    )
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=4, help="Closed-loop workers")
+    load.add_argument("--rate", type=float, help="Open-loop arrivals per second")
+    parser.add_argument(
+        "--requests", type=int, help="Requests to send (default: one pass)"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds")
+    parser.add_argument("--seed", type=int, help="Seed for open-loop arrivals")
+    parser.add_argument(
+        "--output", default="loadtest-results.json", help="Results file (JSON)"
+    )
+
+    fake = parser.add_argument_group("local fake endpoint")
+    fake.add_argument("--prefill-latency-ms", type=float, default=50.0)
+    fake.add_argument("--per-token-latency-ms", type=float, default=20.0)
+    fake.add_argument("--output-tokens", type=int, default=64)
+    fake.add_argument("--max-batch-size", type=int, default=8)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    workload = load_workload(args.workload)
+    num_requests = args.requests or len(workload)
+
+    server = None
+    url = args.url
+    if args.local:
+        runtime = FakeTgiRuntime(
+            prefill_latency_ms=args.prefill_latency_ms,
+            per_token_latency_ms=args.per_token_latency_ms,
+            output_tokens=args.output_tokens,
+            max_batch_size=args.max_batch_size,
+        )
+        server = serve_local(runtime)
+        host, port = server.server_address[:2]
+        url = f"http://{host}:{port}/{'stream' if args.stream else 'invoke'}"
+    sign = sigv4_signer(args.region) if args.iam else None
+    target = HttpTarget(url, args.api_key, args.stream, args.timeout, sign)
+
+    started_at = time.time()
+    with contextlib.ExitStack() as stack:
+        if server:
+            stack.callback(server.shutdown)
+        if args.local:
+            # The local handler writes an EMF record per request to stdout
+            quiet = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(quiet))
+        if args.rate:
+            results, wall_time = run_open_loop(
+                target.send,
+                workload,
+                num_requests,
+                args.rate,
+                args.max_in_flight,
+                args.seed,
+            )
+        else:
+            results, wall_time = run_closed_loop(
+                target.send, workload, num_requests, args.concurrency
+            )
+
+    summary = summarize(results, wall_time)
+    print(format_summary(summary))
+
+    run = {
+        "started_at": started_at,
+        "target": "local" if args.local else args.url,
+        "settings": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("api_key", "url", "output")
+        },
+        "summary": summary,
+        "requests": [asdict(result) for result in results],
+    }
+    with open(args.output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
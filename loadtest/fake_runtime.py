@@ -0,0 +1,166 @@
+"""Local stand-in for the TGI endpoint, to load test the handler without AWS.
+
+``FakeTgiRuntime`` answers ``invoke_endpoint`` and
+``invoke_endpoint_with_response_stream`` like a TGI container would, after a
+simulated prefill and per-token decode delay. At most ``max_batch_size``
+generations run at once; further requests queue, as they would on one
+instance. ``serve_local`` runs the real invoke and streaming handlers against
+it behind a local HTTP server.
+"""
+
+import base64
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+
+LAMBDA_SOURCE_DIR = (
+    Path(__file__).resolve().parent.parent / "lambda" / "invoke_sagemaker"
+)
+
+
+class FakeTgiRuntime:
+    """sagemaker-runtime client that generates placeholder tokens with TGI timing."""
+
+    def __init__(
+        self,
+        prefill_latency_ms: float = 50.0,
+        per_token_latency_ms: float = 20.0,
+        output_tokens: int = 64,
+        max_batch_size: int = 8,
+    ) -> None:
+        """
+        Args:
+            prefill_latency_ms: Delay before the first token
+            per_token_latency_ms: Delay between tokens
+            output_tokens: Tokens generated per request, capped by max_new_tokens
+            max_batch_size: Generations served concurrently; the rest wait
+        """
+        self.prefill_latency_ms = prefill_latency_ms
+        self.per_token_latency_ms = per_token_latency_ms
+        self.output_tokens = output_tokens
+        self._slots = threading.BoundedSemaphore(max_batch_size)
+
+    def invoke_endpoint(self, **kwargs: Any) -> dict[str, Any]:
+        tokens = list(self._generate(kwargs["Body"]))
+        result = {
+            "generated_text": "".join(tokens),
+            "details": {"generated_tokens": len(tokens)},
+        }
+        return {
+            "Body": io.BytesIO(json.dumps([result]).encode()),
+            "InvokedProductionVariant": kwargs.get("TargetVariant", "AllTraffic"),
+        }
+
+    def invoke_endpoint_with_response_stream(self, **kwargs: Any) -> dict[str, Any]:
+        return {
+            "Body": self._stream(kwargs["Body"]),
+            "InvokedProductionVariant": kwargs.get("TargetVariant", "AllTraffic"),
+        }
+
+    def _generate(self, body: str) -> Iterator[str]:
+        parameters = json.loads(body).get("parameters", {})
+        count = min(self.output_tokens, parameters.get("max_new_tokens", 512))
+        with self._slots:
+            time.sleep(self.prefill_latency_ms / 1000)
+            for index in range(count):
+                if index:
+                    time.sleep(self.per_token_latency_ms / 1000)
+                yield f" tok{index}"
+
+    def _stream(self, body: str) -> Iterator[dict[str, Any]]:
+        # Closing the generator mid-stream releases the batch slot, like TGI
+        # dropping a cancelled request
+        for index, text in enumerate(self._generate(body)):
+            event = {"token": {"id": index, "text": text, "special": False}}
+            yield {"PayloadPart": {"Bytes": f"data:{json.dumps(event)}\n\n".encode()}}
+
+
+def serve_local(
+    runtime: FakeTgiRuntime, port: int = 0, min_compression_bytes: int | None = 1024
+) -> ThreadingHTTPServer:
+    """
+    Serve the invoke and streaming handlers against a fake runtime.
+
+    ``POST /invoke`` and ``POST /invoke/batch`` go through the Lambda handler;
+    ``POST /stream`` goes through the streaming server. Like API Gateway with
+    a minimum compression size, responses that large are gzip-compressed for
+    clients that accept it. The server is started on a background thread;
+    call ``shutdown()`` when done.
+
+    Args:
+        runtime: Fake endpoint the handlers invoke
+        port: Port to listen on; 0 picks a free port
+        min_compression_bytes: Smallest response to compress; None disables
+            compression
+
+    Returns:
+        Running server; its address is ``server.server_address``
+    """
+    # The handler reads its configuration from the environment at import
+    os.environ.setdefault("SAGEMAKER_ENDPOINT_NAME", "local-endpoint")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    if str(LAMBDA_SOURCE_DIR) not in sys.path:
+        sys.path.insert(0, str(LAMBDA_SOURCE_DIR))
+    import handler
+    from stream_server import StreamRequestHandler
+
+    handler.sagemaker_runtime = runtime
+
+    class LocalRequestHandler(StreamRequestHandler):
+        def do_POST(self) -> None:
+            if self.path.startswith("/stream"):
+                super().do_POST()
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            data = self.rfile.read(length)
+            event = {"resource": self.path.split("?", 1)[0]}
+            if self.headers.get("Content-Encoding"):
+                # Left for the handler to decode, as a binary proxy event
+                event["body"] = base64.b64encode(data).decode()
+                event["isBase64Encoded"] = True
+            else:
+                event["body"] = data.decode()
+            response = handler.lambda_handler(event, None)
+            encoded = response["body"].encode()
+            headers = dict(response.get("headers", {}))
+            if (
+                min_compression_bytes is not None
+                and len(encoded) >= min_compression_bytes
+                and _accepts_gzip(self.headers.get("Accept-Encoding"))
+            ):
+                encoded = gzip.compress(encoded)
+                headers["Content-Encoding"] = "gzip"
+            self.send_response(response["statusCode"])
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # One line per request would drown the report
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), LocalRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        quality = params.strip().removeprefix("q=") if params.strip() else "1"
+        try:
+            accepted = float(quality) > 0
+        except ValueError:
+            accepted = False
+        if name.strip().lower() in ("gzip", "*") and accepted:
+            return True
+    return False
@@ -0,0 +1,104 @@
+"""Summary statistics for load test results."""
+
+from typing import Any
+
+from loadtest.runner import RequestResult
+
+THROTTLED_STATUS = 429
+
+
+def percentile(values: list[float], fraction: float) -> float | None:
+    """
+    Linearly interpolated percentile, e.g. fraction=0.99 for p99.
+
+    Returns:
+        The percentile, or None for an empty list
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def distribution(values: list[float]) -> dict[str, float] | None:
+    """p50/p95/p99, mean and max of a sample, or None if it is empty."""
+    if not values:
+        return None
+    return {
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "mean": sum(values) / len(values),
+        "max": max(values),
+    }
+
+
+def summarize(results: list[RequestResult], wall_time_seconds: float) -> dict[str, Any]:
+    """
+    Aggregate a run into latency, throughput and error statistics.
+
+    Latency and time to first token cover successful requests only. Throttled
+    requests (HTTP 429) are counted separately from other errors.
+
+    Args:
+        results: One result per request
+        wall_time_seconds: Duration of the run
+
+    Returns:
+        JSON-serializable summary
+    """
+    succeeded = [r for r in results if 200 <= r.status < 300 and r.error is None]
+    throttled = [r for r in results if r.status == THROTTLED_STATUS]
+    total = len(results)
+    generated_tokens = sum(r.generated_tokens or 0 for r in succeeded)
+    request_rates = [
+        r.generated_tokens / (r.latency_ms / 1000)
+        for r in succeeded
+        if r.generated_tokens and r.latency_ms > 0
+    ]
+    return {
+        "requests": total,
+        "succeeded": len(succeeded),
+        "error_rate": (total - len(succeeded) - len(throttled)) / total if total else 0,
+        "throttle_rate": len(throttled) / total if total else 0,
+        "wall_time_seconds": wall_time_seconds,
+        "requests_per_second": len(succeeded) / wall_time_seconds,
+        "latency_ms": distribution([r.latency_ms for r in succeeded]),
+        "time_to_first_token_ms": distribution(
+            [
+                r.time_to_first_token_ms
+                for r in succeeded
+                if r.time_to_first_token_ms is not None
+            ]
+        ),
+        # Aggregate generation throughput of the system, and per request
+        "tokens_per_second": generated_tokens / wall_time_seconds,
+        "request_tokens_per_second": distribution(request_rates),
+    }
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    """Render a summary as a short human-readable report."""
+    lines = [
+        f"Requests:         {summary['requests']} "
+        f"({summary['succeeded']} succeeded in {summary['wall_time_seconds']:.1f}s)",
+        f"Throughput:       {summary['requests_per_second']:.2f} req/s, "
+        f"{summary['tokens_per_second']:.1f} tokens/s",
+        f"Error rate:       {summary['error_rate']:.2%}",
+        f"Throttle rate:    {summary['throttle_rate']:.2%}",
+    ]
+    for label, key in (
+        ("Latency", "latency_ms"),
+        ("First token", "time_to_first_token_ms"),
+    ):
+        stats = summary[key]
+        if stats is not None:
+            lines.append(
+                f"{label + ' (ms):':<18}p50 {stats['p50']:.0f}  "
+                f"p95 {stats['p95']:.0f}  p99 {stats['p99']:.0f}  "
+                f"max {stats['max']:.0f}"
+            )
+    return "\n".join(lines)
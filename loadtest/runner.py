@@ -0,0 +1,275 @@
+"""Replay JSONL workloads against the invoke API and record every request."""
+
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable
+
+# Status recorded when no HTTP response was received (timeout, refused, ...)
+NO_RESPONSE = 0
+
+# Adds authentication headers to a request: (url, body, headers) -> headers
+Signer = Callable[[str, bytes, dict[str, str]], dict[str, str]]
+
+
+@dataclass
+class RequestResult:
+    """Outcome of one request."""
+
+    latency_ms: float
+    status: int
+    time_to_first_token_ms: float | None = None
+    generated_tokens: int | None = None
+    error: str | None = None
+    # Seconds from the start of the run to when the request was due
+    scheduled_at: float = 0.0
+
+
+def load_workload(path: str) -> list[dict[str, Any]]:
+    """
+    Read request bodies from a JSONL file.
+
+    Each line is an /invoke request body, e.g.
+    ``{"prompt": "...", "parameters": {"max_new_tokens": 64}}``. Blank lines
+    are skipped.
+
+    Raises:
+        ValueError: If the file has no requests or a line is not an object
+    """
+    workload = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            body = json.loads(line)
+            if not isinstance(body, dict) or not body.get("prompt"):
+                raise ValueError(
+                    f"{path}:{line_number}: expected an object with a 'prompt'"
+                )
+            workload.append(body)
+    if not workload:
+        raise ValueError(f"{path} contains no requests")
+    return workload
+
+
+class HttpTarget:
+    """Sends request bodies to the invoke API, or its streaming URL."""
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str | None = None,
+        stream: bool = False,
+        timeout_seconds: float = 60.0,
+        sign: Signer | None = None,
+    ) -> None:
+        """
+        Args:
+            url: /invoke URL, or the streaming function URL when stream is set
+            api_key: Value of the x-api-key header
+            stream: Read a server-sent event stream and time the first token
+            timeout_seconds: Per-request socket timeout
+            sign: Signs requests, e.g. sigv4_signer() for IAM-auth function URLs
+        """
+        self.url = url
+        self.api_key = api_key
+        self.stream = stream
+        self.timeout_seconds = timeout_seconds
+        self.sign = sign
+
+    def send(self, body: dict[str, Any]) -> RequestResult:
+        """Send one request and time it."""
+        data = json.dumps(body).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["x-api-key"] = self.api_key
+        if self.sign:
+            headers = self.sign(self.url, data, headers)
+        request = urllib.request.Request(
+            self.url, data=data, headers=headers, method="POST"
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_seconds) as r:
+                if self.stream:
+                    return self._read_stream(r, started)
+                response = json.loads(r.read())
+                return RequestResult(
+                    latency_ms=_elapsed_ms(started),
+                    status=r.status,
+                    generated_tokens=response.get("usage", {}).get("generated_tokens"),
+                )
+        except urllib.error.HTTPError as e:
+            return RequestResult(
+                latency_ms=_elapsed_ms(started),
+                status=e.code,
+                error=e.read().decode(errors="replace")[:200],
+            )
+        except (OSError, ValueError) as e:
+            return RequestResult(
+                latency_ms=_elapsed_ms(started), status=NO_RESPONSE, error=str(e)
+            )
+
+    @staticmethod
+    def _read_stream(response: Any, started: float) -> RequestResult:
+        first_token_ms = None
+        tokens = 0
+        for line in response:
+            if not line.startswith(b"data:"):
+                continue
+            event = json.loads(line[len(b"data:") :])
+            if "error" in event:
+                return RequestResult(
+                    latency_ms=_elapsed_ms(started),
+                    status=response.status,
+                    time_to_first_token_ms=first_token_ms,
+                    generated_tokens=tokens,
+                    error=event.get("message", event["error"]),
+                )
+            if "token" in event:
+                if first_token_ms is None:
+                    first_token_ms = _elapsed_ms(started)
+                tokens += 1
+        return RequestResult(
+            latency_ms=_elapsed_ms(started),
+            status=response.status,
+            time_to_first_token_ms=first_token_ms,
+            generated_tokens=tokens,
+        )
+
+
+def sigv4_signer(region: str, service: str = "lambda") -> Signer:
+    """
+    Sign requests with the default AWS credentials, for IAM-auth function URLs.
+
+    Args:
+        region: Region of the function URL
+        service: Signing name of the service
+
+    Returns:
+        Signer adding SigV4 headers
+    """
+    import boto3
+    from botocore.auth import SigV4Auth
+    from botocore.awsrequest import AWSRequest
+
+    credentials = boto3.Session().get_credentials()
+
+    def sign(url: str, data: bytes, headers: dict[str, str]) -> dict[str, str]:
+        request = AWSRequest(method="POST", url=url, data=data, headers=headers)
+        SigV4Auth(credentials.get_frozen_credentials(), service, region).add_auth(
+            request
+        )
+        return dict(request.headers.items())
+
+    return sign
+
+
+def run_closed_loop(
+    send: Callable[[dict[str, Any]], RequestResult],
+    workload: list[dict[str, Any]],
+    num_requests: int,
+    concurrency: int,
+) -> tuple[list[RequestResult], float]:
+    """
+    Keep a fixed number of requests in flight until num_requests are done.
+
+    Each worker sends its next request as soon as the previous one returns,
+    which measures capacity at that concurrency.
+
+    Args:
+        send: Sends one request body
+        workload: Request bodies, replayed in order and cycled as needed
+        num_requests: Total requests to send
+        concurrency: Requests in flight at once
+
+    Returns:
+        (results in completion order, wall time in seconds)
+    """
+    results: list[RequestResult] = []
+    lock = threading.Lock()
+    next_index = iter(range(num_requests))
+    run_started = time.perf_counter()
+
+    def worker() -> None:
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            scheduled_at = time.perf_counter() - run_started
+            result = send(workload[index % len(workload)])
+            with lock:
+                results.append(replace(result, scheduled_at=scheduled_at))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    return results, time.perf_counter() - run_started
+
+
+def run_open_loop(
+    send: Callable[[dict[str, Any]], RequestResult],
+    workload: list[dict[str, Any]],
+    num_requests: int,
+    rate_per_second: float,
+    max_in_flight: int = 256,
+    seed: int | None = None,
+) -> tuple[list[RequestResult], float]:
+    """
+    Send requests at Poisson arrival times, regardless of how fast they finish.
+
+    Latency is measured from when each request was due, not when a worker
+    got to it, so a saturated system shows up as queueing delay rather than
+    as a lower arrival rate.
+
+    Args:
+        send: Sends one request body
+        workload: Request bodies, replayed in order and cycled as needed
+        num_requests: Total requests to send
+        rate_per_second: Mean arrival rate
+        max_in_flight: Upper bound on concurrent requests (client threads)
+        seed: Seed for the arrival times, for repeatable runs
+
+    Returns:
+        (results in completion order, wall time in seconds)
+    """
+    arrivals = random.Random(seed)
+    results: list[RequestResult] = []
+    lock = threading.Lock()
+    run_started = time.perf_counter()
+
+    def timed_send(body: dict[str, Any], scheduled_at: float) -> None:
+        queued_ms = (time.perf_counter() - run_started - scheduled_at) * 1000
+        result = send(body)
+        result = replace(
+            result,
+            latency_ms=result.latency_ms + queued_ms,
+            time_to_first_token_ms=(
+                None
+                if result.time_to_first_token_ms is None
+                else result.time_to_first_token_ms + queued_ms
+            ),
+            scheduled_at=scheduled_at,
+        )
+        with lock:
+            results.append(result)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        scheduled_at = 0.0
+        for index in range(num_requests):
+            delay = run_started + scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(timed_send, workload[index % len(workload)], scheduled_at)
+            scheduled_at += arrivals.expovariate(rate_per_second)
+    return results, time.perf_counter() - run_started
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
@@ -0,0 +1,18 @@
+"""Asyncio client for the deployed invoke API.
+
+Example:
+    from slm_sagemaker.client import AsyncClient
+
+    async with AsyncClient(invoke_url, api_key=api_key) as client:
+        async for result in client.map(prompts):
+            print(result["generated_text"])
+"""
+
+from slm_sagemaker.client.client import (
+    AsyncClient,
+    ClientError,
+    Signer,
+    parse_retry_after,
+)
+
+__all__ = ["AsyncClient", "ClientError", "Signer", "parse_retry_after"]
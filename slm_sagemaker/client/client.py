@@ -0,0 +1,395 @@
+"""Asyncio client for the invoke API and its streaming URL."""
+
+import asyncio
+import email.utils
+import gzip
+import json
+import random
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Iterable
+from typing import Any, Callable, Self
+
+from slm_sagemaker.client.connection import HttpSession, Response
+
+# Throttled by API Gateway, or the endpoint is saturated (circuit breaker)
+RETRYABLE_STATUS_CODES = {429, 503}
+
+# Adds authentication headers to a request: (url, body, headers) -> headers
+Signer = Callable[[str, bytes, dict[str, str]], dict[str, str]]
+
+_DONE = object()
+
+
+class ClientError(Exception):
+    """A request failed, after any retries."""
+
+    def __init__(
+        self, message: str, status: int | None = None, body: Any = None
+    ) -> None:
+        super().__init__(message)
+        # None when no HTTP response was received
+        self.status = status
+        self.body = body
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """
+    Seconds to wait from a ``Retry-After`` header.
+
+    Args:
+        value: Header value, in seconds or an HTTP date
+        now: Current Unix time, for HTTP dates
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        return None
+    return max(0.0, retry_at.timestamp() - (time.time() if now is None else now))
+
+
+class AsyncClient:
+    """
+    Client for the invoke API, for use from asyncio code.
+
+    Requests share keep-alive connections, and at most ``max_concurrency`` are
+    in flight at once; further requests wait for a slot. Responses of 429 and
+    503 are retried after the ``Retry-After`` the API sends, or with jittered
+    exponential backoff when it sends none. Responses are requested gzipped.
+
+    Example:
+        async with AsyncClient(invoke_url, api_key=api_key) as client:
+            result = await client.invoke("What is the capital of France?")
+            print(result["generated_text"])
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str | None = None,
+        stream_url: str | None = None,
+        sign: Signer | None = None,
+        max_concurrency: int = 8,
+        timeout_seconds: float = 60.0,
+        max_attempts: int = 4,
+        base_delay_seconds: float = 0.5,
+        max_delay_seconds: float = 20.0,
+        compress_requests_over: int | None = None,
+        session: HttpSession | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        """
+        Args:
+            url: /invoke URL, e.g. the ApiGatewayInvokeEndpoint stack output
+            api_key: Value of the x-api-key header for url
+            stream_url: Streaming function URL; without it, stream() returns
+                the whole generation at once
+            sign: Signs streaming requests, e.g. loadtest.runner.sigv4_signer()
+                for IAM-auth function URLs
+            max_concurrency: Requests in flight at once, and idle connections
+                kept per host
+            timeout_seconds: Longest a request may take, or a stream may wait
+                for its response to start
+            max_attempts: Attempts per request including the first
+            base_delay_seconds: Backoff cap of the first retry
+            max_delay_seconds: Largest backoff cap
+            compress_requests_over: Gzip request bodies of at least this many
+                bytes; the API needs content encoding enabled
+                (config.api.min_compression_bytes)
+            session: HTTP session, created if omitted
+            sleep: Async sleep, replaceable in tests
+            rand: Uniform [0, 1) source for the jitter, replaceable in tests
+        """
+        if max_concurrency < 1 or max_attempts < 1:
+            raise ValueError("max_concurrency and max_attempts must be at least 1")
+        self.url = url
+        self.api_key = api_key
+        self.stream_url = stream_url
+        self.sign = sign
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.compress_requests_over = compress_requests_over
+        self.session = session or HttpSession(max_idle_per_origin=max_concurrency)
+        self._sleep = sleep
+        self._rand = rand
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the pooled connections."""
+        await self.session.close()
+
+    async def invoke(
+        self,
+        prompt: str,
+        parameters: dict[str, Any] | None = None,
+        **fields: Any,
+    ) -> dict[str, Any]:
+        """
+        Generate a completion.
+
+        Args:
+            prompt: User prompt
+            parameters: Generation parameters, e.g. {"max_new_tokens": 64}
+            **fields: Other request fields, e.g. model, adapter, session_id
+
+        Returns:
+            The response body, with generated_text and usage
+
+        Raises:
+            ClientError: If the API returned an error, retries ran out or the
+                response was interrupted
+        """
+        return await self.invoke_body(request_body(prompt, parameters, fields))
+
+    async def invoke_body(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Send an /invoke request body as is; see invoke()."""
+        async with self._slots:
+            return await self._within_timeout(self._invoke(body))
+
+    async def stream(
+        self,
+        prompt: str,
+        parameters: dict[str, Any] | None = None,
+        **fields: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Generate a completion token by token.
+
+        Tokens are read from the streaming URL as they are generated. Without
+        a stream_url the whole generation is yielded at once. Leaving the
+        loop early drops the connection, which stops the generation; wrap the
+        iterator in ``contextlib.aclosing`` to do so promptly.
+
+        Args:
+            prompt: User prompt
+            parameters: Generation parameters, e.g. {"max_new_tokens": 64}
+            **fields: Other request fields, e.g. model, adapter
+
+        Yields:
+            Token texts
+
+        Raises:
+            ClientError: If the API returned an error, retries ran out or the
+                stream was interrupted
+        """
+        body = request_body(prompt, parameters, fields)
+        if self.stream_url is None:
+            yield (await self.invoke_body(body))["generated_text"]
+            return
+
+        async with self._slots:
+            response = await self._within_timeout(
+                self._send(self.stream_url, body, stream=True)
+            )
+            try:
+                if response.status >= 300:
+                    raise await _error(response)
+                content_type = response.headers.get("content-type", "")
+                if not content_type.startswith("text/event-stream"):
+                    # A URL that answers in one piece
+                    yield _decode(await _read(response))["generated_text"]
+                    return
+                try:
+                    async for event in _iter_events(response):
+                        if "error" in event:
+                            raise ClientError(
+                                event.get("message") or event["error"],
+                                response.status,
+                                event,
+                            )
+                        if "token" in event:
+                            yield event["token"]
+                except (EOFError, OSError, ValueError) as e:
+                    raise _interrupted(response, e) from e
+            finally:
+                response.close()
+
+    async def map(
+        self,
+        prompts: Iterable[str | dict[str, Any]],
+        parameters: dict[str, Any] | None = None,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[dict[str, Any] | ClientError]:
+        """
+        Generate completions for many prompts, concurrently.
+
+        Prompts are taken from the iterable as slots free up, so it may be
+        long or lazy. Results come back in input order.
+
+        Args:
+            prompts: Prompts, or whole /invoke request bodies
+            parameters: Generation parameters for prompts given as strings
+            return_exceptions: Yield a ClientError for a failed prompt instead
+                of raising it
+
+        Yields:
+            Response bodies, in the order of prompts
+
+        Raises:
+            ClientError: The first failure, unless return_exceptions is set
+        """
+        pending: deque[asyncio.Task] = deque()
+        items = iter(prompts)
+        try:
+            while True:
+                while len(pending) < self.max_concurrency:
+                    item = next(items, _DONE)
+                    if item is _DONE:
+                        break
+                    if isinstance(item, str):
+                        item = request_body(item, parameters, {})
+                    pending.append(asyncio.ensure_future(self.invoke_body(item)))
+                if not pending:
+                    return
+                task = pending.popleft()
+                try:
+                    yield await task
+                except ClientError as e:
+                    if not return_exceptions:
+                        raise
+                    yield e
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _within_timeout(self, operation: Awaitable[Any]) -> Any:
+        try:
+            return await asyncio.wait_for(operation, self.timeout_seconds)
+        except asyncio.TimeoutError as e:
+            raise ClientError(
+                f"No response within {self.timeout_seconds} seconds"
+            ) from e
+
+    async def _invoke(self, body: dict[str, Any]) -> dict[str, Any]:
+        response = await self._send(self.url, body)
+        if response.status >= 300:
+            raise await _error(response)
+        return _decode(await _read(response))
+
+    async def _send(
+        self, url: str, body: dict[str, Any], stream: bool = False
+    ) -> Response:
+        """POST a body, retrying throttles and connection failures."""
+        data = json.dumps(body).encode()
+        content_headers = {"Content-Type": "application/json"}
+        if (
+            self.compress_requests_over is not None
+            and len(data) >= self.compress_requests_over
+        ):
+            data = gzip.compress(data)
+            content_headers["Content-Encoding"] = "gzip"
+        attempt = 0
+        while True:
+            attempt += 1
+            headers = dict(content_headers)
+            if stream:
+                headers["Accept"] = "text/event-stream"
+                if self.sign:
+                    # Signatures expire, so every attempt is signed afresh
+                    headers = self.sign(url, data, headers)
+            else:
+                # API Gateway compresses responses over its minimum size
+                headers["Accept-Encoding"] = "gzip"
+                if self.api_key:
+                    headers["x-api-key"] = self.api_key
+
+            retry_after = None
+            try:
+                response = await self.session.request("POST", url, headers, data)
+            except OSError as e:
+                error = ClientError(f"Request failed: {e}")
+            else:
+                if response.status not in RETRYABLE_STATUS_CODES:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                error = await _error(response)
+
+            if attempt >= self.max_attempts:
+                raise error
+            delay = self._rand() * min(
+                self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempt - 1)
+            )
+            await self._sleep(max(delay, retry_after or 0.0))
+
+
+def request_body(
+    prompt: str, parameters: dict[str, Any] | None, fields: dict[str, Any]
+) -> dict[str, Any]:
+    """An /invoke request body."""
+    body = {"prompt": prompt, **fields}
+    if parameters:
+        body["parameters"] = parameters
+    return body
+
+
+async def _iter_events(response: Response) -> AsyncIterator[dict[str, Any]]:
+    """Data of the server-sent events in a response."""
+    data: list[str] = []
+    async for line in response.iter_lines():
+        if line.startswith(b"data:"):
+            data.append(line[len(b"data:") :].decode("utf-8").strip())
+        elif not line and data:
+            yield json.loads("\n".join(data))
+            data = []
+    if data:
+        yield json.loads("\n".join(data))
+
+
+async def _error(response: Response) -> ClientError:
+    """The error a failed response describes, with its body read."""
+    raw = await _read(response)
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        body = raw.decode("utf-8", errors="replace")
+    message = f"HTTP {response.status}"
+    if isinstance(body, dict):
+        # The handler sends error and message; API Gateway only message
+        details = [body[key] for key in ("error", "message") if body.get(key)]
+        if details:
+            message += ": " + ": ".join(str(detail) for detail in details)
+    return ClientError(message, response.status, body)
+
+
+async def _read(response: Response) -> bytes:
+    """The whole body of a response."""
+    try:
+        return await response.read()
+    except (EOFError, OSError, ValueError) as e:
+        raise _interrupted(response, e) from e
+
+
+def _interrupted(response: Response, error: Exception) -> ClientError:
+    """The error for a body cut short or malformed in transit."""
+    # Covers connections dropped mid-body, bad chunk sizes and truncated gzip
+    return ClientError(
+        f"HTTP {response.status} response was interrupted: {error!r}",
+        response.status,
+    )
+
+
+def _decode(raw: bytes) -> dict[str, Any]:
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise ClientError(f"Response is not JSON: {raw[:200]!r}") from e
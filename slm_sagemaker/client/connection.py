@@ -0,0 +1,268 @@
+"""HTTP/1.1 over asyncio streams, with keep-alive connection pooling.
+
+Only what the invoke API needs: requests with a body, and responses framed by
+``Content-Length``, chunked transfer encoding or the connection closing.
+Connections whose response was read to the end go back to a per-origin idle
+pool and are reused by the next request; connections with an unread or
+unframed body are closed. Whole bodies are gunzipped when the server
+compressed them.
+"""
+
+import asyncio
+import gzip
+import ssl
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from urllib.parse import urlsplit
+
+READ_SIZE = 64 * 1024
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# (scheme, host, port)
+Origin = tuple[str, str, int]
+
+
+class Connection:
+    """One TCP (or TLS) connection to an origin."""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @property
+    def usable(self) -> bool:
+        """False once the server has closed its side."""
+        return not self.reader.at_eof() and not self.writer.is_closing()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class Response:
+    """Status, headers and a body that is read once, as a whole or in parts."""
+
+    def __init__(
+        self,
+        session: "HttpSession",
+        origin: Origin,
+        connection: Connection,
+        status: int,
+        reason: str,
+        headers: dict[str, str],
+        keep_alive: bool,
+        no_body: bool,
+    ) -> None:
+        self.status = status
+        self.reason = reason
+        # Header names are lower case
+        self.headers = headers
+        self._session = session
+        self._origin = origin
+        self._connection: Connection | None = connection
+        self._keep_alive = keep_alive
+        self._no_body = no_body
+        if no_body:
+            self._release()
+
+    async def read(self) -> bytes:
+        """The whole body, decompressed if it is gzip-encoded."""
+        data = b"".join([chunk async for chunk in self.iter_chunks()])
+        if self.headers.get("content-encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        return data
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """The body as it arrives; the connection is released at the end."""
+        if self._no_body:
+            return
+        if self._connection is None:
+            raise RuntimeError("Response body was already read or closed")
+        reader = self._connection.reader
+        try:
+            if self.headers.get("transfer-encoding", "").lower() == "chunked":
+                while True:
+                    size_line = await reader.readline()
+                    size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                    if size == 0:
+                        # Trailers end with an empty line
+                        while (await reader.readline()).strip():
+                            pass
+                        break
+                    chunk = await reader.readexactly(size)
+                    await reader.readexactly(2)
+                    yield chunk
+            elif "content-length" in self.headers:
+                remaining = int(self.headers["content-length"])
+                while remaining:
+                    chunk = await reader.read(min(remaining, READ_SIZE))
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+            else:
+                # Framed by the server closing the connection
+                self._keep_alive = False
+                while chunk := await reader.read(READ_SIZE):
+                    yield chunk
+        except BaseException:
+            self.close()
+            raise
+        self._release()
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        """The body line by line, without line endings."""
+        buffer = b""
+        async for chunk in self.iter_chunks():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line.rstrip(b"\r")
+        if buffer:
+            yield buffer.rstrip(b"\r")
+
+    def close(self) -> None:
+        """Drop the connection, e.g. to stop reading a stream early."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _release(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        if self._keep_alive:
+            self._session.release(self._origin, connection)
+        else:
+            connection.close()
+
+
+class HttpSession:
+    """Sends requests over pooled keep-alive connections."""
+
+    def __init__(
+        self,
+        max_idle_per_origin: int = 10,
+        ssl_context: ssl.SSLContext | None = None,
+        connect_timeout_seconds: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            max_idle_per_origin: Idle connections kept open per origin
+            ssl_context: TLS settings for https URLs; system defaults if omitted
+            connect_timeout_seconds: Longest a new connection may take
+        """
+        self.max_idle_per_origin = max_idle_per_origin
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self._ssl_context = ssl_context
+        self._idle: dict[Origin, list[Connection]] = defaultdict(list)
+        self.connections_opened = 0
+
+    async def request(
+        self, method: str, url: str, headers: dict[str, str], body: bytes = b""
+    ) -> Response:
+        """
+        Send a request and read the response status and headers.
+
+        An idle connection is used if there is one. If the server turns out
+        to have closed it before answering, the request is sent again on a
+        new connection.
+
+        Args:
+            method: HTTP method
+            url: Absolute http(s) URL
+            headers: Request headers; Host and Content-Length are added
+            body: Request body
+
+        Returns:
+            The response, with its body still to be read
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+            raise ValueError(f"Expected an http(s) URL, got {url!r}")
+        port = parts.port or DEFAULT_PORTS[parts.scheme]
+        origin = (parts.scheme, parts.hostname, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host = parts.netloc.rpartition("@")[2]
+        head = [f"{method} {target} HTTP/1.1", f"Host: {host}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        head.append(f"Content-Length: {len(body)}")
+        message = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        idle = self._idle[origin]
+        while idle:
+            connection = idle.pop()
+            if not connection.usable:
+                connection.close()
+                continue
+            try:
+                return await self._exchange(origin, connection, message)
+            except (ConnectionError, EOFError):
+                # Closed by the server while idle; nothing was processed
+                connection.close()
+        connection = await self._connect(origin)
+        return await self._exchange(origin, connection, message)
+
+    def release(self, origin: Origin, connection: Connection) -> None:
+        """Return a connection whose response was fully read to the pool."""
+        idle = self._idle[origin]
+        if connection.usable and len(idle) < self.max_idle_per_origin:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+            idle.clear()
+
+    async def _connect(self, origin: Origin) -> Connection:
+        scheme, host, port = origin
+        ssl_context = None
+        if scheme == "https":
+            ssl_context = self._ssl_context or ssl.create_default_context()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl_context),
+            self.connect_timeout_seconds,
+        )
+        self.connections_opened += 1
+        return Connection(reader, writer)
+
+    async def _exchange(
+        self, origin: Origin, connection: Connection, message: bytes
+    ) -> Response:
+        try:
+            connection.writer.write(message)
+            await connection.writer.drain()
+            status_line = await connection.reader.readline()
+            if not status_line:
+                raise ConnectionResetError("Connection closed before a response")
+            version, status, reason = (
+                status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""]
+            )[:3]
+            headers = {}
+            while line := (await connection.reader.readline()).rstrip(b"\r\n"):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except BaseException:
+            connection.close()
+            raise
+
+        connection_header = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection_header != "close"
+        else:
+            keep_alive = connection_header == "keep-alive"
+        return Response(
+            self,
+            origin,
+            connection,
+            int(status),
+            reason,
+            headers,
+            keep_alive,
+            no_body=int(status) in (204, 304),
+        )
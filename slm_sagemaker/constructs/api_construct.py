@@ -1,15 +1,34 @@
 """API Gateway Construct with Lambda integration for SageMaker endpoint."""
 
+import json
+from typing import Any
+
 from aws_cdk import (
     aws_apigateway as apigw,
+    aws_dynamodb as dynamodb,
     aws_lambda as lambda_,
     aws_iam as iam,
     aws_logs as logs,
+    aws_s3 as s3,
     Duration,
     CfnOutput,
+    RemovalPolicy,
+    Size,
+    Stack,
 )
 from constructs import Construct
 
+from slm_sagemaker.direct_integration import (
+    ERROR_TEMPLATE,
+    RESPONSE_TEMPLATE,
+    request_template,
+)
+
+# AWS Lambda Web Adapter layer, used to stream responses from the Python runtime
+LAMBDA_WEB_ADAPTER_LAYER_ARN = (
+    "arn:aws:lambda:{region}:753240598075:layer:LambdaAdapterLayerX86:25"
+)
+
 
 class ApiGatewayConstruct(Construct):
     """Construct for API Gateway with Lambda integration to invoke SageMaker."""
@@ -20,6 +39,28 @@ class ApiGatewayConstruct(Construct):
         construct_id: str,
         endpoint_name: str,
         api_name: str = "SageMakerLLMApi",
+        enable_streaming: bool = False,
+        enable_shared_cache: bool = False,
+        snap_start: bool = False,
+        provisioned_concurrency: int = 0,
+        async_bucket: s3.IBucket | None = None,
+        max_input_length: int | None = None,
+        max_total_tokens: int | None = None,
+        enable_sessions: bool = False,
+        sticky_sessions: bool = False,
+        model_routes: dict[str, dict[str, Any]] | None = None,
+        adapters: dict[str, str] | None = None,
+        endpoint_variants: list[str] | None = None,
+        hedge_after_ms: int = 0,
+        generation_budget_mode: str = "clamp",
+        near_duplicate_threshold: float = 0.0,
+        direct_integration: bool = False,
+        chat_template: str = "zephyr",
+        system_prompt: str = "You are a helpful AI assistant.",
+        generation_defaults: dict[str, Any] | None = None,
+        min_compression_bytes: int | None = None,
+        health_route: bool = False,
+        payload_log_sample_rate: float = 0.0,
         **kwargs,
     ) -> None:
         """
@@ -30,9 +71,102 @@ class ApiGatewayConstruct(Construct):
             construct_id: Construct ID
             endpoint_name: SageMaker endpoint name to invoke
             api_name: Name for the API Gateway
+            enable_streaming: Add a response-streaming function URL that sends
+                tokens to the client as they are generated
+            enable_shared_cache: Provision a DynamoDB table used as the shared
+                tier of the Lambda response cache
+            snap_start: Enable SnapStart (Python 3.12 runtime) so cold starts
+                restore a primed snapshot instead of re-initializing
+            provisioned_concurrency: Number of pre-initialized execution
+                environments to keep warm (cannot be combined with SnapStart)
+            async_bucket: Bucket of an async endpoint; when set, /invoke submits
+                jobs and GET /result/{id} polls for their output
+            max_input_length: TGI input token limit; prompts over it are
+                rejected before reaching the endpoint
+            max_total_tokens: TGI total token limit; max_new_tokens is clamped
+                to what the prompt leaves of it
+            enable_sessions: Provision a DynamoDB table for multi-turn session
+                history, so clients send only the new message
+            sticky_sessions: Route every turn of a session to the same endpoint
+                instance with SageMaker stateful sessions
+            model_routes: Inference component, chat template, defaults and
+                token limits of each model on an inference component endpoint;
+                requests select one by name
+            adapters: LoRA adapter ids by request-facing name, for a
+                single-model endpoint; requests select one by name
+            endpoint_variants: Production variant names; with more than one,
+                requests may pin a variant and metrics are split per variant
+            hedge_after_ms: Send a duplicate of a short generation that has not
+                answered after this long, to cut tail latency; 0 disables it
+            generation_budget_mode: "clamp" or "reject" max_new_tokens that is
+                not expected to finish before the request deadline, or "off"
+            near_duplicate_threshold: Least prompt similarity (0-1) at which a
+                cached generation is reused for a different prompt; 0 disables
+            direct_integration: Integrate POST /invoke with the SageMaker
+                runtime directly, formatting the prompt in mapping templates
+                instead of the Lambda (batch requests still use the Lambda)
+            chat_template: Prompt format used by the direct integration
+            system_prompt: System message used by the direct integration
+            generation_defaults: Parameters the direct integration fills in
+                when a request omits them
+            min_compression_bytes: Smallest response API Gateway gzips for
+                clients that accept it; also enables compressed request
+                bodies. None disables content encoding
+            health_route: Add GET /health, without an API key, reporting
+                whether the endpoint can serve requests (for DNS health checks)
+            payload_log_sample_rate: Fraction of requests (0-1) whose payload
+                and response are logged in full
         """
         super().__init__(scope, construct_id, **kwargs)
 
+        if hedge_after_ms < 0:
+            raise ValueError(
+                "hedge_after_ms must not be negative. Check config.api settings."
+            )
+        if generation_budget_mode not in ("clamp", "reject", "off"):
+            raise ValueError(
+                f"Unknown generation budget mode {generation_budget_mode!r}. "
+                "Check config.api settings."
+            )
+        if not 0 <= near_duplicate_threshold <= 1:
+            raise ValueError(
+                "near_duplicate_threshold must be between 0 and 1. "
+                "Check config.api settings."
+            )
+        if not 0 <= payload_log_sample_rate <= 1:
+            raise ValueError(
+                "payload_log_sample_rate must be between 0 and 1. "
+                "Check config.api settings."
+            )
+        # API Gateway's limits for the minimum compression size
+        if min_compression_bytes is not None and not (
+            0 <= min_compression_bytes <= 10 * 1024 * 1024
+        ):
+            raise ValueError(
+                "min_compression_bytes must be between 0 and 10485760. "
+                "Check config.api settings."
+            )
+        if snap_start and provisioned_concurrency:
+            raise ValueError(
+                "SnapStart cannot be combined with provisioned concurrency. "
+                "Check config.api settings."
+            )
+        if sticky_sessions and not enable_sessions:
+            raise ValueError(
+                "Sticky sessions require sessions to be enabled. "
+                "Check config.api settings."
+            )
+
+        # Mapping templates only do what the Lambda does for a plain prompt
+        if direct_integration and (
+            async_bucket is not None or enable_sessions or model_routes or adapters
+        ):
+            raise ValueError(
+                "Direct integration cannot be combined with async endpoints, "
+                "sessions, inference components or adapters. "
+                "Check config.api settings."
+            )
+
         # IAM Role for Lambda to invoke SageMaker
         lambda_role = iam.Role(
             self,
@@ -53,11 +187,45 @@ class ApiGatewayConstruct(Construct):
             )
         )
 
+        # Models hosted as inference components are invoked by component name
+        if model_routes:
+            lambda_role.add_to_policy(
+                iam.PolicyStatement(
+                    actions=[
+                        "sagemaker:InvokeEndpoint",
+                        "sagemaker:InvokeEndpointWithResponseStream",
+                    ],
+                    resources=[
+                        f"arn:aws:sagemaker:*:*:inference-component/{route['inference_component']}"
+                        for route in model_routes.values()
+                    ],
+                )
+            )
+
+        # Token limits the handler admits requests against, and per-model
+        # routes (with their own limits) on inference component endpoints
+        model_environment = {}
+        if max_input_length:
+            model_environment["MAX_INPUT_LENGTH"] = str(max_input_length)
+        if max_total_tokens:
+            model_environment["MAX_TOTAL_TOKENS"] = str(max_total_tokens)
+        if model_routes:
+            model_environment["MODEL_ROUTES"] = json.dumps(model_routes)
+        if adapters:
+            model_environment["ADAPTER_ROUTES"] = json.dumps(adapters)
+        if endpoint_variants and len(endpoint_variants) > 1:
+            model_environment["ENDPOINT_VARIANTS"] = ",".join(endpoint_variants)
+
         # Lambda function to invoke SageMaker
         self.lambda_function = lambda_.Function(
             self,
             "InvokeSageMakerFunction",
-            runtime=lambda_.Runtime.PYTHON_3_11,
+            # SnapStart requires Python 3.12 or later
+            runtime=(
+                lambda_.Runtime.PYTHON_3_12
+                if snap_start
+                else lambda_.Runtime.PYTHON_3_11
+            ),
             handler="handler.lambda_handler",
             code=lambda_.Code.from_asset("lambda/invoke_sagemaker"),
             role=lambda_role,
@@ -65,10 +233,144 @@ class ApiGatewayConstruct(Construct):
             memory_size=256,
             environment={
                 "SAGEMAKER_ENDPOINT_NAME": endpoint_name,
+                **model_environment,
             },
             log_retention=logs.RetentionDays.ONE_WEEK,
+            snap_start=(
+                lambda_.SnapStartConf.ON_PUBLISHED_VERSIONS if snap_start else None
+            ),
         )
 
+        # SnapStart and provisioned concurrency only apply to published
+        # versions, so API Gateway invokes a "live" alias in those modes
+        invoke_target = self.lambda_function
+        if snap_start or provisioned_concurrency:
+            if provisioned_concurrency:
+                # Initialization runs ahead of requests, so prime during init
+                self.lambda_function.add_environment("PRIME_ON_INIT", "true")
+            invoke_target = lambda_.Alias(
+                self,
+                "InvokeSageMakerAlias",
+                alias_name="live",
+                version=self.lambda_function.current_version,
+                provisioned_concurrent_executions=provisioned_concurrency or None,
+            )
+
+        # Hedged duplicate requests for short generations
+        if hedge_after_ms:
+            self.lambda_function.add_environment("HEDGE_AFTER_MS", str(hedge_after_ms))
+
+        # Fitting max_new_tokens to the deadline (clamping is the default)
+        if generation_budget_mode != "clamp":
+            self.lambda_function.add_environment(
+                "GENERATION_BUDGET_MODE", generation_budget_mode
+            )
+
+        # Reuse of generations across near-duplicate prompts
+        if near_duplicate_threshold:
+            self.lambda_function.add_environment(
+                "NEAR_DUPLICATE_THRESHOLD", str(near_duplicate_threshold)
+            )
+
+        # Sampled logging of full payloads (off by default)
+        if payload_log_sample_rate:
+            self.lambda_function.add_environment(
+                "PAYLOAD_LOG_SAMPLE_RATE", str(payload_log_sample_rate)
+            )
+
+        # Async endpoints take their input from S3 and write results back there
+        if async_bucket is not None:
+            lambda_role.add_to_policy(
+                iam.PolicyStatement(
+                    actions=["sagemaker:InvokeEndpointAsync"],
+                    resources=[f"arn:aws:sagemaker:*:*:endpoint/{endpoint_name}"],
+                )
+            )
+            async_bucket.grant_read_write(lambda_role)
+            self.lambda_function.add_environment(
+                "ASYNC_BUCKET_NAME", async_bucket.bucket_name
+            )
+
+        # Shared response cache tier (items expire through DynamoDB TTL)
+        self.cache_table = None
+        if enable_shared_cache:
+            self.cache_table = dynamodb.Table(
+                self,
+                "ResponseCacheTable",
+                partition_key=dynamodb.Attribute(
+                    name="cache_key", type=dynamodb.AttributeType.STRING
+                ),
+                billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+                time_to_live_attribute="expires_at",
+                removal_policy=RemovalPolicy.DESTROY,
+            )
+            self.cache_table.grant_read_write_data(lambda_role)
+            self.lambda_function.add_environment(
+                "CACHE_TABLE_NAME", self.cache_table.table_name
+            )
+
+        # Multi-turn session history (idle sessions expire through DynamoDB TTL)
+        self.session_table = None
+        if enable_sessions:
+            self.session_table = dynamodb.Table(
+                self,
+                "SessionTable",
+                partition_key=dynamodb.Attribute(
+                    name="session_id", type=dynamodb.AttributeType.STRING
+                ),
+                billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+                time_to_live_attribute="expires_at",
+                removal_policy=RemovalPolicy.DESTROY,
+            )
+            self.session_table.grant_read_write_data(lambda_role)
+            self.lambda_function.add_environment(
+                "SESSION_TABLE_NAME", self.session_table.table_name
+            )
+            if sticky_sessions:
+                self.lambda_function.add_environment("SESSION_STICKY_ROUTING", "true")
+
+        # Streaming function behind a function URL (API Gateway REST APIs
+        # buffer the whole integration response, so they cannot stream tokens)
+        self.stream_function_url = None
+        if enable_streaming:
+            lambda_role.add_to_policy(
+                iam.PolicyStatement(
+                    actions=["sagemaker:InvokeEndpointWithResponseStream"],
+                    resources=[f"arn:aws:sagemaker:*:*:endpoint/{endpoint_name}"],
+                )
+            )
+            self.stream_function = lambda_.Function(
+                self,
+                "StreamSageMakerFunction",
+                runtime=lambda_.Runtime.PYTHON_3_11,
+                handler="run.sh",
+                code=lambda_.Code.from_asset("lambda/invoke_sagemaker"),
+                role=lambda_role,
+                timeout=Duration.minutes(5),
+                memory_size=256,
+                layers=[
+                    lambda_.LayerVersion.from_layer_version_arn(
+                        self,
+                        "LambdaWebAdapterLayer",
+                        LAMBDA_WEB_ADAPTER_LAYER_ARN.format(
+                            region=Stack.of(self).region
+                        ),
+                    )
+                ],
+                environment={
+                    "SAGEMAKER_ENDPOINT_NAME": endpoint_name,
+                    "AWS_LAMBDA_EXEC_WRAPPER": "/opt/bootstrap",
+                    "AWS_LWA_INVOKE_MODE": "response_stream",
+                    "PORT": "8080",
+                    **model_environment,
+                },
+                log_retention=logs.RetentionDays.ONE_WEEK,
+            )
+            self.stream_function_url = self.stream_function.add_function_url(
+                auth_type=lambda_.FunctionUrlAuthType.AWS_IAM,
+                invoke_mode=lambda_.InvokeMode.RESPONSE_STREAM,
+            )
+
         # Create CloudWatch Logs role for API Gateway (if not already set in account)
         api_gateway_logs_role = iam.Role(
             self,
@@ -83,13 +385,14 @@ class ApiGatewayConstruct(Construct):
 
         # Create REST API with CloudWatch logging disabled initially
         # (API Gateway account settings need to be configured first)
+        self.stage_name = "prod"
         self.api = apigw.RestApi(
             self,
             "RestApi",
             rest_api_name=api_name,
             description="API Gateway for SageMaker Real-Time LLM Endpoint",
             deploy_options=apigw.StageOptions(
-                stage_name="prod",
+                stage_name=self.stage_name,
                 throttling_rate_limit=100,
                 throttling_burst_limit=200,
                 # Logging disabled to avoid CloudWatch Logs role requirement
@@ -98,14 +401,20 @@ class ApiGatewayConstruct(Construct):
             cloud_watch_role=False,  # Don't automatically set CloudWatch role
             default_cors_preflight_options=apigw.CorsOptions(
                 allow_origins=apigw.Cors.ALL_ORIGINS,
-                allow_methods=["POST", "OPTIONS"],
-                allow_headers=["Content-Type", "X-Api-Key"],
+                allow_methods=["GET", "POST", "OPTIONS"],
+                allow_headers=["Content-Type", "Content-Encoding", "X-Api-Key"],
+            ),
+            # Gzip large responses and accept compressed request bodies
+            min_compression_size=(
+                Size.bytes(min_compression_bytes)
+                if min_compression_bytes is not None
+                else None
             ),
         )
 
         # Create Lambda integration (proxy mode passes request/response directly)
         lambda_integration = apigw.LambdaIntegration(
-            self.lambda_function,
+            invoke_target,
             proxy=True,
         )
 
@@ -113,12 +422,51 @@ class ApiGatewayConstruct(Construct):
         invoke_resource = self.api.root.add_resource("invoke")
 
         # Add POST method with API key requirement
-        invoke_resource.add_method(
+        if direct_integration:
+            self._add_direct_invoke_method(
+                invoke_resource,
+                endpoint_name,
+                request_template(chat_template, system_prompt, generation_defaults),
+            )
+        else:
+            invoke_resource.add_method(
+                "POST",
+                lambda_integration,
+                api_key_required=True,
+            )
+
+        # Create /invoke/batch resource for bulk requests
+        batch_resource = invoke_resource.add_resource("batch")
+        batch_resource.add_method(
             "POST",
             lambda_integration,
             api_key_required=True,
         )
 
+        # Create /result/{id} resource for polling async jobs
+        if async_bucket is not None:
+            result_resource = self.api.root.add_resource("result").add_resource("{id}")
+            result_resource.add_method(
+                "GET",
+                lambda_integration,
+                api_key_required=True,
+            )
+
+        # Create /health resource for Route 53 health checks, which cannot
+        # send an API key
+        if health_route:
+            lambda_role.add_to_policy(
+                iam.PolicyStatement(
+                    actions=["sagemaker:DescribeEndpoint"],
+                    resources=[f"arn:aws:sagemaker:*:*:endpoint/{endpoint_name}"],
+                )
+            )
+            self.api.root.add_resource("health").add_method(
+                "GET",
+                lambda_integration,
+                api_key_required=False,
+            )
+
         # Create API Key
         self.api_key = apigw.ApiKey(
             self,
@@ -169,9 +517,121 @@ class ApiGatewayConstruct(Construct):
             description="Full endpoint URL for invoking the model",
         )
 
+        CfnOutput(
+            self,
+            "BatchInvokeEndpoint",
+            value=f"{self.api.url}invoke/batch",
+            description="Full endpoint URL for batch invocations",
+        )
+
         CfnOutput(
             self,
             "ApiGatewayLogsRoleArn",
             value=api_gateway_logs_role.role_arn,
             description="API Gateway CloudWatch Logs Role ARN (optional: set in account settings for logging)",
         )
+
+        if self.stream_function_url is not None:
+            CfnOutput(
+                self,
+                "StreamUrl",
+                value=self.stream_function_url.url,
+                description="Function URL for streaming token responses (IAM auth)",
+            )
+
+    def _add_direct_invoke_method(
+        self, resource: apigw.Resource, endpoint_name: str, template: str
+    ) -> None:
+        """
+        Add a POST method that invokes the endpoint without the Lambda.
+
+        API Gateway validates the body, renders the TGI payload with the
+        request template and maps the endpoint's answer back to the Lambda's
+        response shape. Caching, admission control, retries and metrics are
+        Lambda features and do not apply.
+
+        Args:
+            resource: The /invoke resource
+            endpoint_name: SageMaker endpoint name to invoke
+            template: Request mapping template producing the TGI payload
+        """
+        # Role API Gateway assumes to call the SageMaker runtime
+        integration_role = iam.Role(
+            self,
+            "DirectIntegrationRole",
+            assumed_by=iam.ServicePrincipal("apigateway.amazonaws.com"),
+        )
+        integration_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["sagemaker:InvokeEndpoint"],
+                resources=[f"arn:aws:sagemaker:*:*:endpoint/{endpoint_name}"],
+            )
+        )
+
+        error_templates = {"application/json": ERROR_TEMPLATE}
+        integration = apigw.AwsIntegration(
+            service="runtime.sagemaker",
+            path=f"endpoints/{endpoint_name}/invocations",
+            integration_http_method="POST",
+            options=apigw.IntegrationOptions(
+                credentials_role=integration_role,
+                request_parameters={
+                    "integration.request.header.Content-Type": "'application/json'"
+                },
+                request_templates={"application/json": template},
+                passthrough_behavior=apigw.PassthroughBehavior.NEVER,
+                integration_responses=[
+                    apigw.IntegrationResponse(
+                        status_code="200",
+                        response_templates={"application/json": RESPONSE_TEMPLATE},
+                    ),
+                    # Throttling keeps its status so clients back off
+                    apigw.IntegrationResponse(
+                        selection_pattern="429",
+                        status_code="429",
+                        response_templates=error_templates,
+                    ),
+                    apigw.IntegrationResponse(
+                        selection_pattern=r"4(?!29)\d{2}",
+                        status_code="400",
+                        response_templates=error_templates,
+                    ),
+                    apigw.IntegrationResponse(
+                        selection_pattern=r"5\d{2}",
+                        status_code="502",
+                        response_templates=error_templates,
+                    ),
+                ],
+            ),
+        )
+
+        # Reject bodies without a prompt before they reach the endpoint
+        request_model = self.api.add_model(
+            "InvokeRequestModel",
+            content_type="application/json",
+            schema=apigw.JsonSchema(
+                schema=apigw.JsonSchemaVersion.DRAFT4,
+                type=apigw.JsonSchemaType.OBJECT,
+                required=["prompt"],
+                properties={
+                    "prompt": apigw.JsonSchema(
+                        type=apigw.JsonSchemaType.STRING, min_length=1
+                    ),
+                    "parameters": apigw.JsonSchema(type=apigw.JsonSchemaType.OBJECT),
+                },
+            ),
+        )
+
+        resource.add_method(
+            "POST",
+            integration,
+            api_key_required=True,
+            request_models={"application/json": request_model},
+            request_validator_options=apigw.RequestValidatorOptions(
+                validate_request_body=True
+            ),
+            method_responses=[
+                apigw.MethodResponse(status_code=status_code)
+                for status_code in ("200", "400", "429", "502")
+            ],
+        )
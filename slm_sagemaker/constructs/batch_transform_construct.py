@@ -0,0 +1,134 @@
+"""Batch Transform Construct for offline bulk generation with the endpoint's model."""
+
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_iam as iam,
+    aws_s3 as s3,
+    aws_sagemaker as sagemaker,
+    aws_stepfunctions as sfn,
+    aws_stepfunctions_tasks as tasks,
+    CfnOutput,
+    Duration,
+    RemovalPolicy,
+    Size,
+)
+from constructs import Construct
+
+
+class BatchTransformConstruct(Construct):
+    """
+    Construct for running Batch Transform jobs on an existing TGI model.
+
+    A state machine starts a transform job over the shards under an input
+    prefix of the construct's bucket and waits for it to finish. Each record
+    is one TGI payload, sent to the container on its own, and results are
+    written one line per record, in order, for ``python -m batch_transform``
+    to merge.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        model: sagemaker.CfnModel,
+        execution_role: iam.IRole,
+        instance_type: str,
+        instance_count: int = 1,
+        max_concurrent_transforms: int = 8,
+        max_payload_mb: int = 6,
+        timeout_hours: int = 12,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize the Batch Transform construct.
+
+        Args:
+            scope: CDK scope
+            construct_id: Construct ID
+            model: TGI model of the endpoint, reused by the transform jobs
+            execution_role: The model's execution role, given access to the
+                bucket
+            instance_type: Transform instance type, e.g. "ml.g5.xlarge"
+            instance_count: Transform instances; each works through whole shards
+            max_concurrent_transforms: Records each instance sends to TGI at once
+            max_payload_mb: Largest record
+            timeout_hours: Longest a run may take
+        """
+        super().__init__(scope, construct_id, **kwargs)
+
+        if instance_count < 1 or max_concurrent_transforms < 1:
+            raise ValueError(
+                "Batch Transform needs at least one instance and one concurrent "
+                "transform. Check config.batch_transform settings."
+            )
+
+        # Shards in, results out; both are transient
+        self.bucket = s3.Bucket(
+            self,
+            "BatchTransformBucket",
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            enforce_ssl=True,
+            lifecycle_rules=[s3.LifecycleRule(expiration=Duration.days(14))],
+            removal_policy=RemovalPolicy.DESTROY,
+            auto_delete_objects=True,
+        )
+        self.bucket.grant_read_write(execution_role)
+
+        def bucket_uri(prefix_path: str) -> str:
+            return sfn.JsonPath.format(
+                "s3://{}/{}",
+                self.bucket.bucket_name,
+                sfn.JsonPath.string_at(prefix_path),
+            )
+
+        transform = tasks.SageMakerCreateTransformJob(
+            self,
+            "TransformJob",
+            transform_job_name=sfn.JsonPath.string_at("$.job_name"),
+            model_name=model.attr_model_name,
+            role=execution_role,
+            integration_pattern=sfn.IntegrationPattern.RUN_JOB,
+            batch_strategy=tasks.BatchStrategy.SINGLE_RECORD,
+            max_concurrent_transforms=max_concurrent_transforms,
+            max_payload=Size.mebibytes(max_payload_mb),
+            transform_input=tasks.TransformInput(
+                transform_data_source=tasks.TransformDataSource(
+                    s3_data_source=tasks.TransformS3DataSource(
+                        s3_uri=bucket_uri("$.input_prefix"),
+                        s3_data_type=tasks.S3DataType.S3_PREFIX,
+                    )
+                ),
+                content_type="application/json",
+                split_type=tasks.SplitType.LINE,
+            ),
+            transform_output=tasks.TransformOutput(
+                s3_output_path=bucket_uri("$.output_prefix"),
+                accept="application/json",
+                assemble_with=tasks.AssembleWith.LINE,
+            ),
+            transform_resources=tasks.TransformResources(
+                instance_count=instance_count,
+                # CDK adds the "ml." prefix itself
+                instance_type=ec2.InstanceType(instance_type.removeprefix("ml.")),
+            ),
+        )
+
+        self.state_machine = sfn.StateMachine(
+            self,
+            "StateMachine",
+            definition_body=sfn.DefinitionBody.from_chainable(transform),
+            timeout=Duration.hours(timeout_hours),
+        )
+
+        CfnOutput(
+            self,
+            "BucketName",
+            value=self.bucket.bucket_name,
+            description="Bucket for Batch Transform shards and results",
+        )
+        CfnOutput(
+            self,
+            "StateMachineArn",
+            value=self.state_machine.state_machine_arn,
+            description="Runs a transform of {job_name, input_prefix, output_prefix}",
+        )
@@ -0,0 +1,148 @@
+"""Latency-based DNS routing to a region's API, with a health check."""
+
+from aws_cdk import (
+    aws_apigateway as apigw,
+    aws_certificatemanager as acm,
+    aws_route53 as route53,
+    CfnOutput,
+    Stack,
+)
+from constructs import Construct
+
+
+class GlobalRoutingConstruct(Construct):
+    """
+    Construct adding a region's API to a hostname shared by every region.
+
+    Each regional stack serves its API under the shared domain name and adds a
+    latency record for its region. Route 53 answers each client with the
+    region nearest to it whose health check passes.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        api: apigw.RestApi,
+        stage_name: str,
+        domain_name: str,
+        hosted_zone_id: str,
+        hosted_zone_name: str,
+        health_check_interval_seconds: int = 30,
+        health_check_failure_threshold: int = 3,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize the global routing construct.
+
+        Args:
+            scope: CDK scope
+            construct_id: Construct ID
+            api: The region's REST API, with a GET /health route
+            stage_name: Name of the API's deployment stage
+            domain_name: Hostname shared by every region (from config.global_routing)
+            hosted_zone_id: Route 53 public hosted zone of domain_name (from config.global_routing)
+            hosted_zone_name: Name of that hosted zone (from config.global_routing)
+            health_check_interval_seconds: Seconds between checks, 10 or 30 (from config.global_routing)
+            health_check_failure_threshold: Failed checks before the region is taken out of DNS (from config.global_routing)
+        """
+        super().__init__(scope, construct_id, **kwargs)
+
+        if health_check_interval_seconds not in (10, 30):
+            raise ValueError(
+                "health_check_interval_seconds must be 10 or 30. "
+                "Check config.global_routing settings."
+            )
+        if not 1 <= health_check_failure_threshold <= 10:
+            raise ValueError(
+                "health_check_failure_threshold must be between 1 and 10. "
+                "Check config.global_routing settings."
+            )
+        zone_name = hosted_zone_name.rstrip(".")
+        if not domain_name.endswith(f".{zone_name}"):
+            raise ValueError(
+                f"{domain_name} is not in the hosted zone {zone_name}. "
+                "Check config.global_routing settings."
+            )
+
+        stack = Stack.of(self)
+        region = stack.region
+
+        hosted_zone = route53.HostedZone.from_hosted_zone_attributes(
+            self,
+            "HostedZone",
+            hosted_zone_id=hosted_zone_id,
+            zone_name=zone_name,
+        )
+
+        # Regional custom domains need a certificate in their own region
+        certificate = acm.Certificate(
+            self,
+            "Certificate",
+            domain_name=domain_name,
+            validation=acm.CertificateValidation.from_dns(hosted_zone),
+        )
+
+        self.domain = apigw.DomainName(
+            self,
+            "DomainName",
+            domain_name=domain_name,
+            certificate=certificate,
+            endpoint_type=apigw.EndpointType.REGIONAL,
+            security_policy=apigw.SecurityPolicy.TLS_1_2,
+            mapping=api,
+        )
+
+        # Checks the regional hostname, since the shared one resolves to
+        # whichever region is nearest to the checker
+        self.health_check = route53.CfnHealthCheck(
+            self,
+            "HealthCheck",
+            health_check_config=route53.CfnHealthCheck.HealthCheckConfigProperty(
+                type="HTTPS",
+                fully_qualified_domain_name=(
+                    f"{api.rest_api_id}.execute-api.{region}.{stack.url_suffix}"
+                ),
+                port=443,
+                resource_path=f"/{stage_name}/health",
+                request_interval=health_check_interval_seconds,
+                failure_threshold=health_check_failure_threshold,
+                measure_latency=True,
+            ),
+            health_check_tags=[
+                route53.CfnHealthCheck.HealthCheckTagProperty(
+                    key="Name", value=f"{domain_name} {region}"
+                )
+            ],
+        )
+
+        # One latency record per region, told apart by the set identifier
+        route53.CfnRecordSet(
+            self,
+            "LatencyRecord",
+            hosted_zone_id=hosted_zone_id,
+            name=domain_name,
+            type="A",
+            set_identifier=region,
+            region=region,
+            health_check_id=self.health_check.attr_health_check_id,
+            alias_target=route53.CfnRecordSet.AliasTargetProperty(
+                dns_name=self.domain.domain_name_alias_domain_name,
+                hosted_zone_id=self.domain.domain_name_alias_hosted_zone_id,
+                evaluate_target_health=False,
+            ),
+        )
+
+        CfnOutput(
+            self,
+            "GlobalInvokeEndpoint",
+            value=f"https://{domain_name}/invoke",
+            description="Invoke URL served by the nearest healthy region",
+        )
+
+        CfnOutput(
+            self,
+            "HealthCheckId",
+            value=self.health_check.attr_health_check_id,
+            description="Route 53 health check of this region",
+        )
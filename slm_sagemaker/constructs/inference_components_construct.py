@@ -0,0 +1,218 @@
+"""SageMaker endpoint hosting several TGI models as inference components."""
+
+from typing import Any
+
+from aws_cdk import (
+    aws_sagemaker as sagemaker,
+    aws_iam as iam,
+    CfnOutput,
+    Stack,
+)
+from constructs import Construct
+
+from config import ModelConfig
+from slm_sagemaker.lora_adapters import (
+    adapter_routes,
+    lora_adapters_environment,
+    validate_lora_adapters,
+)
+from slm_sagemaker.tgi_profile import (
+    BYTES_PER_PARAMETER,
+    tgi_profile_environment,
+    validate_tgi_profile,
+)
+from slm_sagemaker.tgi_sizing import INSTANCE_CATALOG, derive_tgi_sizing
+
+
+class InferenceComponentEndpointConstruct(Construct):
+    """Construct for packing several small models onto shared GPU instances."""
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        endpoint_name_prefix: str,
+        models: list[ModelConfig],
+        tgi_image_uri: str,
+        instance_type: str,
+        initial_instance_count: int,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize the inference component endpoint construct.
+
+        Each model gets its own TGI container, GPU and memory reservation and
+        copy count, so several SLMs share one instance instead of each
+        occupying a full GPU instance.
+
+        Args:
+            scope: CDK scope
+            construct_id: Construct ID
+            endpoint_name_prefix: Prefix of the endpoint and endpoint config names (from config.model.name)
+            models: Models to host; the first is the default for requests that name none (from config.model and config.additional_models)
+            tgi_image_uri: TGI container image URI (from config.tgi_image_uri with {region} placeholder)
+            instance_type: Shared instance type (from config.endpoint.inference_components)
+            initial_instance_count: Number of shared instances (from config.endpoint.inference_components)
+        """
+        super().__init__(scope, construct_id, **kwargs)
+
+        self._validate(models, instance_type, initial_instance_count)
+
+        # IAM Role for SageMaker
+        self.execution_role = iam.Role(
+            self,
+            "SageMakerExecutionRole",
+            assumed_by=iam.ServicePrincipal("sagemaker.amazonaws.com"),
+            managed_policies=[
+                iam.ManagedPolicy.from_aws_managed_policy_name(
+                    "AmazonSageMakerFullAccess"
+                ),
+            ],
+        )
+
+        tgi_image = tgi_image_uri.format(region=Stack.of(self).region)
+
+        # Inference component endpoints declare instances only; models are
+        # attached as components after the endpoint exists
+        self.endpoint_config = sagemaker.CfnEndpointConfig(
+            self,
+            "EndpointConfig",
+            endpoint_config_name=f"{endpoint_name_prefix}-config",
+            execution_role_arn=self.execution_role.role_arn,
+            production_variants=[
+                sagemaker.CfnEndpointConfig.ProductionVariantProperty(
+                    variant_name="AllTraffic",
+                    instance_type=instance_type,
+                    initial_instance_count=initial_instance_count,
+                    routing_config=sagemaker.CfnEndpointConfig.RoutingConfigProperty(
+                        routing_strategy="LEAST_OUTSTANDING_REQUESTS"
+                    ),
+                )
+            ],
+        )
+
+        self.endpoint = sagemaker.CfnEndpoint(
+            self,
+            "Endpoint",
+            endpoint_config_name=self.endpoint_config.endpoint_config_name,
+            endpoint_name=f"{endpoint_name_prefix}-endpoint",
+        )
+        self.endpoint.add_dependency(self.endpoint_config)
+        self.endpoint_name = self.endpoint.endpoint_name
+
+        # Async endpoints are a separate endpoint type
+        self.async_bucket = None
+
+        self.tgi_sizing = {}
+        self.model_routes: dict[str, dict[str, Any]] = {}
+        for index, model in enumerate(models):
+            profile = model.tgi_profile
+            validate_tgi_profile(profile, "real-time")
+            validate_lora_adapters(model.adapters, "inference-components")
+            # Size TGI to the GPUs reserved for the model, not the whole instance
+            sizing = derive_tgi_sizing(
+                instance_type,
+                model.architecture,
+                model.tgi_limits,
+                bytes_per_parameter=BYTES_PER_PARAMETER[profile.quantization],
+                gpu_count=model.resources.num_accelerators,
+            )
+
+            cfn_model = sagemaker.CfnModel(
+                self,
+                f"Model{index}",
+                execution_role_arn=self.execution_role.role_arn,
+                primary_container=sagemaker.CfnModel.ContainerDefinitionProperty(
+                    image=tgi_image,
+                    environment={
+                        "HF_MODEL_ID": model.hf_model_id,
+                        "HF_TASK": "text-generation",
+                        **sizing.to_environment(),
+                        **tgi_profile_environment(profile),
+                        **lora_adapters_environment(model.adapters),
+                        "HUGGING_FACE_HUB_TOKEN": "",  # Add token via env if needed for gated models
+                    },
+                ),
+                model_name=model.name,
+            )
+
+            cfn_component = sagemaker.CfnInferenceComponent
+            component = cfn_component(
+                self,
+                f"InferenceComponent{index}",
+                endpoint_name=self.endpoint_name,
+                inference_component_name=f"{model.name}-ic",
+                variant_name="AllTraffic",
+                specification=cfn_component.InferenceComponentSpecificationProperty(
+                    model_name=cfn_model.model_name,
+                    compute_resource_requirements=cfn_component.InferenceComponentComputeResourceRequirementsProperty(
+                        number_of_accelerator_devices_required=model.resources.num_accelerators,
+                        min_memory_required_in_mb=model.resources.min_memory_mb,
+                    ),
+                ),
+                runtime_config=cfn_component.InferenceComponentRuntimeConfigProperty(
+                    copy_count=model.resources.copy_count,
+                ),
+            )
+            component.add_dependency(self.endpoint)
+            component.add_dependency(cfn_model)
+
+            self.tgi_sizing[model.name] = sizing
+            # Routing, prompt format and token limits for the invoke Lambda
+            self.model_routes[model.name] = {
+                "inference_component": component.inference_component_name,
+                "chat_template": model.chat_template.value,
+                "system_prompt": model.system_prompt,
+                "parameters": model.generation_defaults,
+                "max_input_length": sizing.max_input_length,
+                "max_total_tokens": sizing.max_total_tokens,
+                "adapters": adapter_routes(model.adapters),
+                # Downloaded by `make tokenizer`
+                "tokenizer": (
+                    "tokenizer.json" if index == 0 else f"tokenizer-{model.name}.json"
+                ),
+            }
+
+        CfnOutput(
+            self,
+            "EndpointName",
+            value=self.endpoint_name,
+            description="SageMaker Inference Component Endpoint Name",
+        )
+
+    @staticmethod
+    def _validate(
+        models: list[ModelConfig], instance_type: str, initial_instance_count: int
+    ) -> None:
+        """Check that model names are unique and every copy fits on the instances."""
+        names = [model.name for model in models]
+        if len(set(names)) != len(names):
+            raise ValueError(
+                "Model names must be unique. Check config.model and "
+                "config.additional_models settings."
+            )
+
+        instance = INSTANCE_CATALOG.get(instance_type)
+        if instance is None:
+            raise ValueError(
+                f"Unknown instance type {instance_type!r}: add it to INSTANCE_CATALOG. "
+                "Check config.endpoint.inference_components settings."
+            )
+        for model in models:
+            if model.resources.num_accelerators > instance.gpu_count:
+                raise ValueError(
+                    f"{model.name} reserves {model.resources.num_accelerators} GPUs "
+                    f"but {instance_type} has {instance.gpu_count}. "
+                    "Check config.model resources settings."
+                )
+        reserved = sum(
+            model.resources.num_accelerators * model.resources.copy_count
+            for model in models
+        )
+        available = instance.gpu_count * initial_instance_count
+        if reserved > available:
+            raise ValueError(
+                f"Models reserve {reserved} GPUs in total but {initial_instance_count} "
+                f"x {instance_type} provide {available}. Check config.model resources "
+                "and config.endpoint.inference_components settings."
+            )
@@ -1,16 +1,55 @@
 """SageMaker Real-Time Endpoint Construct for Hermes-3-Llama-3.1-8B model."""
 
+import hashlib
+import re
+
 from aws_cdk import (
+    aws_applicationautoscaling as appscaling,
+    aws_cloudwatch as cloudwatch,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_lambda as lambda_,
+    aws_logs as logs,
     aws_sagemaker as sagemaker,
     aws_iam as iam,
+    aws_s3 as s3,
+    custom_resources as cr,
     CfnOutput,
+    CustomResource,
+    Duration,
+    RemovalPolicy,
     Stack,
 )
 from constructs import Construct
 
+from config import (
+    AutoscalingConfig,
+    EndpointVariant,
+    LoraAdapter,
+    ModelArchitecture,
+    ScalingMetric,
+    TgiLimits,
+    TgiProfile,
+    WarmupConfig,
+)
+from slm_sagemaker.lora_adapters import (
+    adapter_routes,
+    lora_adapters_environment,
+    validate_lora_adapters,
+)
+from slm_sagemaker.tgi_profile import (
+    BYTES_PER_PARAMETER,
+    tgi_profile_environment,
+    validate_tgi_profile,
+)
+from slm_sagemaker.tgi_sizing import TgiSizing, derive_tgi_sizing
+
+# SageMaker production variant names
+VARIANT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9](-*[A-Za-z0-9]){0,62}$")
+
 
 class SageMakerEndpointConstruct(Construct):
-    """Construct for deploying a SageMaker Inference Endpoint (Real-Time or Serverless) with TGI."""
+    """Construct for deploying a SageMaker Inference Endpoint (Real-Time, Serverless or Async) with TGI."""
 
     def __init__(
         self,
@@ -24,6 +63,17 @@ class SageMakerEndpointConstruct(Construct):
         initial_instance_count: int | None = None,
         memory_size_in_mb: int | None = None,
         max_concurrency: int | None = None,
+        max_instance_count: int | None = None,
+        max_concurrent_invocations_per_instance: int | None = None,
+        scale_to_zero: bool = True,
+        autoscaling: AutoscalingConfig | None = None,
+        architecture: ModelArchitecture | None = None,
+        tgi_limits: TgiLimits | None = None,
+        tgi_profile: TgiProfile | None = None,
+        adapters: list[LoraAdapter] | None = None,
+        variants: list[EndpointVariant] | None = None,
+        shadow_variant: EndpointVariant | None = None,
+        warmup: WarmupConfig | None = None,
         **kwargs,
     ) -> None:
         """
@@ -36,12 +86,23 @@ class SageMakerEndpointConstruct(Construct):
             construct_id: Construct ID
             model_name: Name for the SageMaker model (from config)
             hf_model_id: HuggingFace model ID (from config)
-            endpoint_type: Type of endpoint - 'real-time' or 'serverless' (from config)
+            endpoint_type: Type of endpoint - 'real-time', 'serverless' or 'async' (from config)
             tgi_image_uri: TGI container image URI (from config.tgi_image_uri with {region} placeholder)
             instance_type: Instance type for real-time endpoints (from config.endpoint.real_time)
             initial_instance_count: Number of instances for real-time endpoints (from config.endpoint.real_time)
             memory_size_in_mb: Memory size for serverless endpoints (from config.endpoint.serverless)
             max_concurrency: Max concurrent invocations for serverless endpoints (from config.endpoint.serverless)
+            max_instance_count: Maximum instances for async endpoints (from config.endpoint.async_inference)
+            max_concurrent_invocations_per_instance: Async requests each instance processes at once (from config.endpoint.async_inference)
+            scale_to_zero: Let async endpoints scale to zero instances when the queue is empty (from config.endpoint.async_inference)
+            autoscaling: Autoscaling for real-time endpoints (from config.endpoint.real_time.autoscaling)
+            architecture: Model dimensions used to size TGI for the instance type (from config.model.architecture)
+            tgi_limits: Explicit TGI limit overrides (from config.model.tgi_limits)
+            tgi_profile: Quantization, dtype, speculation and CUDA graph options (from config.model.tgi_profile)
+            adapters: LoRA adapters loaded beside the base model (from config.model.adapters)
+            variants: Weighted production variants replacing AllTraffic on real-time endpoints (from config.endpoint.real_time)
+            shadow_variant: Variant receiving a copy of real-time traffic (from config.endpoint.real_time)
+            warmup: Priming generations after deploys and serverless keep-warm pings (from config.endpoint.warmup)
         """
         super().__init__(scope, construct_id, **kwargs)
 
@@ -66,28 +127,59 @@ class SageMakerEndpointConstruct(Construct):
         # Format image URI with region
         tgi_image = tgi_image_uri.format(region=region)
 
-        tgi_image_uri_property = sagemaker.CfnModel.ContainerDefinitionProperty(
-            image=tgi_image,
-            environment={
-                "HF_MODEL_ID": hf_model_id,
-                "HF_TASK": "text-generation",
-                "MAX_INPUT_LENGTH": "2048",
-                "MAX_TOTAL_TOKENS": "4096",
-                "SM_NUM_GPUS": "1",
-                "MAX_BATCH_PREFILL_TOKENS": "4096",
-                "MAX_BATCH_TOTAL_TOKENS": "8192",
-                "HUGGING_FACE_HUB_TOKEN": "",  # Add token via env if needed for gated models
-            },
-        )
+        tgi_profile = tgi_profile or TgiProfile()
+        validate_tgi_profile(tgi_profile, endpoint_type)
+        adapters = adapters or []
+        validate_lora_adapters(adapters, endpoint_type)
+        # Adapter names the invoke Lambda accepts, mapped to TGI adapter ids
+        self.adapters = adapter_routes(adapters)
 
-        # Create SageMaker Model
-        self.model = sagemaker.CfnModel(
-            self,
-            "Model",
-            execution_role_arn=self.execution_role.role_arn,
-            primary_container=tgi_image_uri_property,
-            model_name=model_name,
-        )
+        variants = variants or []
+        if (variants or shadow_variant) and endpoint_type != "real-time":
+            raise ValueError(
+                "Production and shadow variants require a real-time endpoint. "
+                "Check config.endpoint settings."
+            )
+        self._validate_variants(variants, shadow_variant)
+
+        self._architecture = architecture
+        self._tgi_limits = tgi_limits
+        self._bytes_per_parameter = BYTES_PER_PARAMETER[tgi_profile.quantization]
+        # Container environment shared by every model; TGI sizing is added per
+        # instance type
+        self._container_environment = {
+            "HF_MODEL_ID": hf_model_id,
+            "HF_TASK": "text-generation",
+            **tgi_profile_environment(tgi_profile),
+            **lora_adapters_environment(adapters),
+            "HUGGING_FACE_HUB_TOKEN": "",  # Add token via env if needed for gated models
+        }
+
+        # Production variants requests can be pinned to, and the TGI sizing of
+        # each; variants on other instance types get their own model
+        self.variant_names = [variant.name for variant in variants] or ["AllTraffic"]
+        self.variant_sizing: dict[str, TgiSizing] = {}
+        variant_models = {
+            variant.name: self._create_variant_model(variant, model_name, tgi_image)
+            for variant in [*variants, *([shadow_variant] if shadow_variant else [])]
+        }
+
+        if variants:
+            # Token limits depend on the model, not the instance, so any
+            # variant's sizing describes what the API may admit
+            self.tgi_sizing = self.variant_sizing[variants[0].name]
+            self.model = variant_models[variants[0].name]
+        else:
+            # Shard across the instance's GPUs and size batch token budgets to the
+            # KV cache that fits beside the weights (serverless endpoints have no GPU)
+            self.tgi_sizing = self._derive_sizing(
+                instance_type if endpoint_type != "serverless" else None
+            )
+            self.variant_sizing["AllTraffic"] = self.tgi_sizing
+            # Create SageMaker Model
+            self.model = self._create_model(
+                "Model", model_name, tgi_image, self.tgi_sizing
+            )
 
         # Create Endpoint Configuration (Real-Time or Serverless)
         # All values come from config - no fallback defaults
@@ -107,6 +199,32 @@ class SageMakerEndpointConstruct(Construct):
                     max_concurrency=max_concurrency,
                 ),
             )
+            production_variants = [production_variant]
+        elif endpoint_type == "async":
+            # Async endpoint configuration (requests queue, results land in S3)
+            if (
+                instance_type is None
+                or max_instance_count is None
+                or max_concurrent_invocations_per_instance is None
+            ):
+                raise ValueError(
+                    "instance_type, max_instance_count and max_concurrent_invocations_per_instance "
+                    "are required for async endpoints. Check config.endpoint.async_inference settings."
+                )
+            production_variant = sagemaker.CfnEndpointConfig.ProductionVariantProperty(
+                model_name=self.model.model_name,
+                variant_name="AllTraffic",
+                instance_type=instance_type,
+                initial_instance_count=1,
+                initial_variant_weight=1.0,
+            )
+            production_variants = [production_variant]
+        elif variants:
+            # Weighted real-time variants, each on its own instance type
+            production_variants = [
+                self._variant_property(variant, variant_models[variant.name])
+                for variant in variants
+            ]
         else:
             # Real-time endpoint configuration
             if instance_type is None or initial_instance_count is None:
@@ -121,14 +239,54 @@ class SageMakerEndpointConstruct(Construct):
                 initial_instance_count=initial_instance_count,
                 initial_variant_weight=1.0,
             )
+            production_variants = [production_variant]
+
+        # Bucket for async request payloads and results
+        self.async_bucket = None
+        async_inference_config = None
+        if endpoint_type == "async":
+            self.async_bucket = s3.Bucket(
+                self,
+                "AsyncInferenceBucket",
+                block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+                enforce_ssl=True,
+                lifecycle_rules=[s3.LifecycleRule(expiration=Duration.days(7))],
+                removal_policy=RemovalPolicy.DESTROY,
+                auto_delete_objects=True,
+            )
+            self.async_bucket.grant_read_write(self.execution_role)
+            cfn_config = sagemaker.CfnEndpointConfig
+            async_inference_config = cfn_config.AsyncInferenceConfigProperty(
+                output_config=cfn_config.AsyncInferenceOutputConfigProperty(
+                    s3_output_path=self.async_bucket.s3_url_for_object("output"),
+                    s3_failure_path=self.async_bucket.s3_url_for_object("failure"),
+                ),
+                client_config=cfn_config.AsyncInferenceClientConfigProperty(
+                    max_concurrent_invocations_per_instance=max_concurrent_invocations_per_instance,
+                ),
+            )
+
+        # The shadow variant gets a copy of production requests; its responses
+        # are only recorded in its CloudWatch metrics
+        shadow_production_variants = None
+        if shadow_variant:
+            shadow_production_variants = [
+                self._variant_property(
+                    shadow_variant, variant_models[shadow_variant.name]
+                )
+            ]
 
         self.endpoint_config = sagemaker.CfnEndpointConfig(
             self,
             "EndpointConfig",
             endpoint_config_name=f"{model_name}-config",
-            production_variants=[production_variant],
+            production_variants=production_variants,
+            shadow_production_variants=shadow_production_variants,
+            async_inference_config=async_inference_config,
         )
         self.endpoint_config.add_dependency(self.model)
+        for variant_model in variant_models.values():
+            self.endpoint_config.add_dependency(variant_model)
 
         # Create Endpoint
         self.endpoint = sagemaker.CfnEndpoint(
@@ -142,15 +300,378 @@ class SageMakerEndpointConstruct(Construct):
         # Expose endpoint name
         self.endpoint_name = self.endpoint.endpoint_name
 
+        if endpoint_type == "async":
+            self._add_async_scaling(max_instance_count, scale_to_zero)
+        elif endpoint_type == "real-time" and autoscaling and autoscaling.enabled:
+            instance_counts = {
+                variant.name: variant.initial_instance_count for variant in variants
+            } or {"AllTraffic": initial_instance_count}
+            for variant_name, instance_count in instance_counts.items():
+                self._add_real_time_scaling(autoscaling, instance_count, variant_name)
+
+        # Priming generations once the endpoint is InService
+        self.warmup_function = None
+        if warmup is not None:
+            # Whatever a deploy can change about the served model; the warm-up
+            # runs again when it changes
+            revision = (
+                self._container_environment,
+                tgi_image,
+                self.variant_sizing,
+                variants,
+                instance_type,
+                initial_instance_count,
+                memory_size_in_mb,
+                max_concurrency,
+            )
+            self._add_warmup(warmup, endpoint_type, max_concurrency, revision)
+
         # Output endpoint name
-        endpoint_description = (
-            "SageMaker Serverless Endpoint Name"
-            if endpoint_type == "serverless"
-            else "SageMaker Real-Time Endpoint Name"
-        )
+        endpoint_description = {
+            "serverless": "SageMaker Serverless Endpoint Name",
+            "async": "SageMaker Async Endpoint Name",
+        }.get(endpoint_type, "SageMaker Real-Time Endpoint Name")
         CfnOutput(
             self,
             "EndpointName",
             value=self.endpoint_name,
             description=endpoint_description,
         )
+
+    def _derive_sizing(self, instance_type: str | None) -> TgiSizing:
+        """Size TGI for an instance type with the endpoint's model and profile."""
+        return derive_tgi_sizing(
+            instance_type,
+            self._architecture,
+            self._tgi_limits,
+            bytes_per_parameter=self._bytes_per_parameter,
+        )
+
+    def _create_model(
+        self, construct_id: str, model_name: str, image: str, sizing: TgiSizing
+    ) -> sagemaker.CfnModel:
+        """Create a TGI model with the shared environment plus its sizing."""
+        return sagemaker.CfnModel(
+            self,
+            construct_id,
+            execution_role_arn=self.execution_role.role_arn,
+            primary_container=sagemaker.CfnModel.ContainerDefinitionProperty(
+                image=image,
+                environment={
+                    **self._container_environment,
+                    **sizing.to_environment(),
+                },
+            ),
+            model_name=model_name,
+        )
+
+    def _create_variant_model(
+        self, variant: EndpointVariant, model_name: str, tgi_image: str
+    ) -> sagemaker.CfnModel:
+        """Create the model of a variant, sized to the variant's instance type."""
+        sizing = self._derive_sizing(variant.instance_type)
+        self.variant_sizing[variant.name] = sizing
+        image = tgi_image
+        if variant.tgi_image_uri:
+            image = variant.tgi_image_uri.format(region=Stack.of(self).region)
+        return self._create_model(
+            f"Model{variant.name}", f"{model_name}-{variant.name}", image, sizing
+        )
+
+    @staticmethod
+    def _variant_property(
+        variant: EndpointVariant, model: sagemaker.CfnModel
+    ) -> sagemaker.CfnEndpointConfig.ProductionVariantProperty:
+        return sagemaker.CfnEndpointConfig.ProductionVariantProperty(
+            model_name=model.model_name,
+            variant_name=variant.name,
+            instance_type=variant.instance_type,
+            initial_instance_count=variant.initial_instance_count,
+            initial_variant_weight=variant.weight,
+        )
+
+    @staticmethod
+    def _validate_variants(
+        variants: list[EndpointVariant], shadow_variant: EndpointVariant | None
+    ) -> None:
+        """Check variant names, weights and instance counts before synth."""
+        all_variants = [*variants, *([shadow_variant] if shadow_variant else [])]
+        names = [variant.name for variant in all_variants]
+        if shadow_variant and not variants:
+            # The shadow runs beside the implicit AllTraffic variant
+            names.append("AllTraffic")
+        if len(set(names)) != len(names):
+            raise ValueError(
+                "Variant names must be unique. Check config.endpoint.real_time settings."
+            )
+        for variant in all_variants:
+            if not VARIANT_NAME_PATTERN.match(variant.name):
+                raise ValueError(
+                    f"Invalid variant name {variant.name!r}: use up to 63 letters, "
+                    "digits and hyphens. Check config.endpoint.real_time settings."
+                )
+            if variant.weight <= 0 or variant.initial_instance_count < 1:
+                raise ValueError(
+                    f"Variant {variant.name} needs a positive weight and at least "
+                    "one instance. Check config.endpoint.real_time settings."
+                )
+
+    def _add_warmup(
+        self,
+        warmup: WarmupConfig,
+        endpoint_type: str,
+        max_concurrency: int | None,
+        revision: tuple,
+    ) -> None:
+        """
+        Warm the endpoint after deploys, and keep serverless containers warm.
+
+        A custom resource that depends on the endpoint invokes the warm-up
+        function once the endpoint is InService. Its properties hold the
+        warm-up settings and a hash of the served model's settings, so it runs
+        again on deploys that change either. An EventBridge schedule pings
+        serverless endpoints with the shortest priming prompt.
+        """
+        if endpoint_type == "async":
+            raise ValueError(
+                "Warm-up requires a real-time or serverless endpoint. "
+                "Check config.endpoint.warmup settings."
+            )
+        if (
+            not warmup.prompt_tokens
+            or min(warmup.prompt_tokens) < 1
+            or warmup.requests_per_length < 1
+            or warmup.max_new_tokens < 1
+            or warmup.keep_warm_minutes < 0
+            or warmup.keep_warm_concurrency < 1
+        ):
+            raise ValueError(
+                "Warm-up needs positive prompt lengths, request counts and "
+                "max_new_tokens. Check config.endpoint.warmup settings."
+            )
+        for name, sizing in self.variant_sizing.items():
+            if (
+                max(warmup.prompt_tokens) > sizing.max_input_length
+                or max(warmup.prompt_tokens) + warmup.max_new_tokens
+                > sizing.max_total_tokens
+            ):
+                raise ValueError(
+                    f"Warm-up prompts exceed the token limits of variant {name} "
+                    f"({sizing.max_input_length} input, {sizing.max_total_tokens} "
+                    "total). Check config.endpoint.warmup settings."
+                )
+        if warmup.keep_warm_minutes:
+            if endpoint_type != "serverless":
+                raise ValueError(
+                    "keep_warm_minutes only applies to serverless endpoints. "
+                    "Check config.endpoint.warmup settings."
+                )
+            if warmup.keep_warm_concurrency > max_concurrency:
+                raise ValueError(
+                    "keep_warm_concurrency cannot exceed the endpoint's "
+                    "max_concurrency. Check config.endpoint.warmup settings."
+                )
+
+        self.warmup_function = lambda_.Function(
+            self,
+            "WarmupFunction",
+            runtime=lambda_.Runtime.PYTHON_3_11,
+            handler="warmup.lambda_handler",
+            code=lambda_.Code.from_asset("lambda/invoke_sagemaker"),
+            # The Provider framework waits at most 15 minutes for a response
+            timeout=Duration.minutes(14),
+            memory_size=256,
+            environment={
+                "SAGEMAKER_ENDPOINT_NAME": self.endpoint_name,
+                "ENDPOINT_VARIANTS": ",".join(self.variant_names),
+            },
+            log_retention=logs.RetentionDays.ONE_WEEK,
+        )
+        self.warmup_function.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=["sagemaker:InvokeEndpoint", "sagemaker:DescribeEndpoint"],
+                resources=[f"arn:aws:sagemaker:*:*:endpoint/{self.endpoint_name}"],
+            )
+        )
+
+        provider = cr.Provider(
+            self,
+            "WarmupProvider",
+            on_event_handler=self.warmup_function,
+            log_retention=logs.RetentionDays.ONE_WEEK,
+        )
+        warmup_resource = CustomResource(
+            self,
+            "Warmup",
+            service_token=provider.service_token,
+            resource_type="Custom::EndpointWarmup",
+            properties={
+                "EndpointName": self.endpoint_name,
+                "PromptTokens": [str(tokens) for tokens in warmup.prompt_tokens],
+                "RequestsPerLength": str(warmup.requests_per_length),
+                "MaxNewTokens": str(warmup.max_new_tokens),
+                "FailOnError": str(warmup.fail_on_error).lower(),
+                "Revision": hashlib.sha256(repr(revision).encode()).hexdigest(),
+            },
+        )
+        warmup_resource.node.add_dependency(self.endpoint)
+
+        if warmup.keep_warm_minutes:
+            events.Rule(
+                self,
+                "KeepWarmSchedule",
+                schedule=events.Schedule.rate(
+                    Duration.minutes(warmup.keep_warm_minutes)
+                ),
+                targets=[
+                    targets.LambdaFunction(
+                        self.warmup_function,
+                        event=events.RuleTargetInput.from_object(
+                            {
+                                "KeepWarm": {
+                                    "Concurrency": warmup.keep_warm_concurrency,
+                                    "PromptTokens": min(warmup.prompt_tokens),
+                                }
+                            }
+                        ),
+                        # The next ping is never far off
+                        retry_attempts=0,
+                    )
+                ],
+            )
+
+    def _add_async_scaling(self, max_instance_count: int, scale_to_zero: bool) -> None:
+        """
+        Scale the async variant on its queue backlog.
+
+        Target tracking keeps the backlog per instance in check. When scaling to
+        zero is enabled, target tracking cannot scale out from zero instances
+        (there is no per-instance backlog), so a step policy on
+        HasBacklogWithoutCapacity adds the first instance.
+        """
+        scalable_target = self._create_scalable_target(
+            "AsyncScalableTarget",
+            min_capacity=0 if scale_to_zero else 1,
+            max_capacity=max_instance_count,
+        )
+
+        scalable_target.scale_to_track_metric(
+            "BacklogPerInstanceTracking",
+            target_value=5,
+            custom_metric=cloudwatch.Metric(
+                namespace="AWS/SageMaker",
+                metric_name="ApproximateBacklogSizePerInstance",
+                dimensions_map={"EndpointName": self.endpoint_name},
+                statistic="Average",
+            ),
+            scale_in_cooldown=Duration.minutes(5),
+            scale_out_cooldown=Duration.minutes(1),
+        )
+
+        if scale_to_zero:
+            scalable_target.scale_on_metric(
+                "ScaleOutFromZero",
+                metric=cloudwatch.Metric(
+                    namespace="AWS/SageMaker",
+                    metric_name="HasBacklogWithoutCapacity",
+                    dimensions_map={"EndpointName": self.endpoint_name},
+                    statistic="Average",
+                    period=Duration.minutes(1),
+                ),
+                scaling_steps=[
+                    appscaling.ScalingInterval(upper=0.5, change=0),
+                    appscaling.ScalingInterval(lower=0.5, change=1),
+                ],
+                adjustment_type=appscaling.AdjustmentType.CHANGE_IN_CAPACITY,
+                cooldown=Duration.minutes(2),
+            )
+
+    def _add_real_time_scaling(
+        self,
+        autoscaling: AutoscalingConfig,
+        initial_instance_count: int,
+        variant_name: str = "AllTraffic",
+    ) -> None:
+        """Target-track a real-time variant, with optional scheduled windows."""
+        if not 1 <= autoscaling.min_capacity <= autoscaling.max_capacity:
+            raise ValueError(
+                "autoscaling requires 1 <= min_capacity <= max_capacity. "
+                "Check config.endpoint.real_time.autoscaling settings."
+            )
+        if not (
+            autoscaling.min_capacity
+            <= initial_instance_count
+            <= autoscaling.max_capacity
+        ):
+            raise ValueError(
+                "initial_instance_count must be within the autoscaling capacity range. "
+                "Check config.endpoint.real_time settings."
+            )
+
+        # Each variant scales on its own; AllTraffic keeps its original ID
+        scalable_target = self._create_scalable_target(
+            (
+                "RealTimeScalableTarget"
+                if variant_name == "AllTraffic"
+                else f"RealTimeScalableTarget{variant_name}"
+            ),
+            min_capacity=autoscaling.min_capacity,
+            max_capacity=autoscaling.max_capacity,
+            variant_name=variant_name,
+        )
+
+        if autoscaling.metric == ScalingMetric.INVOCATIONS_PER_INSTANCE:
+            metric_props = {
+                "predefined_metric": appscaling.PredefinedMetric.SAGEMAKER_VARIANT_INVOCATIONS_PER_INSTANCE,
+            }
+        else:
+            # Concurrency tracks load better than invocation counts for long
+            # generations, since one invocation can hold an instance for seconds
+            metric_props = {
+                "custom_metric": cloudwatch.Metric(
+                    namespace="AWS/SageMaker",
+                    metric_name="ConcurrentRequestsPerModel",
+                    dimensions_map={
+                        "EndpointName": self.endpoint_name,
+                        "VariantName": variant_name,
+                    },
+                    statistic="Average",
+                    period=Duration.minutes(1),
+                ),
+            }
+
+        scalable_target.scale_to_track_metric(
+            "TargetTracking",
+            target_value=autoscaling.target_value,
+            scale_in_cooldown=Duration.seconds(autoscaling.scale_in_cooldown_seconds),
+            scale_out_cooldown=Duration.seconds(autoscaling.scale_out_cooldown_seconds),
+            **metric_props,
+        )
+
+        for window in autoscaling.scheduled_windows:
+            scalable_target.scale_on_schedule(
+                window.name,
+                schedule=appscaling.Schedule.expression(window.schedule),
+                min_capacity=window.min_capacity,
+                max_capacity=window.max_capacity,
+            )
+
+    def _create_scalable_target(
+        self,
+        construct_id: str,
+        min_capacity: int,
+        max_capacity: int,
+        variant_name: str = "AllTraffic",
+    ) -> appscaling.ScalableTarget:
+        """Register a variant's instance count with Application Auto Scaling."""
+        scalable_target = appscaling.ScalableTarget(
+            self,
+            construct_id,
+            service_namespace=appscaling.ServiceNamespace.SAGEMAKER,
+            resource_id=f"endpoint/{self.endpoint_name}/variant/{variant_name}",
+            scalable_dimension="sagemaker:variant:DesiredInstanceCount",
+            min_capacity=min_capacity,
+            max_capacity=max_capacity,
+        )
+        scalable_target.node.add_dependency(self.endpoint)
+        return scalable_target
@@ -0,0 +1,154 @@
+"""Mapping templates for invoking the endpoint from API Gateway without Lambda.
+
+With a direct integration, API Gateway calls the SageMaker runtime itself. The
+request template renders the chat prompt and fills in default generation
+parameters, and the response template extracts ``generated_text`` from TGI's
+output, which is what the invoke Lambda would otherwise do.
+
+Templates are Velocity (VTL). Request values are read with ``$input.json()``,
+which yields JSON-encoded values, so callers cannot inject extra fields into
+the TGI payload.
+"""
+
+import json
+from typing import Any
+
+# Prompt formats by config.ChatTemplate value, matching CHAT_TEMPLATES in
+# lambda/invoke_sagemaker/models.py: (message, assistant_prefix, stop)
+CHAT_TEMPLATE_FORMATS: dict[str, tuple[str, str, tuple[str, ...]]] = {
+    "zephyr": (
+        "<|{role}|>\n{content}</s>\n",
+        "<|assistant|>\n",
+        ("</s>", "<|user|>", "<|system|>"),
+    ),
+    "chatml": (
+        "<|im_start|>{role}\n{content}<|im_end|>\n",
+        "<|im_start|>assistant\n",
+        ("<|im_end|>", "<|im_start|>"),
+    ),
+    "phi3": (
+        "<|{role}|>\n{content}<|end|>\n",
+        "<|assistant|>\n",
+        ("<|end|>", "<|user|>", "<|endoftext|>"),
+    ),
+    "llama3": (
+        "<|start_header_id|>{role}<|end_header_id|>\n\n{content}<|eot_id|>",
+        "<|start_header_id|>assistant<|end_header_id|>\n\n",
+        ("<|eot_id|>",),
+    ),
+}
+
+# Same defaults as build_generation_config() in the invoke Lambda
+DEFAULT_GENERATION_PARAMETERS: dict[str, Any] = {
+    "max_new_tokens": 512,
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "do_sample": True,
+}
+
+# Stands in for the user prompt while the literal parts are JSON-escaped
+_PROMPT_PLACEHOLDER = "\x00prompt\x00"
+
+RESPONSE_TEMPLATE = """\
+#set($tokens = $input.json('$[0].details.generated_tokens'))
+{
+  "generated_text": $input.json('$[0].generated_text'),
+#if("$!tokens" != "" && "$tokens" != "null")
+  "usage": {"generated_tokens": $tokens}
+#else
+  "usage": {}
+#end
+}"""
+
+ERROR_TEMPLATE = """\
+{
+  "error": "Failed to invoke SageMaker endpoint",
+  "message": $input.json('$.message')
+}"""
+
+
+def request_template(
+    chat_template: str,
+    system_prompt: str,
+    generation_defaults: dict[str, Any] | None = None,
+) -> str:
+    """
+    Build the request mapping template for the /invoke body.
+
+    Accepts the Lambda's ``{"prompt": ..., "parameters": {...}}`` body. The
+    prompt is formatted with the chat template and system prompt; parameters
+    the request omits take the defaults.
+
+    Args:
+        chat_template: Prompt format of the model, e.g. "zephyr"
+        system_prompt: System message placed before the user prompt
+        generation_defaults: max_new_tokens, temperature, top_p, do_sample
+            and seed used when a request omits them, over the Lambda's defaults
+
+    Returns:
+        VTL template producing the TGI payload
+
+    Raises:
+        ValueError: If the chat template is unknown or a literal contains VTL
+            syntax characters
+    """
+    if chat_template not in CHAT_TEMPLATE_FORMATS:
+        raise ValueError(
+            f"Unknown chat template {chat_template!r}. Check config.model settings."
+        )
+    message, assistant_prefix, stop = CHAT_TEMPLATE_FORMATS[chat_template]
+    generation_defaults = generation_defaults or {}
+    defaults = {
+        name: generation_defaults.get(name, value)
+        for name, value in DEFAULT_GENERATION_PARAMETERS.items()
+    }
+    default_seed = generation_defaults.get("seed")
+    literals = [
+        system_prompt,
+        *(json.dumps(value) for value in [*defaults.values(), default_seed]),
+    ]
+    if any("$" in literal or "#" in literal for literal in literals):
+        raise ValueError(
+            "The system prompt and generation defaults of a direct integration "
+            "cannot contain '$' or '#'. Check config.model settings."
+        )
+
+    rendered = (
+        message.format(role="system", content=system_prompt)
+        + message.format(role="user", content=_PROMPT_PLACEHOLDER)
+        + assistant_prefix
+    )
+    # JSON-escape the template text, then splice in the prompt, which
+    # $input.json() has already escaped (minus its surrounding quotes)
+    inputs = json.dumps(rendered).replace(
+        json.dumps(_PROMPT_PLACEHOLDER)[1:-1], "${promptText}"
+    )
+
+    lines = [
+        "#set($prompt = $input.json('$.prompt'))",
+        "#set($promptEnd = $prompt.length() - 1)",
+        "#set($promptText = $prompt.substring(1, $promptEnd))",
+        "{",
+        f'  "inputs": {inputs},',
+        '  "parameters": {',
+    ]
+    for name, value in defaults.items():
+        lines += [
+            f"#set($value = $input.json('$.parameters.{name}'))",
+            f'    "{name}": #if("$!value" != "" && "$value" != "null")$value'
+            f"#{{else}}{json.dumps(value)}#end,",
+        ]
+    # Unlike the other parameters, seed is omitted unless set
+    seed_default = (
+        "" if default_seed is None else f'#else    "seed": {json.dumps(default_seed)},'
+    )
+    lines += [
+        "#set($seed = $input.json('$.parameters.seed'))",
+        f'#if("$!seed" != "" && "$seed" != "null")    "seed": $seed,{seed_default}#end',
+        '    "return_full_text": false,',
+        f'    "stop": {json.dumps(list(stop))},',
+        '    "details": true',
+        "  }",
+        "}",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,74 @@
+"""Validation and container environment for multi-LoRA adapter serving."""
+
+import re
+
+from config import LoraAdapter
+
+# Names clients send in the "adapter" request field
+ADAPTER_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,62}$")
+
+# HuggingFace Hub repository ids, "<owner>/<repo>"
+HF_REPO_ID_PATTERN = re.compile(r"^[A-Za-z0-9][\w.-]*/[A-Za-z0-9][\w.-]*$")
+
+
+def validate_lora_adapters(adapters: list[LoraAdapter], endpoint_type: str) -> None:
+    """
+    Reject adapter lists TGI cannot load, or the API cannot route, at synth.
+
+    Args:
+        adapters: LoRA adapters of one base model
+        endpoint_type: 'real-time', 'serverless', 'async' or 'inference-components'
+
+    Raises:
+        ValueError: If an adapter is misnamed, duplicated or unsupported
+    """
+    if not adapters:
+        return
+    if endpoint_type == "serverless":
+        raise ValueError(
+            "LoRA adapters need a GPU; serverless endpoints are CPU-only. "
+            "Check config.model.adapters settings."
+        )
+    for adapter in adapters:
+        if not ADAPTER_NAME_PATTERN.match(adapter.name):
+            raise ValueError(
+                f"Invalid adapter name {adapter.name!r}: use up to 63 letters, "
+                "digits, '-' or '_', starting with a letter or digit. "
+                "Check config.model.adapters settings."
+            )
+        if not HF_REPO_ID_PATTERN.match(adapter.hf_adapter_id):
+            raise ValueError(
+                f"Invalid adapter id {adapter.hf_adapter_id!r}: expected a "
+                "HuggingFace Hub id such as 'owner/adapter'. "
+                "Check config.model.adapters settings."
+            )
+    names = [adapter.name for adapter in adapters]
+    adapter_ids = [adapter.hf_adapter_id for adapter in adapters]
+    if len(set(names)) != len(names) or len(set(adapter_ids)) != len(adapter_ids):
+        raise ValueError(
+            "Adapter names and adapter ids must be unique. "
+            "Check config.model.adapters settings."
+        )
+
+
+def lora_adapters_environment(adapters: list[LoraAdapter]) -> dict[str, str]:
+    """
+    Render adapters as TGI container environment variables.
+
+    TGI loads every adapter at startup and batches requests for different
+    adapters together on the shared base model.
+
+    Args:
+        adapters: LoRA adapters of one base model
+
+    Returns:
+        LORA_ADAPTERS when any adapter is configured
+    """
+    if not adapters:
+        return {}
+    return {"LORA_ADAPTERS": ",".join(adapter.hf_adapter_id for adapter in adapters)}
+
+
+def adapter_routes(adapters: list[LoraAdapter]) -> dict[str, str]:
+    """Map request-facing adapter names to the ids TGI loaded them under."""
+    return {adapter.name: adapter.hf_adapter_id for adapter in adapters}
@@ -0,0 +1,171 @@
+"""Per-region stack settings for multi-region deployments."""
+
+import copy
+import re
+
+from config import DeploymentConfig, EndpointType, RegionConfig
+
+# Stack ID of a single-region deployment, kept so existing stacks update in
+# place; multi-region stacks add the region
+STACK_ID = "SlmSagemakerStack"
+
+REGION_PATTERN = re.compile(r"^[a-z]{2}(-gov|-iso[a-z]?)?-[a-z]+-\d$")
+
+# AWS Deep Learning Containers are published from this account in most
+# regions, and from a region's own account elsewhere
+DEFAULT_DLC_ACCOUNT = "763104351884"
+DLC_ACCOUNTS = {
+    "af-south-1": "626614931356",
+    "ap-east-1": "871362719292",
+    "ap-south-2": "772153158452",
+    "ap-southeast-3": "907027046896",
+    "ap-southeast-4": "457447274322",
+    "ca-west-1": "204538143572",
+    "cn-north-1": "727897471807",
+    "cn-northwest-1": "727897471807",
+    "eu-central-2": "380420809688",
+    "eu-south-1": "692866216735",
+    "eu-south-2": "503227376785",
+    "il-central-1": "780543022126",
+    "me-central-1": "914824155844",
+    "me-south-1": "217643126080",
+    "us-gov-east-1": "446045086412",
+    "us-gov-west-1": "442386744353",
+}
+
+
+def resolve_image_uri(image_uri: str, region: str) -> str:
+    """
+    Resolve a TGI image URI template for a region.
+
+    Fills in ``{region}``. Deep Learning Container images are switched to the
+    registry account (and, in China, the domain) that serves the region.
+
+    Args:
+        image_uri: Image URI, e.g. config.tgi_image_uri
+        region: AWS region, e.g. "eu-west-1"
+
+    Returns:
+        The image URI in the region's registry
+    """
+    uri = image_uri.format(region=region)
+    default_registry = f"{DEFAULT_DLC_ACCOUNT}.dkr.ecr.{region}.amazonaws.com/"
+    if not uri.startswith(default_registry):
+        return uri
+    account = DLC_ACCOUNTS.get(region, DEFAULT_DLC_ACCOUNT)
+    domain = "amazonaws.com.cn" if region.startswith("cn-") else "amazonaws.com"
+    registry = f"{account}.dkr.ecr.{region}.{domain}/"
+    return registry + uri[len(default_registry) :]
+
+
+def deployment_regions(
+    config: DeploymentConfig, default_region: str
+) -> list[RegionConfig]:
+    """
+    Regions to deploy a stack to.
+
+    Args:
+        config: Deployment configuration
+        default_region: Region used when config.regions is empty, e.g. the
+            CLI's AWS_REGION
+
+    Returns:
+        config.regions, or the default region on its own
+
+    Raises:
+        ValueError: If a region is malformed or listed twice
+    """
+    regions = config.regions or [RegionConfig(region=default_region)]
+    names = [region.region for region in regions]
+    for name in names:
+        if not REGION_PATTERN.match(name):
+            raise ValueError(
+                f"Invalid region {name!r}, expected e.g. 'eu-west-1'. "
+                "Check config.regions settings."
+            )
+    if len(set(names)) != len(names):
+        raise ValueError("Regions must be unique. Check config.regions settings.")
+    return regions
+
+
+def stack_id(region: str, multi_region: bool) -> str:
+    """Return the CDK stack ID of a region's stack."""
+    return f"{STACK_ID}-{region}" if multi_region else STACK_ID
+
+
+def regional_config(config: DeploymentConfig, region: RegionConfig) -> DeploymentConfig:
+    """
+    Derive the configuration of one region's stack.
+
+    The region's capacity overrides replace the matching settings of the
+    endpoint type in use, and TGI image URIs are resolved for the region.
+
+    Args:
+        config: Deployment configuration shared by every region
+        region: The region and its capacity overrides
+
+    Returns:
+        A copy of config for the region
+
+    Raises:
+        ValueError: If an override does not apply to the endpoint type
+    """
+    regional = copy.deepcopy(config)
+    endpoint = regional.endpoint
+    overrides = {
+        name: value
+        for name, value in vars(region).items()
+        if name != "region" and value is not None
+    }
+
+    if endpoint.type == EndpointType.REAL_TIME:
+        real_time = endpoint.real_time
+        if real_time.variants and overrides.keys() & {
+            "instance_type",
+            "initial_instance_count",
+        }:
+            raise ValueError(
+                f"Region {region.region} cannot override the instance type or "
+                "count of weighted variants. Check config.regions settings."
+            )
+        if overrides.keys() & {"min_capacity", "max_capacity"} and not (
+            real_time.autoscaling and real_time.autoscaling.enabled
+        ):
+            raise ValueError(
+                f"Region {region.region} sets autoscaling capacity, but "
+                "autoscaling is disabled. Check config.regions settings."
+            )
+        targets = {
+            "instance_type": real_time,
+            "initial_instance_count": real_time,
+            "min_capacity": real_time.autoscaling,
+            "max_capacity": real_time.autoscaling,
+        }
+    elif endpoint.type == EndpointType.SERVERLESS:
+        targets = {"max_concurrency": endpoint.serverless}
+    elif endpoint.type == EndpointType.ASYNC:
+        targets = {"instance_type": endpoint.async_inference}
+        if "max_capacity" in overrides:
+            overrides["max_instance_count"] = overrides.pop("max_capacity")
+            targets["max_instance_count"] = endpoint.async_inference
+    else:
+        targets = {
+            "instance_type": endpoint.inference_components,
+            "initial_instance_count": endpoint.inference_components,
+        }
+
+    for name, value in overrides.items():
+        if name not in targets or targets[name] is None:
+            raise ValueError(
+                f"Region {region.region} sets {name}, which does not apply to "
+                f"{endpoint.type.value} endpoints. Check config.regions settings."
+            )
+        setattr(targets[name], name, value)
+
+    regional.tgi_image_uri = resolve_image_uri(config.tgi_image_uri, region.region)
+    for variant in [*endpoint.real_time.variants, endpoint.real_time.shadow_variant]:
+        if variant is not None and variant.tgi_image_uri:
+            variant.tgi_image_uri = resolve_image_uri(
+                variant.tgi_image_uri, region.region
+            )
+    return regional
@@ -1,7 +1,18 @@
+import aws_cdk as cdk
 from aws_cdk import Stack
 from constructs import Construct
 from slm_sagemaker.constructs.sagemaker_construct import SageMakerEndpointConstruct
+from slm_sagemaker.constructs.inference_components_construct import (
+    InferenceComponentEndpointConstruct,
+)
 from slm_sagemaker.constructs.api_construct import ApiGatewayConstruct
+from slm_sagemaker.constructs.batch_transform_construct import (
+    BatchTransformConstruct,
+)
+from slm_sagemaker.constructs.global_routing_construct import (
+    GlobalRoutingConstruct,
+)
+from slm_sagemaker.regions import deployment_regions, regional_config, stack_id
 from config import DeploymentConfig, EndpointType
 
 
@@ -15,7 +26,36 @@ class SlmSagemakerStack(Stack):
 
         # Deploy SageMaker Endpoint (Real-Time or Serverless) with configured model
         # Model and endpoint configuration is loaded from config.py
-        if config.endpoint.type == EndpointType.SERVERLESS:
+        if (
+            config.additional_models
+            and config.endpoint.type != EndpointType.INFERENCE_COMPONENTS
+        ):
+            raise ValueError(
+                "config.additional_models requires an inference component endpoint. "
+                "Check config.endpoint settings."
+            )
+
+        if config.endpoint.type == EndpointType.INFERENCE_COMPONENTS:
+            if config.endpoint.inference_components is None:
+                raise ValueError(
+                    "config.endpoint.inference_components is required for "
+                    "inference component endpoints."
+                )
+            if config.endpoint.warmup is not None:
+                raise ValueError(
+                    "Warm-up requires a real-time or serverless endpoint. "
+                    "Check config.endpoint.warmup settings."
+                )
+            _sagemaker_construct = InferenceComponentEndpointConstruct(
+                self,
+                "SageMakerEndpoint",
+                endpoint_name_prefix=config.model.name,
+                models=[config.model, *config.additional_models],
+                tgi_image_uri=config.tgi_image_uri,
+                instance_type=config.endpoint.inference_components.instance_type,
+                initial_instance_count=config.endpoint.inference_components.initial_instance_count,
+            )
+        elif config.endpoint.type == EndpointType.SERVERLESS:
             _sagemaker_construct = SageMakerEndpointConstruct(
                 self,
                 "SageMakerEndpoint",
@@ -23,8 +63,35 @@ class SlmSagemakerStack(Stack):
                 hf_model_id=config.model.hf_model_id,
                 endpoint_type="serverless",
                 tgi_image_uri=config.tgi_image_uri,
+                architecture=config.model.architecture,
+                tgi_limits=config.model.tgi_limits,
+                tgi_profile=config.model.tgi_profile,
+                adapters=config.model.adapters,
                 memory_size_in_mb=config.endpoint.serverless.memory_size_in_mb,
                 max_concurrency=config.endpoint.serverless.max_concurrency,
+                warmup=config.endpoint.warmup,
+            )
+        elif config.endpoint.type == EndpointType.ASYNC:
+            if config.endpoint.async_inference is None:
+                raise ValueError(
+                    "config.endpoint.async_inference is required for async endpoints."
+                )
+            _sagemaker_construct = SageMakerEndpointConstruct(
+                self,
+                "SageMakerEndpoint",
+                model_name=config.model.name,
+                hf_model_id=config.model.hf_model_id,
+                endpoint_type="async",
+                tgi_image_uri=config.tgi_image_uri,
+                architecture=config.model.architecture,
+                tgi_limits=config.model.tgi_limits,
+                tgi_profile=config.model.tgi_profile,
+                adapters=config.model.adapters,
+                instance_type=config.endpoint.async_inference.instance_type,
+                max_instance_count=config.endpoint.async_inference.max_instance_count,
+                max_concurrent_invocations_per_instance=config.endpoint.async_inference.max_concurrent_invocations_per_instance,
+                scale_to_zero=config.endpoint.async_inference.scale_to_zero,
+                warmup=config.endpoint.warmup,
             )
         else:
             _sagemaker_construct = SageMakerEndpointConstruct(
@@ -34,14 +101,133 @@ class SlmSagemakerStack(Stack):
                 hf_model_id=config.model.hf_model_id,
                 endpoint_type="real-time",
                 tgi_image_uri=config.tgi_image_uri,
+                architecture=config.model.architecture,
+                tgi_limits=config.model.tgi_limits,
+                tgi_profile=config.model.tgi_profile,
+                adapters=config.model.adapters,
                 instance_type=config.endpoint.real_time.instance_type,
                 initial_instance_count=config.endpoint.real_time.initial_instance_count,
+                autoscaling=config.endpoint.real_time.autoscaling,
+                variants=config.endpoint.real_time.variants,
+                shadow_variant=config.endpoint.real_time.shadow_variant,
+                warmup=config.endpoint.warmup,
             )
 
+        # Offline bulk generation reuses the endpoint's model
+        if config.batch_transform is not None:
+            if config.endpoint.type == EndpointType.INFERENCE_COMPONENTS:
+                raise ValueError(
+                    "Batch Transform requires a single-model endpoint. "
+                    "Check config.batch_transform settings."
+                )
+            BatchTransformConstruct(
+                self,
+                "BatchTransform",
+                model=_sagemaker_construct.model,
+                execution_role=_sagemaker_construct.execution_role,
+                instance_type=config.batch_transform.instance_type,
+                instance_count=config.batch_transform.instance_count,
+                max_concurrent_transforms=config.batch_transform.max_concurrent_transforms,
+                max_payload_mb=config.batch_transform.max_payload_mb,
+                timeout_hours=config.batch_transform.timeout_hours,
+            )
+
+        # Stateful session routing is a real-time endpoint feature
+        if (
+            config.api.sticky_sessions
+            and config.endpoint.type != EndpointType.REAL_TIME
+        ):
+            raise ValueError(
+                "Sticky sessions require a real-time endpoint. "
+                "Check config.api settings."
+            )
+
+        # Single-model endpoints pass their token limits and adapters; inference
+        # component endpoints pass per-model routes that carry them
+        if config.endpoint.type == EndpointType.INFERENCE_COMPONENTS:
+            model_settings = {"model_routes": _sagemaker_construct.model_routes}
+        else:
+            model_settings = {
+                "max_input_length": _sagemaker_construct.tgi_sizing.max_input_length,
+                "max_total_tokens": _sagemaker_construct.tgi_sizing.max_total_tokens,
+                "adapters": _sagemaker_construct.adapters,
+                "endpoint_variants": _sagemaker_construct.variant_names,
+            }
+
         # Deploy API Gateway with Lambda integration
         _api_construct = ApiGatewayConstruct(
             self,
             "ApiGateway",
             endpoint_name=_sagemaker_construct.endpoint_name,
             api_name=config.api.name,
+            enable_streaming=config.api.enable_streaming,
+            enable_shared_cache=config.api.enable_shared_cache,
+            snap_start=config.api.snap_start,
+            provisioned_concurrency=config.api.provisioned_concurrency,
+            async_bucket=_sagemaker_construct.async_bucket,
+            enable_sessions=config.api.enable_sessions,
+            sticky_sessions=config.api.sticky_sessions,
+            hedge_after_ms=config.api.hedge_after_ms,
+            generation_budget_mode=config.api.generation_budget_mode.value,
+            near_duplicate_threshold=config.api.near_duplicate_threshold,
+            direct_integration=config.api.direct_integration,
+            chat_template=config.model.chat_template.value,
+            system_prompt=config.model.system_prompt,
+            generation_defaults=config.model.generation_defaults,
+            min_compression_bytes=config.api.min_compression_bytes,
+            health_route=config.global_routing is not None,
+            payload_log_sample_rate=config.api.payload_log_sample_rate,
+            **model_settings,
+        )
+
+        # This region's entry in the latency-based DNS shared by every region
+        if config.global_routing is not None:
+            GlobalRoutingConstruct(
+                self,
+                "GlobalRouting",
+                api=_api_construct.api,
+                stage_name=_api_construct.stage_name,
+                domain_name=config.global_routing.domain_name,
+                hosted_zone_id=config.global_routing.hosted_zone_id,
+                hosted_zone_name=config.global_routing.hosted_zone_name,
+                health_check_interval_seconds=config.global_routing.health_check_interval_seconds,
+                health_check_failure_threshold=config.global_routing.health_check_failure_threshold,
+            )
+
+
+def create_regional_stacks(
+    app: cdk.App,
+    config: DeploymentConfig,
+    default_region: str,
+    account: str | None = None,
+) -> list[SlmSagemakerStack]:
+    """
+    Create one stack per region in config.regions.
+
+    With no regions configured, a single stack named SlmSagemakerStack is
+    deployed to default_region, as before multi-region support.
+
+    Args:
+        app: CDK app
+        config: Deployment configuration shared by every region
+        default_region: Region used when config.regions is empty
+        account: AWS account; None leaves the stacks account-agnostic
+
+    Returns:
+        The regional stacks
+    """
+    regions = deployment_regions(config, default_region)
+    multi_region = bool(config.regions)
+    return [
+        SlmSagemakerStack(
+            app,
+            stack_id(region.region, multi_region),
+            config=regional_config(config, region),
+            env=cdk.Environment(account=account, region=region.region),
+            description=(
+                "SageMaker Real-Time LLM Endpoint with API Gateway in "
+                f"{region.region}"
+            ),
         )
+        for region in regions
+    ]
@@ -0,0 +1,80 @@
+"""Validation and container environment for TGI performance profiles."""
+
+from config import Quantization, TgiProfile
+
+# Bytes per weight under each quantization method, for KV cache sizing
+BYTES_PER_PARAMETER = {
+    None: 2.0,
+    Quantization.BITSANDBYTES: 1.0,
+    Quantization.EETQ: 1.0,
+    Quantization.AWQ: 0.5,
+    Quantization.GPTQ: 0.5,
+}
+
+MAX_SPECULATE = 10
+
+
+def validate_tgi_profile(profile: TgiProfile, endpoint_type: str) -> None:
+    """
+    Reject profiles TGI would refuse to start with, so they fail at synth.
+
+    Args:
+        profile: TGI performance profile
+        endpoint_type: 'real-time', 'serverless' or 'async'
+
+    Raises:
+        ValueError: If the profile contains incompatible options
+    """
+    if endpoint_type == "serverless" and (
+        profile.quantization is not None or profile.cuda_graphs
+    ):
+        raise ValueError(
+            "Quantization and CUDA graphs need a GPU; serverless endpoints are CPU-only. "
+            "Check config.model.tgi_profile settings."
+        )
+    if profile.quantization is not None and profile.dtype is not None:
+        raise ValueError(
+            "dtype cannot be combined with quantization; quantized weights set their own dtype. "
+            "Check config.model.tgi_profile settings."
+        )
+    if profile.speculate is not None and not 1 <= profile.speculate <= MAX_SPECULATE:
+        raise ValueError(
+            f"speculate must be between 1 and {MAX_SPECULATE} tokens. "
+            "Check config.model.tgi_profile settings."
+        )
+    if profile.cuda_graphs:
+        if profile.quantization == Quantization.BITSANDBYTES:
+            raise ValueError(
+                "bitsandbytes quantization does not support CUDA graphs; set cuda_graphs=[]. "
+                "Check config.model.tgi_profile settings."
+            )
+        if any(size < 1 for size in profile.cuda_graphs):
+            raise ValueError(
+                "cuda_graphs batch sizes must be positive. "
+                "Check config.model.tgi_profile settings."
+            )
+
+
+def tgi_profile_environment(profile: TgiProfile) -> dict[str, str]:
+    """
+    Render a profile as TGI container environment variables.
+
+    Args:
+        profile: TGI performance profile
+
+    Returns:
+        Environment variables for the options that are set
+    """
+    environment = {}
+    if profile.quantization is not None:
+        environment["QUANTIZE"] = profile.quantization.value
+    if profile.dtype is not None:
+        environment["DTYPE"] = profile.dtype.value
+    if profile.speculate is not None:
+        environment["SPECULATE"] = str(profile.speculate)
+    if profile.cuda_graphs is not None:
+        # TGI disables CUDA graphs with "0"
+        environment["CUDA_GRAPHS"] = (
+            ",".join(str(size) for size in sorted(set(profile.cuda_graphs))) or "0"
+        )
+    return environment
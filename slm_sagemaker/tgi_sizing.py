@@ -0,0 +1,230 @@
+"""Instance-aware sizing of TGI sharding and batch token limits."""
+
+from dataclasses import dataclass
+
+from config import ModelArchitecture, TgiLimits
+
+GIB = 1024**3
+
+
+@dataclass(frozen=True)
+class InstanceSpec:
+    """GPU resources of a SageMaker instance type."""
+
+    gpu_count: int
+    gpu_memory_gib: float
+
+
+# GPU count and memory per GPU for SageMaker instance types TGI can run on
+INSTANCE_CATALOG: dict[str, InstanceSpec] = {
+    # NVIDIA T4
+    "ml.g4dn.xlarge": InstanceSpec(1, 16),
+    "ml.g4dn.2xlarge": InstanceSpec(1, 16),
+    "ml.g4dn.4xlarge": InstanceSpec(1, 16),
+    "ml.g4dn.8xlarge": InstanceSpec(1, 16),
+    "ml.g4dn.16xlarge": InstanceSpec(1, 16),
+    "ml.g4dn.12xlarge": InstanceSpec(4, 16),
+    # NVIDIA A10G
+    "ml.g5.xlarge": InstanceSpec(1, 24),
+    "ml.g5.2xlarge": InstanceSpec(1, 24),
+    "ml.g5.4xlarge": InstanceSpec(1, 24),
+    "ml.g5.8xlarge": InstanceSpec(1, 24),
+    "ml.g5.16xlarge": InstanceSpec(1, 24),
+    "ml.g5.12xlarge": InstanceSpec(4, 24),
+    "ml.g5.24xlarge": InstanceSpec(4, 24),
+    "ml.g5.48xlarge": InstanceSpec(8, 24),
+    # NVIDIA L4
+    "ml.g6.xlarge": InstanceSpec(1, 24),
+    "ml.g6.2xlarge": InstanceSpec(1, 24),
+    "ml.g6.4xlarge": InstanceSpec(1, 24),
+    "ml.g6.8xlarge": InstanceSpec(1, 24),
+    "ml.g6.16xlarge": InstanceSpec(1, 24),
+    "ml.g6.12xlarge": InstanceSpec(4, 24),
+    "ml.g6.24xlarge": InstanceSpec(4, 24),
+    "ml.g6.48xlarge": InstanceSpec(8, 24),
+    # NVIDIA L40S
+    "ml.g6e.xlarge": InstanceSpec(1, 48),
+    "ml.g6e.2xlarge": InstanceSpec(1, 48),
+    "ml.g6e.4xlarge": InstanceSpec(1, 48),
+    "ml.g6e.8xlarge": InstanceSpec(1, 48),
+    "ml.g6e.16xlarge": InstanceSpec(1, 48),
+    "ml.g6e.12xlarge": InstanceSpec(4, 48),
+    "ml.g6e.24xlarge": InstanceSpec(4, 48),
+    "ml.g6e.48xlarge": InstanceSpec(8, 48),
+    # NVIDIA A100 / H100
+    "ml.p4d.24xlarge": InstanceSpec(8, 40),
+    "ml.p4de.24xlarge": InstanceSpec(8, 80),
+    "ml.p5.48xlarge": InstanceSpec(8, 80),
+}
+
+
+@dataclass(frozen=True)
+class TgiSizing:
+    """TGI sharding and token limits for one model on one instance type."""
+
+    num_shards: int
+    max_input_length: int
+    max_total_tokens: int
+    max_batch_prefill_tokens: int
+    max_batch_total_tokens: int
+
+    def to_environment(self) -> dict[str, str]:
+        """Render as TGI container environment variables."""
+        return {
+            "SM_NUM_GPUS": str(self.num_shards),
+            "MAX_INPUT_LENGTH": str(self.max_input_length),
+            "MAX_TOTAL_TOKENS": str(self.max_total_tokens),
+            "MAX_BATCH_PREFILL_TOKENS": str(self.max_batch_prefill_tokens),
+            "MAX_BATCH_TOTAL_TOKENS": str(self.max_batch_total_tokens),
+        }
+
+
+# Limits used when the model architecture is unknown
+DEFAULT_SIZING = TgiSizing(
+    num_shards=1,
+    max_input_length=2048,
+    max_total_tokens=4096,
+    max_batch_prefill_tokens=4096,
+    max_batch_total_tokens=8192,
+)
+
+# Tokens reserved for generation when deriving the input limit; matches the
+# handler's default max_new_tokens
+GENERATION_RESERVE_TOKENS = 512
+
+
+def derive_tgi_sizing(
+    instance_type: str | None,
+    architecture: ModelArchitecture | None,
+    limits: TgiLimits | None = None,
+    bytes_per_parameter: float = 2.0,
+    kv_cache_bytes_per_value: int = 2,
+    memory_fraction: float = 0.9,
+    overhead_gib_per_gpu: float = 2.0,
+    gpu_count: int | None = None,
+) -> TgiSizing:
+    """
+    Derive TGI limits that use every GPU and fill the KV cache.
+
+    The model is sharded across as many GPUs as its attention heads allow.
+    Whatever GPU memory is left after weights, CUDA context and activation
+    overhead becomes KV cache, which sets MAX_BATCH_TOTAL_TOKENS and therefore
+    how many sequences TGI can batch concurrently.
+
+    Args:
+        instance_type: SageMaker instance type (None for serverless)
+        architecture: Model dimensions; DEFAULT_SIZING is used when None
+        limits: Explicit overrides for any derived value
+        bytes_per_parameter: Bytes per weight (2 for fp16/bf16)
+        kv_cache_bytes_per_value: Bytes per cached key/value element
+        memory_fraction: Fraction of GPU memory TGI may use
+        overhead_gib_per_gpu: CUDA context and activation memory per GPU
+        gpu_count: GPUs reserved for the model, when it shares the instance
+            (inference components); defaults to every GPU on the instance
+
+    Returns:
+        Derived sizing with overrides applied
+
+    Raises:
+        ValueError: If the instance type is unknown or the model does not fit
+    """
+    limits = limits or TgiLimits()
+    if architecture is None or instance_type is None:
+        return _validate(_apply_limits(DEFAULT_SIZING, limits))
+
+    instance = INSTANCE_CATALOG.get(instance_type)
+    if instance is None:
+        if all(value is not None for value in vars(limits).values()):
+            return _validate(_apply_limits(DEFAULT_SIZING, limits))
+        raise ValueError(
+            f"Unknown instance type {instance_type!r}: add it to INSTANCE_CATALOG "
+            "or set every value in config.model.tgi_limits."
+        )
+
+    num_shards = limits.num_shards or _max_shards(
+        gpu_count or instance.gpu_count, architecture
+    )
+
+    weight_bytes = architecture.num_parameters_billions * 1e9 * bytes_per_parameter
+    usable_bytes = (
+        num_shards
+        * (instance.gpu_memory_gib * memory_fraction - overhead_gib_per_gpu)
+        * GIB
+        - weight_bytes
+    )
+    # Keys and values for every layer and KV head
+    kv_bytes_per_token = (
+        2
+        * architecture.num_layers
+        * architecture.num_kv_heads
+        * architecture.head_dim
+        * kv_cache_bytes_per_value
+    )
+    kv_capacity_tokens = int(usable_bytes // kv_bytes_per_token)
+
+    max_total_tokens = limits.max_total_tokens or architecture.max_context_length
+    if kv_capacity_tokens < max_total_tokens:
+        raise ValueError(
+            f"{instance_type} cannot hold the model weights plus KV cache for one "
+            f"{max_total_tokens}-token sequence. Use a larger instance type."
+        )
+
+    max_input_length = limits.max_input_length or max_total_tokens - min(
+        GENERATION_RESERVE_TOKENS, max_total_tokens // 2
+    )
+    max_batch_total_tokens = limits.max_batch_total_tokens or kv_capacity_tokens
+    # Prefill a couple of full prompts per batch without starving decode
+    max_batch_prefill_tokens = limits.max_batch_prefill_tokens or min(
+        2 * max_input_length, max_batch_total_tokens
+    )
+
+    return _validate(
+        TgiSizing(
+            num_shards=num_shards,
+            max_input_length=max_input_length,
+            max_total_tokens=max_total_tokens,
+            max_batch_prefill_tokens=max_batch_prefill_tokens,
+            max_batch_total_tokens=max_batch_total_tokens,
+        )
+    )
+
+
+def _max_shards(gpu_count: int, architecture: ModelArchitecture) -> int:
+    """Largest GPU count that evenly divides the model's attention heads."""
+    for shards in range(gpu_count, 0, -1):
+        if (
+            architecture.num_attention_heads % shards == 0
+            and architecture.num_kv_heads % shards == 0
+        ):
+            return shards
+    return 1
+
+
+def _apply_limits(sizing: TgiSizing, limits: TgiLimits) -> TgiSizing:
+    return TgiSizing(
+        num_shards=limits.num_shards or sizing.num_shards,
+        max_input_length=limits.max_input_length or sizing.max_input_length,
+        max_total_tokens=limits.max_total_tokens or sizing.max_total_tokens,
+        max_batch_prefill_tokens=(
+            limits.max_batch_prefill_tokens or sizing.max_batch_prefill_tokens
+        ),
+        max_batch_total_tokens=(
+            limits.max_batch_total_tokens or sizing.max_batch_total_tokens
+        ),
+    )
+
+
+def _validate(sizing: TgiSizing) -> TgiSizing:
+    """Check the invariants TGI enforces at startup, so bad values fail at synth."""
+    if not sizing.max_input_length < sizing.max_total_tokens:
+        raise ValueError("max_input_length must be less than max_total_tokens.")
+    if sizing.max_batch_prefill_tokens < sizing.max_input_length:
+        raise ValueError("max_batch_prefill_tokens must be at least max_input_length.")
+    if sizing.max_batch_total_tokens < max(
+        sizing.max_total_tokens, sizing.max_batch_prefill_tokens
+    ):
+        raise ValueError(
+            "max_batch_total_tokens must be at least max_total_tokens and "
+            "max_batch_prefill_tokens."
+        )
+    return sizing
@@ -0,0 +1,14 @@
+"""Shared configuration for unit tests."""
+
+import os
+import sys
+
+# Make the Lambda source importable (the "lambda" directory is not a package)
+LAMBDA_SOURCE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "lambda", "invoke_sagemaker")
+)
+sys.path.insert(0, LAMBDA_SOURCE_DIR)
+
+# Read by the handler at import time
+os.environ.setdefault("SAGEMAKER_ENDPOINT_NAME", "test-endpoint")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
@@ -1,6 +1,10 @@
 """Unit tests for API Gateway Construct."""
 
+import json
+
 import aws_cdk as cdk
+import pytest
+from aws_cdk import aws_s3 as s3
 from aws_cdk.assertions import Template, Match
 from slm_sagemaker.constructs.api_construct import ApiGatewayConstruct
 
@@ -158,3 +162,539 @@ def test_api_method_requires_api_key():
             "ApiKeyRequired": True,
         },
     )
+
+
+def test_api_construct_streaming_function_url():
+    """Test that streaming mode adds a response-streaming function URL."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        enable_streaming=True,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Url",
+        {"AuthType": "AWS_IAM", "InvokeMode": "RESPONSE_STREAM"},
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "run.sh",
+            "Environment": {
+                "Variables": Match.object_like(
+                    {"AWS_LWA_INVOKE_MODE": "response_stream"}
+                )
+            },
+        },
+    )
+
+
+def test_api_construct_shared_cache_table():
+    """Test that the shared cache tier provisions a DynamoDB table."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        enable_shared_cache=True,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::DynamoDB::Table",
+        {
+            "KeySchema": [{"AttributeName": "cache_key", "KeyType": "HASH"}],
+            "TimeToLiveSpecification": {
+                "AttributeName": "expires_at",
+                "Enabled": True,
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like({"CACHE_TABLE_NAME": Match.any_value()})
+            },
+        },
+    )
+
+
+def test_api_construct_creates_batch_resource():
+    """Test that the /invoke/batch resource is created with a POST method."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties("AWS::ApiGateway::Resource", {"PathPart": "batch"})
+    # One POST method each for /invoke and /invoke/batch
+    template.resource_properties_count_is(
+        "AWS::ApiGateway::Method",
+        {"HttpMethod": "POST", "ApiKeyRequired": True},
+        2,
+    )
+
+
+def test_api_construct_snap_start():
+    """Test that SnapStart uses Python 3.12 and routes API Gateway via an alias."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        snap_start=True,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Runtime": "python3.12",
+            "SnapStart": {"ApplyOn": "PublishedVersions"},
+        },
+    )
+    template.has_resource_properties("AWS::Lambda::Alias", {"Name": "live"})
+
+
+def test_api_construct_provisioned_concurrency():
+    """Test that provisioned concurrency is configured on the alias."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        provisioned_concurrency=2,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Alias",
+        {
+            "Name": "live",
+            "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 2},
+        },
+    )
+
+
+def test_api_construct_rejects_snap_start_with_provisioned_concurrency():
+    """Test that SnapStart and provisioned concurrency are mutually exclusive."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError):
+        ApiGatewayConstruct(
+            stack,
+            "TestApi",
+            endpoint_name="test-endpoint",
+            snap_start=True,
+            provisioned_concurrency=2,
+        )
+
+
+def test_api_construct_async_result_route():
+    """Test that an async bucket adds the GET /result/{id} route."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+    bucket = s3.Bucket(stack, "AsyncBucket")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        async_bucket=bucket,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties("AWS::ApiGateway::Resource", {"PathPart": "{id}"})
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {"HttpMethod": "GET", "ApiKeyRequired": True},
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like({"ASYNC_BUCKET_NAME": Match.any_value()})
+            },
+        },
+    )
+
+
+def test_api_construct_token_limits():
+    """Test that TGI token limits are passed to the function environment."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        max_input_length=1536,
+        max_total_tokens=2048,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like(
+                    {"MAX_INPUT_LENGTH": "1536", "MAX_TOTAL_TOKENS": "2048"}
+                )
+            },
+        },
+    )
+
+
+def test_api_construct_session_table():
+    """Test that sessions add a history table and sticky routing flag."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        enable_sessions=True,
+        sticky_sessions=True,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::DynamoDB::Table",
+        {
+            "KeySchema": [{"AttributeName": "session_id", "KeyType": "HASH"}],
+            "TimeToLiveSpecification": {
+                "AttributeName": "expires_at",
+                "Enabled": True,
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like(
+                    {
+                        "SESSION_TABLE_NAME": Match.any_value(),
+                        "SESSION_STICKY_ROUTING": "true",
+                    }
+                )
+            },
+        },
+    )
+
+
+def test_api_construct_rejects_sticky_sessions_without_sessions():
+    """Test that sticky routing requires the session store."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError):
+        ApiGatewayConstruct(
+            stack,
+            "TestApi",
+            endpoint_name="test-endpoint",
+            sticky_sessions=True,
+        )
+
+
+def test_api_construct_endpoint_variants():
+    """Test that several production variants are passed to the function."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        endpoint_variants=["g5", "g6"],
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like({"ENDPOINT_VARIANTS": "g5,g6"})
+            },
+        },
+    )
+
+
+def test_api_construct_hedging():
+    """Test that the hedging delay is passed to the function."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack, "TestApi", endpoint_name="test-endpoint", hedge_after_ms=800
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {"Variables": Match.object_like({"HEDGE_AFTER_MS": "800"})},
+        },
+    )
+
+
+def test_api_construct_rejects_negative_hedge_delay():
+    """Test that a negative hedging delay is rejected."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError, match="hedge_after_ms"):
+        ApiGatewayConstruct(
+            stack, "TestApi", endpoint_name="test-endpoint", hedge_after_ms=-1
+        )
+
+
+def test_api_construct_generation_budget_mode():
+    """Test that a non-default generation budget mode reaches the function."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        generation_budget_mode="reject",
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like({"GENERATION_BUDGET_MODE": "reject"})
+            },
+        },
+    )
+
+    with pytest.raises(ValueError, match="generation budget mode"):
+        ApiGatewayConstruct(
+            stack, "OtherApi", endpoint_name="test-endpoint", generation_budget_mode="x"
+        )
+
+
+def test_api_construct_direct_integration():
+    """Test that /invoke calls the SageMaker runtime without the Lambda."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        direct_integration=True,
+        chat_template="chatml",
+        generation_defaults={"max_new_tokens": 256},
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {
+            "HttpMethod": "POST",
+            "ApiKeyRequired": True,
+            "RequestValidatorId": Match.any_value(),
+            "Integration": Match.object_like(
+                {
+                    "Type": "AWS",
+                    "IntegrationHttpMethod": "POST",
+                    "PassthroughBehavior": "NEVER",
+                    "Credentials": Match.any_value(),
+                    "RequestTemplates": {
+                        "application/json": Match.string_like_regexp(
+                            r'<\|im_start\|>assistant[\s\S]*"max_new_tokens": .*256'
+                        )
+                    },
+                }
+            ),
+        },
+    )
+    methods = json.dumps(template.find_resources("AWS::ApiGateway::Method"))
+    assert "runtime.sagemaker:path/endpoints/test-endpoint/invocations" in methods
+
+    # Batch requests still go through the Lambda
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {"Integration": Match.object_like({"Type": "AWS_PROXY"})},
+    )
+    template.has_resource_properties(
+        "AWS::IAM::Role",
+        {
+            "AssumeRolePolicyDocument": Match.object_like(
+                {
+                    "Statement": [
+                        Match.object_like(
+                            {"Principal": {"Service": "apigateway.amazonaws.com"}}
+                        )
+                    ]
+                }
+            )
+        },
+    )
+    template.resource_count_is("AWS::ApiGateway::RequestValidator", 1)
+
+
+def test_api_construct_rejects_direct_integration_with_sessions():
+    """Test that features only the Lambda provides rule out direct integration."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError, match="Direct integration"):
+        ApiGatewayConstruct(
+            stack,
+            "TestApi",
+            endpoint_name="test-endpoint",
+            direct_integration=True,
+            enable_sessions=True,
+        )
+
+
+def test_api_construct_near_duplicate_threshold():
+    """Test that the near-duplicate threshold is passed to the function."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        near_duplicate_threshold=0.9,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like({"NEAR_DUPLICATE_THRESHOLD": "0.9"})
+            },
+        },
+    )
+
+    with pytest.raises(ValueError, match="near_duplicate_threshold"):
+        ApiGatewayConstruct(
+            stack, "OtherApi", endpoint_name="test-endpoint", near_duplicate_threshold=2
+        )
+
+
+def test_api_construct_min_compression_size():
+    """Test that API Gateway content encoding is configured from the threshold."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        min_compression_bytes=1024,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::RestApi", {"MinimumCompressionSize": 1024}
+    )
+
+    with pytest.raises(ValueError, match="min_compression_bytes"):
+        ApiGatewayConstruct(
+            stack, "OtherApi", endpoint_name="test-endpoint", min_compression_bytes=-1
+        )
+
+
+def test_api_construct_health_route():
+    """Test that the health route is public and can describe the endpoint."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        health_route=True,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Resource", {"PathPart": "health"}
+    )
+    # Route 53 health checks cannot send an API key
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {"HttpMethod": "GET", "ApiKeyRequired": False},
+    )
+    template.has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": Match.array_with(
+                    [Match.object_like({"Action": "sagemaker:DescribeEndpoint"})]
+                )
+            }
+        },
+    )
+
+
+def test_api_construct_payload_log_sample_rate():
+    """Test that sampled payload logging is configured on the Lambda."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = ApiGatewayConstruct(
+        stack,
+        "TestApi",
+        endpoint_name="test-endpoint",
+        payload_log_sample_rate=0.05,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like({"PAYLOAD_LOG_SAMPLE_RATE": "0.05"})
+            },
+        },
+    )
+
+    with pytest.raises(ValueError, match="payload_log_sample_rate"):
+        ApiGatewayConstruct(
+            stack, "OtherApi", endpoint_name="test-endpoint", payload_log_sample_rate=2
+        )
@@ -0,0 +1,81 @@
+"""Unit tests for async inference job submission and polling."""
+
+import io
+import json
+
+import pytest
+
+from async_jobs import get_job_result, submit_job
+
+
+class FakeS3:
+    """In-memory stand-in for the S3 client."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.exceptions.NoSuchKey()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+class FakeAsyncRuntime:
+    """Stand-in for the SageMaker runtime client of an async endpoint."""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke_endpoint_async(self, **kwargs):
+        self.calls.append(kwargs)
+        inference_id = kwargs["InferenceId"]
+        return {
+            "InferenceId": inference_id,
+            "OutputLocation": f"s3://bucket/output/{inference_id}.out",
+        }
+
+
+def test_submit_job_uploads_payload_and_queues_it():
+    """Test that the payload is written to S3 and referenced by the invocation."""
+    s3 = FakeS3()
+    runtime = FakeAsyncRuntime()
+
+    job_id = submit_job(s3, runtime, "bucket", "endpoint", {"inputs": "hi"})
+
+    assert json.loads(s3.objects[("bucket", f"input/{job_id}.json")]) == {
+        "inputs": "hi"
+    }
+    assert runtime.calls[0]["InputLocation"] == f"s3://bucket/input/{job_id}.json"
+    assert runtime.calls[0]["EndpointName"] == "endpoint"
+
+
+def test_get_job_result_reports_each_status():
+    """Test that pending, completed and failed jobs are distinguished."""
+    s3 = FakeS3()
+
+    assert get_job_result(s3, "bucket", "job-1") == {"status": "pending"}
+
+    s3.put_object("bucket", "output/job-1.out", b'[{"generated_text": "Paris"}]')
+    assert get_job_result(s3, "bucket", "job-1") == {
+        "status": "completed",
+        "result": [{"generated_text": "Paris"}],
+    }
+
+    s3.put_object("bucket", "failure/job-2-error.out", b"CUDA out of memory")
+    assert get_job_result(s3, "bucket", "job-2") == {
+        "status": "failed",
+        "error": "CUDA out of memory",
+    }
+
+
+def test_get_job_result_rejects_malformed_job_ids():
+    """Test that job ids cannot address arbitrary S3 keys."""
+    with pytest.raises(ValueError):
+        get_job_result(FakeS3(), "bucket", "../input/secret")
@@ -0,0 +1,62 @@
+"""Unit tests for batch fan-out."""
+
+import threading
+import time
+
+from batch import run_batch
+
+
+def test_run_batch_preserves_input_order():
+    """Test that outcomes are returned in input order regardless of finish order."""
+    tasks = [
+        lambda: (time.sleep(0.05), "slow")[1],
+        lambda: "fast",
+    ]
+
+    assert run_batch(tasks, max_workers=2, deadline_seconds=5) == [
+        {"result": "slow"},
+        {"result": "fast"},
+    ]
+
+
+def test_run_batch_reports_per_item_errors():
+    """Test that a failing item does not fail the whole batch."""
+
+    def fail():
+        raise ValueError("bad item")
+
+    outcomes = run_batch([fail, lambda: "ok"], max_workers=2, deadline_seconds=5)
+
+    assert outcomes == [{"error": "bad item"}, {"result": "ok"}]
+
+
+def test_run_batch_bounds_concurrency():
+    """Test that no more than max_workers tasks run at the same time."""
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def task():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    run_batch([task] * 8, max_workers=3, deadline_seconds=5)
+
+    assert max(peak) <= 3
+
+
+def test_run_batch_times_out_items_past_deadline():
+    """Test that unfinished items are reported once the deadline passes."""
+    release = threading.Event()
+    outcomes = run_batch(
+        [lambda: "done", lambda: release.wait(1)],
+        max_workers=2,
+        deadline_seconds=0.1,
+    )
+    release.set()
+
+    assert outcomes == [{"result": "done"}, {"error": "Deadline exceeded"}]
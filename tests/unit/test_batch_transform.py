@@ -0,0 +1,190 @@
+"""Unit tests for Batch Transform sharding and merging."""
+
+import io
+import json
+
+import pytest
+
+import handler
+from batch_transform.records import PayloadFormatter, iter_records, merge_result
+from batch_transform.shards import merge_results, write_shards
+from batch_transform.storage import Storage
+
+SYSTEM_PROMPT = "You are a helpful AI assistant."
+
+
+class FakeS3:
+    """In-memory stand-in for the S3 client calls the tool makes."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, path, bucket, key):
+        with open(path, "rb") as f:
+            self.objects[(bucket, key)] = f.read()
+
+    def get_object(self, Bucket, Key):
+        body = self.objects[(Bucket, Key)]
+        return {"Body": FakeStreamingBody(body)}
+
+    def get_paginator(self, operation):
+        assert operation == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix, Delimiter):
+        keys = sorted(
+            key
+            for bucket, key in self.objects
+            if bucket == Bucket
+            and key.startswith(Prefix)
+            and Delimiter not in key[len(Prefix) :]
+        )
+        # Two pages, to exercise pagination
+        yield {"Contents": [{"Key": key} for key in keys[:1]]}
+        yield {"Contents": [{"Key": key} for key in keys[1:]]}
+
+
+class FakeStreamingBody:
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    def iter_lines(self):
+        for line in self._stream:
+            yield line.rstrip(b"\n")
+
+
+def _requests(count):
+    return [{"id": i, "prompt": f"Question {i}"} for i in range(count)]
+
+
+def _transform(storage, inputs, outputs, names):
+    """Mimic Batch Transform: one output line per input line, in order."""
+    for name in names:
+        with storage.open_write(f"{outputs}/{name}.out") as f:
+            for line in storage.read_lines(f"{inputs}/{name}"):
+                payload = json.loads(line)
+                result = {"generated_text": f"Answer to {payload['inputs'][-30:]}"}
+                f.write(json.dumps([result]) + "\n")
+
+
+def test_iter_records_skips_blank_lines_and_rejects_bad_records():
+    lines = ['{"prompt": "Hi"}', "", "  ", '{"prompt": "Bye", "id": 7}']
+    assert [r["prompt"] for r in iter_records(lines)] == ["Hi", "Bye"]
+
+    with pytest.raises(ValueError, match="Line 2"):
+        list(iter_records(['{"prompt": "Hi"}', '{"parameters": {}}']))
+
+
+def test_payload_matches_the_invoke_handler():
+    """Test that transform requests are what the handler would send."""
+    formatter = PayloadFormatter("zephyr", handler.SYSTEM_PROMPT)
+    for parameters in ({}, {"max_new_tokens": 64, "do_sample": False, "seed": 3}):
+        record = {"prompt": "Say hi", "parameters": parameters}
+        expected, _ = handler.build_payload(record["prompt"], parameters)
+        assert formatter.payload(record) == expected
+
+
+def test_payload_applies_generation_defaults():
+    formatter = PayloadFormatter("chatml", SYSTEM_PROMPT, {"max_new_tokens": 128})
+
+    payload = formatter.payload({"prompt": "Hi", "parameters": {"top_p": 0.5}})
+
+    assert payload["inputs"].endswith("<|im_start|>assistant\n")
+    assert payload["parameters"]["max_new_tokens"] == 128
+    assert payload["parameters"]["top_p"] == 0.5
+
+
+def test_write_shards_splits_by_records_and_bytes(tmp_path):
+    """Test that shards respect both limits and keep input order."""
+    formatter = PayloadFormatter("zephyr", SYSTEM_PROMPT)
+    storage = Storage()
+    one_record = len(json.dumps(formatter.payload(_requests(1)[0]))) + 1
+
+    shards = write_shards(_requests(7), formatter, storage, str(tmp_path), 3)
+    assert [(s.name, s.records) for s in shards] == [
+        ("shard-00000.jsonl", 3),
+        ("shard-00001.jsonl", 3),
+        ("shard-00002.jsonl", 1),
+    ]
+    lines = list(storage.read_lines(str(tmp_path / "shard-00001.jsonl")))
+    assert json.loads(lines[0])["inputs"].count("Question 3") == 1
+
+    shards = write_shards(
+        _requests(5), formatter, storage, str(tmp_path / "b"), 100, 2 * one_record
+    )
+    assert [s.records for s in shards] == [2, 2, 1]
+
+
+def test_write_shards_rejects_records_over_the_payload_limit(tmp_path):
+    formatter = PayloadFormatter("zephyr", SYSTEM_PROMPT)
+    records = [{"prompt": "short"}, {"prompt": "x" * 2000}]
+
+    with pytest.raises(ValueError, match="Record 2"):
+        write_shards(
+            records, formatter, Storage(), str(tmp_path), max_record_bytes=1000
+        )
+
+
+def test_merge_restores_input_order_across_shards(tmp_path):
+    """Test a local prepare, transform and merge round trip."""
+    storage = Storage()
+    inputs, outputs = str(tmp_path / "input"), str(tmp_path / "output")
+    formatter = PayloadFormatter("zephyr", SYSTEM_PROMPT)
+    shards = write_shards(_requests(5), formatter, storage, inputs, max_records=2)
+    _transform(storage, inputs, outputs, [shard.name for shard in shards])
+
+    results = list(merge_results(_requests(5), storage, outputs))
+
+    assert [r["id"] for r in results] == [0, 1, 2, 3, 4]
+    for result in results:
+        assert f"Question {result['id']}" in result["generated_text"]
+
+
+def test_merge_detects_missing_shards_and_length_mismatches(tmp_path):
+    storage = Storage()
+    inputs, outputs = str(tmp_path / "input"), str(tmp_path / "output")
+    formatter = PayloadFormatter("zephyr", SYSTEM_PROMPT)
+    shards = write_shards(_requests(6), formatter, storage, inputs, max_records=2)
+    with pytest.raises(ValueError, match="No transform outputs"):
+        list(merge_results(_requests(6), storage, inputs))
+
+    _transform(storage, inputs, outputs, [shards[0].name, shards[2].name])
+    with pytest.raises(ValueError, match="shard-00001.jsonl.out"):
+        list(merge_results(_requests(6), storage, outputs))
+
+    _transform(storage, inputs, outputs, [shards[1].name])
+    with pytest.raises(ValueError, match="record 7"):
+        list(merge_results(_requests(7), storage, outputs))
+
+
+def test_round_trip_through_s3():
+    """Test that shards upload to S3 and outputs stream back from it."""
+    storage = Storage(FakeS3())
+    formatter = PayloadFormatter("zephyr", SYSTEM_PROMPT)
+    shards = write_shards(
+        _requests(3), formatter, storage, "s3://bucket/input/run/", max_records=2
+    )
+    assert sorted(key for _, key in storage.s3.objects) == [
+        "input/run/shard-00000.jsonl",
+        "input/run/shard-00001.jsonl",
+    ]
+    names = [shard.name for shard in shards]
+    _transform(storage, "s3://bucket/input/run", "s3://bucket/output/run", names)
+
+    results = list(merge_results(_requests(3), storage, "s3://bucket/output/run/"))
+
+    assert [r["id"] for r in results] == [0, 1, 2]
+
+
+def test_merge_result_reports_generated_tokens():
+    line = json.dumps([{"generated_text": "Hi", "details": {"generated_tokens": 2}}])
+
+    assert merge_result({"prompt": "Hello"}, line) == {
+        "prompt": "Hello",
+        "generated_text": "Hi",
+        "usage": {"generated_tokens": 2},
+    }
+    assert merge_result({"prompt": "Hello"}, '{"generated_text": "Hi"}') == {
+        "prompt": "Hello",
+        "generated_text": "Hi",
+    }
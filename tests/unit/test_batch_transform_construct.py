@@ -0,0 +1,79 @@
+"""Unit tests for Batch Transform Construct."""
+
+import json
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk import aws_iam as iam, aws_sagemaker as sagemaker
+from aws_cdk.assertions import Template
+from slm_sagemaker.constructs.batch_transform_construct import (
+    BatchTransformConstruct,
+)
+
+
+def _model(stack):
+    role = iam.Role(
+        stack,
+        "ExecutionRole",
+        assumed_by=iam.ServicePrincipal("sagemaker.amazonaws.com"),
+    )
+    model = sagemaker.CfnModel(
+        stack,
+        "Model",
+        execution_role_arn=role.role_arn,
+        primary_container=sagemaker.CfnModel.ContainerDefinitionProperty(
+            image="tgi-image"
+        ),
+        model_name="test-model",
+    )
+    return model, role
+
+
+def test_batch_transform_construct_creates_transform_job():
+    """Test that the state machine runs a line-split transform on the model."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+    model, role = _model(stack)
+
+    _construct = BatchTransformConstruct(
+        stack,
+        "TestBatch",
+        model=model,
+        execution_role=role,
+        instance_type="ml.g5.xlarge",
+        instance_count=2,
+        max_concurrent_transforms=4,
+    )
+
+    template = Template.from_stack(stack)
+
+    template.resource_count_is("AWS::S3::Bucket", 1)
+    template.resource_count_is("AWS::StepFunctions::StateMachine", 1)
+    definition = json.dumps(template.find_resources("AWS::StepFunctions::StateMachine"))
+    for expected in (
+        "createTransformJob.sync",
+        '\\"SplitType\\":\\"Line\\"',
+        '\\"AssembleWith\\":\\"Line\\"',
+        '\\"BatchStrategy\\":\\"SingleRecord\\"',
+        '\\"MaxConcurrentTransforms\\":4',
+        '\\"InstanceType\\":\\"ml.g5.xlarge\\"',
+        '\\"InstanceCount\\":2',
+    ):
+        assert expected in definition
+
+
+def test_batch_transform_construct_rejects_zero_instances():
+    """Test that a transform without instances is rejected."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+    model, role = _model(stack)
+
+    with pytest.raises(ValueError, match="config.batch_transform"):
+        BatchTransformConstruct(
+            stack,
+            "TestBatch",
+            model=model,
+            execution_role=role,
+            instance_type="ml.g5.xlarge",
+            instance_count=0,
+        )
@@ -0,0 +1,75 @@
+"""Unit tests for the handler overhead benchmarks."""
+
+import handler
+from benchmarks.gate import find_regressions
+from benchmarks.handler_bench import default_scenarios, measure_scenario
+from cache import InMemorySharedCache, LruTtlCache, ResponseCache
+
+
+def _results(relative_cpu=2.0, peak_kib=8.0, import_relative=1000.0):
+    return {
+        "import": {"ms": 40.0, "relative": import_relative},
+        "scenarios": {
+            "small": {
+                "cpu_us": 60.0,
+                "relative_cpu": relative_cpu,
+                "peak_kib": peak_kib,
+            }
+        },
+    }
+
+
+def test_find_regressions_within_tolerance():
+    """Test that growth inside the tolerances passes."""
+    assert find_regressions(_results(), _results(relative_cpu=2.5, peak_kib=9.0)) == []
+
+
+def test_find_regressions_reports_each_metric():
+    """Test that CPU, memory and import time are gated independently."""
+    current = _results(relative_cpu=4.0, peak_kib=16.0, import_relative=2000.0)
+
+    regressions = find_regressions(_results(), current)
+
+    assert [r.name for r in regressions] == [
+        "import (relative)",
+        "small relative_cpu",
+        "small peak_kib",
+    ]
+    assert regressions[1].change == 1.0
+
+
+def test_find_regressions_allows_slack_on_micro_scenarios():
+    """Test that tiny scenarios get absolute CPU slack on top of the tolerance."""
+    baseline = _results(relative_cpu=2.0)
+
+    # 2.0 * 1.35 + 1.0 calibration units
+    assert find_regressions(baseline, _results(relative_cpu=3.6)) == []
+    assert find_regressions(baseline, _results(relative_cpu=3.8))
+
+
+def test_find_regressions_honours_tolerance_overrides():
+    """Test stricter tolerances and scenarios missing from the current run."""
+    current = _results(relative_cpu=3.2)
+
+    assert find_regressions(_results(), current) == []
+    assert find_regressions(_results(), current, {"relative_cpu": 0.05})
+    current["scenarios"] = {}
+    assert find_regressions(_results(), current, {"relative_cpu": 0.05}) == []
+
+
+def test_measure_scenario_drives_the_handler(monkeypatch):
+    """Test a short run of every scenario against the stubbed runtime."""
+    monkeypatch.setattr(handler, "sagemaker_runtime", None)
+    monkeypatch.setattr(
+        handler,
+        "response_cache",
+        ResponseCache(LruTtlCache(10, 60), InMemorySharedCache()),
+    )
+    monkeypatch.setattr(handler, "tokenizers", {handler.TOKENIZER_PATH: None})
+
+    for scenario in default_scenarios():
+        result = measure_scenario(handler, scenario, iterations=10, repeats=1)
+
+        assert result.cpu_us > 0
+        assert result.relative_cpu > 0
+        assert result.peak_kib > 0
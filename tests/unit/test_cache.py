@@ -0,0 +1,116 @@
+"""Unit tests for the two-tier response cache."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import (
+    InMemorySharedCache,
+    LruTtlCache,
+    ResponseCache,
+    cache_key,
+    is_deterministic,
+)
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_ignores_parameter_order():
+    """Test that equivalent generation configs produce the same key."""
+    a = cache_key("prompt", {"temperature": 0.7, "max_new_tokens": 10})
+    b = cache_key("prompt", {"max_new_tokens": 10, "temperature": 0.7})
+
+    assert a == b
+    assert a != cache_key("prompt", {"max_new_tokens": 11, "temperature": 0.7})
+
+
+def test_is_deterministic():
+    """Test that only greedy or seeded generations are deterministic."""
+    assert is_deterministic({"do_sample": False})
+    assert is_deterministic({"do_sample": True, "seed": 42})
+    assert not is_deterministic({"do_sample": True})
+
+
+def test_lru_evicts_least_recently_used():
+    """Test that the local tier stays bounded and keeps recent entries."""
+    cache = LruTtlCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_lru_expires_entries_after_ttl():
+    """Test that entries are dropped once their TTL has passed."""
+    clock = FakeClock()
+    cache = LruTtlCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 59
+    assert cache.get("a") == 1
+    clock.now = 60
+    assert cache.get("a") is None
+
+
+def test_lru_is_safe_to_share_between_batch_threads():
+    """Test that batch threads can expire and evict the same entries at once."""
+
+    def yielding_clock():
+        # Hand the GIL to another thread between reading and updating an entry
+        time.sleep(0)
+        return time.monotonic()
+
+    cache = LruTtlCache(max_entries=2, ttl_seconds=0, clock=yielding_clock)
+
+    def churn(worker):
+        for i in range(500):
+            key = f"{(worker + i) % 3}"
+            if cache.get(key) is None:
+                cache.put(key, i)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(churn, range(8)))
+
+    assert len(cache) <= 2
+
+
+def test_response_cache_falls_back_to_shared_tier():
+    """Test that shared hits are served and promoted to the local tier."""
+    shared = InMemorySharedCache()
+    writer = ResponseCache(LruTtlCache(10, 60), shared)
+    reader = ResponseCache(LruTtlCache(10, 60), shared)
+
+    assert reader.get("k") == (None, "MISS")
+    writer.put("k", "Paris")
+
+    assert reader.get("k") == ("Paris", "HIT-SHARED")
+    assert reader.get("k") == ("Paris", "HIT-LOCAL")
+    assert reader.stats == {"local_hits": 1, "shared_hits": 1, "misses": 1}
+
+
+def test_response_cache_survives_shared_tier_failure():
+    """Test that an unavailable shared tier degrades to a miss."""
+
+    class BrokenSharedCache:
+        def get(self, key):
+            raise ConnectionError("unreachable")
+
+        def put(self, key, value):
+            raise ConnectionError("unreachable")
+
+    cache = ResponseCache(LruTtlCache(10, 60), BrokenSharedCache())
+    cache.put("k", "v")
+
+    assert cache.get("k") == ("v", "HIT-LOCAL")
+    assert cache.get("other") == (None, "MISS")
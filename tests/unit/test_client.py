@@ -0,0 +1,348 @@
+"""Unit tests for the asyncio client, against local stand-in servers."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from loadtest.fake_runtime import FakeTgiRuntime, serve_local
+from slm_sagemaker.client import AsyncClient, ClientError, parse_retry_after
+
+
+class StubServer:
+    """
+    HTTP/1.1 keep-alive server with scripted responses.
+
+    Responses are popped from ``script`` (status, headers, body), where body
+    is bytes or a list of chunks sent with chunked encoding; once it is empty
+    the server answers 200 with the prompt echoed back.
+    """
+
+    def __init__(self, delay_seconds: float = 0.0):
+        self.script = []
+        self.requests = []
+        self.peers = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Close connections after each response without a Connection header
+        self.drop_connections = False
+        # Send only this many bytes of each body, then hang up
+        self.hang_up_after = None
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                with lock:
+                    stub.requests.append((self.path, dict(self.headers), body))
+                    stub.peers.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    scripted = stub.script.pop(0) if stub.script else None
+                time.sleep(delay_seconds)
+                with lock:
+                    stub.in_flight -= 1
+                if scripted is None:
+                    answer = {"generated_text": f"Answer to {body['prompt']}"}
+                    scripted = (200, {}, json.dumps(answer).encode())
+                status, headers, content = scripted
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if isinstance(content, list):
+                    self.send_header("Transfer-Encoding", "chunked")
+                    parts = [b"%x\r\n%s\r\n" % (len(c), c) for c in content]
+                    parts.append(b"0\r\n\r\n")
+                else:
+                    self.send_header("Content-Length", str(len(content)))
+                    parts = [content]
+                self.end_headers()
+                if stub.hang_up_after is not None:
+                    self.wfile.write(b"".join(parts)[: stub.hang_up_after])
+                    self.close_connection = True
+                    return
+                for part in parts:
+                    self.wfile.write(part)
+                    self.wfile.flush()
+                self.close_connection = stub.drop_connections
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://{}:{}".format(*self.server.server_address[:2])
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.server.shutdown()
+
+
+@pytest.fixture
+def local_server(monkeypatch):
+    runtime = FakeTgiRuntime(
+        prefill_latency_ms=1, per_token_latency_ms=1, output_tokens=5
+    )
+    import handler
+
+    # serve_local installs the fake client; restore the original afterwards
+    monkeypatch.setattr(handler, "sagemaker_runtime", None)
+    monkeypatch.setattr(handler, "tokenizers", {handler.TOKENIZER_PATH: None})
+    server = serve_local(runtime)
+    yield "http://{}:{}".format(*server.server_address[:2])
+    server.shutdown()
+
+
+def _event(data):
+    return f"data: {json.dumps(data)}\n\n".encode()
+
+
+def test_invoke_and_stream_through_the_handler(local_server, capsys):
+    """Test the client against the real invoke and streaming handlers."""
+
+    async def run():
+        async with AsyncClient(
+            f"{local_server}/invoke", stream_url=f"{local_server}/stream"
+        ) as client:
+            result = await client.invoke("Hi", {"max_new_tokens": 3})
+            tokens = [token async for token in client.stream("Hi")]
+        return result, tokens
+
+    result, tokens = asyncio.run(run())
+
+    assert result["generated_text"] == " tok0 tok1 tok2"
+    assert result["usage"]["generated_tokens"] == 3
+    assert tokens == [f" tok{i}" for i in range(5)]
+
+
+def test_compressed_bodies_through_the_handler(local_server, capsys):
+    """Test gzipped requests, and that gzipped responses are decompressed."""
+    prompt = "Tell me about Paris. " * 100
+
+    async def run():
+        async with AsyncClient(
+            f"{local_server}/invoke",
+            stream_url=f"{local_server}/stream",
+            compress_requests_over=512,
+        ) as client:
+            # Echoing the prompt makes the response large enough to compress
+            result = await client.invoke(prompt, fields="*")
+            tokens = [token async for token in client.stream(prompt)]
+        return result, tokens
+
+    result, tokens = asyncio.run(run())
+
+    assert result["prompt"] == prompt
+    assert len(tokens) == 5
+
+
+def test_requests_reuse_one_keep_alive_connection(stub):
+    async def run():
+        async with AsyncClient(f"{stub.url}/invoke", api_key="key") as client:
+            for i in range(5):
+                await client.invoke(f"Question {i}", temperature=None)
+            return client.session.connections_opened
+
+    assert asyncio.run(run()) == 1
+    assert len(stub.peers) == 1
+    path, headers, body = stub.requests[0]
+    assert path == "/invoke"
+    assert headers["x-api-key"] == "key"
+    assert headers["Accept-Encoding"] == "gzip"
+    assert "Content-Encoding" not in headers
+    assert body == {"prompt": "Question 0", "temperature": None}
+
+
+def test_map_bounds_concurrency_and_keeps_input_order():
+    stub = StubServer(delay_seconds=0.02)
+
+    async def run():
+        async with AsyncClient(f"{stub.url}/invoke", max_concurrency=3) as client:
+            prompts = (f"Question {i}" for i in range(10))
+            return [r async for r in client.map(prompts, {"max_new_tokens": 8})]
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        stub.server.shutdown()
+
+    assert [r["generated_text"] for r in results] == [
+        f"Answer to Question {i}" for i in range(10)
+    ]
+    assert 1 < stub.max_in_flight <= 3
+    assert len(stub.peers) <= 3
+    for _, _, body in stub.requests:
+        assert body["parameters"] == {"max_new_tokens": 8}
+
+
+def test_throttles_are_retried_after_retry_after(stub):
+    """Test that Retry-After sets the delay, and backoff applies without it."""
+    throttled = json.dumps({"message": "Too Many Requests"}).encode()
+    unavailable = json.dumps({"error": "SageMaker endpoint is unavailable"}).encode()
+    stub.script = [
+        (429, {"Retry-After": "3"}, throttled),
+        (503, {}, unavailable),
+    ]
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    async def run():
+        async with AsyncClient(
+            f"{stub.url}/invoke", sleep=sleep, rand=lambda: 0.5
+        ) as client:
+            return await client.invoke("Hi")
+
+    assert asyncio.run(run())["generated_text"] == "Answer to Hi"
+    assert delays == [3.0, 0.5]
+    assert len(stub.requests) == 3
+
+
+def test_errors_raise_client_error(stub):
+    """Test that retries run out, and that bad requests are not retried."""
+    throttled = (429, {}, json.dumps({"message": "Too Many Requests"}).encode())
+    invalid = json.dumps({"error": "Missing 'prompt' in request body"}).encode()
+    stub.script = [throttled, throttled, (400, {}, invalid)]
+
+    async def sleep(seconds):
+        pass
+
+    async def run(prompt):
+        async with AsyncClient(
+            f"{stub.url}/invoke", max_attempts=2, sleep=sleep
+        ) as client:
+            return await client.invoke(prompt)
+
+    with pytest.raises(ClientError, match="Too Many Requests") as error:
+        asyncio.run(run("Hi"))
+    assert error.value.status == 429
+
+    with pytest.raises(ClientError, match="Missing 'prompt'") as error:
+        asyncio.run(run(""))
+    assert error.value.status == 400
+    assert len(stub.requests) == 3
+
+
+def test_map_can_return_exceptions(stub):
+    invalid = json.dumps({"error": "Prompt is too long"}).encode()
+    stub.script = [(200, {}, b'{"generated_text": "ok"}'), (400, {}, invalid)]
+
+    async def run():
+        async with AsyncClient(f"{stub.url}/invoke", max_concurrency=1) as client:
+            bodies = [{"prompt": "a"}, {"prompt": "b"}, {"prompt": "c"}]
+            return [r async for r in client.map(bodies, return_exceptions=True)]
+
+    first, second, third = asyncio.run(run())
+
+    assert first == {"generated_text": "ok"}
+    assert isinstance(second, ClientError) and second.status == 400
+    assert third == {"generated_text": "Answer to c"}
+
+
+def test_stream_reads_chunked_events_and_raises_stream_errors(stub):
+    events = [_event({"token": " Hel"}), _event({"token": "lo"}) + _event({"a": 1})]
+    interrupted = [
+        _event({"token": " Hel"}),
+        _event({"error": "Stream interrupted", "message": "Model error"}),
+    ]
+    sse = {"Content-Type": "text/event-stream"}
+    stub.script = [(200, sse, events), (200, sse, interrupted)]
+    signed = []
+
+    def sign(url, data, headers):
+        signed.append(url)
+        return {**headers, "Authorization": "AWS4-HMAC-SHA256 test"}
+
+    async def run():
+        async with AsyncClient(
+            f"{stub.url}/invoke", stream_url=f"{stub.url}/", sign=sign
+        ) as client:
+            tokens = [token async for token in client.stream("Hi")]
+            with pytest.raises(ClientError, match="Model error"):
+                async for _ in client.stream("Hi"):
+                    pass
+            return tokens, client.session.connections_opened
+
+    tokens, connections = asyncio.run(run())
+
+    assert tokens == [" Hel", "lo"]
+    # The first stream was read to the end, so its connection was reused
+    assert connections == 1
+    assert signed == [f"{stub.url}/", f"{stub.url}/"]
+    assert stub.requests[0][1]["Authorization"] == "AWS4-HMAC-SHA256 test"
+
+
+def test_bodies_cut_short_raise_client_error(stub):
+    """Test that a server hanging up mid-body raises ClientError."""
+    first = _event({"token": "a"})
+    stub.script = [
+        (200, {}, b'{"generated_text": "Paris"}'),
+        (200, {"Content-Type": "text/event-stream"}, [first, _event({"token": "b"})]),
+    ]
+    # Mid-way through the invoke body, and through the second event's chunk
+    stub.hang_up_after = 10
+
+    async def run():
+        tokens = []
+        async with AsyncClient(f"{stub.url}/invoke", stream_url=stub.url) as client:
+            with pytest.raises(ClientError) as invoke_error:
+                await client.invoke("Hi")
+            stub.hang_up_after = len(first) + 12
+            with pytest.raises(ClientError) as stream_error:
+                async for token in client.stream("Hi"):
+                    tokens.append(token)
+        return invoke_error.value, stream_error.value, tokens
+
+    invoke_error, stream_error, tokens = asyncio.run(run())
+
+    assert invoke_error.status == 200
+    assert "interrupted" in str(invoke_error)
+    assert stream_error.status == 200
+    assert tokens == ["a"]
+
+
+def test_stream_without_a_streaming_url_yields_the_whole_generation(stub):
+    async def run():
+        async with AsyncClient(f"{stub.url}/invoke") as client:
+            return [token async for token in client.stream("Hi")]
+
+    assert asyncio.run(run()) == ["Answer to Hi"]
+
+
+def test_connections_closed_while_idle_are_replaced(stub):
+    """Test a server that drops keep-alive connections without saying so."""
+    stub.drop_connections = True
+
+    async def run():
+        async with AsyncClient(f"{stub.url}/invoke") as client:
+            results = [await client.invoke(prompt) for prompt in "abc"]
+            return results, client.session.connections_opened
+
+    results, connections = asyncio.run(run())
+
+    assert [r["generated_text"] for r in results] == [
+        "Answer to a",
+        "Answer to b",
+        "Answer to c",
+    ]
+    assert connections == 3
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412490.0) == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
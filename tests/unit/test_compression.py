@@ -0,0 +1,39 @@
+"""Unit tests for request body decoding."""
+
+import base64
+import gzip
+
+import pytest
+
+import compression
+from compression import RequestEncodingError, decode_body
+
+
+def test_decode_body_passes_plain_text_through():
+    assert decode_body('{"prompt": "Hi"}') == '{"prompt": "Hi"}'
+    assert decode_body(b'{"prompt": "Hi"}') == '{"prompt": "Hi"}'
+
+
+def test_decode_body_decompresses_gzip():
+    """Test raw and base64 gzip bodies, detected without a header."""
+    text = '{"prompt": "Café"}'
+    data = gzip.compress(text.encode())
+
+    assert decode_body(data) == text
+    assert decode_body(base64.b64encode(data).decode(), is_base64=True) == text
+    assert decode_body(base64.b64encode(text.encode()).decode(), True) == text
+
+
+def test_decode_body_rejects_invalid_bodies(monkeypatch):
+    with pytest.raises(RequestEncodingError, match="base64"):
+        decode_body("not base64!", is_base64=True)
+    with pytest.raises(RequestEncodingError, match="gzip"):
+        decode_body(gzip.compress(b"{}")[:-12] + b"\xff" * 12)
+    with pytest.raises(RequestEncodingError, match="Truncated"):
+        decode_body(gzip.compress(b'{"prompt": "Hi"}')[:20])
+    with pytest.raises(RequestEncodingError, match="UTF-8"):
+        decode_body(b"\xff\xfe")
+
+    monkeypatch.setattr(compression, "MAX_DECOMPRESSED_BYTES", 1000)
+    with pytest.raises(RequestEncodingError, match="over 1000 bytes"):
+        decode_body(gzip.compress(b" " * 5000))
@@ -0,0 +1,174 @@
+"""Unit tests for the direct API Gateway to SageMaker mapping templates."""
+
+import json
+import re
+
+import pytest
+
+from config import ChatTemplate
+from models import CHAT_TEMPLATES
+from slm_sagemaker.direct_integration import (
+    CHAT_TEMPLATE_FORMATS,
+    DEFAULT_GENERATION_PARAMETERS,
+    ERROR_TEMPLATE,
+    RESPONSE_TEMPLATE,
+    request_template,
+)
+
+SYSTEM_PROMPT = "You are a helpful AI assistant."
+
+INLINE_IF = re.compile(
+    r'#if\("\$!(\w+)" != "" && "\$\1" != "null"\)(.*?)(?:#\{?else\}?(.*?))?#end'
+)
+
+
+def render(template, document):
+    """
+    Evaluate the VTL subset used by the templates against a JSON document.
+
+    Like API Gateway, $input.json() yields JSON-encoded values and an empty
+    string for paths that do not exist.
+    """
+    variables = {}
+    active = []
+    output = []
+
+    def input_json(path):
+        value = document
+        for index, key in re.findall(r"\[(\d+)\]|\.(\w+)", path[1:]):
+            try:
+                value = value[int(index)] if index else value[key]
+            except (KeyError, IndexError, TypeError):
+                return ""
+        return json.dumps(value)
+
+    def present(name):
+        return variables.get(name, "") not in ("", "null")
+
+    for line in template.split("\n"):
+        if match := re.fullmatch(r"#set\(\$(\w+) = \$input\.json\('(.+)'\)\)", line):
+            variables[match[1]] = input_json(match[2])
+        elif match := re.fullmatch(r"#set\(\$(\w+) = \$(\w+)\.length\(\) - 1\)", line):
+            variables[match[1]] = len(variables[match[2]]) - 1
+        elif match := re.fullmatch(
+            r"#set\(\$(\w+) = \$(\w+)\.substring\(1, \$(\w+)\)\)", line
+        ):
+            variables[match[1]] = variables[match[2]][1 : variables[match[3]]]
+        elif match := re.fullmatch(INLINE_IF.pattern.split("(.*?)")[0], line):
+            active.append(present(match[1]))
+        elif line == "#else":
+            active[-1] = not active[-1]
+        elif line == "#end":
+            active.pop()
+        elif all(active):
+            line = INLINE_IF.sub(lambda m: m[2] if present(m[1]) else m[3] or "", line)
+            line = re.sub(r"\$input\.json\('(.+?)'\)", lambda m: input_json(m[1]), line)
+            output.append(
+                re.sub(
+                    r"\$\{(\w+)\}|\$(\w+)", lambda m: str(variables[m[1] or m[2]]), line
+                )
+            )
+    return json.loads("\n".join(output))
+
+
+def test_chat_templates_match_the_invoke_lambda():
+    """Test that both paths format prompts the same way."""
+    assert set(CHAT_TEMPLATE_FORMATS) == {t.value for t in ChatTemplate}
+    for name, (message, assistant_prefix, stop) in CHAT_TEMPLATE_FORMATS.items():
+        template = CHAT_TEMPLATES[name]
+        assert (message, assistant_prefix, stop) == (
+            template.message,
+            template.assistant_prefix,
+            template.stop,
+        )
+
+
+@pytest.mark.parametrize("chat_template", sorted(CHAT_TEMPLATE_FORMATS))
+def test_request_template_formats_the_prompt(chat_template):
+    """Test that the prompt is rendered with the model's chat template."""
+    prompt = 'Say "hi"\n\tthen \\ stop é'
+    payload = render(request_template(chat_template, SYSTEM_PROMPT), {"prompt": prompt})
+
+    assert payload["inputs"] == CHAT_TEMPLATES[chat_template].format(
+        [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+    )
+    assert payload["parameters"]["stop"] == list(CHAT_TEMPLATES[chat_template].stop)
+    assert payload["parameters"]["return_full_text"] is False
+
+
+def test_request_template_fills_in_defaults():
+    """Test that omitted parameters take the defaults and seed stays unset."""
+    payload = render(request_template("zephyr", SYSTEM_PROMPT), {"prompt": "Hi"})
+
+    parameters = payload["parameters"]
+    for name, value in DEFAULT_GENERATION_PARAMETERS.items():
+        assert parameters[name] == value
+    assert "seed" not in parameters
+
+
+def test_request_template_uses_request_parameters():
+    """Test that request parameters override the defaults."""
+    template = request_template(
+        "zephyr", SYSTEM_PROMPT, {"max_new_tokens": 128, "seed": 0}
+    )
+    body = {
+        "prompt": "Hi",
+        "parameters": {"temperature": 0.1, "do_sample": False, "seed": 7},
+    }
+
+    parameters = render(template, body)["parameters"]
+    assert parameters["max_new_tokens"] == 128
+    assert parameters["temperature"] == 0.1
+    assert parameters["do_sample"] is False
+    assert parameters["seed"] == 7
+    assert render(template, {"prompt": "Hi"})["parameters"]["seed"] == 0
+
+
+def test_request_template_does_not_let_prompts_inject_fields():
+    """Test that a prompt cannot break out of the inputs string."""
+    prompt = '", "parameters": {"max_new_tokens": 99999}, "x": "'
+    payload = render(request_template("chatml", SYSTEM_PROMPT), {"prompt": prompt})
+
+    assert prompt in payload["inputs"]
+    assert payload["parameters"]["max_new_tokens"] == 512
+
+
+@pytest.mark.parametrize(
+    "system_prompt, defaults",
+    [("Costs are in $", None), ("#1 assistant", None), ("Hi", {"seed": "$x"})],
+)
+def test_request_template_rejects_vtl_syntax(system_prompt, defaults):
+    """Test that literals which VTL would interpret are rejected."""
+    with pytest.raises(ValueError, match="config.model"):
+        request_template("zephyr", system_prompt, defaults)
+
+
+def test_request_template_rejects_unknown_chat_template():
+    with pytest.raises(ValueError, match="Unknown chat template"):
+        request_template("alpaca", SYSTEM_PROMPT)
+
+
+def test_response_template_extracts_generated_text():
+    """Test that TGI output is mapped to the Lambda's response shape."""
+    output = [
+        {"generated_text": 'A "quoted"\nanswer', "details": {"generated_tokens": 5}}
+    ]
+
+    assert render(RESPONSE_TEMPLATE, output) == {
+        "generated_text": 'A "quoted"\nanswer',
+        "usage": {"generated_tokens": 5},
+    }
+    assert render(RESPONSE_TEMPLATE, [{"generated_text": "Hi"}]) == {
+        "generated_text": "Hi",
+        "usage": {},
+    }
+
+
+def test_error_template_passes_on_the_message():
+    assert render(ERROR_TEMPLATE, {"message": "Model is busy"}) == {
+        "error": "Failed to invoke SageMaker endpoint",
+        "message": "Model is busy",
+    }
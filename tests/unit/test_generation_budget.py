@@ -0,0 +1,86 @@
+"""Unit tests for deadline-fitted generation budgets."""
+
+import pytest
+
+from cache import InMemorySharedCache
+from generation_budget import ThroughputEstimator, max_tokens_within
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingStore:
+    def get(self, key):
+        raise RuntimeError("unavailable")
+
+    def put(self, key, value):
+        raise RuntimeError("unavailable")
+
+
+def test_estimator_needs_min_samples():
+    """Test that no estimate is given until enough generations were seen."""
+    estimator = ThroughputEstimator(min_samples=2)
+
+    estimator.record("tiny", 100, 2.0)
+    assert estimator.seconds_per_token("tiny") is None
+    estimator.record("tiny", 100, 2.0)
+    assert estimator.seconds_per_token("tiny") == pytest.approx(0.02)
+    assert estimator.seconds_per_token("other") is None
+
+
+def test_estimator_averages_and_ignores_short_generations():
+    """Test the moving average, and that prefill-dominated samples are skipped."""
+    estimator = ThroughputEstimator(alpha=0.5, min_samples=1)
+
+    estimator.record("tiny", 100, 1.0)
+    estimator.record("tiny", 100, 3.0)
+    estimator.record("tiny", 2, 10.0)
+
+    assert estimator.seconds_per_token("tiny") == pytest.approx(0.02)
+
+
+def test_estimator_shares_estimates_between_containers():
+    """Test that a cold container starts from the estimate another published."""
+    shared = InMemorySharedCache()
+    warm = ThroughputEstimator(min_samples=1, shared=shared)
+    cold = ThroughputEstimator(min_samples=1, shared=shared)
+
+    warm.record("tiny", 50, 1.0)
+
+    assert shared.items["throughput#tiny"]["seconds_per_token"] == 0.02
+    assert cold.seconds_per_token("tiny") == pytest.approx(0.02)
+
+
+def test_estimator_rate_limits_shared_access():
+    """Test that the shared store is read at most once per sync interval."""
+    clock = FakeClock()
+    shared = InMemorySharedCache()
+    cold = ThroughputEstimator(shared=shared, sync_interval_seconds=60, clock=clock)
+
+    assert cold.seconds_per_token("tiny") is None
+    shared.put("throughput#tiny", {"seconds_per_token": 0.05, "samples": 9})
+    assert cold.seconds_per_token("tiny") is None
+    clock.now = 60
+    assert cold.seconds_per_token("tiny") == 0.05
+
+
+def test_estimator_tolerates_shared_store_failures():
+    """Test that an unavailable shared store only loses the sharing."""
+    estimator = ThroughputEstimator(min_samples=1, shared=FailingStore())
+
+    assert estimator.seconds_per_token("tiny") is None
+    estimator.record("tiny", 50, 1.0)
+    assert estimator.seconds_per_token("tiny") == pytest.approx(0.02)
+
+
+@pytest.mark.parametrize(
+    "remaining, expected", [(11.5, 500), (1.5, 0), (0.5, 0), (1.51, 0)]
+)
+def test_max_tokens_within(remaining, expected):
+    """Test the tokens that fit after the overhead allowance."""
+    assert max_tokens_within(remaining, 0.02, overhead_seconds=1.5) == expected
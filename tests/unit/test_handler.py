@@ -0,0 +1,638 @@
+"""Unit tests for the invoke Lambda handler."""
+
+import base64
+import gzip
+import io
+import json
+
+import pytest
+
+import handler
+from cache import InMemorySharedCache, LruTtlCache, ResponseCache
+from generation_budget import ThroughputEstimator
+from models import load_model_routes
+from near_duplicate import MinHasher, NearDuplicateCache
+from resilience import CircuitBreaker
+from sessions import InMemorySessionStore
+
+
+class FakeSageMakerRuntime:
+    """Stand-in for the sagemaker-runtime client returning a fixed generation."""
+
+    def __init__(self, generated_text="Paris", generated_tokens=2):
+        self.generated_text = generated_text
+        self.generated_tokens = generated_tokens
+        self.calls = []
+
+    def invoke_endpoint(self, **kwargs):
+        self.calls.append(kwargs)
+        result = {
+            "generated_text": self.generated_text,
+            "details": {"generated_tokens": self.generated_tokens},
+        }
+        response = {
+            "Body": io.BytesIO(json.dumps([result]).encode()),
+            "InvokedProductionVariant": kwargs.get("TargetVariant", "AllTraffic"),
+        }
+        if kwargs.get("SessionId") == "NEW_SESSION":
+            response["NewSessionId"] = "sess-1; Expires=2026-01-01T00:00:00Z"
+        return response
+
+
+class CharacterTokenizer:
+    """Stand-in tokenizer counting one token per character."""
+
+    def count_tokens(self, text):
+        return len(text)
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    fake = FakeSageMakerRuntime()
+    monkeypatch.setattr(handler, "sagemaker_runtime", fake)
+    monkeypatch.setattr(
+        handler,
+        "response_cache",
+        ResponseCache(LruTtlCache(10, 60), InMemorySharedCache()),
+    )
+    # Token counting is off unless a test installs a tokenizer
+    monkeypatch.setattr(handler, "tokenizers", {handler.TOKENIZER_PATH: None})
+    monkeypatch.setattr(handler, "circuit_breaker", CircuitBreaker(2, 10))
+    monkeypatch.setattr(handler, "throughput", ThroughputEstimator(min_samples=1))
+    return fake
+
+
+@pytest.fixture
+def character_tokenizer(monkeypatch):
+    monkeypatch.setattr(
+        handler, "tokenizers", {handler.TOKENIZER_PATH: CharacterTokenizer()}
+    )
+    monkeypatch.setattr(handler, "MAX_INPUT_LENGTH", 100)
+    monkeypatch.setattr(handler, "MAX_TOTAL_TOKENS", 120)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    store = InMemorySessionStore()
+    monkeypatch.setattr(handler, "session_store", store)
+    return store
+
+
+def _invoke(body):
+    return handler.lambda_handler({"body": json.dumps(body)}, None)
+
+
+def test_handler_returns_generated_text(runtime):
+    """Test that the TGI response is returned to the caller."""
+    response = _invoke({"prompt": "Capital of France?"})
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["generated_text"] == "Paris"
+    assert "Capital of France?" in json.loads(runtime.calls[0]["Body"])["inputs"]
+
+
+def test_handler_rejects_missing_prompt(runtime):
+    """Test that a request without a prompt is rejected."""
+    response = _invoke({"parameters": {}})
+
+    assert response["statusCode"] == 400
+    assert runtime.calls == []
+
+
+def test_handler_returns_requested_fields(runtime):
+    """Test the lean default and that echoed inputs are returned on request."""
+    body = {"prompt": "Capital of France?", "parameters": {"max_new_tokens": 8}}
+
+    lean = json.loads(_invoke(body)["body"])
+    full = json.loads(_invoke({**body, "fields": "*"})["body"])
+    selected = json.loads(_invoke({**body, "fields": ["generated_text"]})["body"])
+
+    assert lean == {"generated_text": "Paris", "usage": {"generated_tokens": 2}}
+    assert full["prompt"] == "Capital of France?"
+    assert full["parameters"]["max_new_tokens"] == 8
+    assert selected == {"generated_text": "Paris"}
+
+
+def test_handler_rejects_unknown_fields(runtime):
+    response = _invoke({"prompt": "Hi", "fields": ["generated_text", "logits"]})
+
+    assert response["statusCode"] == 400
+    assert "logits" in json.loads(response["body"])["error"]
+    assert runtime.calls == []
+
+
+def test_handler_decodes_compressed_bodies(runtime):
+    """Test gzip-compressed bodies passed on as binary proxy events."""
+    data = gzip.compress(json.dumps({"prompt": "Capital of France?"}).encode())
+    event = {"body": base64.b64encode(data).decode(), "isBase64Encoded": True}
+
+    response = handler.lambda_handler(event, None)
+    corrupt = handler.lambda_handler(
+        {"body": base64.b64encode(data[:20]).decode(), "isBase64Encoded": True},
+        None,
+    )
+
+    assert json.loads(response["body"])["generated_text"] == "Paris"
+    assert corrupt["statusCode"] == 400
+    assert len(runtime.calls) == 1
+
+
+def test_handler_caches_deterministic_requests(runtime):
+    """Test that repeated greedy requests hit the cache."""
+    request = {"prompt": "Hi", "parameters": {"do_sample": False}}
+
+    first = _invoke(request)
+    second = _invoke(request)
+
+    assert first["headers"]["X-Cache"] == "MISS"
+    assert second["headers"]["X-Cache"] == "HIT-LOCAL"
+    assert len(runtime.calls) == 1
+
+
+def test_handler_bypasses_cache_for_sampled_requests(runtime):
+    """Test that sampled requests are not cached unless the caller opts in."""
+    _invoke({"prompt": "Hi"})
+    response = _invoke({"prompt": "Hi"})
+
+    assert response["headers"]["X-Cache"] == "BYPASS"
+    assert len(runtime.calls) == 2
+
+    _invoke({"prompt": "Hi", "cache": True})
+    assert _invoke({"prompt": "Hi", "cache": True})["headers"]["X-Cache"] == "HIT-LOCAL"
+
+
+def test_handler_serves_near_duplicate_prompts(runtime, monkeypatch, capsys):
+    """Test that trivially different prompts reuse a cached generation."""
+    near_duplicates = NearDuplicateCache(0.9, hasher=MinHasher(use_numpy=False))
+    monkeypatch.setattr(handler, "near_duplicate_cache", near_duplicates)
+    greedy = {"do_sample": False}
+
+    _invoke({"prompt": "What is the capital of France?", "parameters": greedy})
+    capsys.readouterr()
+    near = _invoke({"prompt": "what is the capital of  France", "parameters": greedy})
+    record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    sampled = _invoke({"prompt": "what is the capital of France", "cache": False})
+
+    assert near["headers"]["X-Cache"] == "HIT-NEAR"
+    assert json.loads(near["body"])["generated_text"] == "Paris"
+    assert record["NearDuplicateHits"] == 1
+    assert record["NearDuplicateSimilarity"] == 1.0
+    assert sampled["headers"]["X-Cache"] == "BYPASS"
+    assert len(runtime.calls) == 2
+
+
+def test_handler_batch_merges_shared_and_item_parameters(runtime):
+    """Test that batch items inherit shared parameters and can override them."""
+    event = {
+        "resource": "/invoke/batch",
+        "body": json.dumps(
+            {
+                "prompts": ["a", {"prompt": "b", "parameters": {"top_p": 0.5}}, {}],
+                "parameters": {"max_new_tokens": 16},
+            }
+        ),
+    }
+
+    response = handler.lambda_handler(event, None)
+    results = json.loads(response["body"])["results"]
+
+    assert response["statusCode"] == 200
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["generated_text"] == "Paris"
+    assert results[2]["error"] == "Missing 'prompt' in batch item"
+    sent = sorted(
+        (json.loads(call["Body"])["parameters"] for call in runtime.calls),
+        key=lambda p: p["top_p"],
+    )
+    assert [p["max_new_tokens"] for p in sent] == [16, 16]
+    assert [p["top_p"] for p in sent] == [0.5, 0.9]
+
+
+@pytest.mark.parametrize("deadline_seconds", ["soon", None, True, 0, -5])
+def test_handler_batch_rejects_invalid_deadline(runtime, deadline_seconds):
+    """Test that a bad batch deadline is a client error, not a 500."""
+    event = {
+        "resource": "/invoke/batch",
+        "body": json.dumps({"prompts": ["a"], "deadline_seconds": deadline_seconds}),
+    }
+
+    response = handler.lambda_handler(event, None)
+
+    assert response["statusCode"] == 400
+    assert "deadline_seconds" in json.loads(response["body"])["error"]
+    assert runtime.calls == []
+
+
+def test_handle_batch_items_share_the_batch_deadline(runtime, monkeypatch):
+    """Test that items get the batch deadline, not the whole request's."""
+    deadlines = []
+    generate = handler.generate
+
+    def recording_generate(*args, deadline=None, **kwargs):
+        deadlines.append(deadline)
+        return generate(*args, deadline=deadline, **kwargs)
+
+    monkeypatch.setattr(handler, "generate", recording_generate)
+
+    response = handler.handle_batch(
+        {"prompts": ["a", "b"], "deadline_seconds": 2}, handler.Deadline(60)
+    )
+
+    assert response["statusCode"] == 200
+    assert len(deadlines) == 2
+    assert deadlines[0] is deadlines[1]
+    assert deadlines[0].remaining() <= 2
+
+
+def test_handler_reports_stage_timings(runtime, capsys):
+    """Test that stage timings are returned and published as EMF metrics."""
+    response = _invoke({"prompt": "Hi"})
+
+    server_timing = response["headers"]["Server-Timing"]
+    stages = [part.split(";")[0] for part in server_timing.split(", ")]
+    assert stages == ["parse", "template", "endpoint", "decode"]
+
+    record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert record["GeneratedTokens"] == 2
+    assert record["InputLength"] == 2
+    assert "TokensPerSecond" in record
+
+
+def test_handler_samples_payload_logging(runtime, monkeypatch, capsys):
+    """Test that payloads are only logged when sampled."""
+    monkeypatch.setattr(handler, "PAYLOAD_LOG_SAMPLE_RATE", 0.0)
+    _invoke({"prompt": "secret prompt"})
+    assert "secret prompt" not in capsys.readouterr().out
+
+    monkeypatch.setattr(handler, "PAYLOAD_LOG_SAMPLE_RATE", 1.0)
+    _invoke({"prompt": "secret prompt"})
+    assert "secret prompt" in capsys.readouterr().out
+
+
+def test_handler_clamps_max_new_tokens_to_context(runtime, character_tokenizer):
+    """Test that generation is limited to the tokens the prompt leaves free."""
+    response = _invoke({"prompt": "Hi", "parameters": {"max_new_tokens": 512}})
+    body = json.loads(response["body"])
+    input_tokens = len(handler.format_chat_prompt("Hi"))
+
+    assert response["statusCode"] == 200
+    assert body["usage"] == {"input_tokens": input_tokens, "generated_tokens": 2}
+    sent = json.loads(runtime.calls[0]["Body"])["parameters"]
+    assert sent["max_new_tokens"] == 120 - input_tokens
+
+
+def test_handler_rejects_prompts_over_input_limit(runtime, character_tokenizer):
+    """Test that oversized prompts are rejected before calling the endpoint."""
+    response = _invoke({"prompt": "x" * 100})
+
+    assert response["statusCode"] == 400
+    error = json.loads(response["body"])["error"]
+    assert "over the endpoint limit of 100 tokens" in error
+    assert runtime.calls == []
+
+
+def test_handler_session_keeps_history(runtime, sessions):
+    """Test that later turns are templated with the stored conversation."""
+    _invoke({"session_id": "chat-1", "prompt": "Capital of France?"})
+    response = _invoke({"session_id": "chat-1", "prompt": "And Spain?"})
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["session_id"] == "chat-1"
+    inputs = json.loads(runtime.calls[1]["Body"])["inputs"]
+    assert inputs.index("Capital of France?") < inputs.index("Paris")
+    assert inputs.index("Paris") < inputs.index("And Spain?")
+    assert len(sessions.get("chat-1")["messages"]) == 4
+
+
+def test_handler_session_truncates_history(runtime, sessions, monkeypatch):
+    """Test that history beyond the token budget is dropped."""
+    monkeypatch.setattr(handler, "SESSION_HISTORY_TOKENS", 12)
+    _invoke({"session_id": "chat-1", "prompt": "first question"})
+    _invoke({"session_id": "chat-1", "prompt": "second question"})
+
+    inputs = json.loads(runtime.calls[1]["Body"])["inputs"]
+    assert "first question" not in inputs
+    assert "second question" in inputs
+
+
+def test_handler_session_sticky_routing(runtime, sessions, monkeypatch):
+    """Test that a session is pinned to the instance SageMaker assigns."""
+    monkeypatch.setattr(handler, "SESSION_STICKY_ROUTING", True)
+    _invoke({"session_id": "chat-1", "prompt": "Hi"})
+    _invoke({"session_id": "chat-1", "prompt": "Again"})
+
+    assert runtime.calls[0]["SessionId"] == "NEW_SESSION"
+    assert runtime.calls[1]["SessionId"] == "sess-1"
+
+
+def test_handler_rejects_sessions_when_disabled(runtime, monkeypatch):
+    """Test that session requests fail clearly without a session store."""
+    monkeypatch.setattr(handler, "session_store", None)
+    response = _invoke({"session_id": "chat-1", "prompt": "Hi"})
+
+    assert response["statusCode"] == 400
+    assert runtime.calls == []
+
+
+@pytest.fixture
+def model_routes(monkeypatch):
+    routes = load_model_routes(
+        {
+            "tinyllama": {
+                "inference_component": "tinyllama-ic",
+                "chat_template": "zephyr",
+                "system_prompt": "You are a helpful AI assistant.",
+                "tokenizer": "tokenizer.json",
+            },
+            "qwen": {
+                "inference_component": "qwen-ic",
+                "chat_template": "chatml",
+                "system_prompt": "You are Qwen.",
+                "parameters": {"temperature": 0.2},
+                "tokenizer": "tokenizer-qwen.json",
+            },
+        },
+        handler.HANDLER_DIR,
+    )
+    monkeypatch.setattr(handler, "MODEL_ROUTES", routes)
+    monkeypatch.setattr(
+        handler, "tokenizers", {route.tokenizer_path: None for route in routes.values()}
+    )
+    return routes
+
+
+def test_handler_routes_to_requested_model(runtime, model_routes):
+    """Test that "model" selects the inference component, template and defaults."""
+    response = _invoke({"prompt": "Hi", "model": "qwen"})
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["model"] == "qwen"
+    call = runtime.calls[0]
+    sent = json.loads(call["Body"])
+    assert call["InferenceComponentName"] == "qwen-ic"
+    assert sent["inputs"].startswith("<|im_start|>system\nYou are Qwen.<|im_end|>")
+    assert sent["parameters"]["temperature"] == 0.2
+    assert sent["parameters"]["stop"] == ["<|im_end|>", "<|im_start|>"]
+
+
+def test_handler_defaults_to_first_model(runtime, model_routes):
+    """Test that requests without "model" go to the first configured model."""
+    _invoke({"prompt": "Hi"})
+
+    assert runtime.calls[0]["InferenceComponentName"] == "tinyllama-ic"
+
+
+def test_handler_rejects_unknown_model(runtime, model_routes):
+    """Test that unknown models are rejected with the available names."""
+    response = _invoke({"prompt": "Hi", "model": "gpt-9"})
+
+    assert response["statusCode"] == 400
+    assert "tinyllama, qwen" in json.loads(response["body"])["error"]
+    assert runtime.calls == []
+
+
+def test_handler_selects_lora_adapter(runtime, monkeypatch):
+    """Test that "adapter" is sent to TGI as its adapter id."""
+    monkeypatch.setattr(handler, "ADAPTER_ROUTES", {"support": "acme/support-lora"})
+
+    response = _invoke({"prompt": "Hi", "adapter": "support"})
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["adapter"] == "support"
+    sent = json.loads(runtime.calls[0]["Body"])
+    assert sent["parameters"]["adapter_id"] == "acme/support-lora"
+
+
+def test_handler_rejects_unknown_adapter(runtime, monkeypatch):
+    """Test that adapters the model does not load are rejected."""
+    monkeypatch.setattr(handler, "ADAPTER_ROUTES", {"support": "acme/support-lora"})
+
+    response = _invoke({"prompt": "Hi", "adapter": "sql"})
+
+    assert response["statusCode"] == 400
+    assert "support" in json.loads(response["body"])["error"]
+    assert runtime.calls == []
+
+
+def test_handler_pins_target_variant(runtime, monkeypatch, capsys):
+    """Test that pinned requests reach the variant and are measured per variant."""
+    monkeypatch.setattr(handler, "ENDPOINT_VARIANTS", ["g5", "g6"])
+    body = {
+        "prompt": "Hi",
+        "parameters": {"do_sample": False},
+        "target_variant": "g6",
+    }
+
+    _invoke(body)
+    response = _invoke(body)
+
+    # Deterministic, but pinned requests always reach the endpoint
+    assert len(runtime.calls) == 2
+    assert runtime.calls[0]["TargetVariant"] == "g6"
+    assert response["headers"]["X-Cache"] == "BYPASS"
+    assert json.loads(response["body"])["variant"] == "g6"
+    record = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert record["Variant"] == "g6"
+    assert record["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [
+        ["EndpointName", "Variant"]
+    ]
+
+
+def test_handler_rejects_unknown_target_variant(runtime, monkeypatch):
+    """Test that variants the endpoint does not have are rejected."""
+    monkeypatch.setattr(handler, "ENDPOINT_VARIANTS", ["g5", "g6"])
+
+    response = _invoke({"prompt": "Hi", "target_variant": "inf2"})
+
+    assert response["statusCode"] == 400
+    assert "g5, g6" in json.loads(response["body"])["error"]
+    assert runtime.calls == []
+
+
+class ThrottlingError(Exception):
+    """Stand-in for the ClientError raised when the endpoint throttles."""
+
+    response = {
+        "Error": {"Code": "ThrottlingException"},
+        "ResponseMetadata": {"HTTPStatusCode": 429},
+    }
+
+
+def test_handler_retries_throttled_requests(runtime, monkeypatch):
+    """Test that a throttle is retried within the deadline."""
+    invoke = runtime.invoke_endpoint
+    failures = [ThrottlingError("Rate exceeded")]
+
+    def throttle_once(**kwargs):
+        if failures:
+            raise failures.pop()
+        return invoke(**kwargs)
+
+    monkeypatch.setattr(runtime, "invoke_endpoint", throttle_once)
+
+    response = _invoke({"prompt": "Hi"})
+
+    assert response["statusCode"] == 200
+    assert len(runtime.calls) == 1
+
+
+def test_handler_fails_fast_while_endpoint_is_saturated(runtime, monkeypatch):
+    """Test 503 with Retry-After once throttles have opened the breaker."""
+
+    def throttle(**kwargs):
+        runtime.calls.append(kwargs)
+        raise ThrottlingError("Rate exceeded")
+
+    monkeypatch.setattr(runtime, "invoke_endpoint", throttle)
+
+    first = _invoke({"prompt": "Hi"})
+    second = _invoke({"prompt": "Hi"})
+
+    assert first["statusCode"] == 503
+    assert len(runtime.calls) == 2  # Retried until the breaker opened
+    assert second["statusCode"] == 503
+    assert second["headers"]["Retry-After"] == "10"
+    assert len(runtime.calls) == 2
+
+
+class Context:
+    """Lambda context with a fixed remaining time."""
+
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def test_handler_clamps_max_new_tokens_to_deadline(runtime):
+    """Test that generations that cannot finish in time are shortened."""
+    handler.throughput.record(handler.resolve_model(None).name, 10, 5.0)  # 2/s
+    body = {"prompt": "Hi", "parameters": {"max_new_tokens": 900}}
+
+    # 18.25s left after the response margin and the overhead allowance
+    response = handler.lambda_handler({"body": json.dumps(body)}, Context(20_250))
+
+    body = json.loads(response["body"])
+    sent = json.loads(runtime.calls[0]["Body"])
+    assert sent["parameters"]["max_new_tokens"] == 36
+    assert body["generation_budget"] == {
+        "max_new_tokens": 36,
+        "clamped": True,
+        "tokens_per_second": 2.0,
+    }
+
+
+def test_handler_rejects_generations_over_deadline(runtime, monkeypatch):
+    """Test reject mode, and that requests which fit are left as they are."""
+    monkeypatch.setattr(handler, "GENERATION_BUDGET_MODE", "reject")
+    handler.throughput.record(handler.resolve_model(None).name, 10, 5.0)
+
+    def invoke(max_new_tokens):
+        body = {"prompt": "Hi", "parameters": {"max_new_tokens": max_new_tokens}}
+        return handler.lambda_handler({"body": json.dumps(body)}, Context(20_250))
+
+    rejected = invoke(900)
+    accepted = invoke(20)
+
+    assert rejected["statusCode"] == 400
+    assert "at most 36 fit" in json.loads(rejected["body"])["error"]
+    assert len(runtime.calls) == 1
+    assert json.loads(accepted["body"])["generation_budget"]["clamped"] is False
+
+
+def test_handler_skips_budget_without_estimate(runtime):
+    """Test that requests are untouched until throughput has been observed."""
+    response = _invoke({"prompt": "Hi", "parameters": {"max_new_tokens": 900}})
+
+    body = json.loads(response["body"])
+    sent = json.loads(runtime.calls[0]["Body"])
+    assert sent["parameters"]["max_new_tokens"] == 900
+    assert "generation_budget" not in body
+
+
+def test_handler_caches_clamped_generations_under_clamped_parameters(runtime):
+    """Test that full-length cache hits skip the budget and clamped ones reuse it."""
+    model = handler.resolve_model(None).name
+    body = {"prompt": "Hi", "parameters": {"do_sample": False, "max_new_tokens": 900}}
+    event = {"body": json.dumps(body)}
+
+    handler.lambda_handler(event, Context(20_250))  # No estimate yet: full length
+    handler.throughput.record(model, 10, 5.0)
+    cached = handler.lambda_handler(event, Context(20_250))
+
+    assert len(runtime.calls) == 1
+    assert cached["headers"]["X-Cache"] == "HIT-LOCAL"
+    assert "generation_budget" not in json.loads(cached["body"])
+
+    body["prompt"] = "Hello"
+    event = {"body": json.dumps(body)}
+    first = handler.lambda_handler(event, Context(20_250))
+    second = handler.lambda_handler(event, Context(20_250))
+
+    assert len(runtime.calls) == 2
+    assert first["headers"]["X-Cache"] == "MISS"
+    assert second["headers"]["X-Cache"] == "HIT-LOCAL"
+    assert json.loads(second["body"])["generation_budget"]["clamped"] is True
+
+
+class FakeSageMaker:
+    """Stand-in for the SageMaker client answering DescribeEndpoint."""
+
+    def __init__(self, status="InService"):
+        self.status = status
+        self.calls = 0
+
+    def describe_endpoint(self, EndpointName):
+        self.calls += 1
+        if self.status is None:
+            raise RuntimeError("Rate exceeded")
+        return {"EndpointName": EndpointName, "EndpointStatus": self.status}
+
+
+def test_health_reports_endpoint_status_and_circuit(runtime, monkeypatch):
+    """Test the health route used by Route 53 health checks."""
+    sagemaker = FakeSageMaker()
+    monkeypatch.setattr(handler, "sagemaker_client", sagemaker)
+    monkeypatch.setattr(handler, "_endpoint_status", None)
+    event = {"resource": "/health", "httpMethod": "GET", "body": None}
+
+    healthy = handler.lambda_handler(event, None)
+    handler.lambda_handler(event, None)
+
+    assert healthy["statusCode"] == 200
+    assert json.loads(healthy["body"]) == {
+        "status": "healthy",
+        "endpoint_status": "InService",
+        "circuit": "closed",
+    }
+    # The status is reused between health checks
+    assert sagemaker.calls == 1
+    assert runtime.calls == []
+
+    # A saturated endpoint takes the region out of DNS
+    handler.circuit_breaker.record_failure()
+    handler.circuit_breaker.record_failure()
+    saturated = handler.lambda_handler(event, None)
+    assert saturated["statusCode"] == 503
+    assert json.loads(saturated["body"])["circuit"] == "open"
+
+
+def test_health_fails_while_endpoint_is_not_serving(runtime, monkeypatch):
+    """Test that updates stay healthy, and unknown or failed states do not."""
+    monkeypatch.setattr(handler, "HEALTH_CACHE_SECONDS", 0)
+    monkeypatch.setattr(handler, "_endpoint_status", None)
+    monkeypatch.setattr(handler, "sagemaker_client", FakeSageMaker("Updating"))
+    event = {"resource": "/health", "httpMethod": "GET", "body": None}
+
+    updating = handler.lambda_handler(event, None)
+    handler.sagemaker_client.status = "Failed"
+    failed = handler.lambda_handler(event, None)
+    handler.sagemaker_client.status = None
+    unknown = handler.lambda_handler(event, None)
+
+    assert updating["statusCode"] == 200
+    assert failed["statusCode"] == 503
+    assert json.loads(failed["body"])["endpoint_status"] == "Failed"
+    assert unknown["statusCode"] == 503
+    assert json.loads(unknown["body"])["endpoint_status"] == "Unknown"
@@ -0,0 +1,52 @@
+"""Cold-start tests for the invoke Lambda handler."""
+
+import json
+import os
+import subprocess
+import sys
+
+LAMBDA_SOURCE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "lambda", "invoke_sagemaker")
+)
+
+# Budget for importing the handler module in a fresh interpreter
+IMPORT_TIME_BUDGET_SECONDS = 0.15
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import handler
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "boto3": "boto3" in sys.modules}))
+"""
+
+
+def _import_handler_in_subprocess():
+    env = {
+        **os.environ,
+        "SAGEMAKER_ENDPOINT_NAME": "test-endpoint",
+        "PRIME_ON_INIT": "",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=LAMBDA_SOURCE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_handler_import_is_within_budget():
+    """Test that importing the handler stays within the cold-start budget."""
+    result = _import_handler_in_subprocess()
+
+    assert result["seconds"] < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_handler_import_defers_boto3():
+    """Test that boto3 is not imported until the client is first needed."""
+    result = _import_handler_in_subprocess()
+
+    assert not result["boto3"]
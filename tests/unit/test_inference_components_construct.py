@@ -0,0 +1,136 @@
+"""Unit tests for the inference component endpoint construct."""
+
+import json
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Template, Match
+from slm_sagemaker.constructs.inference_components_construct import (
+    InferenceComponentEndpointConstruct,
+)
+from config import (
+    ChatTemplate,
+    InferenceComponentResources,
+    ModelArchitecture,
+    ModelConfig,
+)
+
+TEST_TGI_IMAGE_URI = "763104351884.dkr.ecr.{region}.amazonaws.com/huggingface-pytorch-tgi-inference:2.3.0-tgi2.3.1-gpu-py310-cu121-ubuntu22.04"
+
+TINYLLAMA = ModelConfig(
+    name="TinyLlama",
+    hf_model_id="TinyLlama/TinyLlama-1.1B-Chat-v1.0",
+    architecture=ModelArchitecture(
+        num_parameters_billions=1.1,
+        num_layers=22,
+        num_attention_heads=32,
+        num_kv_heads=4,
+        head_dim=64,
+        max_context_length=2048,
+    ),
+)
+
+QWEN = ModelConfig(
+    name="Qwen2-0-5B",
+    hf_model_id="Qwen/Qwen2-0.5B-Instruct",
+    chat_template=ChatTemplate.CHATML,
+    generation_defaults={"temperature": 0.2},
+    resources=InferenceComponentResources(copy_count=2),
+)
+
+
+def _construct(models, instance_type="ml.g5.12xlarge"):
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+    construct = InferenceComponentEndpointConstruct(
+        stack,
+        "TestEndpoint",
+        endpoint_name_prefix="Test",
+        models=models,
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type=instance_type,
+        initial_instance_count=1,
+    )
+    return construct, Template.from_stack(stack)
+
+
+def test_inference_components_share_one_endpoint():
+    """Test that each model becomes a component of a single endpoint."""
+    _, template = _construct([TINYLLAMA, QWEN])
+
+    template.resource_count_is("AWS::SageMaker::Endpoint", 1)
+    template.resource_count_is("AWS::SageMaker::Model", 2)
+    template.resource_count_is("AWS::SageMaker::InferenceComponent", 2)
+    template.has_resource_properties(
+        "AWS::SageMaker::EndpointConfig",
+        {
+            "ExecutionRoleArn": Match.any_value(),
+            "ProductionVariants": [
+                Match.object_like(
+                    {"InstanceType": "ml.g5.12xlarge", "ModelName": Match.absent()}
+                )
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::SageMaker::InferenceComponent",
+        {
+            "InferenceComponentName": "Qwen2-0-5B-ic",
+            "Specification": {
+                "ModelName": "Qwen2-0-5B",
+                "ComputeResourceRequirements": {
+                    "NumberOfAcceleratorDevicesRequired": 1,
+                    "MinMemoryRequiredInMb": 4096,
+                },
+            },
+            "RuntimeConfig": {"CopyCount": 2},
+        },
+    )
+
+
+def test_inference_components_size_tgi_to_reserved_gpus():
+    """Test that a one-GPU reservation is not sharded across the instance."""
+    _, template = _construct([TINYLLAMA])
+
+    template.has_resource_properties(
+        "AWS::SageMaker::Model",
+        {
+            "PrimaryContainer": {
+                "Environment": Match.object_like(
+                    {"SM_NUM_GPUS": "1", "MAX_TOTAL_TOKENS": "2048"}
+                )
+            }
+        },
+    )
+
+
+def test_inference_components_model_routes():
+    """Test the per-model routes passed to the invoke Lambda."""
+    construct, _ = _construct([TINYLLAMA, QWEN])
+
+    routes = json.loads(json.dumps(construct.model_routes))
+    assert list(routes) == ["TinyLlama", "Qwen2-0-5B"]
+    assert routes["TinyLlama"]["chat_template"] == "zephyr"
+    assert routes["TinyLlama"]["tokenizer"] == "tokenizer.json"
+    assert routes["Qwen2-0-5B"] == {
+        "inference_component": "Qwen2-0-5B-ic",
+        "chat_template": "chatml",
+        "system_prompt": "You are a helpful AI assistant.",
+        "parameters": {"temperature": 0.2},
+        "max_input_length": 2048,
+        "max_total_tokens": 4096,
+        "tokenizer": "tokenizer-Qwen2-0-5B.json",
+        "adapters": {},
+    }
+
+
+def test_inference_components_reject_overcommitted_gpus():
+    """Test that reservations beyond the instance's GPUs fail at synth."""
+    with pytest.raises(ValueError, match="reserve 3 GPUs"):
+        _construct([TINYLLAMA, QWEN], instance_type="ml.g5.xlarge")
+
+
+def test_inference_components_reject_duplicate_names():
+    """Test that model names, used as component names, must be unique."""
+    with pytest.raises(ValueError):
+        _construct([TINYLLAMA, TINYLLAMA])
@@ -0,0 +1,150 @@
+"""Unit tests for the load testing harness."""
+
+import gzip
+import json
+import urllib.request
+
+import pytest
+
+from loadtest.fake_runtime import FakeTgiRuntime, serve_local
+from loadtest.report import percentile, summarize
+from loadtest.runner import (
+    HttpTarget,
+    RequestResult,
+    load_workload,
+    run_closed_loop,
+    run_open_loop,
+)
+
+
+def test_percentile_interpolates():
+    """Test percentiles between and at the ends of a sample."""
+    values = [10.0, 20.0, 30.0, 40.0, 50.0]
+
+    assert percentile(values, 0.5) == 30.0
+    assert percentile(values, 0.95) == pytest.approx(48.0)
+    assert percentile(values, 1.0) == 50.0
+    assert percentile([], 0.5) is None
+
+
+def test_summarize_separates_throttles_from_errors():
+    """Test rates, latency over successes and token throughput."""
+    results = [
+        RequestResult(latency_ms=100.0, status=200, generated_tokens=10),
+        RequestResult(latency_ms=200.0, status=200, generated_tokens=30),
+        RequestResult(latency_ms=5.0, status=429, error="Too Many Requests"),
+        RequestResult(latency_ms=50.0, status=500, error="boom"),
+    ]
+
+    summary = summarize(results, wall_time_seconds=2.0)
+
+    assert summary["succeeded"] == 2
+    assert summary["throttle_rate"] == 0.25
+    assert summary["error_rate"] == 0.25
+    assert summary["latency_ms"]["max"] == 200.0
+    assert summary["tokens_per_second"] == 20.0
+    assert summary["time_to_first_token_ms"] is None
+
+
+def test_load_workload_rejects_bodies_without_prompt(tmp_path):
+    """Test that malformed workload lines are reported with their line number."""
+    path = tmp_path / "workload.jsonl"
+    path.write_text('{"prompt": "Hi"}\n\n{"parameters": {}}\n')
+
+    with pytest.raises(ValueError, match=":3:"):
+        load_workload(str(path))
+
+
+def test_closed_loop_sends_every_request():
+    """Test that the workload is cycled until the request count is reached."""
+    sent = []
+
+    def send(body):
+        sent.append(body["prompt"])
+        return RequestResult(latency_ms=1.0, status=200)
+
+    results, _ = run_closed_loop(send, [{"prompt": "a"}, {"prompt": "b"}], 5, 2)
+
+    assert len(results) == 5
+    assert sorted(sent) == ["a", "a", "a", "b", "b"]
+
+
+def test_open_loop_schedules_requests():
+    """Test that open-loop requests are timed from their scheduled arrival."""
+    results, _ = run_open_loop(
+        lambda body: RequestResult(latency_ms=1.0, status=200),
+        [{"prompt": "a"}],
+        num_requests=4,
+        rate_per_second=1000,
+        seed=7,
+    )
+
+    assert len(results) == 4
+    assert all(result.latency_ms >= 1.0 for result in results)
+    assert sorted(result.scheduled_at for result in results)[0] == 0.0
+
+
+@pytest.fixture
+def local_server(monkeypatch):
+    runtime = FakeTgiRuntime(
+        prefill_latency_ms=1, per_token_latency_ms=1, output_tokens=5
+    )
+    import handler
+
+    # serve_local installs the fake client; restore the original afterwards
+    monkeypatch.setattr(handler, "sagemaker_runtime", None)
+    # Token counting is off unless the tokenizer is bundled
+    monkeypatch.setattr(handler, "tokenizers", {handler.TOKENIZER_PATH: None})
+    server = serve_local(runtime)
+    yield "http://{}:{}".format(*server.server_address[:2])
+    server.shutdown()
+
+
+def test_local_invoke_through_handler(local_server, capsys):
+    """Test a request through the real handler against the fake endpoint."""
+    result = HttpTarget(f"{local_server}/invoke").send(
+        {"prompt": "Hi", "parameters": {"max_new_tokens": 3}}
+    )
+
+    assert result.status == 200
+    assert result.error is None
+    assert result.generated_tokens == 3
+
+
+def test_local_stream_times_first_token(local_server, capsys):
+    """Test that streamed requests record time to first token."""
+    result = HttpTarget(f"{local_server}/stream", stream=True).send({"prompt": "Hi"})
+
+    assert result.status == 200
+    assert result.generated_tokens == 5
+    assert 0 < result.time_to_first_token_ms <= result.latency_ms
+
+
+def test_local_errors_are_recorded(local_server, capsys):
+    """Test that error responses are recorded with their status."""
+    result = HttpTarget(f"{local_server}/invoke").send({"prompt": "Hi", "model": "x"})
+
+    assert result.status == 400
+    assert json.loads(result.error)["error"]
+
+
+def test_local_server_compresses_large_responses(local_server, capsys):
+    """Test gzip responses over the minimum size, like API Gateway's."""
+
+    def post(body, accept_encoding):
+        request = urllib.request.Request(
+            f"{local_server}/invoke",
+            data=json.dumps(body).encode(),
+            headers={"Accept-Encoding": accept_encoding},
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as response:
+            return response.headers.get("Content-Encoding"), response.read()
+
+    large = {"prompt": "Hi " * 500, "fields": "*"}
+    encoding, data = post(large, "gzip, deflate")
+    assert encoding == "gzip"
+    assert json.loads(gzip.decompress(data))["prompt"] == large["prompt"]
+
+    assert post(large, "identity")[0] is None
+    assert post({"prompt": "Hi"}, "gzip")[0] is None
@@ -0,0 +1,65 @@
+"""Unit tests for multi-LoRA adapter configuration."""
+
+import pytest
+
+from config import LoraAdapter
+from slm_sagemaker.lora_adapters import (
+    adapter_routes,
+    lora_adapters_environment,
+    validate_lora_adapters,
+)
+
+ADAPTERS = [
+    LoraAdapter(name="support", hf_adapter_id="acme/support-lora"),
+    LoraAdapter(name="sql_v2", hf_adapter_id="acme/sql-lora.v2"),
+]
+
+
+def test_no_adapters_add_no_environment():
+    """Test that the base model is served alone without adapters."""
+    assert lora_adapters_environment([]) == {}
+
+
+def test_adapters_environment():
+    """Test that adapters are listed for TGI to load at startup."""
+    assert lora_adapters_environment(ADAPTERS) == {
+        "LORA_ADAPTERS": "acme/support-lora,acme/sql-lora.v2"
+    }
+
+
+def test_adapter_routes():
+    """Test that request-facing names map to TGI adapter ids."""
+    assert adapter_routes(ADAPTERS) == {
+        "support": "acme/support-lora",
+        "sql_v2": "acme/sql-lora.v2",
+    }
+
+
+def test_valid_adapters_pass_validation():
+    """Test that well-formed adapters are accepted."""
+    validate_lora_adapters(ADAPTERS, "real-time")
+
+
+@pytest.mark.parametrize(
+    "adapters, endpoint_type",
+    [
+        ([LoraAdapter("support", "acme/support-lora")], "serverless"),
+        ([LoraAdapter("-support", "acme/support-lora")], "real-time"),
+        ([LoraAdapter("support team", "acme/support-lora")], "real-time"),
+        ([LoraAdapter("a" * 64, "acme/support-lora")], "real-time"),
+        ([LoraAdapter("support", "support-lora")], "real-time"),
+        ([LoraAdapter("support", "acme/a,acme/b")], "async"),
+        (
+            [LoraAdapter("support", "acme/a"), LoraAdapter("support", "acme/b")],
+            "real-time",
+        ),
+        (
+            [LoraAdapter("a", "acme/support"), LoraAdapter("b", "acme/support")],
+            "inference-components",
+        ),
+    ],
+)
+def test_invalid_adapters_are_rejected(adapters, endpoint_type):
+    """Test that misnamed, duplicated or unsupported adapters fail validation."""
+    with pytest.raises(ValueError):
+        validate_lora_adapters(adapters, endpoint_type)
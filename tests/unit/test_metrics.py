@@ -0,0 +1,51 @@
+"""Unit tests for EMF metrics and stage timing."""
+
+import json
+
+import pytest
+
+from metrics import RequestMetrics, emit_metrics
+
+
+def test_emit_metrics_writes_emf_record(capsys):
+    """Test that metrics are printed in Embedded Metric Format."""
+    emit_metrics({"Latency": (12.5, "Milliseconds")}, {"EndpointName": "ep"})
+
+    record = json.loads(capsys.readouterr().out)
+    directive = record["_aws"]["CloudWatchMetrics"][0]
+
+    assert directive["Dimensions"] == [["EndpointName"]]
+    assert directive["Metrics"] == [{"Name": "Latency", "Unit": "Milliseconds"}]
+    assert record["EndpointName"] == "ep"
+    assert record["Latency"] == 12.5
+
+
+def test_request_metrics_times_stages():
+    """Test that stage durations accumulate and render as Server-Timing."""
+    ticks = iter([0.0, 0.002, 1.0, 1.5, 2.0, 2.001])
+    metrics = RequestMetrics(clock=lambda: next(ticks))
+
+    with metrics.stage("Parse"):
+        pass
+    with metrics.stage("Endpoint"):
+        pass
+    with metrics.stage("Parse"):
+        pass
+
+    assert metrics.stages == {"Parse": pytest.approx(3.0), "Endpoint": 500.0}
+    assert metrics.server_timing() == "parse;dur=3.0, endpoint;dur=500.0"
+
+
+def test_request_metrics_emits_single_record(capsys):
+    """Test that stages and values are published together."""
+    ticks = iter([0.0, 0.25])
+    metrics = RequestMetrics(clock=lambda: next(ticks))
+    with metrics.stage("Endpoint"):
+        pass
+    metrics.set("GeneratedTokens", 10)
+
+    metrics.emit({"EndpointName": "ep"})
+
+    record = json.loads(capsys.readouterr().out)
+    assert record["EndpointTime"] == 250.0
+    assert record["GeneratedTokens"] == 10
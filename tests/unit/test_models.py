@@ -0,0 +1,60 @@
+"""Unit tests for per-model chat templates and routing."""
+
+import pytest
+
+from models import (
+    CHAT_TEMPLATES,
+    ModelRoute,
+    UnknownAdapterError,
+    UnknownModelError,
+    select_adapter,
+    select_route,
+)
+
+
+def test_zephyr_template_matches_tinyllama_format():
+    """Test the TinyLlama-Chat prompt format."""
+    prompt = CHAT_TEMPLATES["zephyr"].format(
+        [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "Hi"},
+        ]
+    )
+
+    assert prompt == "<|system|>\nBe brief.</s>\n<|user|>\nHi</s>\n<|assistant|>\n"
+
+
+def test_chatml_template_opens_assistant_turn():
+    """Test the ChatML prompt format."""
+    prompt = CHAT_TEMPLATES["chatml"].format([{"role": "user", "content": "Hi"}])
+
+    assert prompt == "<|im_start|>user\nHi<|im_end|>\n<|im_start|>assistant\n"
+
+
+def test_select_route():
+    """Test default and named route selection."""
+    routes = {
+        name: ModelRoute(name, CHAT_TEMPLATES["zephyr"], "", f"{name}.json")
+        for name in ("a", "b")
+    }
+
+    assert select_route(routes, None).name == "a"
+    assert select_route(routes, "b").name == "b"
+    with pytest.raises(UnknownModelError):
+        select_route(routes, "c")
+
+
+def test_select_adapter():
+    """Test that an adapter name resolves to its TGI adapter id."""
+    route = ModelRoute(
+        "a",
+        CHAT_TEMPLATES["zephyr"],
+        "",
+        "a.json",
+        adapters={"support": "acme/support-lora"},
+    )
+
+    assert select_adapter(route, None).adapter_id is None
+    assert select_adapter(route, "support").adapter_id == "acme/support-lora"
+    with pytest.raises(UnknownAdapterError):
+        select_adapter(route, "sql")
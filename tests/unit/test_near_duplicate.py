@@ -0,0 +1,153 @@
+"""Unit tests for the near-duplicate prompt cache."""
+
+import pytest
+
+from near_duplicate import (
+    LshIndex,
+    MinHasher,
+    NearDuplicateCache,
+    normalize_prompt,
+    shingle_hashes,
+    similarity,
+)
+
+PROMPT = "What is the capital of France, and what is it famous for?"
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _jaccard(first, second, size=5):
+    a = set(shingle_hashes(normalize_prompt(first), size))
+    b = set(shingle_hashes(normalize_prompt(second), size))
+    return len(a & b) / len(a | b)
+
+
+def test_normalize_prompt_removes_trivial_differences():
+    """Test that casing, whitespace and edge punctuation are ignored."""
+    assert normalize_prompt("  What IS\n\tthe capital?  ") == "what is the capital"
+    assert normalize_prompt("2+2=?") == "2+2"
+
+
+def test_signatures_are_deterministic_and_normalized():
+    """Test that trivially different prompts get identical signatures."""
+    hasher = MinHasher(use_numpy=False)
+
+    signature = hasher.signature(PROMPT)
+    assert len(signature) == 64
+    assert signature == MinHasher(use_numpy=False).signature(PROMPT)
+    variant = "  what is the CAPITAL of france, and what is it famous for"
+    assert signature == hasher.signature(variant)
+
+
+def test_signature_agreement_estimates_jaccard_similarity():
+    """Test that the estimate tracks the exact shingle similarity."""
+    hasher = MinHasher(num_perm=256, use_numpy=False)
+    other = "What's the capital of France, and what is it known for?"
+
+    estimate = similarity(hasher.signature(PROMPT), hasher.signature(other))
+
+    assert estimate == pytest.approx(_jaccard(PROMPT, other), abs=0.1)
+    unrelated = hasher.signature("Write a haiku about autumn leaves")
+    assert similarity(hasher.signature(PROMPT), unrelated) < 0.1
+
+
+def test_numpy_signatures_match_pure_python():
+    """Test that the vectorized path computes the same signatures."""
+    pytest.importorskip("numpy")
+
+    for prompt in (PROMPT, "Hi", ""):
+        assert MinHasher(use_numpy=True).signature(prompt) == MinHasher(
+            use_numpy=False
+        ).signature(prompt)
+
+
+def test_index_returns_most_similar_entry_within_scope():
+    """Test that lookups find near matches only in the same scope."""
+    hasher = MinHasher(use_numpy=False)
+    index = LshIndex()
+    index.add("greedy", hasher.signature(PROMPT), "Paris")
+    index.add("greedy", hasher.signature("Tell me a joke"), "Knock knock")
+
+    variant = "What is the capital of France and what is it famous for?"
+    value, score = index.query("greedy", hasher.signature(variant))
+    assert value == "Paris"
+    assert score > 0.8
+    assert index.query("sampled", hasher.signature(PROMPT)) == (None, 0.0)
+    assert index.query("greedy", hasher.signature("Summarize this article")) == (
+        None,
+        0.0,
+    )
+
+
+def test_index_evicts_least_recently_used_entries():
+    """Test that the index stays within its bound and drops stale buckets."""
+    hasher = MinHasher(use_numpy=False)
+    index = LshIndex(max_entries=2)
+    prompts = ["first prompt here", "second prompt here", "third prompt here"]
+    for prompt in prompts[:2]:
+        index.add("s", hasher.signature(prompt), prompt)
+    index.query("s", hasher.signature(prompts[0]))  # Refresh the first entry
+    index.add("s", hasher.signature(prompts[2]), prompts[2])
+
+    assert len(index) == 2
+    assert index.query("s", hasher.signature(prompts[0]))[0] == prompts[0]
+    assert index.query("s", hasher.signature(prompts[1]))[1] < 1.0
+    assert sum(len(bucket) for bucket in index._buckets.values()) == 2 * 16
+
+
+def test_index_entries_expire():
+    clock = FakeClock()
+    hasher = MinHasher(use_numpy=False)
+    index = LshIndex(ttl_seconds=60, clock=clock)
+    index.add("s", hasher.signature(PROMPT), "Paris")
+
+    clock.now = 61
+    assert index.query("s", hasher.signature(PROMPT)) == (None, 0.0)
+    assert len(index) == 0
+
+
+def test_index_rejects_bands_that_do_not_divide_the_signature():
+    with pytest.raises(ValueError):
+        LshIndex(num_perm=64, bands=10)
+
+
+def test_cache_applies_threshold_and_counts_hits():
+    """Test that only matches above the threshold are served."""
+    cache = NearDuplicateCache(threshold=0.9, hasher=MinHasher(use_numpy=False))
+    cache.put("s", cache.signature(PROMPT), "Paris")
+
+    value, score = cache.get("s", cache.signature(PROMPT.upper() + "  "))
+    assert (value, score) == ("Paris", 1.0)
+
+    value, score = cache.get("s", cache.signature("What is the capital of Spain?"))
+    assert value is None
+    assert 0 < score < 0.9
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+
+def test_cache_skips_long_prompts():
+    cache = NearDuplicateCache(threshold=0.9, max_prompt_chars=10)
+
+    assert cache.signature(PROMPT) is None
+    cache.put("s", None, "Paris")
+    assert cache.get("s", None) == (None, 0.0)
+    assert len(cache.index) == 0
+
+
+@pytest.mark.parametrize("prompt", ["", "?", "!!!", " \n "])
+def test_cache_skips_prompts_empty_after_normalization(prompt):
+    """Test that prompts without text do not all match each other."""
+    cache = NearDuplicateCache(threshold=0.9, hasher=MinHasher(use_numpy=False))
+    cache.put("s", cache.signature("?"), "An answer to '?'")
+
+    assert cache.signature(prompt) is None
+    assert cache.get("s", cache.signature(prompt)) == (None, 0.0)
+    assert len(cache.index) == 0
@@ -0,0 +1,167 @@
+"""Unit tests for per-region stack settings."""
+
+import copy
+
+import pytest
+
+from config import (
+    CONFIG,
+    AutoscalingConfig,
+    EndpointType,
+    EndpointVariant,
+    RegionConfig,
+    ScalingMetric,
+)
+from slm_sagemaker.regions import (
+    deployment_regions,
+    regional_config,
+    resolve_image_uri,
+    stack_id,
+)
+
+IMAGE = (
+    "763104351884.dkr.ecr.{region}.amazonaws.com/"
+    "huggingface-pytorch-tgi-inference:2.1.1-tgi2.0.1-gpu-py310-cu121-ubuntu22.04"
+)
+
+
+def _config(endpoint_type=EndpointType.REAL_TIME):
+    config = copy.deepcopy(CONFIG)
+    config.endpoint.type = endpoint_type
+    config.tgi_image_uri = IMAGE
+    return config
+
+
+def test_resolve_image_uri_uses_the_regions_registry():
+    assert resolve_image_uri(IMAGE, "eu-west-1").startswith(
+        "763104351884.dkr.ecr.eu-west-1.amazonaws.com/huggingface-pytorch-tgi"
+    )
+    assert resolve_image_uri(IMAGE, "me-south-1").startswith(
+        "217643126080.dkr.ecr.me-south-1.amazonaws.com/"
+    )
+    assert resolve_image_uri(IMAGE, "cn-north-1").startswith(
+        "727897471807.dkr.ecr.cn-north-1.amazonaws.com.cn/"
+    )
+    # Images from other registries only get the region filled in
+    own = "123456789012.dkr.ecr.{region}.amazonaws.com/tgi:latest"
+    assert resolve_image_uri(own, "me-south-1") == (
+        "123456789012.dkr.ecr.me-south-1.amazonaws.com/tgi:latest"
+    )
+
+
+def test_deployment_regions_default_and_validation():
+    assert [r.region for r in deployment_regions(_config(), "us-west-2")] == [
+        "us-west-2"
+    ]
+
+    config = _config()
+    config.regions = [RegionConfig("us-east-1"), RegionConfig("eu-central-1")]
+    assert deployment_regions(config, "us-west-2") == config.regions
+
+    config.regions.append(RegionConfig("us-east-1"))
+    with pytest.raises(ValueError, match="unique"):
+        deployment_regions(config, "us-west-2")
+    config.regions = [RegionConfig("Europe")]
+    with pytest.raises(ValueError, match="Invalid region 'Europe'"):
+        deployment_regions(config, "us-west-2")
+
+
+def test_stack_ids_keep_the_single_region_name():
+    assert stack_id("us-east-1", multi_region=False) == "SlmSagemakerStack"
+    assert stack_id("eu-west-1", multi_region=True) == "SlmSagemakerStack-eu-west-1"
+
+
+def test_regional_config_overrides_real_time_capacity():
+    """Test that overrides apply to the region's copy only."""
+    config = _config()
+    config.endpoint.real_time.autoscaling = AutoscalingConfig(
+        enabled=True,
+        min_capacity=1,
+        max_capacity=4,
+        metric=ScalingMetric.INVOCATIONS_PER_INSTANCE,
+        target_value=60,
+        scale_in_cooldown_seconds=600,
+        scale_out_cooldown_seconds=60,
+    )
+    region = RegionConfig(
+        "eu-west-1",
+        instance_type="ml.g5.2xlarge",
+        initial_instance_count=2,
+        min_capacity=2,
+        max_capacity=8,
+    )
+
+    regional = regional_config(config, region)
+
+    real_time = regional.endpoint.real_time
+    assert real_time.instance_type == "ml.g5.2xlarge"
+    assert real_time.initial_instance_count == 2
+    assert real_time.autoscaling.min_capacity == 2
+    assert real_time.autoscaling.max_capacity == 8
+    assert regional.tgi_image_uri.startswith("763104351884.dkr.ecr.eu-west-1.")
+    # The shared configuration is unchanged
+    assert config.endpoint.real_time.instance_type == "ml.g5.xlarge"
+    assert config.endpoint.real_time.autoscaling.max_capacity == 4
+    assert "{region}" in config.tgi_image_uri
+
+
+def test_regional_config_overrides_other_endpoint_types():
+    serverless = regional_config(
+        _config(EndpointType.SERVERLESS), RegionConfig("eu-west-1", max_concurrency=3)
+    )
+    assert serverless.endpoint.serverless.max_concurrency == 3
+
+    async_config = regional_config(
+        _config(EndpointType.ASYNC),
+        RegionConfig("eu-west-1", instance_type="ml.g5.2xlarge", max_capacity=5),
+    )
+    assert async_config.endpoint.async_inference.instance_type == "ml.g5.2xlarge"
+    assert async_config.endpoint.async_inference.max_instance_count == 5
+
+    components = regional_config(
+        _config(EndpointType.INFERENCE_COMPONENTS),
+        RegionConfig("eu-west-1", initial_instance_count=3),
+    )
+    assert components.endpoint.inference_components.initial_instance_count == 3
+
+
+def test_regional_config_resolves_variant_images():
+    config = _config()
+    config.endpoint.real_time.variants = [
+        EndpointVariant("gpu", "ml.g5.xlarge"),
+        EndpointVariant(
+            "neuron",
+            "ml.inf2.xlarge",
+            tgi_image_uri="763104351884.dkr.ecr.{region}.amazonaws.com/tgi-neuron:1",
+        ),
+    ]
+
+    regional = regional_config(config, RegionConfig("af-south-1"))
+
+    assert regional.endpoint.real_time.variants[1].tgi_image_uri == (
+        "626614931356.dkr.ecr.af-south-1.amazonaws.com/tgi-neuron:1"
+    )
+
+
+@pytest.mark.parametrize(
+    "endpoint_type, overrides, message",
+    [
+        (EndpointType.SERVERLESS, {"instance_type": "x"}, "instance_type"),
+        (EndpointType.REAL_TIME, {"max_concurrency": 2}, "max_concurrency"),
+        (EndpointType.REAL_TIME, {"max_capacity": 2}, "autoscaling is disabled"),
+        (EndpointType.ASYNC, {"initial_instance_count": 2}, "initial_instance_count"),
+    ],
+)
+def test_regional_config_rejects_overrides_that_do_not_apply(
+    endpoint_type, overrides, message
+):
+    with pytest.raises(ValueError, match=message):
+        regional_config(_config(endpoint_type), RegionConfig("eu-west-1", **overrides))
+
+
+def test_regional_config_rejects_instance_overrides_with_variants():
+    config = _config()
+    config.endpoint.real_time.variants = [EndpointVariant("a", "ml.g5.xlarge")]
+
+    with pytest.raises(ValueError, match="weighted variants"):
+        regional_config(config, RegionConfig("eu-west-1", initial_instance_count=2))
@@ -0,0 +1,226 @@
+"""Unit tests for endpoint call retries, hedging and circuit breaking."""
+
+import threading
+import time
+
+import pytest
+
+from resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    EndpointUnavailableError,
+    call_with_retries,
+    hedged_call,
+    is_retryable,
+)
+
+
+class FakeClientError(Exception):
+    """Stand-in for botocore's ClientError."""
+
+    def __init__(self, code, status=400, original_status=None):
+        super().__init__(code)
+        self.response = {
+            "Error": {"Code": code},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        }
+        if original_status is not None:
+            self.response["OriginalStatusCode"] = original_status
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingCall:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def _no_sleep(seconds):
+    pass
+
+
+@pytest.mark.parametrize(
+    "error, retryable",
+    [
+        (FakeClientError("ThrottlingException", 429), True),
+        (FakeClientError("ModelNotReadyException", 429), True),
+        (FakeClientError("InternalFailure", 500), True),
+        (FakeClientError("ModelError", 424, original_status=503), True),
+        (FakeClientError("ModelError", 424, original_status=422), False),
+        (FakeClientError("ValidationError", 400), False),
+        (ValueError("bad"), False),
+    ],
+)
+def test_is_retryable(error, retryable):
+    """Test which endpoint errors are transient."""
+    assert is_retryable(error) is retryable
+
+
+def test_deadline_for_request_uses_earlier_limit():
+    """Test that the Lambda's remaining time and the cap both bound the deadline."""
+
+    class Context:
+        def __init__(self, remaining_ms):
+            self.remaining_ms = remaining_ms
+
+        def get_remaining_time_in_millis(self):
+            return self.remaining_ms
+
+    clock = FakeClock()
+
+    assert Deadline.for_request(Context(10_000), 29, 0.5, clock).remaining() == 9.5
+    assert Deadline.for_request(Context(60_000), 29, 0.5, clock).remaining() == 28.5
+    assert Deadline.for_request(None, 29, 0.5, clock).remaining() == 28.5
+
+    deadline = Deadline(1, clock)
+    clock.now = 2
+    assert deadline.remaining() == 0
+    assert deadline.expired
+
+
+def test_call_with_retries_retries_transient_errors():
+    """Test that throttles are retried with jittered, growing backoff."""
+    call = FailingCall(
+        FakeClientError("ThrottlingException", 429),
+        FakeClientError("ThrottlingException", 429),
+    )
+    sleeps = []
+
+    result = call_with_retries(
+        call,
+        Deadline(30),
+        max_attempts=3,
+        base_delay_seconds=0.1,
+        sleep=sleeps.append,
+        rand=lambda: 0.5,
+    )
+
+    assert result == "ok"
+    assert call.calls == 3
+    assert sleeps == [pytest.approx(0.05), pytest.approx(0.1)]
+
+
+def test_call_with_retries_raises_non_retryable_errors_unchanged():
+    """Test that client errors are not retried."""
+    call = FailingCall(FakeClientError("ValidationError", 400))
+
+    with pytest.raises(FakeClientError):
+        call_with_retries(call, Deadline(30), sleep=_no_sleep)
+
+    assert call.calls == 1
+
+
+def test_call_with_retries_stops_at_the_deadline():
+    """Test that no retry is started when it cannot finish in time."""
+    call = FailingCall(FakeClientError("ThrottlingException", 429))
+
+    with pytest.raises(EndpointUnavailableError, match="after 1 attempt"):
+        call_with_retries(call, Deadline(0.5), min_attempt_seconds=1.0, sleep=_no_sleep)
+
+    assert call.calls == 1
+
+
+def test_call_with_retries_gives_up_after_max_attempts():
+    """Test the error raised when every attempt fails."""
+    call = FailingCall(*[FakeClientError("InternalFailure", 500)] * 3)
+
+    with pytest.raises(EndpointUnavailableError) as excinfo:
+        call_with_retries(call, Deadline(30), max_attempts=2, sleep=_no_sleep)
+
+    assert call.calls == 2
+    assert excinfo.value.retry_after_header == "2"
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    """Test fail-fast while open and a single trial call after the timeout."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    clock.now = 4
+    assert breaker.retry_after() == 6
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial call at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_call_with_retries_fails_fast_while_circuit_is_open():
+    """Test that an open breaker rejects calls without invoking the endpoint."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=5, clock=clock)
+    breaker.record_failure()
+    call = FailingCall()
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        call_with_retries(call, Deadline(30), breaker, sleep=_no_sleep)
+
+    assert call.calls == 0
+    assert excinfo.value.retry_after_header == "5"
+
+
+def test_hedged_call_returns_the_faster_attempt():
+    """Test that a slow first attempt is overtaken by its duplicate."""
+    release_first = threading.Event()
+    attempts = []
+
+    def call():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            release_first.wait(5)
+            return "slow"
+        return "fast"
+
+    try:
+        assert hedged_call(call, hedge_after_seconds=0.01) == "fast"
+    finally:
+        release_first.set()
+    assert len(attempts) == 2
+
+
+def test_hedged_call_skips_duplicate_for_fast_attempts():
+    """Test that no duplicate is sent when the first attempt answers in time."""
+    call = FailingCall()
+
+    assert hedged_call(call, hedge_after_seconds=5) == "ok"
+    assert call.calls == 1
+
+
+def test_hedged_call_raises_when_both_attempts_fail():
+    """Test that an error is raised only after both attempts have failed."""
+    call = FailingCall(ValueError("first"), ValueError("second"))
+
+    def slow_failure():
+        time.sleep(0.02)
+        return call()
+
+    with pytest.raises(ValueError):
+        hedged_call(slow_failure, hedge_after_seconds=0.01)
+    assert call.calls == 2
@@ -0,0 +1,44 @@
+"""Unit tests for response field selection."""
+
+import pytest
+
+from response_fields import (
+    RESPONSE_FIELDS,
+    ResponseFieldsError,
+    parse_fields,
+    select_fields,
+)
+
+BODY = {
+    "generated_text": "Paris",
+    "prompt": "Capital of France?",
+    "parameters": {"max_new_tokens": 8},
+    "usage": {"generated_tokens": 2},
+}
+
+
+def test_default_leaves_out_echoed_inputs():
+    assert select_fields(BODY, parse_fields(None)) == {
+        "generated_text": "Paris",
+        "usage": {"generated_tokens": 2},
+    }
+
+
+def test_fields_as_list_string_or_everything():
+    assert parse_fields(["prompt"]) == {"prompt"}
+    assert parse_fields("generated_text, parameters") == {
+        "generated_text",
+        "parameters",
+    }
+    assert parse_fields("*") == RESPONSE_FIELDS
+    assert select_fields(BODY, parse_fields("*")) == BODY
+    # Requested fields the response does not have are skipped
+    assert select_fields(BODY, parse_fields(["prompt", "model"])) == {
+        "prompt": "Capital of France?"
+    }
+
+
+@pytest.mark.parametrize("value", [[], "", ["prompt", 1], {"prompt": True}, ["x"]])
+def test_malformed_or_unknown_fields_are_rejected(value):
+    with pytest.raises(ResponseFieldsError):
+        parse_fields(value)
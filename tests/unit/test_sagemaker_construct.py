@@ -1,8 +1,22 @@
 """Unit tests for SageMaker Real-Time Construct."""
 
 import aws_cdk as cdk
+import pytest
 from aws_cdk.assertions import Template, Match
 from slm_sagemaker.constructs.sagemaker_construct import SageMakerEndpointConstruct
+from config import (
+    AutoscalingConfig,
+    Dtype,
+    EndpointVariant,
+    LoraAdapter,
+    ModelArchitecture,
+    Quantization,
+    ScalingMetric,
+    ScheduledScalingWindow,
+    TgiLimits,
+    TgiProfile,
+    WarmupConfig,
+)
 
 # Test TGI image URI
 TEST_TGI_IMAGE_URI = "763104351884.dkr.ecr.{region}.amazonaws.com/huggingface-pytorch-tgi-inference:2.3.0-tgi2.3.1-gpu-py310-cu121-ubuntu22.04"
@@ -132,3 +146,573 @@ def test_sagemaker_construct_creates_iam_role():
             )
         },
     )
+
+
+def test_sagemaker_construct_creates_async_endpoint():
+    """Test that async endpoints get S3 output config and scale-to-zero scaling."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="async",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        max_instance_count=3,
+        max_concurrent_invocations_per_instance=4,
+    )
+
+    template = Template.from_stack(stack)
+
+    assert construct.async_bucket is not None
+    template.has_resource_properties(
+        "AWS::SageMaker::EndpointConfig",
+        {
+            "AsyncInferenceConfig": {
+                "OutputConfig": {
+                    "S3OutputPath": Match.any_value(),
+                    "S3FailurePath": Match.any_value(),
+                },
+                "ClientConfig": {"MaxConcurrentInvocationsPerInstance": 4},
+            }
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {"MinCapacity": 0, "MaxCapacity": 3},
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {"PolicyType": "StepScaling"},
+    )
+
+
+def test_sagemaker_construct_async_requires_settings():
+    """Test that async endpoints fail fast without their configuration."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError):
+        SageMakerEndpointConstruct(
+            stack,
+            "TestSageMaker",
+            model_name="TestModel",
+            hf_model_id="test/model",
+            endpoint_type="async",
+            tgi_image_uri=TEST_TGI_IMAGE_URI,
+            instance_type="ml.g5.xlarge",
+        )
+
+
+def _autoscaling(**overrides):
+    settings = {
+        "enabled": True,
+        "min_capacity": 1,
+        "max_capacity": 4,
+        "metric": ScalingMetric.INVOCATIONS_PER_INSTANCE,
+        "target_value": 60,
+        "scale_in_cooldown_seconds": 600,
+        "scale_out_cooldown_seconds": 60,
+    }
+    settings.update(overrides)
+    return AutoscalingConfig(**settings)
+
+
+def test_sagemaker_construct_real_time_autoscaling():
+    """Test that real-time autoscaling tracks invocations per instance."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        initial_instance_count=1,
+        autoscaling=_autoscaling(
+            scheduled_windows=[
+                ScheduledScalingWindow(
+                    name="Overnight",
+                    schedule="cron(0 22 * * ? *)",
+                    min_capacity=1,
+                    max_capacity=1,
+                )
+            ]
+        ),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": 1,
+            "MaxCapacity": 4,
+            "ResourceId": "endpoint/TestModel-endpoint/variant/AllTraffic",
+            "ScalableDimension": "sagemaker:variant:DesiredInstanceCount",
+            "ScheduledActions": [
+                Match.object_like(
+                    {
+                        "ScheduledActionName": "Overnight",
+                        "Schedule": "cron(0 22 * * ? *)",
+                        "ScalableTargetAction": {"MinCapacity": 1, "MaxCapacity": 1},
+                    }
+                )
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "PolicyType": "TargetTrackingScaling",
+            "TargetTrackingScalingPolicyConfiguration": Match.object_like(
+                {
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": "SageMakerVariantInvocationsPerInstance"
+                    },
+                    "TargetValue": 60,
+                    "ScaleInCooldown": 600,
+                    "ScaleOutCooldown": 60,
+                }
+            ),
+        },
+    )
+
+
+def test_sagemaker_construct_real_time_autoscaling_on_concurrency():
+    """Test that autoscaling can track concurrent requests per model."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        initial_instance_count=1,
+        autoscaling=_autoscaling(
+            metric=ScalingMetric.CONCURRENT_REQUESTS_PER_MODEL, target_value=8
+        ),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": Match.object_like(
+                {
+                    "CustomizedMetricSpecification": Match.object_like(
+                        {"MetricName": "ConcurrentRequestsPerModel"}
+                    ),
+                    "TargetValue": 8,
+                }
+            ),
+        },
+    )
+
+
+def test_sagemaker_construct_autoscaling_disabled_adds_no_policy():
+    """Test that a disabled autoscaling section adds no scaling resources."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        initial_instance_count=1,
+        autoscaling=_autoscaling(enabled=False),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+
+
+def test_sagemaker_construct_autoscaling_rejects_invalid_capacity():
+    """Test that the initial count must fall within the scaling range."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError):
+        SageMakerEndpointConstruct(
+            stack,
+            "TestSageMaker",
+            model_name="TestModel",
+            hf_model_id="test/model",
+            endpoint_type="real-time",
+            tgi_image_uri=TEST_TGI_IMAGE_URI,
+            instance_type="ml.g5.xlarge",
+            initial_instance_count=5,
+            autoscaling=_autoscaling(),
+        )
+
+
+def test_sagemaker_construct_derives_tgi_sizing_from_instance():
+    """Test that the container environment is sized for the instance type."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.12xlarge",
+        initial_instance_count=1,
+        architecture=ModelArchitecture(
+            num_parameters_billions=1.1,
+            num_layers=22,
+            num_attention_heads=32,
+            num_kv_heads=4,
+            head_dim=64,
+            max_context_length=2048,
+        ),
+        tgi_limits=TgiLimits(max_batch_total_tokens=65536),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::SageMaker::Model",
+        {
+            "PrimaryContainer": Match.object_like(
+                {
+                    "Environment": Match.object_like(
+                        {
+                            "SM_NUM_GPUS": "4",
+                            "MAX_INPUT_LENGTH": "1536",
+                            "MAX_TOTAL_TOKENS": "2048",
+                            "MAX_BATCH_PREFILL_TOKENS": "3072",
+                            "MAX_BATCH_TOTAL_TOKENS": "65536",
+                        }
+                    )
+                }
+            )
+        },
+    )
+
+
+def test_sagemaker_construct_passes_tgi_profile_to_container():
+    """Test that the TGI profile is added to the container environment."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    _construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        initial_instance_count=1,
+        tgi_profile=TgiProfile(quantization=Quantization.EETQ, speculate=2),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::SageMaker::Model",
+        {
+            "PrimaryContainer": Match.object_like(
+                {
+                    "Environment": Match.object_like(
+                        {"QUANTIZE": "eetq", "SPECULATE": "2"}
+                    )
+                }
+            )
+        },
+    )
+
+
+def test_sagemaker_construct_rejects_incompatible_tgi_profile():
+    """Test that incompatible TGI options fail at synth time."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError):
+        SageMakerEndpointConstruct(
+            stack,
+            "TestSageMaker",
+            model_name="TestModel",
+            hf_model_id="test/model",
+            endpoint_type="real-time",
+            tgi_image_uri=TEST_TGI_IMAGE_URI,
+            instance_type="ml.g5.xlarge",
+            initial_instance_count=1,
+            tgi_profile=TgiProfile(quantization=Quantization.AWQ, dtype=Dtype.FLOAT16),
+        )
+
+
+def test_sagemaker_construct_loads_lora_adapters():
+    """Test that adapters are passed to TGI and exposed by name for routing."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        initial_instance_count=1,
+        adapters=[
+            LoraAdapter(name="support", hf_adapter_id="acme/support-lora"),
+            LoraAdapter(name="sql", hf_adapter_id="acme/sql-lora"),
+        ],
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::SageMaker::Model",
+        {
+            "PrimaryContainer": Match.object_like(
+                {
+                    "Environment": Match.object_like(
+                        {"LORA_ADAPTERS": "acme/support-lora,acme/sql-lora"}
+                    )
+                }
+            )
+        },
+    )
+    assert construct.adapters == {
+        "support": "acme/support-lora",
+        "sql": "acme/sql-lora",
+    }
+
+
+def test_sagemaker_construct_weighted_variants_with_shadow():
+    """Test that variants get their own instance type, weight and TGI sizing."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    construct = SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        initial_instance_count=1,
+        architecture=ModelArchitecture(
+            num_parameters_billions=1.1,
+            num_layers=22,
+            num_attention_heads=32,
+            num_kv_heads=4,
+            head_dim=64,
+            max_context_length=2048,
+        ),
+        variants=[
+            EndpointVariant(name="g5", instance_type="ml.g5.xlarge", weight=0.8),
+            EndpointVariant(name="g6", instance_type="ml.g6.12xlarge", weight=0.2),
+        ],
+        shadow_variant=EndpointVariant(
+            name="g6e", instance_type="ml.g6e.xlarge", weight=0.5
+        ),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.resource_count_is("AWS::SageMaker::Model", 3)
+    template.has_resource_properties(
+        "AWS::SageMaker::EndpointConfig",
+        {
+            "ProductionVariants": [
+                Match.object_like(
+                    {
+                        "VariantName": "g5",
+                        "ModelName": "TestModel-g5",
+                        "InstanceType": "ml.g5.xlarge",
+                        "InitialVariantWeight": 0.8,
+                    }
+                ),
+                Match.object_like(
+                    {
+                        "VariantName": "g6",
+                        "ModelName": "TestModel-g6",
+                        "InstanceType": "ml.g6.12xlarge",
+                        "InitialVariantWeight": 0.2,
+                    }
+                ),
+            ],
+            "ShadowProductionVariants": [
+                Match.object_like(
+                    {"VariantName": "g6e", "InstanceType": "ml.g6e.xlarge"}
+                )
+            ],
+        },
+    )
+    assert construct.variant_names == ["g5", "g6"]
+    assert construct.variant_sizing["g5"].num_shards == 1
+    assert construct.variant_sizing["g6"].num_shards == 4
+
+
+@pytest.mark.parametrize(
+    "variants",
+    [
+        [EndpointVariant("a", "ml.g5.xlarge"), EndpointVariant("a", "ml.g6.xlarge")],
+        [EndpointVariant("g5_xlarge", "ml.g5.xlarge")],
+        [EndpointVariant("g5", "ml.g5.xlarge", weight=0)],
+    ],
+)
+def test_sagemaker_construct_rejects_invalid_variants(variants):
+    """Test that duplicate, misnamed or zero-weight variants fail at synth time."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError):
+        SageMakerEndpointConstruct(
+            stack,
+            "TestSageMaker",
+            model_name="TestModel",
+            hf_model_id="test/model",
+            endpoint_type="real-time",
+            tgi_image_uri=TEST_TGI_IMAGE_URI,
+            instance_type="ml.g5.xlarge",
+            initial_instance_count=1,
+            variants=variants,
+        )
+
+
+def test_sagemaker_construct_warms_up_after_deploy():
+    """Test that a custom resource primes the endpoint once it exists."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="real-time",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        instance_type="ml.g5.xlarge",
+        initial_instance_count=1,
+        warmup=WarmupConfig(prompt_tokens=[16, 512], fail_on_error=True),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.has_resource(
+        "Custom::EndpointWarmup",
+        {
+            "Properties": Match.object_like(
+                {
+                    "EndpointName": "TestModel-endpoint",
+                    "PromptTokens": ["16", "512"],
+                    "RequestsPerLength": "2",
+                    "MaxNewTokens": "16",
+                    "FailOnError": "true",
+                    "Revision": Match.any_value(),
+                }
+            ),
+            "DependsOn": Match.array_with(
+                [Match.string_like_regexp("TestSageMakerEndpoint")]
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "warmup.lambda_handler",
+            "Environment": {
+                "Variables": {
+                    "SAGEMAKER_ENDPOINT_NAME": "TestModel-endpoint",
+                    "ENDPOINT_VARIANTS": "AllTraffic",
+                }
+            },
+        },
+    )
+    # Keep-warm pings are for serverless endpoints only
+    template.resource_count_is("AWS::Events::Rule", 0)
+
+
+def test_sagemaker_construct_keeps_serverless_endpoint_warm():
+    """Test the keep-warm schedule of a serverless endpoint."""
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    SageMakerEndpointConstruct(
+        stack,
+        "TestSageMaker",
+        model_name="TestModel",
+        hf_model_id="test/model",
+        endpoint_type="serverless",
+        tgi_image_uri=TEST_TGI_IMAGE_URI,
+        memory_size_in_mb=6144,
+        max_concurrency=4,
+        warmup=WarmupConfig(
+            prompt_tokens=[32, 256], keep_warm_minutes=5, keep_warm_concurrency=2
+        ),
+    )
+
+    template = Template.from_stack(stack)
+
+    template.resource_count_is("Custom::EndpointWarmup", 1)
+    template.has_resource_properties(
+        "AWS::Events::Rule",
+        {
+            "ScheduleExpression": "rate(5 minutes)",
+            "Targets": [
+                Match.object_like(
+                    {
+                        "Input": '{"KeepWarm":{"Concurrency":2,"PromptTokens":32}}',
+                        "RetryPolicy": {"MaximumRetryAttempts": 0},
+                    }
+                )
+            ],
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "endpoint_type, warmup",
+    [
+        ("async", WarmupConfig()),
+        ("real-time", WarmupConfig(keep_warm_minutes=5)),
+        ("real-time", WarmupConfig(prompt_tokens=[])),
+        ("real-time", WarmupConfig(prompt_tokens=[100000])),
+        ("serverless", WarmupConfig(keep_warm_minutes=5, keep_warm_concurrency=20)),
+    ],
+)
+def test_sagemaker_construct_rejects_invalid_warmup(endpoint_type, warmup):
+    app = cdk.App()
+    stack = cdk.Stack(app, "TestStack")
+
+    with pytest.raises(ValueError, match="config.endpoint.warmup"):
+        SageMakerEndpointConstruct(
+            stack,
+            "TestSageMaker",
+            model_name="TestModel",
+            hf_model_id="test/model",
+            endpoint_type=endpoint_type,
+            tgi_image_uri=TEST_TGI_IMAGE_URI,
+            instance_type="ml.g5.xlarge",
+            initial_instance_count=1,
+            memory_size_in_mb=6144,
+            max_concurrency=4,
+            max_instance_count=2,
+            max_concurrent_invocations_per_instance=4,
+            warmup=warmup,
+        )
@@ -0,0 +1,60 @@
+"""Unit tests for multi-turn session history."""
+
+from sessions import (
+    InMemorySessionStore,
+    parse_endpoint_session_id,
+    truncate_history,
+)
+
+
+def _turns(count):
+    messages = []
+    for turn in range(count):
+        messages.append({"role": "user", "content": f"question {turn}"})
+        messages.append({"role": "assistant", "content": f"answer {turn}"})
+    return messages
+
+
+def test_truncate_history_keeps_recent_turns():
+    """Test that the oldest turns are dropped to fit the budget."""
+    messages = _turns(3) + [{"role": "user", "content": "question 3"}]
+
+    kept = truncate_history(messages, budget_tokens=3, count_tokens=lambda m: 1)
+
+    assert [m["content"] for m in kept] == ["question 2", "answer 2", "question 3"]
+
+
+def test_truncate_history_never_starts_with_a_reply():
+    """Test that a user message is never separated from its reply."""
+    messages = _turns(2) + [{"role": "user", "content": "question 2"}]
+
+    kept = truncate_history(messages, budget_tokens=2, count_tokens=lambda m: 1)
+
+    assert [m["content"] for m in kept] == ["question 2"]
+
+
+def test_truncate_history_keeps_newest_message():
+    """Test that an oversized newest message is left to admission control."""
+    messages = [{"role": "user", "content": "long"}]
+
+    assert truncate_history(messages, 1, lambda m: 100) == messages
+
+
+def test_in_memory_store_round_trip():
+    """Test that stored sessions are isolated copies."""
+    store = InMemorySessionStore()
+    assert store.get("abc") == {"messages": [], "endpoint_session_id": None}
+
+    session = {"messages": _turns(1), "endpoint_session_id": "sess-1"}
+    store.put("abc", session)
+    session["messages"].clear()
+
+    assert store.get("abc")["messages"] == _turns(1)
+
+
+def test_parse_endpoint_session_id():
+    """Test that the expiry suffix of NewSessionId is stripped."""
+    header = "sess-1; Expires=2026-01-01T00:00:00Z"
+
+    assert parse_endpoint_session_id(header) == "sess-1"
+    assert parse_endpoint_session_id(None) is None
@@ -1,8 +1,20 @@
+import copy
+
 import aws_cdk as core
 import aws_cdk.assertions as assertions
 
-from slm_sagemaker.slm_sagemaker_stack import SlmSagemakerStack
-from config import CONFIG
+from slm_sagemaker.slm_sagemaker_stack import (
+    SlmSagemakerStack,
+    create_regional_stacks,
+)
+from config import (
+    CONFIG,
+    BatchTransformConfig,
+    EndpointType,
+    GlobalRoutingConfig,
+    RegionConfig,
+    WarmupConfig,
+)
 
 
 def test_stack_creates_sagemaker_resources():
@@ -42,3 +54,167 @@ def test_stack_creates_required_iam_roles():
     # 3. API Gateway CloudWatch Logs role
     # 4. Lambda service role (auto-created by CDK)
     template.resource_count_is("AWS::IAM::Role", 4)
+
+
+def test_stack_creates_async_endpoint():
+    """Test that the async endpoint type wires the bucket and result route."""
+    config = copy.deepcopy(CONFIG)
+    config.endpoint.type = EndpointType.ASYNC
+    app = core.App()
+    stack = SlmSagemakerStack(app, "slm-sagemaker", config=config)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::S3::Bucket", 1)
+    template.has_resource_properties(
+        "AWS::SageMaker::EndpointConfig",
+        {"AsyncInferenceConfig": assertions.Match.any_value()},
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {"HttpMethod": "GET", "ApiKeyRequired": True},
+    )
+
+
+def test_stack_passes_token_limits_to_lambda():
+    """Test that the handler admits requests against the derived TGI limits."""
+    app = core.App()
+    stack = SlmSagemakerStack(app, "slm-sagemaker", config=CONFIG)
+    template = assertions.Template.from_stack(stack)
+
+    # TinyLlama on ml.g5.xlarge: 2048-token context, 512 reserved to generate
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": assertions.Match.object_like(
+                    {"MAX_INPUT_LENGTH": "1536", "MAX_TOTAL_TOKENS": "2048"}
+                )
+            },
+        },
+    )
+
+
+def test_stack_creates_inference_component_endpoint():
+    """Test that additional models are packed onto one endpoint."""
+    config = copy.deepcopy(CONFIG)
+    config.endpoint.type = EndpointType.INFERENCE_COMPONENTS
+    second_model = copy.deepcopy(config.model)
+    second_model.name = "TinyLlama-Second"
+    config.additional_models = [second_model]
+    app = core.App()
+    stack = SlmSagemakerStack(app, "slm-sagemaker", config=config)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::SageMaker::InferenceComponent", 2)
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": assertions.Match.object_like(
+                    {"MODEL_ROUTES": assertions.Match.any_value()}
+                )
+            },
+        },
+    )
+
+
+def test_stack_creates_batch_transform_pipeline():
+    """Test that Batch Transform reuses the endpoint's model."""
+    config = copy.deepcopy(CONFIG)
+    config.batch_transform = BatchTransformConfig(instance_type="ml.g5.xlarge")
+    app = core.App()
+    stack = SlmSagemakerStack(app, "slm-sagemaker", config=config)
+    template = assertions.Template.from_stack(stack)
+
+    # The transform runs on the same model as the endpoint
+    template.resource_count_is("AWS::SageMaker::Model", 1)
+    template.resource_count_is("AWS::StepFunctions::StateMachine", 1)
+    template.resource_count_is("AWS::S3::Bucket", 1)
+
+
+def test_stack_warms_up_serverless_endpoint():
+    """Test that the stack passes warm-up settings to the endpoint."""
+    config = copy.deepcopy(CONFIG)
+    config.endpoint.type = EndpointType.SERVERLESS
+    config.endpoint.warmup = WarmupConfig(keep_warm_minutes=10)
+    app = core.App()
+    stack = SlmSagemakerStack(app, "slm-sagemaker", config=config)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("Custom::EndpointWarmup", 1)
+    template.has_resource_properties(
+        "AWS::Events::Rule", {"ScheduleExpression": "rate(10 minutes)"}
+    )
+
+
+def test_single_region_keeps_the_stack_name():
+    """Test that deployments without config.regions update in place."""
+    app = core.App()
+    stacks = create_regional_stacks(app, CONFIG, default_region="us-east-1")
+
+    assert [stack.stack_name for stack in stacks] == ["SlmSagemakerStack"]
+    assert stacks[0].region == "us-east-1"
+
+
+def test_stacks_per_region_with_latency_routing():
+    """Test that each region gets its own capacity and latency record."""
+    config = copy.deepcopy(CONFIG)
+    config.regions = [
+        RegionConfig("us-east-1"),
+        RegionConfig("eu-west-1", instance_type="ml.g5.2xlarge"),
+    ]
+    config.global_routing = GlobalRoutingConfig(
+        domain_name="llm.example.com",
+        hosted_zone_id="Z0123456789",
+        hosted_zone_name="example.com",
+    )
+    app = core.App()
+    stacks = create_regional_stacks(app, config, default_region="us-west-2")
+
+    assert [stack.stack_name for stack in stacks] == [
+        "SlmSagemakerStack-us-east-1",
+        "SlmSagemakerStack-eu-west-1",
+    ]
+    for stack in stacks:
+        template = assertions.Template.from_stack(stack)
+        template.has_resource_properties(
+            "AWS::Route53::RecordSet",
+            {
+                "Name": "llm.example.com",
+                "Type": "A",
+                "Region": stack.region,
+                "SetIdentifier": stack.region,
+            },
+        )
+        template.has_resource_properties(
+            "AWS::Route53::HealthCheck",
+            {
+                "HealthCheckConfig": assertions.Match.object_like(
+                    {"Type": "HTTPS", "ResourcePath": "/prod/health"}
+                )
+            },
+        )
+        template.has_resource_properties(
+            "AWS::ApiGateway::Resource", {"PathPart": "health"}
+        )
+        template.has_resource_properties(
+            "AWS::SageMaker::Model",
+            {
+                "PrimaryContainer": assertions.Match.object_like(
+                    {
+                        "Image": assertions.Match.string_like_regexp(
+                            f"\\.dkr\\.ecr\\.{stack.region}\\."
+                        )
+                    }
+                )
+            },
+        )
+
+    assertions.Template.from_stack(stacks[1]).has_resource_properties(
+        "AWS::SageMaker::EndpointConfig",
+        {
+            "ProductionVariants": [
+                assertions.Match.object_like({"InstanceType": "ml.g5.2xlarge"})
+            ]
+        },
+    )
@@ -0,0 +1,150 @@
+"""Unit tests for TGI token stream parsing and the streaming server."""
+
+import json
+import urllib.request
+
+import handler
+from loadtest.fake_runtime import serve_local
+from streaming import GenerationStream, SseTokenParser
+
+
+def _token_event(text: str, special: bool = False) -> bytes:
+    """Encode a TGI token event as an SSE frame."""
+    event = {"token": {"id": 1, "text": text, "special": special}}
+    return f"data:{json.dumps(event)}\n\n".encode()
+
+
+class FakeEventStream:
+    """Stand-in for the botocore EventStream in a streaming response body."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield {"PayloadPart": {"Bytes": chunk}}
+
+    def close(self):
+        self.closed = True
+
+
+class BrokenEventStream(FakeEventStream):
+    """Event stream whose SageMaker connection fails after its chunks."""
+
+    def __iter__(self):
+        yield from super().__iter__()
+        raise ConnectionError("Endpoint connection lost")
+
+
+class BrokenRuntime:
+    """sagemaker-runtime client whose streams fail part-way through."""
+
+    def __init__(self):
+        self.body = BrokenEventStream([_token_event("Hi")])
+
+    def invoke_endpoint_with_response_stream(self, **kwargs):
+        return {"Body": self.body}
+
+
+def test_parser_handles_events_split_across_chunks():
+    """Test that events spanning chunk boundaries are reassembled."""
+    frame = _token_event("Hello")
+    parser = SseTokenParser()
+
+    assert list(parser.feed(frame[:10])) == []
+    events = list(parser.feed(frame[10:]))
+
+    assert [e["token"]["text"] for e in events] == ["Hello"]
+
+
+def test_parser_yields_multiple_events_from_one_chunk():
+    """Test that several events in one chunk are all yielded."""
+    parser = SseTokenParser()
+
+    events = list(parser.feed(_token_event("a") + _token_event("b")))
+
+    assert [e["token"]["text"] for e in events] == ["a", "b"]
+
+
+def test_generation_stream_records_time_to_first_token():
+    """Test that tokens are yielded in order and timings are recorded."""
+    ticks = iter([0.0, 0.25, 1.0])
+    body = FakeEventStream([_token_event("Par"), _token_event("is")])
+    stream = GenerationStream(body, clock=lambda: next(ticks))
+
+    assert list(stream) == ["Par", "is"]
+    assert stream.generated_text == "Paris"
+    assert stream.token_count == 2
+    assert stream.time_to_first_token_ms == 250.0
+    assert stream.total_time_ms == 1000.0
+
+
+def test_generation_stream_skips_special_tokens():
+    """Test that special tokens such as </s> are not sent to the client."""
+    body = FakeEventStream([_token_event("Hi"), _token_event("</s>", special=True)])
+
+    assert list(GenerationStream(body)) == ["Hi"]
+
+
+def test_closing_generation_stream_closes_sagemaker_stream():
+    """Test that abandoning the stream cancels the SageMaker response."""
+    body = FakeEventStream([_token_event("a"), _token_event("b")])
+    tokens = iter(GenerationStream(body))
+
+    next(tokens)
+    tokens.close()
+
+    assert body.closed
+
+
+def _stream_lines(monkeypatch, runtime):
+    """POST a prompt to a local streaming server; return the response lines."""
+    # serve_local installs the fake client; restore the original afterwards
+    monkeypatch.setattr(handler, "sagemaker_runtime", None)
+    monkeypatch.setattr(handler, "tokenizers", {handler.TOKENIZER_PATH: None})
+    server = serve_local(runtime)
+    request = urllib.request.Request(
+        "http://{}:{}/stream".format(*server.server_address[:2]),
+        data=json.dumps({"prompt": "Hi"}).encode(),
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.read().decode().splitlines()
+    finally:
+        server.shutdown()
+
+
+def test_stream_server_closes_sagemaker_stream_on_errors(monkeypatch):
+    """Test that a failed stream reports the error and cancels the generation."""
+    runtime = BrokenRuntime()
+
+    lines = _stream_lines(monkeypatch, runtime)
+
+    events = [json.loads(line[len("data:") :]) for line in lines if line]
+    assert events == [
+        {"token": "Hi"},
+        {"error": "Stream interrupted", "message": "Endpoint connection lost"},
+    ]
+    assert runtime.body.closed
+
+
+def test_stream_server_tolerates_clients_gone_before_the_error(monkeypatch, capsys):
+    """Test that a failed write, then a hung-up client, still ends cleanly."""
+    from stream_server import StreamRequestHandler
+
+    def send_event(self, data):
+        if "token" in data:
+            raise TimeoutError("Write timed out")
+        raise BrokenPipeError()
+
+    monkeypatch.setattr(StreamRequestHandler, "_send_event", send_event)
+    runtime = BrokenRuntime()
+
+    _stream_lines(monkeypatch, runtime)
+
+    output = capsys.readouterr().out
+    assert "Client disconnected before the error was sent" in output
+    # The handler finished, publishing its stream metrics
+    assert "StreamedTokens" in output
+    assert runtime.body.closed
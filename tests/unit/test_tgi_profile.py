@@ -0,0 +1,60 @@
+"""Unit tests for TGI performance profiles."""
+
+import pytest
+
+from config import Dtype, Quantization, TgiProfile
+from slm_sagemaker.tgi_profile import tgi_profile_environment, validate_tgi_profile
+
+
+def test_default_profile_adds_no_environment():
+    """Test that an empty profile leaves TGI defaults untouched."""
+    assert tgi_profile_environment(TgiProfile()) == {}
+
+
+def test_profile_environment():
+    """Test that profile options map to TGI environment variables."""
+    profile = TgiProfile(
+        quantization=Quantization.AWQ,
+        speculate=2,
+        cuda_graphs=[8, 1, 2, 4, 2],
+    )
+
+    assert tgi_profile_environment(profile) == {
+        "QUANTIZE": "awq",
+        "SPECULATE": "2",
+        "CUDA_GRAPHS": "1,2,4,8",
+    }
+
+
+def test_empty_cuda_graphs_disables_capture():
+    """Test that an empty list disables CUDA graphs."""
+    profile = TgiProfile(dtype=Dtype.BFLOAT16, cuda_graphs=[])
+
+    assert tgi_profile_environment(profile) == {
+        "DTYPE": "bfloat16",
+        "CUDA_GRAPHS": "0",
+    }
+
+
+@pytest.mark.parametrize(
+    "profile, endpoint_type",
+    [
+        (TgiProfile(quantization=Quantization.EETQ, dtype=Dtype.FLOAT16), "real-time"),
+        (TgiProfile(quantization=Quantization.BITSANDBYTES, cuda_graphs=[1]), "async"),
+        (TgiProfile(speculate=0), "real-time"),
+        (TgiProfile(cuda_graphs=[0, 4]), "real-time"),
+        (TgiProfile(quantization=Quantization.GPTQ), "serverless"),
+    ],
+)
+def test_incompatible_profiles_are_rejected(profile, endpoint_type):
+    """Test that combinations TGI cannot run fail validation."""
+    with pytest.raises(ValueError):
+        validate_tgi_profile(profile, endpoint_type)
+
+
+def test_compatible_profile_passes_validation():
+    """Test that a valid profile is accepted."""
+    validate_tgi_profile(
+        TgiProfile(quantization=Quantization.EETQ, speculate=3, cuda_graphs=[1, 2]),
+        "real-time",
+    )
@@ -0,0 +1,109 @@
+"""Unit tests for instance-aware TGI sizing."""
+
+import pytest
+
+from config import ModelArchitecture, TgiLimits
+from slm_sagemaker.tgi_sizing import DEFAULT_SIZING, derive_tgi_sizing
+
+TINYLLAMA = ModelArchitecture(
+    num_parameters_billions=1.1,
+    num_layers=22,
+    num_attention_heads=32,
+    num_kv_heads=4,
+    head_dim=64,
+    max_context_length=2048,
+)
+
+LLAMA_8B = ModelArchitecture(
+    num_parameters_billions=8.0,
+    num_layers=32,
+    num_attention_heads=32,
+    num_kv_heads=8,
+    head_dim=128,
+    max_context_length=8192,
+)
+
+
+def test_single_gpu_sizing_fills_kv_cache():
+    """Test derived limits for TinyLlama on a single A10G."""
+    sizing = derive_tgi_sizing("ml.g5.xlarge", TINYLLAMA)
+
+    assert sizing.num_shards == 1
+    assert sizing.max_total_tokens == 2048
+    assert sizing.max_input_length == 1536
+    assert sizing.max_batch_prefill_tokens == 3072
+    # (24 GiB * 0.9 - 2 GiB) - 2.2 GB of weights, at 22 KiB of KV cache per token
+    assert sizing.max_batch_total_tokens == 836529
+
+
+def test_multi_gpu_instance_shards_across_all_gpus():
+    """Test that a 4-GPU instance shards 4 ways and gains KV cache capacity."""
+    single = derive_tgi_sizing("ml.g5.xlarge", LLAMA_8B)
+    sharded = derive_tgi_sizing("ml.g5.12xlarge", LLAMA_8B)
+
+    assert sharded.num_shards == 4
+    assert sharded.max_batch_total_tokens > 4 * single.max_batch_total_tokens
+
+
+def test_shard_count_divides_attention_heads():
+    """Test that shards are limited to a divisor of the KV head count."""
+    sizing = derive_tgi_sizing("ml.g5.48xlarge", TINYLLAMA)
+
+    assert sizing.num_shards == 4
+
+
+def test_reserved_gpus_limit_shards():
+    """Test that a model sharing an instance is sized to its reserved GPUs."""
+    reserved = derive_tgi_sizing("ml.g5.12xlarge", TINYLLAMA, gpu_count=1)
+
+    assert reserved == derive_tgi_sizing("ml.g5.xlarge", TINYLLAMA)
+
+
+def test_overrides_take_precedence():
+    """Test that explicit limits replace derived values."""
+    sizing = derive_tgi_sizing(
+        "ml.g5.xlarge",
+        TINYLLAMA,
+        TgiLimits(max_total_tokens=1024, max_batch_total_tokens=16384),
+    )
+
+    assert sizing.max_total_tokens == 1024
+    assert sizing.max_input_length == 512
+    assert sizing.max_batch_total_tokens == 16384
+
+
+def test_unknown_architecture_uses_defaults():
+    """Test that sizing falls back to the previous fixed limits."""
+    assert derive_tgi_sizing("ml.g5.xlarge", None) == DEFAULT_SIZING
+    assert derive_tgi_sizing(None, TINYLLAMA) == DEFAULT_SIZING
+
+
+def test_unknown_instance_type_requires_explicit_limits():
+    """Test that unknown instance types need every limit set explicitly."""
+    with pytest.raises(ValueError):
+        derive_tgi_sizing("ml.x1.unknown", TINYLLAMA)
+
+    limits = TgiLimits(
+        num_shards=2,
+        max_input_length=1000,
+        max_total_tokens=2000,
+        max_batch_prefill_tokens=2000,
+        max_batch_total_tokens=10000,
+    )
+    assert derive_tgi_sizing("ml.x1.unknown", TINYLLAMA, limits).num_shards == 2
+
+
+def test_model_too_large_for_instance_is_rejected():
+    """Test that a model whose weights exceed GPU memory fails at synth time."""
+    with pytest.raises(ValueError):
+        derive_tgi_sizing("ml.g4dn.xlarge", LLAMA_8B)
+
+
+def test_inconsistent_overrides_are_rejected():
+    """Test that overrides violating TGI's invariants are rejected."""
+    with pytest.raises(ValueError):
+        derive_tgi_sizing(
+            "ml.g5.xlarge",
+            TINYLLAMA,
+            TgiLimits(max_input_length=4096, max_total_tokens=2048),
+        )
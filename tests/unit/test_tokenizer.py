@@ -0,0 +1,90 @@
+"""Unit tests for token counting and admission."""
+
+import json
+
+import pytest
+
+from tokenizer import (
+    AdmissionError,
+    BpeTokenizer,
+    UnsupportedTokenizerError,
+    apply_token_budget,
+    load_tokenizer,
+)
+
+
+def _tokenizer():
+    vocab = {
+        token: index
+        for index, token in enumerate(
+            ["<unk>", "<s>", "</s>", "▁", "h", "i", "▁h", "▁hi", "!"]
+        )
+    }
+    return BpeTokenizer(
+        vocab=vocab,
+        merges=[("▁", "h"), ("▁h", "i")],
+        added_tokens=["<unk>", "<s>", "</s>"],
+    )
+
+
+def test_tokenizer_applies_merges_in_rank_order():
+    """Test that BPE merges produce whole-word tokens."""
+    assert _tokenizer().encode("hi hi!") == ["<s>", "▁hi", "▁hi", "!"]
+
+
+def test_tokenizer_matches_added_tokens():
+    """Test that special tokens in the template are single tokens."""
+    assert _tokenizer().encode("hi</s>hi") == ["<s>", "▁hi", "</s>", "▁hi"]
+
+
+def test_tokenizer_byte_fallback():
+    """Test that characters outside the vocabulary count one token per byte."""
+    assert _tokenizer().encode("é") == ["<s>", "▁", "<0xC3>", "<0xA9>"]
+
+
+def test_tokenizer_handles_long_inputs():
+    """Test that long prompts are tokenized without quadratic blow-up."""
+    assert _tokenizer().count_tokens(" ".join(["hi"] * 20000)) == 20001
+
+
+def test_load_tokenizer_from_file(tmp_path):
+    """Test loading a Hugging Face tokenizer.json."""
+    path = tmp_path / "tokenizer.json"
+    path.write_text(
+        json.dumps(
+            {
+                "added_tokens": [{"content": "<s>"}],
+                "pre_tokenizer": None,
+                "post_processor": {"single": [{"SpecialToken": {"id": "<s>"}}]},
+                "model": {"type": "BPE", "vocab": {"▁": 0, "a": 1}, "merges": []},
+            }
+        )
+    )
+
+    assert load_tokenizer(str(path)).encode("a") == ["<s>", "▁", "a"]
+    assert load_tokenizer(str(tmp_path / "missing.json")) is None
+
+
+def test_load_tokenizer_rejects_unsupported_models(tmp_path):
+    """Test that tokenizers with a pre-tokenizer are not silently miscounted."""
+    path = tmp_path / "tokenizer.json"
+    path.write_text(
+        json.dumps({"pre_tokenizer": {"type": "ByteLevel"}, "model": {"type": "BPE"}})
+    )
+
+    with pytest.raises(UnsupportedTokenizerError):
+        BpeTokenizer.from_file(str(path))
+
+
+def test_token_budget_clamps_max_new_tokens():
+    """Test that generation is clamped to the tokens left in the context."""
+    config = {"max_new_tokens": 512}
+
+    assert apply_token_budget(1800, config, 1900, 2048) == 248
+    assert config["max_new_tokens"] == 248
+
+
+def test_token_budget_rejects_long_prompts():
+    """Test that prompts over the input limit are rejected."""
+    with pytest.raises(AdmissionError, match="2000 tokens"):
+        apply_token_budget(2000, {"max_new_tokens": 16}, 1536, 2048)
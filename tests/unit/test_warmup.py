@@ -0,0 +1,215 @@
+"""Unit tests for the endpoint warm-up function."""
+
+import json
+
+import pytest
+
+import warmup
+from resilience import Deadline
+from warmup import (
+    WarmupSettings,
+    keep_warm,
+    priming_prompt,
+    wait_in_service,
+    warm_up,
+)
+
+
+class FakeClientError(Exception):
+    """Stand-in for botocore's ClientError."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {
+            "Error": {"Code": code},
+            "ResponseMetadata": {"HTTPStatusCode": 400},
+        }
+
+
+class FakeEndpoint:
+    """Records invocations; raises queued errors (None answers) in turn."""
+
+    def __init__(self, errors=()):
+        self.calls = []
+        self.errors = list(errors)
+
+    def __call__(self, payload, variant):
+        self.calls.append((payload, variant))
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        return [{"generated_text": " ok"}]
+
+
+class FakeClock:
+    """Advances by one second each time it is read."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+def _records(capsys):
+    return [
+        json.loads(line)
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith('{"_aws"')
+    ]
+
+
+def test_settings_parse_custom_resource_properties():
+    """Test that string properties from CloudFormation are converted."""
+    settings = WarmupSettings.from_properties(
+        {
+            "ServiceToken": "arn",
+            "PromptTokens": ["32", "512"],
+            "RequestsPerLength": "2",
+            "MaxNewTokens": "16",
+            "FailOnError": "true",
+        }
+    )
+
+    assert settings == WarmupSettings((32, 512), 2, 16, fail_on_error=True)
+
+
+def test_priming_prompt_has_about_the_requested_tokens():
+    assert len(priming_prompt(100).split()) == 100
+    assert priming_prompt(3) == "The quick brown"
+
+
+def test_warm_up_primes_each_variant_and_prompt_length(capsys):
+    """Test that every variant gets every length, with first latencies apart."""
+    endpoint = FakeEndpoint()
+    settings = WarmupSettings((8, 64), requests_per_length=2, max_new_tokens=4)
+
+    failures = warm_up(
+        settings, ["A", "B"], Deadline(600), invoke=endpoint, clock=FakeClock()
+    )
+
+    assert failures == 0
+    assert [(len(p["inputs"].split()), v) for p, v in endpoint.calls] == [
+        (8, "A"),
+        (8, "A"),
+        (64, "A"),
+        (64, "A"),
+        (8, "B"),
+        (8, "B"),
+        (64, "B"),
+        (64, "B"),
+    ]
+    assert endpoint.calls[0][0]["parameters"] == {
+        "max_new_tokens": 4,
+        "do_sample": False,
+    }
+    records = _records(capsys)
+    assert len(records) == 4
+    assert records[0]["Trigger"] == "Deploy"
+    assert records[0]["Variant"] == "A"
+    assert records[0]["PromptTokens"] == "8"
+    assert records[0]["WarmupFirstLatency"] == 1000.0
+    assert records[0]["WarmupLatency"] == 1000.0
+    assert records[0]["WarmupFailures"] == 0
+
+
+def test_warm_up_targets_no_variant_on_single_variant_endpoints(capsys):
+    endpoint = FakeEndpoint()
+
+    warm_up(WarmupSettings((8,), 1, 1), ["AllTraffic"], Deadline(600), endpoint)
+
+    assert [variant for _, variant in endpoint.calls] == [None]
+    assert "WarmupLatency" not in _records(capsys)[0]
+
+
+def test_warm_up_retries_cold_containers_and_counts_failures(capsys):
+    """Test that not-ready errors are retried and bad requests counted."""
+    not_ready, invalid = (
+        FakeClientError("ModelNotReadyException"),
+        FakeClientError("ValidationError"),
+    )
+    endpoint = FakeEndpoint([not_ready, None, invalid])
+    delays = []
+
+    failures = warm_up(
+        WarmupSettings((8,), 2, 1),
+        ["AllTraffic"],
+        Deadline(600),
+        invoke=endpoint,
+        clock=FakeClock(),
+        sleep=delays.append,
+    )
+
+    # The first request succeeded on its retry; the second was rejected
+    assert failures == 1
+    assert len(endpoint.calls) == 3
+    assert len(delays) == 1
+    record = _records(capsys)[0]
+    assert record["WarmupFirstLatency"] == 1000.0
+    assert record["WarmupFailures"] == 1
+    assert "WarmupLatency" not in record
+
+
+def test_keep_warm_sends_concurrent_pings(capsys):
+    endpoint = FakeEndpoint()
+
+    failures = keep_warm(3, 16, Deadline(60), invoke=endpoint)
+
+    assert failures == 0
+    assert len(endpoint.calls) == 3
+    payload, variant = endpoint.calls[0]
+    assert payload["parameters"]["max_new_tokens"] == 1
+    assert variant is None
+    record = _records(capsys)[0]
+    assert record["Trigger"] == "KeepWarm"
+    assert record["WarmupFailures"] == 0
+    assert "WarmupLatency" in record
+
+
+def test_wait_in_service_polls_transitional_states():
+    statuses = iter(["Updating", "Updating", "InService"])
+    sleeps = []
+
+    wait_in_service(lambda: next(statuses), Deadline(600), sleep=sleeps.append)
+
+    assert sleeps == [warmup.STATUS_POLL_SECONDS] * 2
+
+    with pytest.raises(RuntimeError, match="is Failed"):
+        wait_in_service(lambda: "Failed", Deadline(600))
+    with pytest.raises(RuntimeError, match="still Creating"):
+        wait_in_service(lambda: "Creating", Deadline(1))
+
+
+def test_handler_warms_up_on_create_and_ignores_delete(monkeypatch, capsys):
+    """Test the custom resource lifecycle and FailOnError."""
+    endpoint = FakeEndpoint()
+    monkeypatch.setattr(warmup, "endpoint_status", lambda: "InService")
+    monkeypatch.setattr(warmup, "invoke_endpoint", endpoint)
+    properties = {"PromptTokens": ["8"], "RequestsPerLength": "1", "MaxNewTokens": "1"}
+
+    response = warmup.lambda_handler(
+        {"RequestType": "Create", "ResourceProperties": properties}, None
+    )
+    assert response == {
+        "PhysicalResourceId": "test-endpoint-warmup",
+        "Data": {"Failures": 0},
+    }
+    assert len(endpoint.calls) == 1
+
+    response = warmup.lambda_handler(
+        {"RequestType": "Delete", "PhysicalResourceId": "id"}, None
+    )
+    assert response == {"PhysicalResourceId": "id"}
+    assert len(endpoint.calls) == 1
+
+    endpoint.errors = [FakeClientError("ValidationError")]
+    with pytest.raises(RuntimeError, match="1 priming request"):
+        warmup.lambda_handler(
+            {
+                "RequestType": "Update",
+                "PhysicalResourceId": "id",
+                "ResourceProperties": {**properties, "FailOnError": "true"},
+            },
+            None,
+        )